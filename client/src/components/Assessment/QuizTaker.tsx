@@ -30,6 +30,7 @@ import { assessmentApi, Assessment, AssessmentSubmission } from '../../services/
 import AdaptiveQuizTaker from './AdaptiveQuizTaker';
 import { AIEnhancedAssessmentResults } from './AIEnhancedAssessmentResults';
 import { useResponsive } from '../Responsive/useResponsive';
+import { useAnswerAutosave } from '../../hooks/useAnswerAutosave';
 
 interface QuizTakerProps {
   assessmentId?: string;
@@ -125,6 +126,7 @@ const TraditionalQuizTaker: React.FC<TraditionalQuizTakerProps> = ({ assessmentI
   const [results, setResults] = useState<any>(null);
   const [canTakeAssessment, setCanTakeAssessment] = useState(false);
   const [assessmentStarted, setAssessmentStarted] = useState(false);
+  const autosave = useAnswerAutosave(submissionId, setError);
 
   // Load assessment data
   useEffect(() => {
@@ -196,6 +198,7 @@ const TraditionalQuizTaker: React.FC<TraditionalQuizTakerProps> = ({ assessmentI
       ...prev,
       [questionId]: answer
     }));
+    autosave.queueAnswer(questionId, answer);
   };
 
   const validateAnswers = () => {
@@ -213,6 +216,7 @@ const TraditionalQuizTaker: React.FC<TraditionalQuizTakerProps> = ({ assessmentI
 
     try {
       setSubmitting(true);
+      await autosave.settle();
       const response = await assessmentApi.submitAssessment(submissionId, { answers });
       
       // Get complete submission details including attempt number
@@ -128,9 +128,9 @@ const QueueDisplay: React.FC<QueueDisplayProps> = ({ instructorId, isInstructor,
     // Listen for presence changes
     const socket = socketService.getSocket();
     if (socket) {
-      socket.on('presence-changed', loadPresence);
+      socket.on('presence-batch', loadPresence);
       return () => {
-        socket.off('presence-changed', loadPresence);
+        socket.off('presence-batch', loadPresence);
       };
     }
   }, [queue]);
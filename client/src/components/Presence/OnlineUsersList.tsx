@@ -73,13 +73,13 @@ const OnlineUsersList: React.FC<OnlineUsersListProps> = ({
     
     const socket = socketService.getSocket();
     if (socket) {
-      socket.on('presence-changed', handlePresenceChanged);
+      socket.on('presence-batch', handlePresenceChanged);
     }
     
     return () => {
       clearInterval(interval);
       if (socket) {
-        socket.off('presence-changed', handlePresenceChanged);
+        socket.off('presence-batch', handlePresenceChanged);
       }
     };
   }, [courseId, limit]); // eslint-disable-line react-hooks/exhaustive-deps
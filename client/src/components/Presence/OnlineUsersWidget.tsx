@@ -49,10 +49,10 @@ const OnlineUsersWidget: React.FC<OnlineUsersWidgetProps> = ({ maxAvatars = 8 })
     // Listen for real-time presence changes
     const socket = socketService.getSocket();
     if (socket) {
-      socket.on('presence-changed', loadOnlineUsers);
+      socket.on('presence-batch', loadOnlineUsers);
       
       return () => {
-        socket.off('presence-changed', loadOnlineUsers);
+        socket.off('presence-batch', loadOnlineUsers);
       };
     }
   }, []); // eslint-disable-line react-hooks/exhaustive-deps
@@ -0,0 +1,94 @@
+import { useCallback, useEffect, useRef } from 'react';
+import { assessmentApi, AnswerDelta } from '../services/assessmentApi';
+
+const AUTOSAVE_DELAY_MS = 1000;
+
+// Network errors, rate limiting and server errors; anything else is the server rejecting the batch
+function isTransientError(error: any): boolean {
+  const status = error?.response?.status;
+  return !status || status === 429 || status >= 500;
+}
+
+/**
+ * Debounced autosave of assessment answers.
+ *
+ * Changes are collected per question (last value wins) and sent as one batch
+ * AUTOSAVE_DELAY_MS after the last change, with at most one request in flight.
+ * A batch that failed transiently is retried with the next one unless the answer
+ * changed again; a batch the server rejected is dropped and reported to onRejected
+ * (the final submit still carries every answer).
+ */
+export function useAnswerAutosave(submissionId: string | null, onRejected?: (message: string) => void) {
+  const pending = useRef<Map<string, AnswerDelta>>(new Map());
+  const inFlight = useRef<Promise<void> | null>(null);
+  const timer = useRef<ReturnType<typeof setTimeout> | null>(null);
+  const onRejectedRef = useRef(onRejected);
+  onRejectedRef.current = onRejected;
+
+  const send = useCallback(async (): Promise<void> => {
+    if (timer.current) {
+      clearTimeout(timer.current);
+      timer.current = null;
+    }
+    while (inFlight.current) {
+      await inFlight.current;
+    }
+    if (!submissionId || pending.current.size === 0) {
+      return;
+    }
+
+    const batch = pending.current;
+    pending.current = new Map();
+    inFlight.current = assessmentApi
+      .saveAnswers(submissionId, [...batch.values()])
+      .then(() => undefined)
+      .catch((error) => {
+        console.error('Error autosaving answers:', error);
+        if (!isTransientError(error)) {
+          onRejectedRef.current?.(error.response?.data?.error || 'Your latest answers could not be saved');
+          return;
+        }
+        batch.forEach((delta, questionId) => {
+          if (!pending.current.has(questionId)) {
+            pending.current.set(questionId, delta);
+          }
+        });
+      })
+      .finally(() => {
+        inFlight.current = null;
+      });
+    await inFlight.current;
+  }, [submissionId]);
+
+  const queueAnswer = useCallback((questionId: string, answer: any) => {
+    pending.current.set(questionId, { questionId, answer });
+    if (timer.current) {
+      clearTimeout(timer.current);
+    }
+    timer.current = setTimeout(() => {
+      void send();
+    }, AUTOSAVE_DELAY_MS);
+  }, [send]);
+
+  // Drop unsent changes (the final submit carries every answer) and wait for a save in flight
+  const settle = useCallback(async (): Promise<void> => {
+    if (timer.current) {
+      clearTimeout(timer.current);
+      timer.current = null;
+    }
+    pending.current.clear();
+    while (inFlight.current) {
+      await inFlight.current;
+    }
+  }, []);
+
+  useEffect(() => {
+    return () => {
+      if (timer.current) {
+        clearTimeout(timer.current);
+      }
+    };
+  }, []);
+
+  return { queueAnswer, settle };
+}
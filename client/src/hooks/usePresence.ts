@@ -4,7 +4,7 @@
  */
 
 import { useEffect, useRef, useState, useCallback } from 'react';
-import { PresenceStatus, PresenceEventData } from '../types/presence';
+import { PresenceStatus, PresenceEventData, PresenceBatchEventData } from '../types/presence';
 import { presenceApi } from '../services/presenceApi';
 import { socketService } from '../services/socketService';
 
@@ -141,18 +141,22 @@ export const usePresence = (options: UsePresenceOptions = {}) => {
       }
     };
 
+    const handlePresenceBatch = (data: PresenceBatchEventData) => {
+      data.changes.forEach(handlePresenceChanged);
+    };
+
     const handlePresenceUpdated = (data: { status: PresenceStatus; activity?: string }) => {
       console.log('Own presence updated:', data);
       setCurrentStatus(data.status);
     };
 
     // Register listeners
-    socket.on('presence-changed', handlePresenceChanged);
+    socket.on('presence-batch', handlePresenceBatch);
     socket.on('presence-updated', handlePresenceUpdated);
 
     // Cleanup
     return () => {
-      socket.off('presence-changed', handlePresenceChanged);
+      socket.off('presence-batch', handlePresenceBatch);
       socket.off('presence-updated', handlePresenceUpdated);
     };
   }, []);
@@ -125,7 +125,7 @@ const Chat: React.FC = () => {
   // Load messages
   const loadMessages = async (roomId: string) => {
     try {
-      const messagesData = await chatApi.getMessages(roomId);
+      const { messages: messagesData } = await chatApi.getMessages(roomId);
       
       // Replace messages but keep any that arrived via websocket after this fetch started
       setMessages(prev => {
@@ -20,6 +20,7 @@ import {
   DialogActions,
   DialogContentText,
   CircularProgress,
+  LinearProgress,
   TextField,
 } from '@mui/material';
 import { useTheme } from '@mui/material/styles';
@@ -620,6 +621,14 @@ const SettingsPage: React.FC = () => {
                           <Typography variant="body2" color="text.secondary" paragraph>
                             Your data export is being prepared. This usually takes 5-10 minutes.
                           </Typography>
+                          {exportStatus.status === 'processing' && typeof exportStatus.progressPercent === 'number' && (
+                            <Box mb={2}>
+                              <LinearProgress variant="determinate" value={exportStatus.progressPercent} />
+                              <Typography variant="caption" color="text.secondary">
+                                {exportStatus.progressPercent}% complete
+                              </Typography>
+                            </Box>
+                          )}
                           <Typography variant="caption" color="text.secondary">
                             Requested {new Date(exportStatus.requestedAt).toLocaleString()}
                           </Typography>
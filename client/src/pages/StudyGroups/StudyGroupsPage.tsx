@@ -169,9 +169,9 @@ export const StudyGroupsPage: React.FC = () => {
     // Listen for presence changes
     const socket = socketService.getSocket();
     if (socket) {
-      socket.on('presence-changed', loadOnlineUsers);
+      socket.on('presence-batch', loadOnlineUsers);
       return () => {
-        socket.off('presence-changed', loadOnlineUsers);
+        socket.off('presence-batch', loadOnlineUsers);
       };
     }
   }, []);
@@ -162,33 +162,57 @@ const Tutoring: React.FC = () => {
   const handleSendMessage = async () => {
     if (!newMessage.trim() || !selectedSession || sending) return;
 
+    const sessionId = selectedSession.Id;
+    const content = newMessage.trim();
+    // Placeholder for the AI answer, filled in token by token while it streams
+    const streamingId = `streaming-${Date.now()}`;
+
     setSending(true);
+    setCurrentSuggestions([]);
     try {
-      const response = await tutoringApi.sendMessage(selectedSession.Id, {
-        content: newMessage.trim(),
-        model: selectedModel // Send selected AI model
-      });
+      const aiMessage = await tutoringApi.streamMessage(
+        sessionId,
+        {
+          content,
+          model: selectedModel // Send selected AI model
+        },
+        {
+          onUserMessage: (userMessage) => {
+            setNewMessage('');
+            setMessages(prev => [
+              ...prev,
+              userMessage,
+              { Id: streamingId, Content: '', Role: 'ai', CreatedAt: new Date().toISOString(), MessageType: 'text' }
+            ]);
+          },
+          onToken: (delta) => {
+            setMessages(prev => prev.map(m => (m.Id === streamingId ? { ...m, Content: m.Content + delta } : m)));
+          },
+          // Suggestions are generated alongside the answer and may arrive before it ends
+          onSuggestions: (suggestions) => setCurrentSuggestions(suggestions)
+        }
+      );
 
-      // Add both user and AI messages to the display
-      setMessages(prev => [...prev, response.userMessage, response.aiMessage]);
-      setNewMessage('');
+      // Replace the placeholder with the saved AI message
+      setMessages(prev => prev.map(m => (m.Id === streamingId ? aiMessage : m)));
       
       // Update current suggestions from AI response
-      if (response.aiMessage.suggestions) {
-        setCurrentSuggestions(response.aiMessage.suggestions);
+      if (aiMessage.suggestions) {
+        setCurrentSuggestions(aiMessage.suggestions);
       }
       
       // Update session in list
       setSessions(prev => 
         prev.map(s => 
-          s.Id === selectedSession.Id 
-            ? { ...s, UpdatedAt: response.aiMessage.CreatedAt, MessageCount: s.MessageCount + 2 }
+          s.Id === sessionId 
+            ? { ...s, UpdatedAt: aiMessage.CreatedAt, MessageCount: s.MessageCount + 2 }
             : s
         )
       );
     } catch (error) {
       console.error('Failed to send message:', error);
       setError('Failed to send message');
+      setMessages(prev => prev.filter(m => m.Id !== streamingId));
     } finally {
       setSending(false);
     }
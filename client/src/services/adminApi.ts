@@ -137,12 +137,14 @@ export interface PaginatedUsers {
     totalPages: number;
     hasNext: boolean;
     hasPrev: boolean;
+    nextCursor: string | null; // pass back as `cursor` for keyset paging
   };
 }
 
 export interface UserFilters {
   page?: number;
   limit?: number;
+  cursor?: string;
   search?: string;
   role?: string;
   status?: string;
@@ -205,12 +207,14 @@ export interface PaginatedCourses {
     totalPages: number;
     hasNext: boolean;
     hasPrev: boolean;
+    nextCursor: string | null; // pass back as `cursor` for keyset paging
   };
 }
 
 export interface CourseFilters {
   page?: number;
   limit?: number;
+  cursor?: string;
   search?: string;
   status?: string;
   category?: string;
@@ -266,12 +270,14 @@ export interface PaginatedTransactions {
     totalPages: number;
     hasNext: boolean;
     hasPrev: boolean;
+    nextCursor: string | null; // pass back as `cursor` for keyset paging
   };
 }
 
 export interface TransactionFilters {
   page?: number;
   limit?: number;
+  cursor?: string;
   search?: string;
   status?: string;
   dateFrom?: string;
@@ -306,6 +312,107 @@ export interface SystemHealth {
     loggedInToday: number;
     loggedInThisWeek: number;
   };
+  caches: Array<{
+    name: string;
+    size: number;
+    maxEntries: number;
+    ttlMs: number;
+    hits: number;
+    misses: number;
+    hitRate: number;
+    evictions: number;
+    expirations: number;
+    invalidations: number;
+  }>;
+  queues: Array<{
+    name: string;
+    pending: number;
+    running: number;
+    concurrency: number;
+    maxPending: number;
+    completed: number;
+    failed: number;
+    dropped: number;
+  }>;
+  videoProgressBuffer: {
+    bufferedEntries: number;
+    maxEntries: number;
+    flushIntervalMs: number;
+    heartbeatsReceived: number;
+    heartbeatsCoalesced: number;
+    flushes: number;
+    rowsFlushed: number;
+    flushFailures: number;
+    droppedEntries: number;
+    lastFlushMs: number;
+    avgFlushMs: number;
+    maxFlushMs: number;
+  };
+  presence: {
+    trackedUsers: number;
+    onlineUsers: number;
+    dirtyEntries: number;
+    pendingChanges: number;
+    snapshots: number;
+    rowsSnapshotted: number;
+    snapshotFailures: number;
+    droppedRows: number;
+    lastSnapshotMs: number;
+    batchesEmitted: number;
+    changesBroadcast: number;
+    changesCoalesced: number;
+    remoteUpdatesApplied: number;
+  };
+  chatReadReceipts: {
+    pendingReceipts: number;
+    flushIntervalMs: number;
+    receiptsReceived: number;
+    receiptsCoalesced: number;
+    flushes: number;
+    rowsFlushed: number;
+    flushFailures: number;
+    droppedReceipts: number;
+  };
+  latencies: Array<{
+    name: string;
+    count: number;
+    lastMs: number;
+    avgMs: number;
+    p50Ms: number;
+    p95Ms: number;
+    maxMs: number;
+  }>;
+  governors: Array<{
+    name: string;
+    maxConcurrent: number;
+    tokensPerMinute: number;
+    running: number;
+    waiting: number;
+    maxWaiting: number;
+    tokensAvailable: number;
+    admitted: number;
+    rejected: number;
+    tokensUsed: number;
+    avgWaitMs: number;
+  }>;
+  cluster: {
+    adapter: 'memory' | 'cluster';
+    nodeId: string;
+    messagesPublished: number;
+    messagesReceived: number;
+    handlerFailures: number;
+  };
+  leaderElection: {
+    mode: 'sql' | 'none';
+    holderId: string;
+    isLeader: boolean;
+    currentLeader: string | null;
+    leaseMs: number;
+    elections: number;
+    renewFailures: number;
+    jobsRun: number;
+    jobsSkipped: number;
+  };
 }
 
 export interface AuditLogEntry {
@@ -325,12 +432,14 @@ export interface PaginatedAuditLog {
     totalPages: number;
     hasNext: boolean;
     hasPrev: boolean;
+    nextCursor: string | null; // pass back as `cursor` for keyset paging
   };
 }
 
 export interface AuditLogFilters {
   page?: number;
   limit?: number;
+  cursor?: string;
   type?: string; // 'all' | 'deletion' | 'ownership'
 }
 
@@ -108,6 +108,12 @@ export interface SubmitAssessmentRequest {
   answers: Record<string, any>;
 }
 
+export interface AnswerDelta {
+  questionId: string;
+  answer: any; // null or '' clears the saved answer
+  timeSpent?: number;
+}
+
 export interface SubmitAssessmentResponse {
   score: number;
   maxScore: number;
@@ -222,6 +228,12 @@ class AssessmentApiService {
     return response.data;
   }
 
+  // Autosave changed answers of an in-progress attempt
+  async saveAnswers(submissionId: string, answers: AnswerDelta[]): Promise<{ saved: number }> {
+    const response = await api.patch(`${this.baseUrl}/submissions/${submissionId}/answers`, { answers });
+    return response.data;
+  }
+
   // Submit assessment answers (students only)
   async submitAssessment(submissionId: string, answers: SubmitAssessmentRequest): Promise<SubmitAssessmentResponse> {
     const response = await api.post(`${this.baseUrl}/submissions/${submissionId}/submit`, answers);
@@ -55,6 +55,11 @@ export interface ChatMessage {
   };
 }
 
+export interface ChatMessagesPage {
+  messages: ChatMessage[]; // Oldest first
+  nextCursor: string | null; // Cursor for the page of older messages
+}
+
 export interface CreateRoomRequest {
   name: string;
   description?: string;
@@ -74,9 +79,9 @@ class ChatApi {
     return response.data;
   }
 
-  async getMessages(roomId: string, limit = 50, offset = 0): Promise<ChatMessage[]> {
+  async getMessages(roomId: string, limit = 50, cursor?: string): Promise<ChatMessagesPage> {
     const response = await api.get(`/chat/rooms/${roomId}/messages`, {
-      params: { limit, offset }
+      params: { limit, cursor }
     });
     return response.data;
   }
@@ -40,6 +40,12 @@ export interface Course {
   RequiresApproval?: boolean;
   // Certificate Settings (Phase 3)
   CertificateEnabled?: boolean;
+  // Present on search results from the catalog search index (HTML-escaped, matches in <mark>)
+  SearchScore?: number;
+  SearchHighlights?: {
+    title: string;
+    snippet: string;
+  };
   Instructor: {
     Id: string; // Added instructor ID
     FirstName: string;
@@ -79,6 +85,7 @@ export interface CourseFilters {
   instructorId?: string;
   page?: number;
   limit?: number;
+  cursor?: string;
 }
 
 export interface CoursesResponse {
@@ -89,6 +96,7 @@ export interface CoursesResponse {
     total: number;
     hasNext: boolean;
     hasPrev: boolean;
+    nextCursor: string | null; // pass back as `cursor` for keyset paging
   };
 }
 
@@ -106,6 +106,8 @@ export const getExportStatus = async (): Promise<{
   fileSize?: number;
   downloadCount?: number;
   errorMessage?: string;
+  progressPercent?: number | null;
+  progressStep?: string | null;
 }> => {
   const response = await axios.get(`${API_BASE}/settings/export-data/status`);
   return response.data;
@@ -87,7 +87,18 @@ class SocketService {
         resolve();
       });
 
+      // The server refuses handshakes with 'Server busy' while its admission queue is full
+      // (e.g. everyone reconnecting after a deploy); retry with jittered backoff
+      let busyRetries = 0;
+
       this.socket.on('connect_error', (error) => {
+        if (error.message === 'Server busy' && busyRetries < 6) {
+          busyRetries++;
+          const delay = Math.min(30000, 1000 * 2 ** busyRetries) * (0.5 + Math.random());
+          console.warn(`Socket server busy, retrying in ${Math.round(delay)}ms`);
+          setTimeout(() => this.socket?.connect(), delay);
+          return;
+        }
         console.error('Socket connection error:', error);
         this.connected = false;
         reject(error);
@@ -69,6 +69,12 @@ export interface SendMessageResponse {
   };
 }
 
+export interface StreamMessageHandlers {
+  onUserMessage?: (message: TutoringMessage) => void;
+  onToken: (delta: string) => void;
+  onSuggestions?: (suggestions: string[]) => void;
+}
+
 export interface LearningRecommendations {
   recommendations: string[];
 }
@@ -94,6 +100,78 @@ class TutoringApi {
     return response.data;
   }
 
+  /**
+   * Send a message and stream the AI answer (server-sent events over the POST response).
+   * Resolves with the saved AI message once the answer is complete.
+   */
+  async streamMessage(
+    sessionId: string,
+    data: SendMessageRequest,
+    handlers: StreamMessageHandlers,
+    signal?: AbortSignal
+  ): Promise<SendMessageResponse['aiMessage']> {
+    const token = getAuthToken();
+    const response = await fetch(`${API_BASE_URL}/api/tutoring/sessions/${sessionId}/messages`, {
+      method: 'POST',
+      headers: {
+        'Content-Type': 'application/json',
+        Accept: 'text/event-stream',
+        ...(token ? { Authorization: `Bearer ${token}` } : {})
+      },
+      body: JSON.stringify({ ...data, stream: true }),
+      signal
+    });
+
+    if (!response.ok || !response.body) {
+      throw new Error(`Failed to send message (HTTP ${response.status})`);
+    }
+
+    const reader = response.body.getReader();
+    const decoder = new TextDecoder();
+    let buffer = '';
+
+    while (true) {
+      const { value, done } = await reader.read();
+      if (done) {
+        break;
+      }
+      buffer += decoder.decode(value, { stream: true });
+
+      // Events are separated by a blank line: "event: <name>\ndata: <json>"
+      let boundary = buffer.indexOf('\n\n');
+      while (boundary !== -1) {
+        const rawEvent = buffer.slice(0, boundary);
+        buffer = buffer.slice(boundary + 2);
+        boundary = buffer.indexOf('\n\n');
+
+        const event = rawEvent.match(/^event: (.*)$/m)?.[1];
+        const payload = rawEvent.match(/^data: (.*)$/m)?.[1];
+        if (!event || payload === undefined) {
+          continue;
+        }
+        const parsed = JSON.parse(payload);
+
+        switch (event) {
+          case 'user-message':
+            handlers.onUserMessage?.(parsed);
+            break;
+          case 'token':
+            handlers.onToken(parsed.delta);
+            break;
+          case 'suggestions':
+            handlers.onSuggestions?.(parsed.suggestions);
+            break;
+          case 'done':
+            return parsed.aiMessage;
+          case 'error':
+            throw new Error(parsed.error || 'Failed to process message');
+        }
+      }
+    }
+
+    throw new Error('AI response stream ended unexpectedly');
+  }
+
   async getRecommendations(): Promise<LearningRecommendations> {
     const response = await api.get('/api/tutoring/recommendations');
     return response.data;
@@ -43,6 +43,11 @@ export interface PresenceEventData {
   timestamp: string;
 }
 
+// 'presence-batch' socket event: latest change per user since the previous batch
+export interface PresenceBatchEventData {
+  changes: PresenceEventData[];
+}
+
 export interface BulkPresenceRequest {
   userIds: string[];
 }
@@ -0,0 +1,49 @@
+-- ========================================
+-- AI FEEDBACK CACHE TABLE
+-- ========================================
+-- Purpose: Persisted AI explanations for assessment answers, keyed by a hash of
+--          (question, normalized answer) and the model. Students who give the same answer
+--          to the same question share one generated explanation
+--          (server/src/services/AssessmentFeedbackService.ts).
+
+USE startUp1;
+GO
+
+IF OBJECT_ID('dbo.AIFeedbackCache', 'U') IS NOT NULL
+BEGIN
+    PRINT '⚠️ AIFeedbackCache table already exists - skipping creation';
+END
+ELSE
+BEGIN
+    CREATE TABLE dbo.AIFeedbackCache (
+        AnswerHash CHAR(64) NOT NULL, -- SHA-256 of question id/text/correct answer + normalized student answer
+        Model NVARCHAR(50) NOT NULL,
+        QuestionId UNIQUEIDENTIFIER NOT NULL, -- no FK, see "Question-keyed tables" in schema.sql
+        Insights NVARCHAR(MAX) NOT NULL, -- JSON: personalizedExplanation, conceptsToReview, improvementSuggestions, commonMistakes
+        HitCount INT NOT NULL DEFAULT 0,
+        CreatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+        LastUsedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+        CONSTRAINT PK_AIFeedbackCache PRIMARY KEY (AnswerHash, Model)
+    );
+
+    CREATE INDEX IX_AIFeedbackCache_QuestionId ON dbo.AIFeedbackCache(QuestionId);
+
+    PRINT '✅ AIFeedbackCache table created';
+END
+GO
+
+-- Tables created by an earlier version of this script cascaded from dbo.Questions, which
+-- wiped the cached explanations on every assessment edit; entries are keyed by content hash
+DECLARE @fk NVARCHAR(128) = (
+    SELECT TOP 1 fk.name
+    FROM sys.foreign_keys fk
+    WHERE fk.parent_object_id = OBJECT_ID('dbo.AIFeedbackCache')
+      AND fk.referenced_object_id = OBJECT_ID('dbo.Questions')
+);
+IF @fk IS NOT NULL
+BEGIN
+    DECLARE @sql NVARCHAR(400) = N'ALTER TABLE dbo.AIFeedbackCache DROP CONSTRAINT ' + QUOTENAME(@fk);
+    EXEC sp_executesql @sql;
+    PRINT '✅ Dropped AIFeedbackCache foreign key to Questions';
+END
+GO
@@ -0,0 +1,52 @@
+-- ========================================
+-- ASSESSMENT ANSWERS TABLE
+-- ========================================
+-- Purpose: One row per (submission, question) for answers of in-progress assessment
+--          submissions (server/src/services/AssessmentAnswerService.ts). Autosave and the
+--          adaptive answer endpoint write single rows instead of rewriting the whole
+--          AssessmentSubmissions.Answers JSON, and submit scores the rows in one query.
+--          AssessmentSubmissions.Answers stays the snapshot written at completion.
+--
+-- QuestionId has no foreign key (see "Question-keyed tables" in schema.sql); rows are
+-- removed with their submission.
+--
+-- Answers of submissions that are in progress when this runs are copied from their JSON
+-- so they are not lost at submit.
+
+USE startUp1;
+GO
+
+IF OBJECT_ID('dbo.AssessmentAnswers', 'U') IS NOT NULL
+BEGIN
+    PRINT '⚠️ AssessmentAnswers table already exists - skipping creation';
+END
+ELSE
+BEGIN
+    CREATE TABLE dbo.AssessmentAnswers (
+        SubmissionId UNIQUEIDENTIFIER NOT NULL FOREIGN KEY REFERENCES dbo.AssessmentSubmissions(Id) ON DELETE CASCADE,
+        QuestionId UNIQUEIDENTIFIER NOT NULL,
+        Answer NVARCHAR(MAX) NOT NULL, -- JSON value
+        TimeSpent INT NULL, -- seconds on this question, when the client tracks it
+        UpdatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+        CONSTRAINT PK_AssessmentAnswers PRIMARY KEY (SubmissionId, QuestionId)
+    );
+
+    PRINT '✅ AssessmentAnswers table created';
+
+    INSERT INTO dbo.AssessmentAnswers (SubmissionId, QuestionId, Answer, UpdatedAt)
+    SELECT
+        s.Id,
+        q.Id,
+        CASE WHEN j.[type] = 1 THEN '"' + STRING_ESCAPE(j.[value], 'json') + '"' ELSE j.[value] END,
+        GETUTCDATE()
+    FROM dbo.AssessmentSubmissions s
+    CROSS APPLY OPENJSON(CASE WHEN ISJSON(s.Answers) = 1 THEN s.Answers END) j
+    INNER JOIN dbo.Questions q
+        ON q.Id = TRY_CONVERT(UNIQUEIDENTIFIER, j.[key]) AND q.AssessmentId = s.AssessmentId
+    WHERE s.Status = 'in_progress'
+      AND j.[type] <> 0 -- null
+      AND NOT (j.[type] = 1 AND j.[value] = '');
+
+    PRINT '✅ Copied ' + CAST(@@ROWCOUNT AS NVARCHAR(20)) + ' in-progress answer(s)';
+END
+GO
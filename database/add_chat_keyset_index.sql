@@ -0,0 +1,36 @@
+-- Migration: Chat message keyset pagination index
+-- Purpose: GET /api/chat/rooms/:roomId/messages pages with a (CreatedAt, Id) cursor instead of
+--          OFFSET. The index matches ORDER BY CreatedAt DESC, Id DESC within a room and replaces
+--          IX_ChatMessages_RoomId_CreatedAt (same leading columns).
+
+USE [startUp1]
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes 
+    WHERE object_id = OBJECT_ID(N'dbo.ChatMessages') 
+    AND name = 'IX_ChatMessages_RoomId_CreatedAt_Id'
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_ChatMessages_RoomId_CreatedAt_Id
+        ON dbo.ChatMessages(RoomId, CreatedAt DESC, Id DESC);
+
+    PRINT '✅ Created IX_ChatMessages_RoomId_CreatedAt_Id';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ IX_ChatMessages_RoomId_CreatedAt_Id already exists';
+END
+GO
+
+IF EXISTS (
+    SELECT * FROM sys.indexes 
+    WHERE object_id = OBJECT_ID(N'dbo.ChatMessages') 
+    AND name = 'IX_ChatMessages_RoomId_CreatedAt'
+)
+BEGIN
+    DROP INDEX IX_ChatMessages_RoomId_CreatedAt ON dbo.ChatMessages;
+
+    PRINT '✅ Dropped IX_ChatMessages_RoomId_CreatedAt (superseded)';
+END
+GO
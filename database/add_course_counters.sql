@@ -0,0 +1,62 @@
+-- Migration: Authoritative course counters
+-- Purpose: Add Courses.LessonCount, index Enrollments for per-course counted-status lookups,
+--          and backfill EnrollmentCount/LessonCount from the source tables.
+-- Counters are maintained by server/src/services/CourseCounterService.ts and repaired nightly
+-- by its reconciliation job.
+
+USE [startUp1]
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.columns 
+    WHERE object_id = OBJECT_ID(N'dbo.Courses') 
+    AND name = 'LessonCount'
+)
+BEGIN
+    ALTER TABLE dbo.Courses
+    ADD LessonCount INT NOT NULL DEFAULT 0;
+
+    PRINT '✅ Added LessonCount column to Courses table';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ LessonCount column already exists in Courses table';
+END
+GO
+
+-- Counter refreshes count one course's active/completed enrollments: seek on (CourseId, Status)
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes 
+    WHERE object_id = OBJECT_ID(N'dbo.Enrollments') 
+    AND name = 'IX_Enrollments_CourseId_Status'
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_Enrollments_CourseId_Status
+        ON dbo.Enrollments(CourseId, Status);
+
+    PRINT '✅ Created IX_Enrollments_CourseId_Status';
+END
+GO
+
+-- Backfill both counters from the source tables
+UPDATE c
+SET EnrollmentCount = ISNULL(x.Total, 0)
+FROM dbo.Courses c
+LEFT JOIN (
+    SELECT CourseId, COUNT(*) AS Total
+    FROM dbo.Enrollments
+    WHERE Status IN ('active', 'completed')
+    GROUP BY CourseId
+) x ON x.CourseId = c.Id;
+
+UPDATE c
+SET LessonCount = ISNULL(x.Total, 0)
+FROM dbo.Courses c
+LEFT JOIN (
+    SELECT CourseId, COUNT(*) AS Total
+    FROM dbo.Lessons
+    GROUP BY CourseId
+) x ON x.CourseId = c.Id;
+
+PRINT '✅ Backfilled EnrollmentCount and LessonCount';
+GO
@@ -0,0 +1,39 @@
+-- Migration: Incremental course progress
+-- Purpose: Add CourseProgress.ProgressPoints (sum of the user's lesson ProgressPercentage values
+--          in the course) and backfill it from UserProgress.
+-- POST /api/progress/lessons/:lessonId/complete adds the completed lesson's missing points and
+-- derives OverallProgress = ProgressPoints / Courses.LessonCount instead of recounting every lesson
+-- (server/src/services/LessonCompletionService.ts).
+
+USE [startUp1]
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.columns 
+    WHERE object_id = OBJECT_ID(N'dbo.CourseProgress') 
+    AND name = 'ProgressPoints'
+)
+BEGIN
+    ALTER TABLE dbo.CourseProgress
+    ADD ProgressPoints DECIMAL(9,2) NOT NULL DEFAULT 0;
+
+    PRINT '✅ Added ProgressPoints column to CourseProgress table';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ ProgressPoints column already exists in CourseProgress table';
+END
+GO
+
+-- Backfill from the lesson-level rows
+UPDATE cp
+SET ProgressPoints = ISNULL(x.Points, 0)
+FROM dbo.CourseProgress cp
+LEFT JOIN (
+    SELECT UserId, CourseId, SUM(ProgressPercentage) AS Points
+    FROM dbo.UserProgress
+    GROUP BY UserId, CourseId
+) x ON x.UserId = cp.UserId AND x.CourseId = cp.CourseId;
+
+PRINT '✅ Backfilled CourseProgress.ProgressPoints';
+GO
@@ -0,0 +1,28 @@
+-- Migration: Add progress columns to DataExportRequests
+-- Date: October 17, 2026
+-- Purpose: Exports are streamed section by section; the job records how far it has got
+--          so the settings page can show progress while an export is processing
+
+USE [startUp1]
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.columns 
+    WHERE object_id = OBJECT_ID(N'dbo.DataExportRequests') 
+    AND name = 'ProgressPercent'
+)
+BEGIN
+    ALTER TABLE dbo.DataExportRequests
+    ADD ProgressPercent INT NULL,
+        ProgressStep NVARCHAR(100) NULL; -- Archive entry last written, e.g. 'community/chat-messages.json'
+    
+    PRINT '✅ Added ProgressPercent and ProgressStep columns to DataExportRequests table';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ Progress columns already exist in DataExportRequests table';
+END
+GO
+
+PRINT '✅ Migration completed successfully';
+GO
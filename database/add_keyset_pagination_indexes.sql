@@ -0,0 +1,59 @@
+-- Migration: Keyset pagination indexes
+-- Purpose: Let the catalog and admin listings seek to the next page on (sort column, Id)
+--          instead of scanning and discarding OFFSET rows.
+-- Transactions already have IX_Transactions_CreatedAt; these cover the default sorts of
+-- GET /api/courses (CreatedAt), admin courses (UpdatedAt) and admin users (CreatedAt).
+
+USE [startUp1]
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes 
+    WHERE object_id = OBJECT_ID(N'dbo.Courses') 
+    AND name = 'IX_Courses_CreatedAt_Id'
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_Courses_CreatedAt_Id
+        ON dbo.Courses(CreatedAt DESC, Id DESC);
+
+    PRINT '✅ Created IX_Courses_CreatedAt_Id';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ IX_Courses_CreatedAt_Id already exists';
+END
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes 
+    WHERE object_id = OBJECT_ID(N'dbo.Courses') 
+    AND name = 'IX_Courses_UpdatedAt_Id'
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_Courses_UpdatedAt_Id
+        ON dbo.Courses(UpdatedAt DESC, Id DESC);
+
+    PRINT '✅ Created IX_Courses_UpdatedAt_Id';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ IX_Courses_UpdatedAt_Id already exists';
+END
+GO
+
+IF NOT EXISTS (
+    SELECT * FROM sys.indexes 
+    WHERE object_id = OBJECT_ID(N'dbo.Users') 
+    AND name = 'IX_Users_CreatedAt_Id'
+)
+BEGIN
+    CREATE NONCLUSTERED INDEX IX_Users_CreatedAt_Id
+        ON dbo.Users(CreatedAt DESC, Id DESC);
+
+    PRINT '✅ Created IX_Users_CreatedAt_Id';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ IX_Users_CreatedAt_Id already exists';
+END
+GO
@@ -0,0 +1,71 @@
+-- ========================================
+-- QUESTION STATS TABLE + BACKFILL
+-- ========================================
+-- Purpose: Running per-question answer statistics for adaptive difficulty
+--          (server/src/services/QuestionStatsService.ts). The submit endpoint adds each
+--          completed submission's answers; difficulty is derived from one row per question.
+--
+-- The backfill below loads existing history once, set-based, from the per-question
+-- entries of completed (non-preview) submissions' Feedback JSON. It only runs while the
+-- table is empty, so the script can be re-run safely. Only the submission's total time is
+-- recorded, so each answered question is credited an equal share of it (as at submit time).
+
+USE startUp1;
+GO
+
+IF OBJECT_ID('dbo.QuestionStats', 'U') IS NOT NULL
+BEGIN
+    PRINT '⚠️ QuestionStats table already exists - skipping creation';
+END
+ELSE
+BEGIN
+    CREATE TABLE dbo.QuestionStats (
+        QuestionId UNIQUEIDENTIFIER NOT NULL PRIMARY KEY, -- no FK, see "Question-keyed tables" in schema.sql
+        Attempts INT NOT NULL DEFAULT 0,
+        CorrectCount INT NOT NULL DEFAULT 0,
+        TimedAttempts INT NOT NULL DEFAULT 0, -- attempts that contributed to TotalTimeSpent
+        TotalTimeSpent BIGINT NOT NULL DEFAULT 0, -- seconds
+        UpdatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE()
+    );
+
+    PRINT '✅ QuestionStats table created';
+END
+GO
+
+IF NOT EXISTS (SELECT 1 FROM dbo.QuestionStats)
+BEGIN
+    ;WITH Answered AS (
+        SELECT
+            q.Id AS QuestionId,
+            s.Id AS SubmissionId,
+            s.TimeSpent,
+            CASE WHEN JSON_VALUE(f.[value], '$.isCorrect') = 'true' THEN 1 ELSE 0 END AS IsCorrect
+        FROM dbo.AssessmentSubmissions s
+        CROSS APPLY OPENJSON(CASE WHEN ISJSON(s.Feedback) = 1 THEN s.Feedback END) f
+        INNER JOIN dbo.Questions q
+            ON q.Id = TRY_CONVERT(UNIQUEIDENTIFIER, f.[key]) AND q.AssessmentId = s.AssessmentId
+        WHERE s.Status = 'completed'
+          AND s.IsPreview = 0
+          AND f.[type] = 5 -- object entry
+          AND (NULLIF(JSON_VALUE(f.[value], '$.userAnswer'), '') IS NOT NULL
+               OR JSON_QUERY(f.[value], '$.userAnswer') IS NOT NULL)
+    ),
+    Shared AS (
+        SELECT
+            QuestionId,
+            IsCorrect,
+            ROUND(CAST(TimeSpent AS FLOAT) / COUNT(*) OVER (PARTITION BY SubmissionId), 0) AS TimeShare
+        FROM Answered
+    )
+    INSERT INTO dbo.QuestionStats (QuestionId, Attempts, CorrectCount, TimedAttempts, TotalTimeSpent, UpdatedAt)
+    SELECT QuestionId, COUNT(*), SUM(IsCorrect), COUNT(*), SUM(CAST(TimeShare AS BIGINT)), SYSUTCDATETIME()
+    FROM Shared
+    GROUP BY QuestionId;
+
+    PRINT '✅ QuestionStats backfilled for ' + CAST(@@ROWCOUNT AS NVARCHAR(20)) + ' question(s)';
+END
+ELSE
+BEGIN
+    PRINT 'ℹ️ QuestionStats already populated - skipping backfill';
+END
+GO
@@ -0,0 +1,27 @@
+-- ========================================
+-- SCHEDULER LEASES TABLE
+-- ========================================
+-- Purpose: Leader election for multi-node deployments. The node holding the 'scheduler'
+--          lease runs the cron jobs and the presence inactivity sweep; the others skip them
+--          (server/src/services/LeaderElectionService.ts).
+
+USE startUp1;
+GO
+
+IF OBJECT_ID('dbo.SchedulerLeases', 'U') IS NOT NULL
+BEGIN
+    PRINT '⚠️ SchedulerLeases table already exists - skipping creation';
+END
+ELSE
+BEGIN
+    CREATE TABLE dbo.SchedulerLeases (
+        Name NVARCHAR(100) NOT NULL PRIMARY KEY,
+        HolderId NVARCHAR(200) NOT NULL, -- host:pid:nonce of the leading node
+        AcquiredAt DATETIME2 NOT NULL,
+        RenewedAt DATETIME2 NOT NULL,
+        ExpiresAt DATETIME2 NOT NULL
+    );
+
+    PRINT '✅ SchedulerLeases table created';
+END
+GO
@@ -71,6 +71,9 @@ IF OBJECT_ID('dbo.OfficeHours', 'U') IS NOT NULL DROP TABLE dbo.OfficeHours;
 IF OBJECT_ID('dbo.UserPresence', 'U') IS NOT NULL DROP TABLE dbo.UserPresence;
 IF OBJECT_ID('dbo.UserSettings', 'U') IS NOT NULL DROP TABLE dbo.UserSettings;
 -- Core Assessment Tables
+IF OBJECT_ID('dbo.AIFeedbackCache', 'U') IS NOT NULL DROP TABLE dbo.AIFeedbackCache;
+IF OBJECT_ID('dbo.QuestionStats', 'U') IS NOT NULL DROP TABLE dbo.QuestionStats;
+IF OBJECT_ID('dbo.AssessmentAnswers', 'U') IS NOT NULL DROP TABLE dbo.AssessmentAnswers;
 IF OBJECT_ID('dbo.AssessmentSubmissions', 'U') IS NOT NULL DROP TABLE dbo.AssessmentSubmissions;
 IF OBJECT_ID('dbo.Questions', 'U') IS NOT NULL DROP TABLE dbo.Questions;
 IF OBJECT_ID('dbo.Assessments', 'U') IS NOT NULL DROP TABLE dbo.Assessments;
@@ -79,6 +82,7 @@ IF OBJECT_ID('dbo.UserProgress', 'U') IS NOT NULL DROP TABLE dbo.UserProgress;
 IF OBJECT_ID('dbo.Enrollments', 'U') IS NOT NULL DROP TABLE dbo.Enrollments;
 IF OBJECT_ID('dbo.Lessons', 'U') IS NOT NULL DROP TABLE dbo.Lessons;
 IF OBJECT_ID('dbo.Courses', 'U') IS NOT NULL DROP TABLE dbo.Courses;
+IF OBJECT_ID('dbo.SchedulerLeases', 'U') IS NOT NULL DROP TABLE dbo.SchedulerLeases;
 -- Terms & Privacy Tables (drop before Users due to FK dependency)
 IF OBJECT_ID('dbo.UserTermsAcceptance', 'U') IS NOT NULL DROP TABLE dbo.UserTermsAcceptance;
 IF OBJECT_ID('dbo.TermsVersions', 'U') IS NOT NULL DROP TABLE dbo.TermsVersions;
@@ -134,7 +138,8 @@ CREATE TABLE dbo.Courses (
     Price DECIMAL(10,2) NOT NULL DEFAULT 0.00,
     Rating DECIMAL(3,2) NOT NULL DEFAULT 0.00,
     RatingCount INT NOT NULL DEFAULT 0, -- Denormalized count of ratings/reviews
-    EnrollmentCount INT NOT NULL DEFAULT 0,
+    EnrollmentCount INT NOT NULL DEFAULT 0, -- Active + completed enrollments (maintained by CourseCounterService)
+    LessonCount INT NOT NULL DEFAULT 0, -- Lessons in the course (maintained by CourseCounterService)
     Prerequisites NVARCHAR(MAX) NULL, -- JSON array of prerequisite course IDs (e.g., ["uuid1", "uuid2"])
     LearningOutcomes NVARCHAR(MAX) NULL, -- JSON array of learning outcome strings (e.g., ["Understand React", "Build apps"])
     -- Enrollment Controls (Phase 2 - Feb 8, 2026)
@@ -456,11 +461,14 @@ CREATE TABLE dbo.FileUploads (
 CREATE INDEX IX_Users_Email ON dbo.Users(Email);
 CREATE INDEX IX_Users_Username ON dbo.Users(Username);
 CREATE INDEX IX_Users_Role ON dbo.Users(Role);
+CREATE INDEX IX_Users_CreatedAt_Id ON dbo.Users(CreatedAt DESC, Id DESC); -- admin user list keyset paging
 
 CREATE INDEX IX_Courses_InstructorId ON dbo.Courses(InstructorId);
 CREATE INDEX IX_Courses_Category ON dbo.Courses(Category);
 CREATE INDEX IX_Courses_Level ON dbo.Courses(Level);
 CREATE INDEX IX_Courses_IsPublished ON dbo.Courses(IsPublished);
+CREATE INDEX IX_Courses_CreatedAt_Id ON dbo.Courses(CreatedAt DESC, Id DESC); -- catalog keyset paging
+CREATE INDEX IX_Courses_UpdatedAt_Id ON dbo.Courses(UpdatedAt DESC, Id DESC); -- admin course list keyset paging
 
 CREATE INDEX IX_Lessons_CourseId ON dbo.Lessons(CourseId);
 CREATE INDEX IX_Lessons_OrderIndex ON dbo.Lessons(OrderIndex);
@@ -468,6 +476,7 @@ CREATE INDEX IX_Lessons_OrderIndex ON dbo.Lessons(OrderIndex);
 CREATE INDEX IX_Enrollments_UserId ON dbo.Enrollments(UserId);
 CREATE INDEX IX_Enrollments_CourseId ON dbo.Enrollments(CourseId);
 CREATE INDEX IX_Enrollments_Status ON dbo.Enrollments(Status);
+CREATE INDEX IX_Enrollments_CourseId_Status ON dbo.Enrollments(CourseId, Status);
 
 CREATE INDEX IX_UserProgress_UserId ON dbo.UserProgress(UserId);
 CREATE INDEX IX_UserProgress_CourseId ON dbo.UserProgress(CourseId);
@@ -476,7 +485,7 @@ CREATE INDEX IX_UserProgress_LastAccessedAt ON dbo.UserProgress(LastAccessedAt);
 CREATE INDEX IX_ChatMessages_RoomId ON dbo.ChatMessages(RoomId);
 CREATE INDEX IX_ChatMessages_UserId ON dbo.ChatMessages(UserId);
 CREATE INDEX IX_ChatMessages_CreatedAt ON dbo.ChatMessages(CreatedAt);
-CREATE INDEX IX_ChatMessages_RoomId_CreatedAt ON dbo.ChatMessages(RoomId, CreatedAt DESC);
+CREATE INDEX IX_ChatMessages_RoomId_CreatedAt_Id ON dbo.ChatMessages(RoomId, CreatedAt DESC, Id DESC);
 
 CREATE INDEX IX_ChatParticipants_RoomId ON dbo.ChatParticipants(RoomId);
 CREATE INDEX IX_ChatParticipants_UserId ON dbo.ChatParticipants(UserId);
@@ -504,6 +513,7 @@ CREATE TABLE dbo.CourseProgress (
     UserId UNIQUEIDENTIFIER NOT NULL FOREIGN KEY REFERENCES dbo.Users(Id) ON DELETE CASCADE,
     CourseId UNIQUEIDENTIFIER NOT NULL FOREIGN KEY REFERENCES dbo.Courses(Id) ON DELETE CASCADE,
     OverallProgress INT NOT NULL DEFAULT 0 CHECK (OverallProgress >= 0 AND OverallProgress <= 100),
+    ProgressPoints DECIMAL(9,2) NOT NULL DEFAULT 0, -- sum of lesson ProgressPercentage (OverallProgress = ProgressPoints / LessonCount)
     CompletedLessons NVARCHAR(MAX) NULL, -- JSON array of lesson IDs
     TimeSpent INT NOT NULL DEFAULT 0, -- in minutes
     LastAccessedAt DATETIME2 NULL,
@@ -1248,6 +1258,8 @@ CREATE TABLE dbo.DataExportRequests (
     DownloadCount INT NOT NULL DEFAULT 0,
     LastDownloadedAt DATETIME2 NULL,
     ErrorMessage NVARCHAR(MAX) NULL,
+    ProgressPercent INT NULL, -- 0-100 while processing
+    ProgressStep NVARCHAR(100) NULL, -- Archive entry last written
     CreatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
     UpdatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE()
 );
@@ -1294,6 +1306,60 @@ CREATE NONCLUSTERED INDEX IX_UserTermsAcceptance_UserId ON dbo.UserTermsAcceptan
 CREATE NONCLUSTERED INDEX IX_UserTermsAcceptance_TermsVersionId ON dbo.UserTermsAcceptance(TermsVersionId);
 CREATE NONCLUSTERED INDEX IX_UserTermsAcceptance_AcceptedAt ON dbo.UserTermsAcceptance(AcceptedAt DESC);
 
+-- ========================================
+-- MULTI-NODE SCHEDULING
+-- ========================================
+
+-- SchedulerLeases Table - Leader election; the 'scheduler' lease holder runs the cron jobs
+CREATE TABLE dbo.SchedulerLeases (
+    Name NVARCHAR(100) NOT NULL PRIMARY KEY,
+    HolderId NVARCHAR(200) NOT NULL, -- host:pid:nonce of the leading node
+    AcquiredAt DATETIME2 NOT NULL,
+    RenewedAt DATETIME2 NOT NULL,
+    ExpiresAt DATETIME2 NOT NULL
+);
+
+-- Question-keyed tables (AIFeedbackCache, QuestionStats, AssessmentAnswers): QuestionId has no
+-- foreign key to Questions. Editing an assessment deletes its questions and re-inserts them with
+-- the same Ids, so a cascade would wipe these rows on every edit. Rows of questions that are gone
+-- for good are deleted by the nightly "Prune Orphaned Question Data" job (NotificationScheduler);
+-- AssessmentAnswers rows are removed with their submission instead.
+
+-- AIFeedbackCache Table - Shared AI explanations per (question, normalized answer, model)
+CREATE TABLE dbo.AIFeedbackCache (
+    AnswerHash CHAR(64) NOT NULL, -- SHA-256 of question id/text/correct answer + normalized student answer
+    Model NVARCHAR(50) NOT NULL,
+    QuestionId UNIQUEIDENTIFIER NOT NULL, -- no FK, see "Question-keyed tables" in schema.sql
+    Insights NVARCHAR(MAX) NOT NULL, -- JSON: personalizedExplanation, conceptsToReview, improvementSuggestions, commonMistakes
+    HitCount INT NOT NULL DEFAULT 0,
+    CreatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    LastUsedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    CONSTRAINT PK_AIFeedbackCache PRIMARY KEY (AnswerHash, Model)
+);
+
+CREATE INDEX IX_AIFeedbackCache_QuestionId ON dbo.AIFeedbackCache(QuestionId);
+
+-- QuestionStats Table - Running answer statistics per question (adaptive difficulty)
+CREATE TABLE dbo.QuestionStats (
+    QuestionId UNIQUEIDENTIFIER NOT NULL PRIMARY KEY, -- no FK, see "Question-keyed tables" in schema.sql
+    Attempts INT NOT NULL DEFAULT 0,
+    CorrectCount INT NOT NULL DEFAULT 0,
+    TimedAttempts INT NOT NULL DEFAULT 0, -- attempts that contributed to TotalTimeSpent
+    TotalTimeSpent BIGINT NOT NULL DEFAULT 0, -- seconds
+    UpdatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE()
+);
+
+-- AssessmentAnswers Table - One row per answered question of an in-progress submission
+-- (QuestionId has no FK, see "Question-keyed tables" above)
+CREATE TABLE dbo.AssessmentAnswers (
+    SubmissionId UNIQUEIDENTIFIER NOT NULL FOREIGN KEY REFERENCES dbo.AssessmentSubmissions(Id) ON DELETE CASCADE,
+    QuestionId UNIQUEIDENTIFIER NOT NULL,
+    Answer NVARCHAR(MAX) NOT NULL, -- JSON value
+    TimeSpent INT NULL, -- seconds on this question, when the client tracks it
+    UpdatedAt DATETIME2 NOT NULL DEFAULT GETUTCDATE(),
+    CONSTRAINT PK_AssessmentAnswers PRIMARY KEY (SubmissionId, QuestionId)
+);
+
 -- Seed initial Terms of Service v1.0
 INSERT INTO dbo.TermsVersions (DocumentType, Version, Title, Content, Summary, EffectiveDate, IsActive)
 VALUES (
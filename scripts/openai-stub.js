@@ -0,0 +1,169 @@
+/**
+ * Local OpenAI-compatible stub for the AI tutor
+ *
+ * Serves POST /v1/chat/completions (plain, `stream: true` and JSON response formats) with
+ * canned answers, so tutoring - including streaming and time-to-first-token - and AI
+ * assessment feedback can be exercised without an OpenAI account or network access.
+ *
+ * Usage:
+ *   node scripts/openai-stub.js
+ *   # server/.env: OPENAI_BASE_URL=http://localhost:4010/v1
+ *
+ * Options (environment):
+ *   OPENAI_STUB_PORT      port to listen on (default 4010)
+ *   OPENAI_STUB_TTFT_MS   delay before the first token / the whole reply (default 400)
+ *   OPENAI_STUB_TOKEN_MS  delay between streamed tokens (default 25)
+ *   OPENAI_STUB_FAIL      set to 1 to answer every request with HTTP 500
+ */
+
+const http = require('http');
+
+const PORT = parseInt(process.env.OPENAI_STUB_PORT || '4010', 10);
+const TTFT_MS = parseInt(process.env.OPENAI_STUB_TTFT_MS || '400', 10);
+const TOKEN_MS = parseInt(process.env.OPENAI_STUB_TOKEN_MS || '25', 10);
+const FAIL = process.env.OPENAI_STUB_FAIL === '1';
+
+const sleep = (ms) => new Promise((resolve) => setTimeout(resolve, ms));
+
+let requestCount = 0;
+
+function buildReply(messages, maxTokens, responseFormat) {
+  const lastUser = [...messages].reverse().find((m) => m.role === 'user');
+  const question = lastUser ? String(lastUser.content) : '';
+
+  // Structured output: one feedback item per "key" in the prompt (assessment feedback batches)
+  if (responseFormat && responseFormat.type === 'json_schema') {
+    const keys = [...question.matchAll(/"key": "([^"]+)"/g)].map((match) => match[1]);
+    return JSON.stringify({
+      items: keys.map((key) => ({
+        key,
+        personalizedExplanation: `Stub explanation for question ${key}.`,
+        conceptsToReview: ['Core concept', 'Related concept'],
+        improvementSuggestions: ['Re-read the lesson', 'Try a similar question'],
+        commonMistakes: []
+      }))
+    });
+  }
+  if (responseFormat && responseFormat.type === 'json_object') {
+    return '{}';
+  }
+
+  // Suggestion requests (short max_tokens) expect one suggestion per line
+  if (maxTokens && maxTokens <= 200) {
+    return [
+      '1. Can you show an example?',
+      '2. What are common mistakes here?',
+      '3. How would I test this?',
+      '4. What should I learn next?'
+    ].join('\n');
+  }
+
+  return `**Stub tutor answer** to: "${question.slice(0, 120)}"\n\n` +
+    'Here is a step-by-step explanation:\n\n' +
+    '1. Start with the core idea and define the terms.\n' +
+    '2. Work through a small example.\n' +
+    '3. Check your understanding with a practice exercise.\n\n' +
+    '```js\nconsole.log("hello from the stub");\n```';
+}
+
+// Split into word-sized tokens, keeping whitespace, like a real tokenizer's deltas
+function tokenize(text) {
+  return text.match(/\s*\S+|\s+/g) || [];
+}
+
+function readBody(req) {
+  return new Promise((resolve, reject) => {
+    let data = '';
+    req.on('data', (chunk) => { data += chunk; });
+    req.on('end', () => resolve(data));
+    req.on('error', reject);
+  });
+}
+
+async function handleCompletion(req, res) {
+  const id = `chatcmpl-stub-${++requestCount}`;
+  const created = Math.floor(Date.now() / 1000);
+  const body = JSON.parse((await readBody(req)) || '{}');
+  const model = body.model || 'gpt-4o-mini';
+  const reply = buildReply(body.messages || [], body.max_tokens, body.response_format);
+
+  console.log(`🤖 #${requestCount} ${model}${body.stream ? ' (stream)' : ''}, ${(body.messages || []).length} message(s)`);
+
+  if (FAIL) {
+    res.writeHead(500, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify({ error: { message: 'Stub failure (OPENAI_STUB_FAIL=1)', type: 'server_error' } }));
+    return;
+  }
+
+  await sleep(TTFT_MS);
+
+  if (!body.stream) {
+    res.writeHead(200, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify({
+      id,
+      object: 'chat.completion',
+      created,
+      model,
+      choices: [{ index: 0, message: { role: 'assistant', content: reply }, finish_reason: 'stop' }],
+      usage: { prompt_tokens: 0, completion_tokens: tokenize(reply).length, total_tokens: tokenize(reply).length }
+    }));
+    return;
+  }
+
+  res.writeHead(200, {
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache',
+    Connection: 'keep-alive'
+  });
+
+  let closed = false;
+  res.on('close', () => { closed = true; });
+
+  const chunk = (delta, finishReason = null) => JSON.stringify({
+    id,
+    object: 'chat.completion.chunk',
+    created,
+    model,
+    choices: [{ index: 0, delta, finish_reason: finishReason }]
+  });
+
+  res.write(`data: ${chunk({ role: 'assistant', content: '' })}\n\n`);
+  for (const token of tokenize(reply)) {
+    if (closed) {
+      console.log(`   ${id}: client disconnected`);
+      return;
+    }
+    res.write(`data: ${chunk({ content: token })}\n\n`);
+    await sleep(TOKEN_MS);
+  }
+  res.write(`data: ${chunk({}, 'stop')}\n\n`);
+  res.write('data: [DONE]\n\n');
+  res.end();
+}
+
+const server = http.createServer((req, res) => {
+  if (req.method === 'POST' && req.url.replace(/\/+$/, '').endsWith('/chat/completions')) {
+    handleCompletion(req, res).catch((error) => {
+      console.error('❌ Stub error:', error);
+      if (!res.headersSent) {
+        res.writeHead(400, { 'Content-Type': 'application/json' });
+      }
+      res.end(JSON.stringify({ error: { message: error.message, type: 'invalid_request_error' } }));
+    });
+    return;
+  }
+  if (req.method === 'GET' && req.url.replace(/\/+$/, '').endsWith('/models')) {
+    res.writeHead(200, { 'Content-Type': 'application/json' });
+    res.end(JSON.stringify({
+      object: 'list',
+      data: ['gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo'].map((id) => ({ id, object: 'model', owned_by: 'stub' }))
+    }));
+    return;
+  }
+  res.writeHead(404, { 'Content-Type': 'application/json' });
+  res.end(JSON.stringify({ error: { message: `No stub route for ${req.method} ${req.url}` } }));
+});
+
+server.listen(PORT, () => {
+  console.log(`✅ OpenAI stub listening on http://localhost:${PORT}/v1 (TTFT ${TTFT_MS}ms, ${TOKEN_MS}ms/token${FAIL ? ', failing' : ''})`);
+});
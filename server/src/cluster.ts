@@ -0,0 +1,72 @@
+import cluster from 'cluster';
+import os from 'os';
+import path from 'path';
+import dotenv from 'dotenv';
+
+dotenv.config({ path: path.join(__dirname, '..', '.env') });
+
+/**
+ * Single-host multi-process entry point (`npm run start:cluster`)
+ *
+ * The primary owns the listening port and hands each connection to a worker:
+ * Socket.IO sessions stick to one worker (@socket.io/sticky), other requests go to the
+ * worker with the fewest connections. Workers run the normal server (index.ts) with the
+ * cluster adapter, so rooms, emits and fetchSockets() span all workers. Cron jobs run on
+ * the worker that holds the scheduler lease (LeaderElectionService).
+ *
+ * This is also the local stand-in for a multi-host deployment behind a load balancer.
+ */
+
+if (cluster.isPrimary) {
+  // Loaded only in the primary: workers must not pull these into their process
+  const { createServer } = require('http');
+  const { setupMaster } = require('@socket.io/sticky');
+  const { setupPrimary } = require('@socket.io/cluster-adapter');
+  const { logger } = require('./utils/logger');
+
+  const PORT = process.env.PORT || 3000;
+  const workerCount = parseInt(process.env.SOCKET_CLUSTER_WORKERS || String(os.cpus().length), 10);
+  let shuttingDown = false;
+
+  const httpServer = createServer();
+  setupMaster(httpServer, { loadBalancingMethod: 'least-connection' });
+  setupPrimary();
+
+  const fork = () => cluster.fork({ SOCKET_ADAPTER: 'cluster' });
+
+  for (let i = 0; i < workerCount; i++) {
+    fork();
+  }
+
+  cluster.on('exit', (worker, code, signal) => {
+    if (shuttingDown) {
+      return;
+    }
+    logger.warn(`⚠️ [Cluster] Worker ${worker.process.pid} exited (${signal || code}) - starting a replacement`);
+    fork();
+  });
+
+  httpServer.listen(PORT, () => {
+    logger.info(`🚀 [Cluster] Primary ${process.pid} listening on port ${PORT} with ${workerCount} worker(s)`);
+  });
+
+  const shutdown = (signal: NodeJS.Signals) => {
+    shuttingDown = true;
+    logger.info(`[Cluster] ${signal} received, stopping workers`);
+    httpServer.close();
+    for (const worker of Object.values(cluster.workers || {})) {
+      worker?.process.kill(signal);
+    }
+    // Exit once every worker has run its own graceful shutdown
+    cluster.on('exit', () => {
+      if (Object.keys(cluster.workers || {}).length === 0) {
+        process.exit(0);
+      }
+    });
+  };
+
+  process.on('SIGTERM', () => shutdown('SIGTERM'));
+  process.on('SIGINT', () => shutdown('SIGINT'));
+} else {
+  require('./index');
+}
@@ -9,7 +9,6 @@ import { Server } from 'socket.io';
 import dotenv from 'dotenv';
 import path from 'path';
 import fs from 'fs';
-import cron from 'node-cron';
 
 // Load environment variables
 dotenv.config({ path: path.join(__dirname, '..', '.env') });
@@ -53,9 +52,11 @@ import couponRoutes from './routes/coupons';
 import instructorProfileRoutes from './routes/instructorProfile';
 const studentProgressRoutes = require('./routes/student-progress');
 import { DatabaseService } from './services/DatabaseService';
+import { SocketClusterService } from './services/SocketClusterService';
+import { LeaderElectionService } from './services/LeaderElectionService';
 import { setupSocketHandlers } from './sockets';
 import { logger } from './utils/logger';
-import { initializeScheduler } from './services/NotificationScheduler';
+import { initializeScheduler, scheduleLeaderJob } from './services/NotificationScheduler';
 import { stopCsrfCleanup } from './middleware/csrf';
 
 const app = express();
@@ -68,6 +69,9 @@ const io = new Server(server, {
   }
 });
 
+// Socket.IO adapter: in-memory for one process, shared between workers in cluster mode
+SocketClusterService.configure(io);
+
 const PORT = process.env.PORT || 3000;
 
 // Rate limiting - More permissive for development
@@ -175,6 +179,9 @@ import { OfficeHoursService } from './services/OfficeHoursService';
 import { StudyGroupService } from './services/StudyGroupService';
 import { CommentService } from './services/CommentService';
 import { CourseEventService } from './services/CourseEventService';
+import { CourseSearchIndex } from './services/CourseSearchIndex';
+import { VideoProgressBuffer } from './services/VideoProgressBuffer';
+import { ChatReadReceiptBuffer } from './services/ChatReadReceiptBuffer';
 
 const notificationService = new NotificationService(io);
 const commentService = new CommentService();
@@ -264,7 +271,7 @@ app.use(errorHandler);
 setupSocketHandlers(io);
 
 // Schedule notification queue processing every 5 minutes
-cron.schedule('*/5 * * * *', async () => {
+scheduleLeaderJob('*/5 * * * *', 'Notification Queue Processing', async () => {
   try {
     logger.info('⏰ [CRON] Running scheduled notification queue processing...');
     const notificationService = new NotificationService(io);
@@ -280,12 +287,12 @@ cron.schedule('*/5 * * * *', async () => {
   } catch (error) {
     logger.error('❌ [CRON] Error in notification queue processing:', error);
   }
-});
+}, false);
 
 logger.info('✅ Notification queue processor scheduled (every 5 minutes)');
 
 // Schedule daily digest sending at 8 AM every day
-cron.schedule('0 8 * * *', async () => {
+scheduleLeaderJob('0 8 * * *', 'Daily Digests', async () => {
   try {
     logger.info('⏰ [CRON] Running daily digest sending (8 AM)...');
     const EmailDigestService = (await import('./services/EmailDigestService')).default;
@@ -304,12 +311,12 @@ cron.schedule('0 8 * * *', async () => {
   } catch (error) {
     logger.error('❌ [CRON] Error in daily digest sending:', error);
   }
-});
+}, false);
 
 logger.info('✅ Daily digest scheduler active (8 AM daily)');
 
 // Schedule weekly digest sending at 8 AM every Monday
-cron.schedule('0 8 * * 1', async () => {
+scheduleLeaderJob('0 8 * * 1', 'Weekly Digests', async () => {
   try {
     logger.info('⏰ [CRON] Running weekly digest sending (Monday 8 AM)...');
     const EmailDigestService = (await import('./services/EmailDigestService')).default;
@@ -322,7 +329,7 @@ cron.schedule('0 8 * * 1', async () => {
   } catch (error) {
     logger.error('❌ [CRON] Error in weekly digest sending:', error);
   }
-});
+}, false);
 
 logger.info('✅ Weekly digest scheduler active (Monday 8 AM)');
 
@@ -332,7 +339,11 @@ process.on('SIGTERM', async () => {
   
   // Stop scheduled jobs and cleanup
   stopCsrfCleanup();
-  PresenceService.stopPresenceMonitoring();
+  await PresenceService.stop();
+  await LeaderElectionService.getInstance().stop();
+  CourseSearchIndex.getInstance().stop();
+  await VideoProgressBuffer.getInstance().stop();
+  await ChatReadReceiptBuffer.getInstance().stop();
   
   server.close(() => {
     logger.info('Process terminated');
@@ -345,7 +356,11 @@ process.on('SIGINT', async () => {
   
   // Stop scheduled jobs and cleanup
   stopCsrfCleanup();
-  PresenceService.stopPresenceMonitoring();
+  await PresenceService.stop();
+  await LeaderElectionService.getInstance().stop();
+  CourseSearchIndex.getInstance().stop();
+  await VideoProgressBuffer.getInstance().stop();
+  await ChatReadReceiptBuffer.getInstance().stop();
   
   server.close(() => {
     logger.info('Process terminated');
@@ -365,6 +380,29 @@ const startServer = async () => {
       logger.warn('⚠️  Database-dependent features will not be available until connection is restored');
     }
 
+    // Catalog search index: builds in the background (search falls back to LIKE until ready)
+    if ((process.env.COURSE_SEARCH_MODE || 'index') === 'index') {
+      CourseSearchIndex.getInstance().start();
+    }
+
+    // Video-progress heartbeats are buffered in memory and flushed in batches
+    VideoProgressBuffer.getInstance().start();
+
+    // Chat read receipts (LastReadAt) are coalesced and written in batches
+    ChatReadReceiptBuffer.getInstance().start();
+
+    // Cron jobs run on one node: the holder of the scheduler lease
+    LeaderElectionService.getInstance().start();
+
+    // Presence lives in memory; UserPresence is a periodic snapshot
+    PresenceService.start();
+
+    // Cluster workers get connections from the primary (cluster.ts) instead of listening
+    if (!SocketClusterService.attachServer(io)) {
+      logger.info(`🚀 Mishin Learn worker ${process.pid} ready (connections via cluster primary on port ${PORT})`);
+      return;
+    }
+
     // Start HTTP server regardless of database status
     server.listen(PORT, () => {
       logger.info(`🚀 Mishin Learn Server running on http://localhost:${PORT}`);
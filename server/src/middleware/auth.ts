@@ -1,6 +1,7 @@
 import { Request, Response, NextFunction } from 'express';
 import jwt, { JwtPayload } from 'jsonwebtoken';
 import { DatabaseService } from '../services/DatabaseService';
+import { ActiveUserCache } from '../services/ActiveUserCache';
 import { logger } from '../utils/logger';
 
 export interface AuthRequest extends Request {
@@ -54,23 +55,12 @@ export const authenticateToken = async (
     // Verify JWT token
     const decoded = jwt.verify(token, secret) as TokenPayload;
 
-    console.log(`[AUTH] JWT decoded - userId: ${decoded.userId}, email: ${decoded.email}, role: ${decoded.role}`);
-
-    // Optional: Verify user still exists and is active
-    const db = DatabaseService.getInstance();
+    // Verify user still exists and is active (cached; see ActiveUserCache)
     try {
-      const users = await db.query(
-        'SELECT Id, Email, Username, FirstName, LastName, Role, IsActive FROM dbo.Users WHERE Id = @userId AND IsActive = 1',
-        { userId: decoded.userId }
-      );
-
-      console.log(`[AUTH] Database lookup for userId: ${decoded.userId}, found ${users.length} users`);
-      if (users.length > 0) {
-        console.log(`[AUTH] User found with role: ${users[0].Role}`);
-      }
+      const user = await ActiveUserCache.getActiveUser(decoded.userId);
 
-      if (users.length === 0) {
-        console.log(`[AUTH] User not found or inactive for userId: ${decoded.userId}`);
+      if (!user) {
+        logger.warn(`[AUTH] User not found or inactive for userId: ${decoded.userId}`);
         res.status(401).json({
           success: false,
           error: {
@@ -85,11 +75,9 @@ export const authenticateToken = async (
       req.user = {
         userId: decoded.userId,
         email: decoded.email,
-        role: users[0].Role  // Use current role from database
+        role: user.Role  // Use current role from database
       };
 
-      console.log(`[AUTH] Authentication successful for user: ${decoded.email}, role: ${users[0].Role}`);
-
       next();
     } catch (dbError) {
       logger.warn('Database check failed in auth middleware, proceeding with token data', dbError);
@@ -160,18 +148,14 @@ export const optionalAuth = async (
 
     const decoded = jwt.verify(token, secret) as TokenPayload;
 
-    const db = DatabaseService.getInstance();
     try {
-      const users = await db.query(
-        'SELECT Id, Email, Username, FirstName, LastName, Role, IsActive FROM dbo.Users WHERE Id = @userId AND IsActive = 1',
-        { userId: decoded.userId }
-      );
+      const user = await ActiveUserCache.getActiveUser(decoded.userId);
 
-      if (users.length > 0) {
+      if (user) {
         req.user = {
           userId: decoded.userId,
           email: decoded.email,
-          role: users[0].Role
+          role: user.Role
         };
       }
     } catch (dbError) {
@@ -0,0 +1,187 @@
+import { Request, Response, NextFunction, RequestHandler } from 'express';
+import crypto from 'crypto';
+import { TtlLruCache } from '../utils/TtlLruCache';
+import { logger } from '../utils/logger';
+
+/**
+ * Response cache for public GET endpoints that return the same JSON to every caller
+ *
+ * Entries are keyed by route path + sorted query string and hold the serialized
+ * body with a weak ETag, so a client sending If-None-Match gets a 304.
+ *
+ * - Fresh (younger than ttlMs): served from memory, the handler does not run.
+ * - Stale (up to staleWhileRevalidateMs later): served from memory, and the handler
+ *   runs once in the background to refresh the entry (stale-while-revalidate).
+ * - Miss: concurrent requests for the same key wait for the first one's handler
+ *   instead of all querying SQL Server.
+ *
+ * Invalidation is by tag: an entry remembers the version of each tag as it was when
+ * its handler started, and invalidateResponseCache(tag) bumps the version so older
+ * entries miss (including one whose handler was still running at the time).
+ * Only 200 responses sent with res.json() are cached.
+ */
+
+export interface ResponseCacheOptions {
+  ttlMs: number;
+  staleWhileRevalidateMs?: number;
+  /** Invalidation tags for this request (e.g. 'catalog', 'course:<id>') */
+  tags?: (req: Request) => string[];
+  /** Skip the cache for this request (e.g. authenticated callers get personalized data) */
+  bypass?: (req: Request) => boolean;
+}
+
+interface CachedResponse {
+  body: string;
+  etag: string;
+  freshUntil: number;
+  tagVersions: Array<[string, number]>;
+  revalidating: boolean;
+}
+
+const RESPONSE_CACHE_ENABLED = process.env.RESPONSE_CACHE_ENABLED !== 'false';
+
+const responses = new TtlLruCache<string, CachedResponse>(
+  'httpResponses',
+  parseInt(process.env.RESPONSE_CACHE_MAX_ENTRIES || '2000', 10),
+  60 * 1000
+);
+
+const tagVersions = new Map<string, number>();
+const inflight = new Map<string, Promise<CachedResponse | null>>();
+
+/**
+ * Drop every cached response stored under any of these tags
+ */
+export function invalidateResponseCache(...tags: string[]): void {
+  for (const tag of tags) {
+    tagVersions.set(tag, (tagVersions.get(tag) || 0) + 1);
+  }
+}
+
+function cacheKey(req: Request): string {
+  const query = Object.keys(req.query)
+    .sort()
+    .map(key => `${key}=${JSON.stringify(req.query[key])}`)
+    .join('&');
+  return `${req.baseUrl}${req.path}?${query}`;
+}
+
+function isCurrent(entry: CachedResponse): boolean {
+  return entry.tagVersions.every(([tag, version]) => (tagVersions.get(tag) || 0) === version);
+}
+
+// Read before the handler runs, so an invalidation during the handler makes its result stale
+function currentTagVersions(req: Request, options: ResponseCacheOptions): Array<[string, number]> {
+  const tags = options.tags ? options.tags(req) : [];
+  return tags.map((tag): [string, number] => [tag, tagVersions.get(tag) || 0]);
+}
+
+function store(key: string, body: any, versions: Array<[string, number]>, options: ResponseCacheOptions): CachedResponse {
+  const serialized = JSON.stringify(body);
+  const entry: CachedResponse = {
+    body: serialized,
+    etag: `W/"${crypto.createHash('sha1').update(serialized).digest('base64url')}"`,
+    freshUntil: Date.now() + options.ttlMs,
+    tagVersions: versions,
+    revalidating: false
+  };
+  responses.set(key, entry, options.ttlMs + (options.staleWhileRevalidateMs || 0));
+  return entry;
+}
+
+function send(req: Request, res: Response, entry: CachedResponse, status: 'HIT' | 'MISS' | 'STALE'): void {
+  res.set('ETag', entry.etag);
+  res.set('Cache-Control', 'no-cache');
+  res.set('X-Cache', status);
+  if (req.fresh) {
+    res.status(304).end();
+    return;
+  }
+  res.type('application/json').send(entry.body);
+}
+
+/**
+ * Run the rest of the route after a stale entry was already sent: the handler's
+ * res.json() output refreshes the entry instead of going to the client.
+ */
+function revalidate(key: string, req: Request, res: Response, next: NextFunction, entry: CachedResponse, options: ResponseCacheOptions): void {
+  entry.revalidating = true;
+  const versions = currentTagVersions(req, options);
+  let status = 200;
+
+  res.status = (code: number) => {
+    status = code;
+    return res;
+  };
+  res.set = () => res;
+  res.header = () => res;
+  res.send = () => res;
+  res.json = (body: any) => {
+    if (status === 200) {
+      store(key, body, versions, options);
+    } else {
+      entry.revalidating = false;
+      logger.warn(`[ResponseCache] Revalidation of ${key} returned ${status}; keeping stale entry`);
+    }
+    return res;
+  };
+
+  next();
+}
+
+export function responseCache(options: ResponseCacheOptions): RequestHandler {
+  return (req: Request, res: Response, next: NextFunction) => {
+    if (!RESPONSE_CACHE_ENABLED || req.method !== 'GET' || (options.bypass && options.bypass(req))) {
+      return next();
+    }
+
+    const key = cacheKey(req);
+    const cached = responses.get(key);
+
+    if (cached && isCurrent(cached)) {
+      if (Date.now() < cached.freshUntil) {
+        return send(req, res, cached, 'HIT');
+      }
+      send(req, res, cached, 'STALE');
+      if (!cached.revalidating) {
+        revalidate(key, req, res, next, cached, options);
+      }
+      return;
+    }
+
+    // Another request is already filling this key: wait for its result
+    const pending = inflight.get(key);
+    if (pending) {
+      pending
+        .then(entry => (entry && isCurrent(entry) ? send(req, res, entry, 'HIT') : next()))
+        .catch(next);
+      return;
+    }
+
+    let settle!: (entry: CachedResponse | null) => void;
+    inflight.set(key, new Promise(resolve => { settle = resolve; }));
+    const finish = (entry: CachedResponse | null) => {
+      if (inflight.has(key)) {
+        inflight.delete(key);
+        settle(entry);
+      }
+    };
+
+    const versions = currentTagVersions(req, options);
+    const originalJson = res.json.bind(res);
+    res.json = (body: any) => {
+      if (res.statusCode !== 200) {
+        finish(null);
+        return originalJson(body);
+      }
+      const entry = store(key, body, versions, options);
+      finish(entry);
+      send(req, res, entry, 'MISS');
+      return res;
+    };
+    // Handler errored or responded without res.json(): release waiters to run it themselves
+    res.on('close', () => finish(null));
+
+    next();
+  };
+}
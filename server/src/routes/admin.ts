@@ -2,7 +2,9 @@ import express from 'express';
 import { authenticateToken, authorize, AuthRequest } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
 import { AdminService } from '../services/AdminService';
+import { ActiveUserCache } from '../services/ActiveUserCache';
 import { logger } from '../utils/logger';
+import { decodeCursor } from '../utils/pagination';
 
 const router = express.Router();
 const db = DatabaseService.getInstance();
@@ -102,6 +104,7 @@ router.post('/promote-to-instructor', authenticateToken, authorize(['admin']), a
       role: 'instructor',
       id: user.Id
     });
+    ActiveUserCache.invalidate(user.Id);
 
     // Get updated user data
     const updatedUsers = await db.query('SELECT Id, Email, Role FROM dbo.Users WHERE Id = @id', { id: user.Id });
@@ -130,10 +133,14 @@ router.post('/promote-to-instructor', authenticateToken, authorize(['admin']), a
 // ─── Paginated User List ──────────────────────────────────────────
 router.get('/users', authenticateToken, authorize(['admin']), async (req: AuthRequest, res) => {
   try {
-    const { page, limit, search, role, status, sortBy, sortOrder } = req.query;
+    const { page, limit, cursor, search, role, status, sortBy, sortOrder } = req.query;
+    if (cursor && !decodeCursor(cursor)) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
     const result = await adminService.getUsers({
       page: page ? parseInt(page as string) : undefined,
       limit: limit ? parseInt(limit as string) : undefined,
+      cursor: cursor as string | undefined,
       search: search as string | undefined,
       role: role as string | undefined,
       status: status as string | undefined,
@@ -230,10 +237,14 @@ router.post('/users/:id/reset-password', authenticateToken, authorize(['admin'])
 // ─── Paginated Course List ────────────────────────────────────────
 router.get('/courses', authenticateToken, authorize(['admin']), async (req: AuthRequest, res) => {
   try {
-    const { page, limit, search, status, category, level, instructorId, sortBy, sortOrder } = req.query;
+    const { page, limit, cursor, search, status, category, level, instructorId, sortBy, sortOrder } = req.query;
+    if (cursor && !decodeCursor(cursor)) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
     const result = await adminService.getCourses({
       page: page ? parseInt(page as string) : undefined,
       limit: limit ? parseInt(limit as string) : undefined,
+      cursor: cursor as string | undefined,
       search: search as string | undefined,
       status: status as string | undefined,
       category: category as string | undefined,
@@ -326,10 +337,14 @@ router.delete('/courses/:id', authenticateToken, authorize(['admin']), async (re
 // ─── Paginated Transaction List ───────────────────────────────────
 router.get('/transactions', authenticateToken, authorize(['admin']), async (req: AuthRequest, res) => {
   try {
-    const { page, limit, search, status, dateFrom, dateTo, courseId, userId, sortBy, sortOrder } = req.query;
+    const { page, limit, cursor, search, status, dateFrom, dateTo, courseId, userId, sortBy, sortOrder } = req.query;
+    if (cursor && !decodeCursor(cursor)) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
     const result = await adminService.getTransactions({
       page: page ? parseInt(page as string) : undefined,
       limit: limit ? parseInt(limit as string) : undefined,
+      cursor: cursor as string | undefined,
       search: search as string | undefined,
       status: status as string | undefined,
       dateFrom: dateFrom as string | undefined,
@@ -414,7 +429,11 @@ router.get('/audit-log', authenticateToken, authorize(['admin']), async (req: Au
     const page = parseInt(req.query.page as string) || 1;
     const limit = parseInt(req.query.limit as string) || 20;
     const type = (req.query.type as string) || 'all';
-    const result = await adminService.getAuditLog({ page, limit, type });
+    const cursor = req.query.cursor as string | undefined;
+    if (cursor && !decodeCursor(cursor)) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
+    const result = await adminService.getAuditLog({ page, limit, cursor, type });
     res.json(result);
   } catch (error) {
     logger.error('Admin GET /audit-log failed', { error, userId: req.user?.userId });
@@ -6,9 +6,44 @@ import { checkRole } from '../middleware/roleCheck';
 import { adaptiveAssessmentService } from '../services/AdaptiveAssessmentService';
 import { AssessmentFeedbackService } from '../services/AssessmentFeedbackService';
 import { NotificationService } from '../services/NotificationService';
+import { QuestionStatsService, QuestionOutcome } from '../services/QuestionStatsService';
+import { AssessmentAnswerService, AnswerDelta, MAX_ANSWER_DELTAS } from '../services/AssessmentAnswerService';
 
 const router = express.Router();
 
+/**
+ * Add a completed submission's graded answers to QuestionStats (adaptive difficulty).
+ * Only the submission's total time is known, so each answered question is credited an
+ * equal share of it.
+ */
+function recordQuestionStats(outcomes: QuestionOutcome[], timeSpent: number): Promise<void> {
+  const share = outcomes.length > 0 ? Math.round(timeSpent / outcomes.length) : 0;
+  return QuestionStatsService.recordOutcomes(
+    outcomes.map(outcome => ({ ...outcome, timeSpent: outcome.timeSpent ?? share }))
+  );
+}
+
+const uuidRegex = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
+/**
+ * Validate a batch of answer deltas from a request body; returns null if any entry is invalid
+ */
+function parseAnswerDeltas(value: unknown, maxCount: number = MAX_ANSWER_DELTAS): AnswerDelta[] | null {
+  if (!Array.isArray(value) || value.length > maxCount) {
+    return null;
+  }
+  const deltas: AnswerDelta[] = [];
+  for (const entry of value) {
+    if (!entry || typeof entry.questionId !== 'string' || !uuidRegex.test(entry.questionId) ||
+        !AssessmentAnswerService.isValidAnswer(entry.answer)) {
+      return null;
+    }
+    const timeSpent = typeof entry.timeSpent === 'number' && entry.timeSpent >= 0 ? Math.round(entry.timeSpent) : null;
+    deltas.push({ questionId: entry.questionId, answer: entry.answer, timeSpent });
+  }
+  return deltas;
+}
+
 // Assessment Types
 interface Assessment {
   id?: string;
@@ -793,6 +828,24 @@ router.post('/:assessmentId/adaptive/submit-answer', authenticateToken, async (r
 
     const db = DatabaseService.getInstance();
 
+    const submission = await db.query(`
+      SELECT Status FROM dbo.AssessmentSubmissions
+      WHERE Id = @submissionId AND UserId = @userId AND AssessmentId = @assessmentId
+    `, { submissionId, userId, assessmentId });
+
+    if (submission.length === 0) {
+      return res.status(404).json({ error: 'Submission not found' });
+    }
+
+    if (submission[0].Status !== 'in_progress') {
+      return res.status(400).json({ error: 'Submission is not in progress' });
+    }
+
+    const deltas = parseAnswerDeltas([{ questionId, answer, timeSpent }]);
+    if (!deltas) {
+      return res.status(400).json({ error: 'Invalid answer' });
+    }
+
     // Get question details for scoring
     const question = await db.query(`
       SELECT Id, Type, CorrectAnswer, Difficulty, AdaptiveWeight
@@ -814,35 +867,8 @@ router.post('/:assessmentId/adaptive/submit-answer', authenticateToken, async (r
       isCorrect = answer?.toLowerCase().trim() === correctAnswer?.toLowerCase().trim();
     }
 
-    // Store answer in submission's temporary data
-    const currentSubmission = await db.query(`
-      SELECT Answers FROM dbo.AssessmentSubmissions WHERE Id = @submissionId
-    `, { submissionId });
-
-    let currentAnswers: Record<string, any> = {};
-    if (currentSubmission[0]?.Answers) {
-      try {
-        currentAnswers = JSON.parse(currentSubmission[0].Answers);
-      } catch (error) {
-        // Log parse error but continue with empty object
-        console.error('Failed to parse assessment answers JSON, using empty object', {
-          submissionId,
-          error: error instanceof Error ? error.message : 'Unknown error'
-        });
-      }
-    }
-
-    currentAnswers[questionId] = answer;
-
-    await db.query(`
-      UPDATE dbo.AssessmentSubmissions 
-      SET Answers = @answers, TimeSpent = @timeSpent
-      WHERE Id = @submissionId
-    `, { 
-      submissionId, 
-      answers: JSON.stringify(currentAnswers),
-      timeSpent 
-    });
+    // Save the answer (with the time spent on this question) as its own row
+    await AssessmentAnswerService.saveAnswers(submissionId, deltas);
 
     res.json({
       correct: isCorrect,
@@ -856,6 +882,38 @@ router.post('/:assessmentId/adaptive/submit-answer', authenticateToken, async (r
   }
 });
 
+// PATCH /api/assessments/submissions/:submissionId/answers - Autosave a batch of answer changes
+router.patch('/submissions/:submissionId/answers', authenticateToken, checkRole(['student', 'instructor']), async (req: AuthRequest, res: Response) => {
+  try {
+    const { submissionId } = req.params;
+    const userId = req.user?.userId;
+    const deltas = parseAnswerDeltas(req.body?.answers);
+
+    if (!deltas) {
+      return res.status(400).json({ error: `answers must be an array of at most ${MAX_ANSWER_DELTAS} { questionId, answer, timeSpent? } entries` });
+    }
+
+    const submission = await DatabaseService.getInstance().query(`
+      SELECT Status FROM dbo.AssessmentSubmissions WHERE Id = @submissionId AND UserId = @userId
+    `, { submissionId, userId });
+
+    if (submission.length === 0) {
+      return res.status(404).json({ error: 'Submission not found' });
+    }
+
+    if (submission[0].Status !== 'in_progress') {
+      return res.status(400).json({ error: 'Submission is not in progress' });
+    }
+
+    await AssessmentAnswerService.saveAnswers(submissionId, deltas);
+
+    res.json({ saved: deltas.length });
+  } catch (error) {
+    console.error('Error saving assessment answers:', error);
+    res.status(500).json({ error: 'Failed to save answers' });
+  }
+});
+
 // POST /api/assessments/submissions/:submissionId/submit - Submit assessment answers
 router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['student', 'instructor']), async (req: AuthRequest, res: Response) => {
   try {
@@ -886,13 +944,20 @@ router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['
     const startedAt = new Date(submission[0].StartedAt).getTime();
     const timeSpent = Math.floor((now - startedAt) / 1000);
 
-    // Get questions with correct answers
-    const questions = await db.query(`
-      SELECT Id, Type, CorrectAnswer, Difficulty
-      FROM dbo.Questions 
-      WHERE AssessmentId = @assessmentId 
-      ORDER BY OrderIndex
-    `, { assessmentId: submission[0].AssessmentId });
+    // Answers sent with the submit are the final state; the rest were autosaved
+    if (answers !== undefined) {
+      const finalDeltas = answers && typeof answers === 'object' && !Array.isArray(answers)
+        ? parseAnswerDeltas(Object.entries(answers).map(([questionId, answer]) => ({ questionId, answer })), Infinity)
+        : null;
+      if (!finalDeltas) {
+        return res.status(400).json({ error: 'Invalid answers' });
+      }
+      await AssessmentAnswerService.saveAnswers(submissionId, finalDeltas);
+    }
+
+    // Score every question in one query over the saved answers
+    const questions = await AssessmentAnswerService.gradeSubmission(submissionId, submission[0].AssessmentId);
+    const savedAnswers = AssessmentAnswerService.toAnswersObject(questions);
 
     // Use adaptive scoring if assessment is adaptive
     if (submission[0].IsAdaptive) {
@@ -900,14 +965,14 @@ router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['
         const adaptiveScoring = await adaptiveAssessmentService.calculateAdaptiveScore(
           submission[0].AssessmentId,
           userId!,
-          answers,
+          questions,
           timeSpent
         );
 
         const finalScore = Math.round(adaptiveScoring.finalScore);
 
         // Update submission with adaptive scoring
-        await db.query(`
+        const adaptiveUpdate = await db.execute(`
           UPDATE dbo.AssessmentSubmissions 
           SET 
             Answers = @answers,
@@ -917,10 +982,10 @@ router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['
             Status = 'completed',
             CompletedAt = GETUTCDATE(),
             Feedback = @feedback
-          WHERE Id = @submissionId
+          WHERE Id = @submissionId AND Status = 'in_progress'
         `, {
           submissionId,
-          answers: JSON.stringify(answers),
+          answers: JSON.stringify(savedAnswers),
           score: finalScore,
           maxScore: 100,
           timeSpent,
@@ -934,6 +999,11 @@ router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['
           })
         });
 
+        // Count the answers once (a concurrent duplicate submit updates no row)
+        if (adaptiveUpdate.rowsAffected[0] > 0 && !submission[0].IsPreview) {
+          await recordQuestionStats(adaptiveScoring.questionOutcomes, timeSpent);
+        }
+
         // Update user skill profile
         await adaptiveAssessmentService.updateUserSkillProfile(
           userId!,
@@ -963,37 +1033,33 @@ router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['
     let totalScore = 0;
     let maxScore = questions.length * 100; // 100 points per question
     const feedback: Record<string, any> = {};
+    const questionOutcomes: QuestionOutcome[] = [];
 
     for (const question of questions) {
-      const userAnswer = answers[question.Id];
+      const userAnswer = savedAnswers[question.QuestionId];
       const correctAnswer = JSON.parse(question.CorrectAnswer);
-      
-      let isCorrect = false;
-      
-      // Simple scoring logic (can be enhanced)
-      if (question.Type === 'multiple_choice' || question.Type === 'true_false') {
-        isCorrect = userAnswer === correctAnswer;
-      } else if (question.Type === 'short_answer') {
-        isCorrect = userAnswer?.toLowerCase().trim() === correctAnswer?.toLowerCase().trim();
-      }
-      // Add more scoring logic for other question types
+      const isCorrect = question.IsCorrect;
 
       if (isCorrect) {
         totalScore += 100;
       }
 
-      feedback[question.Id] = {
+      feedback[question.QuestionId] = {
         userAnswer,
         correctAnswer,
         isCorrect,
         score: isCorrect ? 100 : 0
       };
+
+      if (question.Answer !== null) {
+        questionOutcomes.push({ questionId: question.QuestionId, isCorrect, timeSpent: question.TimeSpent });
+      }
     }
 
     const finalScore = Math.round((totalScore / maxScore) * 100);
 
     // Update submission
-    await db.query(`
+    const submissionUpdate = await db.execute(`
       UPDATE dbo.AssessmentSubmissions 
       SET 
         Answers = @answers,
@@ -1003,16 +1069,21 @@ router.post('/submissions/:submissionId/submit', authenticateToken, checkRole(['
         Status = 'completed',
         CompletedAt = GETUTCDATE(),
         Feedback = @feedback
-      WHERE Id = @submissionId
+      WHERE Id = @submissionId AND Status = 'in_progress'
     `, {
       submissionId,
-      answers: JSON.stringify(answers),
+      answers: JSON.stringify(savedAnswers),
       score: finalScore,
       maxScore: 100,
       timeSpent,
       feedback: JSON.stringify(feedback)
     });
 
+    // Count the answers once (a concurrent duplicate submit updates no row)
+    if (submissionUpdate.rowsAffected[0] > 0 && !submission[0].IsPreview) {
+      await recordQuestionStats(questionOutcomes, timeSpent);
+    }
+
     // Update user progress if passed
     if (finalScore >= submission[0].PassingScore) {
       // Update lesson progress logic here
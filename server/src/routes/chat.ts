@@ -5,6 +5,8 @@ import { ChatService } from '../services/ChatService';
 
 const router = Router();
 
+const uuidRegex = /^[0-9a-f]{8}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{4}-[0-9a-f]{12}$/i;
+
 // Get chat rooms for user
 router.get('/rooms', authenticateToken, async (req: AuthRequest, res: Response) => {
   try {
@@ -24,7 +26,7 @@ router.get('/rooms', authenticateToken, async (req: AuthRequest, res: Response)
   }
 });
 
-// Get messages for a room
+// Get messages for a room (newest page first; pass nextCursor as ?cursor= for older messages)
 router.get('/rooms/:roomId/messages', authenticateToken, async (req: AuthRequest, res: Response) => {
   try {
     const userId = req.user?.userId;
@@ -33,18 +35,18 @@ router.get('/rooms/:roomId/messages', authenticateToken, async (req: AuthRequest
     }
 
     const { roomId } = req.params;
-    const { limit, offset, before } = req.query;
+    const { limit, cursor, before } = req.query;
     
     const io = req.app.get('io');
     const chatService = new ChatService(io);
 
-    const messages = await chatService.getRoomMessages(roomId, userId, {
+    const page = await chatService.getRoomMessages(roomId, userId, {
       limit: limit ? parseInt(limit as string) : undefined,
-      offset: offset ? parseInt(offset as string) : undefined,
+      cursor: cursor as string | undefined,
       beforeTimestamp: before as string
     });
 
-    res.json(messages);
+    res.json(page);
   } catch (error: any) {
     console.error('Error fetching messages:', error);
     if (error.message === 'User is not a participant of this room') {
@@ -143,14 +145,20 @@ router.post('/rooms/:roomId/read', authenticateToken, async (req: AuthRequest, r
     }
 
     const { roomId } = req.params;
+    if (!uuidRegex.test(roomId)) {
+      return res.status(400).json({ error: 'Invalid room ID' });
+    }
 
     const io = req.app.get('io');
     const chatService = new ChatService(io);
 
     await chatService.markMessagesAsRead(roomId, userId);
     res.json({ success: true });
-  } catch (error) {
+  } catch (error: any) {
     console.error('Error marking messages as read:', error);
+    if (error.message === 'User is not a participant of this room') {
+      return res.status(403).json({ error: error.message });
+    }
     res.status(500).json({ error: 'Failed to mark messages as read' });
   }
 });
@@ -1,12 +1,103 @@
 import { Router } from 'express';
 import { authenticateToken, optionalAuth } from '../middleware/auth';
+import { responseCache, invalidateResponseCache } from '../middleware/responseCache';
 import { DatabaseService } from '../services/DatabaseService';
+import { CourseEventService } from '../services/CourseEventService';
+import { CourseSearchIndex, CourseSearchHit } from '../services/CourseSearchIndex';
+import { KeysetSort, decodeCursor, cursorKeyExpr, keysetCondition, takeKeysetPage, getCachedTotal } from '../utils/pagination';
+import { TtlLruCache } from '../utils/TtlLruCache';
 
 const router = Router();
 const db = DatabaseService.getInstance();
 
+// 'index' = ranked in-process search index (LIKE until it is built); 'like' = legacy LIKE filter
+const COURSE_SEARCH_MODE = process.env.COURSE_SEARCH_MODE || 'index';
+
+// Catalog card columns, shared by the LIKE listing and the search-index lookup
+const catalogSelect = (extraColumns: string = '') => `
+  SELECT ${extraColumns}
+    c.Id,
+    c.Title,
+    c.Description,
+    c.Thumbnail,
+    c.Category,
+    c.Level,
+    c.Duration,
+    c.Price,
+    c.Rating,
+    c.RatingCount,
+    c.EnrollmentCount,
+    c.Tags,
+    c.CreatedAt,
+    c.UpdatedAt,
+    c.InstructorId, -- Added instructor ID to response
+    u.FirstName as InstructorFirstName,
+    u.LastName as InstructorLastName,
+    u.Avatar as InstructorAvatar,
+    c.LessonCount,
+    c.MaxEnrollment,
+    c.EnrollmentOpenDate,
+    c.EnrollmentCloseDate,
+    c.RequiresApproval
+  FROM Courses c
+  INNER JOIN Users u ON c.InstructorId = u.Id
+`;
+
+// Public catalog responses are cached (see middleware/responseCache.ts) and dropped on course changes
+const CATALOG_CACHE_TTL_MS = parseInt(process.env.CATALOG_CACHE_TTL_MS || '30000', 10);
+const CATALOG_CACHE_STALE_MS = parseInt(process.env.CATALOG_CACHE_STALE_MS || '300000', 10);
+
+const catalogCache = responseCache({
+  ttlMs: CATALOG_CACHE_TTL_MS,
+  staleWhileRevalidateMs: CATALOG_CACHE_STALE_MS,
+  tags: () => ['catalog']
+});
+
+// Course detail is only shared between anonymous visitors; signed-in users see their own enrollment state
+const courseDetailCache = responseCache({
+  ttlMs: CATALOG_CACHE_TTL_MS,
+  staleWhileRevalidateMs: CATALOG_CACHE_STALE_MS,
+  tags: (req) => [`course:${String(req.params.id).toLowerCase()}`],
+  bypass: (req: any) => Boolean(req.user)
+});
+
+const courseEvents = CourseEventService.getInstance();
+courseEvents.onCatalogChanged(({ courseId }) => invalidateResponseCache('catalog', `course:${String(courseId).toLowerCase()}`));
+courseEvents.onCourseUpdated(({ courseId }) => invalidateResponseCache(`course:${String(courseId).toLowerCase()}`));
+
+// Distinct students across an instructor's courses (shown on course detail); a student
+// enrolled in several of the instructor's courses counts once, so it can't come from the counters
+const instructorStudentCounts = new TtlLruCache<string, number>(
+  'instructorStudentCounts',
+  parseInt(process.env.INSTRUCTOR_STUDENT_COUNT_CACHE_MAX || '10000', 10),
+  parseInt(process.env.INSTRUCTOR_STUDENT_COUNT_CACHE_TTL_MS || '300000', 10)
+);
+
+const getInstructorStudentCount = async (instructorId: string): Promise<number> => {
+  const key = String(instructorId).toLowerCase();
+  const cached = instructorStudentCounts.get(key);
+  if (cached !== undefined) {
+    return cached;
+  }
+
+  const result = await db.query<{ StudentCount: number }>(`
+    SELECT COUNT(DISTINCT e.UserId) as StudentCount
+    FROM Enrollments e
+    INNER JOIN Courses c ON e.CourseId = c.Id
+    WHERE c.InstructorId = @instructorId AND e.Status IN ('active', 'completed')
+  `, { instructorId });
+
+  const count = result[0]?.StudentCount || 0;
+  instructorStudentCounts.set(key, count);
+  return count;
+};
+
+// Catalog listing order (newest first); keyset pages continue from (CreatedAt, Id)
+const CATALOG_SORT: KeysetSort = { expr: 'c.CreatedAt', type: 'date' };
+const CATALOG_SORT_KEY = 'created:DESC';
+
 // Get all published courses with optional filtering and search
-router.get('/', async (req: any, res: any) => {
+router.get('/', catalogCache, async (req: any, res: any) => {
   try {
     const { 
       search = '', 
@@ -14,9 +105,16 @@ router.get('/', async (req: any, res: any) => {
       level = '', 
       instructorId = '',
       page = 1, 
-      limit = 12 
+      limit = 12,
+      cursor
     } = req.query;
 
+    // Opaque keyset cursor from a previous page's pagination.nextCursor (page/OFFSET still supported)
+    const decodedCursor = cursor ? decodeCursor(cursor) : null;
+    if (cursor && !decodedCursor) {
+      return res.status(400).json({ error: 'Invalid cursor' });
+    }
+
     const offset = (parseInt(page) - 1) * parseInt(limit);
 
     // Use Status field if it exists, fallback to IsPublished
@@ -24,8 +122,22 @@ router.get('/', async (req: any, res: any) => {
     let whereClause = "WHERE (c.Status = 'published' OR (c.Status IS NULL AND c.IsPublished = 1)) AND ISNULL(c.Visibility, 'public') = 'public'";
     const params: any = {};
 
+    // Ranked search through the in-process index; the page comes back in relevance order
+    let searchHits: CourseSearchHit[] | null = null;
+    let searchTotal = 0;
+    if (search && COURSE_SEARCH_MODE === 'index' && CourseSearchIndex.getInstance().isReady()) {
+      const result = CourseSearchIndex.getInstance().search(
+        String(search),
+        { category: category || undefined, level: level || undefined, instructorId: instructorId || undefined },
+        offset,
+        parseInt(limit)
+      );
+      searchHits = result.hits;
+      searchTotal = result.total;
+    }
+
     // Add search filter
-    if (search) {
+    if (search && !searchHits) {
       // Search in Title, Description, Tags, AND Category (handle both snake_case and Title Case)
       // e.g., "Data Science" matches both category "data_science" and title "Data Science Basics"
       whereClause += ` AND (c.Title LIKE @search OR c.Description LIKE @search OR c.Tags LIKE @search OR REPLACE(c.Category, '_', ' ') LIKE @searchCategory)`;
@@ -52,51 +164,71 @@ router.get('/', async (req: any, res: any) => {
       params.instructorId = instructorId;
     }
 
-    const query = `
-      SELECT 
-        c.Id,
-        c.Title,
-        c.Description,
-        c.Thumbnail,
-        c.Category,
-        c.Level,
-        c.Duration,
-        c.Price,
-        c.Rating,
-        c.RatingCount,
-        (SELECT COUNT(*) FROM Enrollments e WHERE e.CourseId = c.Id AND e.Status IN ('active', 'completed')) as EnrollmentCount,
-        c.Tags,
-        c.CreatedAt,
-        c.UpdatedAt,
-        c.InstructorId, -- Added instructor ID to response
-        u.FirstName as InstructorFirstName,
-        u.LastName as InstructorLastName,
-        u.Avatar as InstructorAvatar,
-        (SELECT COUNT(*) FROM Lessons l WHERE l.CourseId = c.Id) as LessonCount,
-        c.MaxEnrollment,
-        c.EnrollmentOpenDate,
-        c.EnrollmentCloseDate,
-        c.RequiresApproval
-      FROM Courses c
-      INNER JOIN Users u ON c.InstructorId = u.Id
-      ${whereClause}
-      ORDER BY c.CreatedAt DESC
-      OFFSET @offset ROWS
-      FETCH NEXT @limit ROWS ONLY
-    `;
-
-    // Count query for pagination
-    const countQuery = `
-      SELECT COUNT(*) as total
-      FROM Courses c
-      INNER JOIN Users u ON c.InstructorId = u.Id
-      ${whereClause}
-    `;
+    let coursesResult: any[];
+    let total: number;
+    let hasNext: boolean;
+    let nextCursor: string | null = null;
+
+    if (searchHits) {
+      // Load only this page's courses (still catalog-filtered in case the index is a moment stale)
+      coursesResult = [];
+      if (searchHits.length > 0) {
+        const idParams: any = {};
+        const idList = searchHits.map((hit, index) => {
+          idParams[`id${index}`] = hit.courseId;
+          return `@id${index}`;
+        });
+        const rows = await db.query(`
+          ${catalogSelect()}
+          ${whereClause} AND c.Id IN (${idList.join(', ')})
+        `, { ...params, ...idParams });
+
+        const rowsById = new Map<string, any>(rows.map((row: any): [string, any] => [String(row.Id).toUpperCase(), row]));
+        for (const hit of searchHits) {
+          const row = rowsById.get(hit.courseId);
+          if (row) {
+            coursesResult.push({ ...row, SearchScore: hit.score, SearchHighlights: hit.highlights });
+          }
+        }
+      }
+      total = searchTotal;
+      hasNext = offset + coursesResult.length < total;
+    } else {
+      // Keyset mode seeks past the cursor row; OFFSET mode skips (page - 1) * limit rows
+      const useCursor = decodedCursor?.s === CATALOG_SORT_KEY;
+      const pageParams: any = { ...params, offset: useCursor ? 0 : offset, limit: parseInt(limit) + 1 };
+      if (useCursor) {
+        pageParams.cursorValue = String(decodedCursor!.v);
+        pageParams.cursorId = decodedCursor!.id;
+      }
 
-    const [coursesResult, countResult] = await Promise.all([
-      db.query(query, { ...params, offset, limit: parseInt(limit) }),
-      db.query(countQuery, params)
-    ]);
+      // One extra row tells us whether there is a next page
+      const query = `
+        ${catalogSelect(`${cursorKeyExpr(CATALOG_SORT)} as cursorKey,`)}
+        ${whereClause}${useCursor ? ` AND ${keysetCondition(CATALOG_SORT, 'c.Id', 'DESC')}` : ''}
+        ORDER BY c.CreatedAt DESC, c.Id DESC
+        OFFSET @offset ROWS
+        FETCH NEXT @limit ROWS ONLY
+      `;
+
+      // Count query for pagination (cached briefly per filter set)
+      const countQuery = `
+        SELECT COUNT(*) as total
+        FROM Courses c
+        INNER JOIN Users u ON c.InstructorId = u.Id
+        ${whereClause}
+      `;
+
+      const [pageResult, countResult] = await Promise.all([
+        db.query(query, pageParams),
+        getCachedTotal(`catalog:${JSON.stringify(params)}`, async () => (await db.query(countQuery, params))[0].total)
+      ]);
+      const keysetPage = takeKeysetPage(pageResult, parseInt(limit), CATALOG_SORT_KEY, 'Id');
+      coursesResult = keysetPage.rows;
+      hasNext = keysetPage.hasNext;
+      nextCursor = keysetPage.nextCursor;
+      total = countResult;
+    }
 
     const courses = coursesResult.map((course: any) => ({
       ...course,
@@ -119,7 +251,6 @@ router.get('/', async (req: any, res: any) => {
       delete course.InstructorAvatar;
     });
 
-    const total = countResult[0].total;
     const totalPages = Math.ceil(total / parseInt(limit));
 
     res.json({
@@ -128,8 +259,9 @@ router.get('/', async (req: any, res: any) => {
         current: parseInt(page),
         pages: totalPages,
         total,
-        hasNext: parseInt(page) < totalPages,
-        hasPrev: parseInt(page) > 1
+        hasNext,
+        hasPrev: parseInt(page) > 1 || Boolean(decodedCursor),
+        nextCursor
       }
     });
 
@@ -140,7 +272,7 @@ router.get('/', async (req: any, res: any) => {
 });
 
 // Get course by ID with detailed information
-router.get('/:id', optionalAuth, async (req: any, res: any) => {
+router.get('/:id', optionalAuth, courseDetailCache, async (req: any, res: any) => {
   try {
     const { id } = req.params;
     const userId = req.user?.userId || null;
@@ -151,12 +283,7 @@ router.get('/:id', optionalAuth, async (req: any, res: any) => {
         u.FirstName as InstructorFirstName,
         u.LastName as InstructorLastName,
         u.Avatar as InstructorAvatar,
-        u.Email as InstructorEmail,
-        (SELECT COUNT(*) FROM Enrollments e WHERE e.CourseId = c.Id AND e.Status IN ('active', 'completed')) as ActiveEnrollmentCount,
-        (SELECT COUNT(DISTINCT e2.UserId) 
-         FROM Enrollments e2 
-         INNER JOIN Courses c2 ON e2.CourseId = c2.Id 
-         WHERE c2.InstructorId = c.InstructorId AND e2.Status IN ('active', 'completed')) as InstructorStudentCount
+        u.Email as InstructorEmail
       FROM Courses c
       INNER JOIN Users u ON c.InstructorId = u.Id
       WHERE c.Id = @id AND (
@@ -176,13 +303,6 @@ router.get('/:id', optionalAuth, async (req: any, res: any) => {
 
     const course = result[0];
     
-    console.log('Course enrollment data:', {
-      CourseId: course.Id,
-      ActiveEnrollmentCount: course.ActiveEnrollmentCount,
-      InstructorStudentCount: course.InstructorStudentCount,
-      StaticEnrollmentCount: course.EnrollmentCount
-    });
-
     // Get lessons for this course
     const lessonsQuery = `
       SELECT Id, Title, Description, OrderIndex, Duration, IsRequired
@@ -191,13 +311,17 @@ router.get('/:id', optionalAuth, async (req: any, res: any) => {
       ORDER BY OrderIndex
     `;
 
-    const lessons = await db.query(lessonsQuery, { courseId: id });
+    const [lessons, instructorStudentCount] = await Promise.all([
+      db.query(lessonsQuery, { courseId: id }),
+      getInstructorStudentCount(course.InstructorId)
+    ]);
 
     // Format response
     const courseData = {
       ...course,
+      InstructorStudentCount: instructorStudentCount,
       Level: course.Level?.toLowerCase(), // Normalize level to lowercase
-      EnrollmentCount: course.ActiveEnrollmentCount || 0, // Use computed count
+      EnrollmentCount: course.EnrollmentCount || 0,
       Prerequisites: course.Prerequisites ? JSON.parse(course.Prerequisites) : [],
       LearningOutcomes: course.LearningOutcomes ? JSON.parse(course.LearningOutcomes) : [],
       Tags: course.Tags ? JSON.parse(course.Tags) : [],
@@ -219,7 +343,6 @@ router.get('/:id', optionalAuth, async (req: any, res: any) => {
     };
 
     // Remove temporary and instructor fields from main course object
-    delete courseData.ActiveEnrollmentCount;
     delete courseData.InstructorFirstName;
     delete courseData.InstructorLastName;
     delete courseData.InstructorAvatar;
@@ -256,8 +379,7 @@ router.get('/:id/preview/:token', async (req: any, res: any) => {
         u.FirstName as InstructorFirstName,
         u.LastName as InstructorLastName,
         u.Avatar as InstructorAvatar,
-        u.Email as InstructorEmail,
-        (SELECT COUNT(*) FROM Enrollments e WHERE e.CourseId = c.Id AND e.Status IN ('active', 'completed')) as ActiveEnrollmentCount
+        u.Email as InstructorEmail
       FROM Courses c
       INNER JOIN Users u ON c.InstructorId = u.Id
       WHERE c.Id = @id AND c.PreviewToken = @token
@@ -283,7 +405,7 @@ router.get('/:id/preview/:token', async (req: any, res: any) => {
     const courseData = {
       ...course,
       Level: course.Level?.toLowerCase(),
-      EnrollmentCount: course.ActiveEnrollmentCount || 0,
+      EnrollmentCount: course.EnrollmentCount || 0,
       Prerequisites: course.Prerequisites ? JSON.parse(course.Prerequisites) : [],
       LearningOutcomes: course.LearningOutcomes ? JSON.parse(course.LearningOutcomes) : [],
       Tags: course.Tags ? JSON.parse(course.Tags) : [],
@@ -305,7 +427,6 @@ router.get('/:id/preview/:token', async (req: any, res: any) => {
     };
 
     // Cleanup temp fields
-    delete courseData.ActiveEnrollmentCount;
     delete courseData.InstructorFirstName;
     delete courseData.InstructorLastName;
     delete courseData.InstructorAvatar;
@@ -445,24 +566,16 @@ router.get('/:id/check-prerequisites', authenticateToken, async (req: any, res:
 });
 
 // Get course categories and stats
-router.get('/meta/categories', async (req: any, res: any) => {
+router.get('/meta/categories', catalogCache, async (req: any, res: any) => {
   try {
     const query = `
       SELECT 
         c.Category,
         COUNT(*) as Count,
         ISNULL(AVG(CAST(c.Rating as FLOAT)), 0) as AverageRating,
-        ISNULL(AVG(CAST(e.EnrollmentCount as FLOAT)), 0) as AverageEnrollments
+        ISNULL(AVG(CAST(c.EnrollmentCount as FLOAT)), 0) as AverageEnrollments
       FROM Courses c
       INNER JOIN Users u ON c.InstructorId = u.Id
-      LEFT JOIN (
-        SELECT 
-          CourseId,
-          COUNT(*) as EnrollmentCount
-        FROM Enrollments 
-        WHERE Status IN ('active', 'completed')
-        GROUP BY CourseId
-      ) e ON c.Id = e.CourseId
       WHERE (c.Status = 'published' OR (c.Status IS NULL AND c.IsPublished = 1))
         AND ISNULL(c.Visibility, 'public') = 'public'
       GROUP BY c.Category
@@ -482,24 +595,16 @@ router.get('/meta/categories', async (req: any, res: any) => {
 });
 
 // Get course levels and stats
-router.get('/meta/levels', async (req: any, res: any) => {
+router.get('/meta/levels', catalogCache, async (req: any, res: any) => {
   try {
     const query = `
       SELECT 
         c.Level,
         COUNT(*) as Count,
         ISNULL(AVG(CAST(c.Rating as FLOAT)), 0) as AverageRating,
-        ISNULL(AVG(CAST(e.EnrollmentCount as FLOAT)), 0) as AverageEnrollments
+        ISNULL(AVG(CAST(c.EnrollmentCount as FLOAT)), 0) as AverageEnrollments
       FROM Courses c
       INNER JOIN Users u ON c.InstructorId = u.Id
-      LEFT JOIN (
-        SELECT 
-          CourseId,
-          COUNT(*) as EnrollmentCount
-        FROM Enrollments 
-        WHERE Status IN ('active', 'completed')
-        GROUP BY CourseId
-      ) e ON c.Id = e.CourseId
       WHERE (c.Status = 'published' OR (c.Status IS NULL AND c.IsPublished = 1))
         AND ISNULL(c.Visibility, 'public') = 'public'
       GROUP BY c.Level
@@ -525,12 +630,13 @@ router.get('/meta/levels', async (req: any, res: any) => {
 });
 
 // Get overall course statistics
-router.get('/meta/stats', async (req: any, res: any) => {
+router.get('/meta/stats', catalogCache, async (req: any, res: any) => {
   try {
     const query = `
       SELECT 
         COUNT(*) as TotalCourses,
         COUNT(CASE WHEN c.Price = 0 THEN 1 END) as FreeCourses,
+        -- Distinct students (a student in several courses counts once); the response is cached
         ISNULL((SELECT COUNT(DISTINCT UserId) FROM Enrollments WHERE Status IN ('active', 'completed')), 0) as TotalStudents,
         COUNT(DISTINCT c.Category) as TotalCategories
       FROM Courses c
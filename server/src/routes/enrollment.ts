@@ -5,6 +5,7 @@ import { authenticateToken, AuthRequest } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
 import { NotificationService } from '../services/NotificationService';
 import { CourseEventService } from '../services/CourseEventService';
+import { CourseCounterService } from '../services/CourseCounterService';
 
 const router = Router();
 const db = DatabaseService.getInstance();
@@ -420,9 +421,7 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
           await db.execute(`
             UPDATE dbo.Enrollments SET Status = 'active' WHERE Id = @enrollmentId
           `, { enrollmentId: existingEnrollment[0].Id });
-          await db.execute(`
-            UPDATE dbo.Courses SET EnrollmentCount = EnrollmentCount + 1 WHERE Id = @courseId
-          `, { courseId });
+          await CourseCounterService.refreshEnrollmentCount(courseId);
           res.status(200).json({
             enrollmentId: existingEnrollment[0].Id,
             courseId,
@@ -431,6 +430,7 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
             code: 'ENROLLMENT_SUCCESS'
           });
           try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { console.error('[Enrollment] Emit failed:', e); }
+          await CourseEventService.getInstance().joinUserToCourseRoom(userId!, courseId);
           return;
         }
       } else if (status === 'rejected') {
@@ -447,10 +447,8 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
         });
 
         if (newStatus === 'active') {
-          // Increment enrollment count for auto-approved re-enrollment
-          await db.execute(`
-            UPDATE dbo.Courses SET EnrollmentCount = EnrollmentCount + 1 WHERE Id = @courseId
-          `, { courseId });
+          // Auto-approved re-enrollment is counted again
+          await CourseCounterService.refreshEnrollmentCount(courseId);
         }
 
         res.status(200).json({
@@ -466,6 +464,9 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
 
         // Emit after response sent (active = enrollment count changed, pending = pending count changed)
         try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { console.error('[Enrollment] Emit failed:', e); }
+        if (newStatus === 'active') {
+          await CourseEventService.getInstance().joinUserToCourseRoom(userId!, courseId);
+        }
         return;
       } else if (status === 'completed') {
         // Student completed the course but can remain enrolled to access new content
@@ -501,11 +502,9 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
           reactivateStatus
         });
 
-        // Increment enrollment count only when directly activating (free course, no approval)
+        // Counted again only when directly activating (free course, no approval)
         if (reactivateStatus === 'active') {
-          await db.execute(`
-            UPDATE dbo.Courses SET EnrollmentCount = EnrollmentCount + 1 WHERE Id = @courseId
-          `, { courseId });
+          await CourseCounterService.refreshEnrollmentCount(courseId);
         }
 
         // Get user details for notifications (already have course details from courseData)
@@ -598,6 +597,9 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
 
         // Emit real-time enrollment change (after response sent — covers both active and pending)
         try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { console.error('[Enrollment] Emit failed:', e); }
+        if (reactivateStatus === 'active') {
+          await CourseEventService.getInstance().joinUserToCourseRoom(userId!, courseId);
+        }
         return;
       }
     }
@@ -685,13 +687,7 @@ router.post('/courses/:courseId/enroll', authenticateToken, async (req: AuthRequ
     // We no longer create a course-level progress entry here
 
     // Update course enrollment count
-    await db.execute(`
-      UPDATE dbo.Courses
-      SET EnrollmentCount = EnrollmentCount + 1
-      WHERE Id = @courseId
-    `, {
-      courseId
-    });
+    await CourseCounterService.refreshEnrollmentCount(courseId);
 
     // Get user details for notifications
     const userDetails = await db.query(`
@@ -811,9 +807,13 @@ router.delete('/courses/:courseId/unenroll', authenticateToken, async (req: Auth
       userId,
       courseId
     });
+    await CourseCounterService.refreshEnrollmentCount(courseId);
 
     res.json({ message: 'Successfully unenrolled from course' });
 
+    try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { console.error('[Enrollment] Emit failed:', e); }
+    await CourseEventService.getInstance().removeUserFromCourseRoom(userId!, courseId);
+
   } catch (error) {
     console.error('Error unenrolling from course:', error);
     res.status(500).json({ error: 'Failed to unenroll from course' });
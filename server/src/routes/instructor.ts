@@ -4,6 +4,7 @@ import { DatabaseService } from '../services/DatabaseService';
 import { SettingsService } from '../services/SettingsService';
 import { NotificationService } from '../services/NotificationService';
 import { CourseEventService } from '../services/CourseEventService';
+import { CourseCounterService } from '../services/CourseCounterService';
 import { triggerAtRiskDetection } from '../services/NotificationScheduler';
 import { logger } from '../utils/logger';
 import { v4 as uuidv4 } from 'uuid';
@@ -442,8 +443,12 @@ router.post('/courses', authenticateToken, authorize(['instructor', 'admin']), a
             updatedAt: now
           });
         }
+        await CourseCounterService.refreshLessonCount(courseId);
       }
 
+      // The instructor's open sockets start receiving this course's events
+      await CourseEventService.getInstance().joinUserToCourseRoom(userId, courseId);
+
       res.status(201).json({ 
         id: courseId, 
         message: 'Course created successfully',
@@ -1197,13 +1202,10 @@ router.put('/enrollments/:enrollmentId/approve', authenticateToken, authorize(['
       WHERE Id = @enrollmentId
     `, { enrollmentId, newStatus });
 
-    // Only increment enrollment count for free courses (paid courses increment after payment)
+    // Only free courses become active here (paid courses are counted after payment)
     if (!isPaidCourse) {
-      await db.execute(`
-        UPDATE dbo.Courses 
-        SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1
-        WHERE Id = @courseId
-      `, { courseId: enrollmentData.CourseId });
+      await CourseCounterService.refreshEnrollmentCount(enrollmentData.CourseId);
+      await CourseEventService.getInstance().joinUserToCourseRoom(enrollmentData.UserId, enrollmentData.CourseId);
     }
 
     // Send notification to student
@@ -3,6 +3,7 @@ import { authenticateToken } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
 import { NotificationService } from '../services/NotificationService';
 import { CourseEventService } from '../services/CourseEventService';
+import { CourseCounterService } from '../services/CourseCounterService';
 import { v4 as uuidv4 } from 'uuid';
 
 const router = Router();
@@ -257,6 +258,7 @@ router.post('/', authenticateToken, async (req: Request, res: Response) => {
         updatedAt: now
       }
     );
+    await CourseCounterService.refreshLessonCount(courseId);
 
     // DEPRECATED: VideoLessons table no longer used for new lessons
     // All content (videos, text, quizzes) stored in ContentJson
@@ -471,15 +473,50 @@ router.delete('/:id', authenticateToken, async (req: Request, res: Response) =>
 
     const lessonCourseId = courseCheck[0].CourseId;
 
-    // Delete related records that have NO ACTION constraints (SQL Server cascade path limitations)
-    // 1. Delete user progress records for this lesson
-    await db.execute('DELETE FROM dbo.UserProgress WHERE LessonId = @id', { id });
-    
-    // 2. Delete tutoring sessions that reference this lesson
-    await db.execute('DELETE FROM dbo.TutoringSessions WHERE LessonId = @id', { id });
-
-    // 3. Finally, delete the lesson itself
-    await db.execute('DELETE FROM dbo.Lessons WHERE Id = @id', { id });
+    // One transaction: related records that have NO ACTION constraints (SQL Server cascade path
+    // limitations), the lesson itself, and the course progress that counted the lesson.
+    // CourseProgress.ProgressPoints is the sum of a user's lesson percentages (see
+    // LessonCompletionService), so it is rebuilt from the remaining UserProgress rows for every
+    // user of the course; OverallProgress changes for all of them because LessonCount drops.
+    await db.execute(`
+      SET XACT_ABORT ON;
+      BEGIN TRANSACTION;
+
+      -- 1. User progress records for this lesson
+      DELETE FROM dbo.UserProgress WHERE LessonId = @id;
+
+      -- 2. Tutoring sessions that reference this lesson
+      DELETE FROM dbo.TutoringSessions WHERE LessonId = @id;
+
+      -- 3. The lesson itself
+      DELETE FROM dbo.Lessons WHERE Id = @id;
+
+      -- 4. Course progress without the deleted lesson
+      UPDATE cp
+      SET ProgressPoints = pts.Points,
+          OverallProgress = CASE WHEN lc.LessonCount = 0 THEN 0 ELSE ROUND(pts.Points / lc.LessonCount, 0) END,
+          CompletedLessons = '[' + ISNULL(STUFF((
+            SELECT ',"' + CAST(up.LessonId AS NVARCHAR(36)) + '"'
+            FROM dbo.UserProgress up
+            WHERE up.UserId = cp.UserId AND up.CourseId = cp.CourseId AND up.ProgressPercentage >= 100
+            FOR XML PATH('')
+          ), 1, 1, ''), '') + ']',
+          UpdatedAt = GETUTCDATE()
+      FROM dbo.CourseProgress cp
+      CROSS APPLY (SELECT COUNT(*) AS LessonCount FROM dbo.Lessons l WHERE l.CourseId = cp.CourseId) lc
+      CROSS APPLY (
+        SELECT ISNULL(SUM(up.ProgressPercentage), 0) AS RawPoints
+        FROM dbo.UserProgress up
+        WHERE up.UserId = cp.UserId AND up.CourseId = cp.CourseId
+      ) raw
+      CROSS APPLY (
+        SELECT CASE WHEN raw.RawPoints > 100.0 * lc.LessonCount THEN 100.0 * lc.LessonCount ELSE raw.RawPoints END AS Points
+      ) pts
+      WHERE cp.CourseId = @courseId;
+
+      COMMIT TRANSACTION;
+    `, { id, courseId: lessonCourseId });
+    await CourseCounterService.refreshLessonCount(lessonCourseId);
 
     res.json({ message: 'Lesson deleted successfully' });
 
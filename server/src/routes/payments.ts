@@ -5,6 +5,7 @@ import EmailService from '../services/EmailService';
 import { AuthRequest, authenticateToken } from '../middleware/auth';
 import InvoicePdfService from '../services/InvoicePdfService';
 import { CourseEventService } from '../services/CourseEventService';
+import { CourseCounterService } from '../services/CourseCounterService';
 import { CouponService } from '../services/CouponService';
 import path from 'path';
 
@@ -604,11 +605,7 @@ router.post('/confirm-enrollment', authenticateToken, async (req: Request, res:
           `UPDATE dbo.Enrollments SET Status = 'active', EnrolledAt = GETUTCDATE() WHERE Id = @id`,
           { id: existingEnrollment[0].Id }
         );
-        // Increment enrollment count
-        await db.query(
-          `UPDATE dbo.Courses SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1 WHERE Id = @courseId`,
-          { courseId }
-        );
+        await CourseCounterService.refreshEnrollmentCount(courseId);
         enrollmentCountChanged = true;
         console.log(`✅ Enrollment activated (was ${enrollmentStatus}) for user ${userId} in course ${courseId}`);
       }
@@ -619,11 +616,7 @@ router.post('/confirm-enrollment', authenticateToken, async (req: Request, res:
          VALUES (NEWID(), @userId, @courseId, GETUTCDATE(), 'active')`,
         { userId, courseId }
       );
-      // Increment enrollment count
-      await db.query(
-        `UPDATE dbo.Courses SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1 WHERE Id = @courseId`,
-        { courseId }
-      );
+      await CourseCounterService.refreshEnrollmentCount(courseId);
       enrollmentCountChanged = true;
       console.log(`✅ Enrollment created for user ${userId} in course ${courseId}`);
     }
@@ -643,6 +636,7 @@ router.post('/confirm-enrollment', authenticateToken, async (req: Request, res:
       } catch (emitError) {
         console.error('[Payments] Failed to emit enrollment count event:', emitError);
       }
+      await CourseEventService.getInstance().joinUserToCourseRoom(userId!, courseId);
     }
   } catch (error) {
     console.error('❌ Error confirming enrollment:', error);
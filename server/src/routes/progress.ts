@@ -4,8 +4,8 @@ import { v4 as uuidv4 } from 'uuid';
 import bcrypt from 'bcryptjs';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
-import { NotificationService } from '../services/NotificationService';
-import { CertificateService } from '../services/CertificateService';
+import { LessonCompletionService } from '../services/LessonCompletionService';
+import { CourseCounterService } from '../services/CourseCounterService';
 
 const router = Router();
 const db = DatabaseService.getInstance();
@@ -199,224 +199,18 @@ router.post('/lessons/:lessonId/complete', authenticateToken, async (req: AuthRe
     const { timeSpent = 0, notes = '' } = req.body;
     const userId = req.user?.userId;
 
-    // Get lesson info
-    const lesson = await db.query(`
-      SELECT CourseId, Title, IsRequired FROM dbo.Lessons WHERE Id = @lessonId
-    `, { lessonId });
+    // One transaction for all writes; notifications/certificate are queued after commit
+    const result = await LessonCompletionService.completeLesson(userId!, lessonId, timeSpent, notes, req.app.get('io'));
 
-    if (lesson.length === 0) {
+    if (result.outcome === 'not_found') {
       return res.status(404).json({ error: 'Lesson not found' });
     }
 
-    const courseId = lesson[0].CourseId;
-
-    // Verify user is enrolled OR is the instructor (matching lesson access logic exactly)
-    const access = await db.query(`
-      SELECT Id, InstructorId FROM dbo.Courses 
-      WHERE Id = @courseId AND (InstructorId = @userId OR Id IN (
-        SELECT CourseId FROM dbo.Enrollments WHERE UserId = @userId
-      ))
-    `, { userId, courseId });
-
-    if (access.length === 0) {
-      console.log(`[PROGRESS API] Access denied - user ${userId} not enrolled or instructor for course ${courseId}`);
+    if (result.outcome === 'forbidden') {
+      console.log(`[PROGRESS API] Access denied - user ${userId} not enrolled or instructor for course ${result.courseId}`);
       return res.status(403).json({ error: 'Not enrolled in this course' });
     }
 
-    const now = new Date().toISOString();
-
-    // Check if lesson was already completed (atomically during update to prevent race conditions)
-    let wasAlreadyCompleted = false;
-
-    // Check if progress exists first
-    const existingProgress = await db.query(`
-      SELECT Id FROM dbo.UserProgress
-      WHERE UserId = @userId AND LessonId = @lessonId
-    `, { userId, lessonId });
-
-    if (existingProgress.length > 0) {
-      // Update existing progress and capture previous completion status
-      const updateResult = await db.query(`
-        DECLARE @WasCompleted BIT;
-        
-        UPDATE dbo.UserProgress
-        SET @WasCompleted = CASE WHEN Status = 'completed' AND CompletedAt IS NOT NULL THEN 1 ELSE 0 END,
-            CompletedAt = CASE WHEN CompletedAt IS NULL THEN @completedAt ELSE CompletedAt END, 
-            TimeSpent = @timeSpent, 
-            ProgressPercentage = 100, 
-            NotesJson = @notes, 
-            LastAccessedAt = @updatedAt, 
-            Status = @status
-        WHERE UserId = @userId AND LessonId = @lessonId;
-        
-        SELECT @WasCompleted as WasCompleted;
-      `, { userId, lessonId, completedAt: now, timeSpent, notes, updatedAt: now, status: 'completed' });
-      
-      wasAlreadyCompleted = updateResult.length > 0 && updateResult[0].WasCompleted === 1;
-    } else {
-      // Create new progress record
-      await db.execute(`
-        INSERT INTO dbo.UserProgress (Id, UserId, CourseId, LessonId, CompletedAt, TimeSpent, ProgressPercentage, NotesJson, LastAccessedAt, Status)
-        VALUES (@id, @userId, @courseId, @lessonId, @completedAt, @timeSpent, @progressPercentage, @notes, @lastAccessedAt, @status)
-      `, {
-        id: uuidv4(),
-        userId,
-        courseId,
-        lessonId,
-        completedAt: now,
-        timeSpent,
-        progressPercentage: 100,
-        notes,
-        lastAccessedAt: now,
-        status: 'completed'
-      });
-    }
-
-    // Update overall course progress
-    await updateCourseProgress(userId!, courseId);
-
-    // Get course title and progress for notifications
-    const courseInfo = await db.query(`
-      SELECT c.Title as CourseTitle, c.InstructorId, cp.OverallProgress
-      FROM dbo.Courses c
-      LEFT JOIN dbo.CourseProgress cp ON c.Id = cp.CourseId AND cp.UserId = @userId
-      WHERE c.Id = @courseId
-    `, { courseId, userId });
-
-    const courseTitle = courseInfo[0]?.CourseTitle || 'your course';
-    const instructorId = courseInfo[0]?.InstructorId;
-    const courseProgress = courseInfo[0]?.OverallProgress || 0;
-
-    // Get io instance and create notification service
-    const io = req.app.get('io');
-    const notificationService = new NotificationService(io);
-
-    // Only send notifications if this is the first time completing the lesson
-    if (!wasAlreadyCompleted) {
-      // Notify student of lesson completion
-      try {
-        await notificationService.createNotificationWithControls(
-          {
-            userId: userId!,
-            type: 'progress',
-            priority: 'normal',
-            title: 'Lesson Completed!',
-            message: `Great work! You completed "${lesson[0].Title}" in ${courseTitle}. Course progress: ${Math.floor(courseProgress)}%`,
-            actionUrl: `/courses/${courseId}`,
-            actionText: 'Continue Learning'
-          },
-          {
-            category: 'progress',
-            subcategory: 'LessonCompletion'
-          }
-        );
-        console.log(`✅ Lesson completion notification sent to user ${userId}`);
-      } catch (notifError) {
-        console.error('⚠️ Failed to send lesson completion notification:', notifError);
-      }
-
-      // Notify instructor at milestones (25%, 50%, 75%, 100%)
-      const milestone = Math.floor(courseProgress);
-      if (instructorId && [25, 50, 75, 100].includes(milestone)) {
-        try {
-          const studentInfo = await db.query(`
-            SELECT FirstName, LastName FROM dbo.Users WHERE Id = @userId
-          `, { userId });
-          
-          const studentName = studentInfo[0] 
-            ? `${studentInfo[0].FirstName} ${studentInfo[0].LastName}`.trim()
-            : 'A student';
-
-          await notificationService.createNotificationWithControls(
-            {
-              userId: instructorId,
-              type: 'progress',
-              priority: 'normal',
-              title: 'Student Progress Milestone',
-              message: `${studentName} reached ${milestone}% completion in "${courseTitle}"`,
-              actionUrl: `/instructor/students`,
-              actionText: 'View Students'
-            },
-            {
-              category: 'progress',
-              subcategory: 'CourseMilestones'
-            }
-          );
-          console.log(`✅ Milestone notification sent to instructor ${instructorId} (${milestone}%)`);
-
-          // Issue certificate and send notification at 100% completion
-          if (milestone === 100) {
-            // Check if certificates are enabled for this course
-            const courseSettings = await db.query(`
-              SELECT CertificateEnabled FROM dbo.Courses WHERE Id = @courseId
-            `, { courseId });
-            
-            const certificateEnabled = courseSettings[0]?.CertificateEnabled !== undefined 
-              ? Boolean(courseSettings[0].CertificateEnabled) 
-              : true; // Default to true for backward compatibility
-            
-            if (!certificateEnabled) {
-              console.log(`ℹ️ Certificates disabled for course ${courseId}, skipping certificate issuance`);
-            } else {
-            // ISSUE CERTIFICATE FIRST
-            const certificateService = new CertificateService();
-            
-            try {
-              const certificate = await certificateService.issueCertificate(userId!, courseId);
-              console.log(`✅ Certificate issued: ${certificate.CertificateNumber} for user ${userId} course ${courseId}`);
-              
-              // Send certificate earned notification (HIGH PRIORITY, separate from course completion)
-              // Use public shareable link so it works regardless of who's logged in
-              await notificationService.createNotificationWithControls(
-                {
-                  userId: userId!,
-                  type: 'achievement',
-                  priority: 'high',
-                  title: '🎓 Certificate Earned!',
-                  message: `Congratulations! Your certificate for "${courseTitle}" is ready. Download it now!`,
-                  actionUrl: `/certificate/${certificate.VerificationCode}`,
-                  actionText: 'Download Certificate'
-                },
-                {
-                  category: 'system',
-                  subcategory: 'Certificates'
-                }
-              );
-              console.log(`✅ Certificate earned notification sent to user ${userId}`);
-              console.log(`📧 Public certificate link: /certificate/${certificate.VerificationCode}`);
-              
-            } catch (certError) {
-              console.error('⚠️ Failed to issue certificate or send notification:', certError);
-              // Non-blocking - course completion still succeeds
-            }
-            } // end if (certificateEnabled)
-            
-            // Send course completion congratulations (always, regardless of certificate setting)
-            await notificationService.createNotificationWithControls(
-              {
-                userId: userId!,
-                type: 'progress',
-                priority: 'high',
-                title: '🎉 Congratulations! Course Completed!',
-                message: `You've completed "${courseTitle}"! Great achievement!`,
-                actionUrl: `/courses/${courseId}`,
-                actionText: 'View Course'
-              },
-              {
-                category: 'progress',
-                subcategory: 'CourseCompletion'
-              }
-            );
-            console.log(`✅ Course completion congratulations sent to user ${userId}`);
-          }
-        } catch (notifError) {
-          console.error('⚠️ Failed to send milestone notification:', notifError);
-        }
-      }
-    } else {
-      console.log(`ℹ️ Lesson already completed, skipping duplicate notifications for user ${userId}`);
-    }
-
     res.json({ message: 'Lesson marked as completed', lessonId, timeSpent });
 
   } catch (error) {
@@ -529,9 +323,9 @@ async function updateCourseProgress(userId: string, courseId: string) {
       .map(l => l.LessonId);
     
     // Calculate progress based on lesson completion percentage
-    const avgProgress = totalLessons > 0 
-      ? completedLessons.reduce((sum, lesson) => sum + (lesson.ProgressPercentage || 0), 0) / totalLessons
-      : 0;
+    // (ProgressPoints keeps the sum so lesson completion can update it incrementally)
+    const progressPoints = completedLessons.reduce((sum, lesson) => sum + (lesson.ProgressPercentage || 0), 0);
+    const avgProgress = totalLessons > 0 ? progressPoints / totalLessons : 0;
 
     const now = new Date().toISOString();
 
@@ -544,19 +338,20 @@ async function updateCourseProgress(userId: string, courseId: string) {
     if (existingProgress.length > 0) {
       await db.execute(`
         UPDATE dbo.CourseProgress
-        SET OverallProgress = @progress, TimeSpent = @timeSpent, LastAccessedAt = @lastAccessed, 
+        SET OverallProgress = @progress, ProgressPoints = @progressPoints, TimeSpent = @timeSpent, LastAccessedAt = @lastAccessed, 
             CompletedLessons = @completedLessonsJson, UpdatedAt = @updatedAt
         WHERE UserId = @userId AND CourseId = @courseId
-      `, { userId, courseId, progress: Math.round(avgProgress), timeSpent: totalTimeSpent, lastAccessed: now, completedLessonsJson: JSON.stringify(completedLessonIds), updatedAt: now });
+      `, { userId, courseId, progress: Math.round(avgProgress), progressPoints, timeSpent: totalTimeSpent, lastAccessed: now, completedLessonsJson: JSON.stringify(completedLessonIds), updatedAt: now });
     } else {
       await db.execute(`
-        INSERT INTO dbo.CourseProgress (Id, UserId, CourseId, OverallProgress, CompletedLessons, TimeSpent, LastAccessedAt, CreatedAt, UpdatedAt)
-        VALUES (@id, @userId, @courseId, @progress, @completedLessonsJson, @timeSpent, @lastAccessed, @createdAt, @updatedAt)
+        INSERT INTO dbo.CourseProgress (Id, UserId, CourseId, OverallProgress, ProgressPoints, CompletedLessons, TimeSpent, LastAccessedAt, CreatedAt, UpdatedAt)
+        VALUES (@id, @userId, @courseId, @progress, @progressPoints, @completedLessonsJson, @timeSpent, @lastAccessed, @createdAt, @updatedAt)
       `, { 
         id: uuidv4(),
         userId, 
         courseId, 
         progress: Math.round(avgProgress),
+        progressPoints,
         completedLessonsJson: JSON.stringify(completedLessonIds),
         timeSpent: totalTimeSpent, 
         lastAccessed: now, 
@@ -835,6 +630,7 @@ router.post('/create-test-data', authenticateToken, async (req: AuthRequest, res
         }
       }
     }
+    await CourseCounterService.refreshEnrollmentCounts(instructorCourses.map((c: any) => c.Id));
     
     res.json({
       success: true,
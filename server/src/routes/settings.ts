@@ -158,7 +158,9 @@ router.get('/export-data/status', authenticateToken, async (req: AuthRequest, re
       fileName: exportRequest.FileName,
       fileSize: exportRequest.FileSize,
       downloadCount: exportRequest.DownloadCount,
-      errorMessage: exportRequest.ErrorMessage
+      errorMessage: exportRequest.ErrorMessage,
+      progressPercent: exportRequest.ProgressPercent,
+      progressStep: exportRequest.ProgressStep
     });
   } catch (error) {
     console.error('Error fetching export status:', error);
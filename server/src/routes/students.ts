@@ -3,6 +3,7 @@ import { authenticateToken } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
 import { SettingsService } from '../services/SettingsService';
 import { CourseEventService } from '../services/CourseEventService';
+import { CourseCounterService, COUNTED_ENROLLMENT_STATUSES } from '../services/CourseCounterService';
 
 const router = express.Router();
 const db = DatabaseService.getInstance();
@@ -296,14 +297,17 @@ router.put('/:studentId/enrollment/:enrollmentId', authenticateToken, async (req
       { finalStatus, enrollmentId }
     );
 
-    // Manage EnrollmentCount: increment when transitioning to 'active' from a never-counted status
+    // Manage EnrollmentCount: refresh when the enrollment moves into or out of a counted status
+    // (e.g. pending → active, active → suspended/cancelled)
     let enrollmentCountChanged = false;
-    if (finalStatus === 'active' && ['pending', 'approved'].includes(enrollment.CurrentStatus)) {
-      await db.execute(
-        'UPDATE dbo.Courses SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1 WHERE Id = @courseId',
-        { courseId: enrollment.CourseId }
-      );
+    if (COUNTED_ENROLLMENT_STATUSES.includes(finalStatus) !== COUNTED_ENROLLMENT_STATUSES.includes(enrollment.CurrentStatus)) {
+      await CourseCounterService.refreshEnrollmentCount(enrollment.CourseId);
       enrollmentCountChanged = true;
+      if (COUNTED_ENROLLMENT_STATUSES.includes(finalStatus)) {
+        await CourseEventService.getInstance().joinUserToCourseRoom(enrollment.UserId, enrollment.CourseId);
+      } else {
+        await CourseEventService.getInstance().removeUserFromCourseRoom(enrollment.UserId, enrollment.CourseId);
+      }
     }
 
     // Send notification to student for status changes
@@ -1,13 +1,15 @@
 import { Router } from 'express';
 import { DatabaseService } from '../services/DatabaseService';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
+import { responseCache } from '../middleware/responseCache';
 import { logger } from '../utils/logger';
 
 const router = Router();
 const db = DatabaseService.getInstance();
 
 // GET /api/terms/current - Get current active terms versions (public, no auth required)
-router.get('/current', async (req, res, next) => {
+// Terms change only through migrations, so the cached copy simply expires
+router.get('/current', responseCache({ ttlMs: 5 * 60 * 1000, staleWhileRevalidateMs: 60 * 60 * 1000 }), async (req, res, next) => {
   try {
     const activeTerms = await db.query(
       `SELECT Id, DocumentType, Version, Title, Content, Summary, EffectiveDate, CreatedAt
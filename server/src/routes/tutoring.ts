@@ -3,7 +3,7 @@ import { Response } from 'express';
 import { v4 as uuidv4 } from 'uuid';
 import { authenticateToken, AuthRequest } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
-import { AITutoringService, TutoringContext } from '../services/AITutoringService';
+import { AITutoringService, AIResponse, TutoringContext } from '../services/AITutoringService';
 import { NotificationService } from '../services/NotificationService';
 
 const router = Router();
@@ -118,14 +118,90 @@ router.get('/sessions/:sessionId/messages', authenticateToken, async (req: AuthR
   }
 });
 
+/**
+ * Store the AI response with model info in metadata
+ */
+async function saveAiMessage(sessionId: string, aiResponse: AIResponse, model?: string) {
+  const aiMessageId = uuidv4();
+  const aiTimestamp = new Date().toISOString();
+  await db.execute(`
+    INSERT INTO dbo.TutoringMessages (Id, SessionId, Content, Role, Timestamp, Metadata)
+    VALUES (@id, @sessionId, @content, @role, @timestamp, @metadata)
+  `, {
+    id: aiMessageId,
+    sessionId,
+    content: aiResponse.content,
+    role: 'ai', // Database CHECK constraint requires 'ai' or 'user'
+    timestamp: aiTimestamp,
+    metadata: JSON.stringify({
+      suggestions: aiResponse.suggestions,
+      followUpQuestions: aiResponse.followUpQuestions,
+      model: model || 'gpt-4o-mini' // Store which model was used
+    })
+  });
+
+  return {
+    Id: aiMessageId,
+    Content: aiResponse.content,
+    Role: 'ai',
+    CreatedAt: aiTimestamp,
+    MessageType: 'text',
+    suggestions: aiResponse.suggestions,
+    followUpQuestions: aiResponse.followUpQuestions
+  };
+}
+
+/**
+ * Send notification for AI response (never blocks or fails the tutoring response)
+ */
+async function notifyAiResponse(req: AuthRequest, userId: string, sessionId: string, session: any) {
+  try {
+    const io = req.app.get('io');
+    if (io) {
+      const notificationService = new NotificationService(io);
+      
+      // Get session title for notification message
+      const sessionTitle = session.Title || 'your question';
+      const truncatedTitle = sessionTitle.length > 50 
+        ? sessionTitle.substring(0, 47) + '...' 
+        : sessionTitle;
+      
+      await notificationService.createNotificationWithControls(
+        {
+          userId,
+          type: 'community',
+          priority: 'normal',
+          title: 'AI Tutor Response',
+          message: `Your AI tutor answered your question about "${truncatedTitle}"`,
+          actionUrl: `/tutoring?session=${sessionId}`,
+          actionText: 'View Response',
+          relatedEntityId: sessionId,
+          relatedEntityType: 'tutoring'
+        },
+        {
+          category: 'community',
+          subcategory: 'AITutoring'
+        }
+      );
+      
+      console.log(`✅ [AI TUTORING] Notification sent to user ${userId} for session ${sessionId}`);
+    }
+  } catch (notifError) {
+    console.error('⚠️ Failed to send AI tutoring notification:', notifError);
+    // Don't block tutoring response on notification failure
+  }
+}
+
 // Send message to AI tutor
+// With { stream: true } the response is a text/event-stream of
+// user-message, token, suggestions and done (or error) events.
 router.post('/sessions/:sessionId/messages', authenticateToken, async (req: AuthRequest, res: Response) => {
   try {
     const { sessionId } = req.params;
-    const { content, model } = req.body; // Accept model parameter
+    const { content, model, stream } = req.body; // Accept model parameter
     const userId = req.user?.userId;
 
-    console.log(`📨 Processing tutoring message with model: ${model || 'default'}`);
+    console.log(`📨 Processing tutoring message with model: ${model || 'default'}${stream ? ' (streaming)' : ''}`);
 
     // Verify user owns the session and get session context
     const sessionData = await db.query(`
@@ -188,83 +264,34 @@ router.post('/sessions/:sessionId/messages', authenticateToken, async (req: Auth
       }))
     };
 
+    const userMessage = {
+      Id: userMessageId,
+      Content: content,
+      Role: 'user',
+      CreatedAt: now,
+      MessageType: 'text'
+    };
+
+    if (stream) {
+      return streamAiResponse(req, res, {
+        userId: userId!,
+        sessionId,
+        session,
+        content,
+        model,
+        tutoringContext,
+        userMessage
+      });
+    }
+
     // Generate AI response with selected model
     const aiResponse = await aiService.generateResponse(content, tutoringContext, model);
     
-    // Store AI response with model info in metadata
-    const aiMessageId = uuidv4();
-    const aiTimestamp = new Date().toISOString();
-    await db.execute(`
-      INSERT INTO dbo.TutoringMessages (Id, SessionId, Content, Role, Timestamp, Metadata)
-      VALUES (@id, @sessionId, @content, @role, @timestamp, @metadata)
-    `, {
-      id: aiMessageId,
-      sessionId,
-      content: aiResponse.content,
-      role: 'ai', // Database CHECK constraint requires 'ai' or 'user'
-      timestamp: aiTimestamp,
-      metadata: JSON.stringify({
-        suggestions: aiResponse.suggestions,
-        followUpQuestions: aiResponse.followUpQuestions,
-        model: model || 'gpt-4o-mini' // Store which model was used
-      })
-    });
+    const aiMessage = await saveAiMessage(sessionId, aiResponse, model);
 
-    // Send notification for AI response
-    try {
-      const io = req.app.get('io');
-      if (io) {
-        const notificationService = new NotificationService(io);
-        
-        // Get session title for notification message
-        const sessionTitle = session.Title || 'your question';
-        const truncatedTitle = sessionTitle.length > 50 
-          ? sessionTitle.substring(0, 47) + '...' 
-          : sessionTitle;
-        
-        await notificationService.createNotificationWithControls(
-          {
-            userId: userId!,
-            type: 'community',
-            priority: 'normal',
-            title: 'AI Tutor Response',
-            message: `Your AI tutor answered your question about "${truncatedTitle}"`,
-            actionUrl: `/tutoring?session=${sessionId}`,
-            actionText: 'View Response',
-            relatedEntityId: sessionId,
-            relatedEntityType: 'tutoring'
-          },
-          {
-            category: 'community',
-            subcategory: 'AITutoring'
-          }
-        );
-        
-        console.log(`✅ [AI TUTORING] Notification sent to user ${userId} for session ${sessionId}`);
-      }
-    } catch (notifError) {
-      console.error('⚠️ Failed to send AI tutoring notification:', notifError);
-      // Don't block tutoring response on notification failure
-    }
+    await notifyAiResponse(req, userId!, sessionId, session);
 
-    res.json({
-      userMessage: {
-        Id: userMessageId,
-        Content: content,
-        Role: 'user',
-        CreatedAt: now,
-        MessageType: 'text'
-      },
-      aiMessage: {
-        Id: aiMessageId,
-        Content: aiResponse.content,
-        Role: 'ai',
-        CreatedAt: aiTimestamp,
-        MessageType: 'text',
-        suggestions: aiResponse.suggestions,
-        followUpQuestions: aiResponse.followUpQuestions
-      }
-    });
+    res.json({ userMessage, aiMessage });
 
   } catch (error) {
     console.error('Error processing tutoring message:', error);
@@ -272,6 +299,71 @@ router.post('/sessions/:sessionId/messages', authenticateToken, async (req: Auth
   }
 });
 
+/**
+ * Server-sent events for a streamed AI answer. The answer is saved once it is complete
+ * (or, if the client disconnects mid-answer, whatever part was generated).
+ */
+async function streamAiResponse(
+  req: AuthRequest,
+  res: Response,
+  params: {
+    userId: string;
+    sessionId: string;
+    session: any;
+    content: string;
+    model?: string;
+    tutoringContext: TutoringContext;
+    userMessage: Record<string, unknown>;
+  }
+) {
+  const { userId, sessionId, session, content, model, tutoringContext, userMessage } = params;
+
+  // no-transform keeps compression() from buffering the stream
+  res.status(200).set({
+    'Content-Type': 'text/event-stream',
+    'Cache-Control': 'no-cache, no-transform',
+    'Connection': 'keep-alive',
+    'X-Accel-Buffering': 'no'
+  });
+  res.flushHeaders();
+
+  const abort = new AbortController();
+  res.on('close', () => {
+    if (!res.writableEnded) {
+      abort.abort();
+    }
+  });
+
+  const send = (event: string, data: unknown) => {
+    if (!res.writableEnded && !abort.signal.aborted) {
+      res.write(`event: ${event}\ndata: ${JSON.stringify(data)}\n\n`);
+    }
+  };
+
+  send('user-message', userMessage);
+
+  try {
+    const aiResponse = await aiService.streamResponse(content, tutoringContext, model, {
+      onToken: delta => send('token', { delta }),
+      onSuggestions: suggestions => send('suggestions', { suggestions })
+    }, abort.signal);
+
+    if (abort.signal.aborted && !aiResponse.content) {
+      return;
+    }
+
+    const aiMessage = await saveAiMessage(sessionId, aiResponse, model);
+    send('done', { aiMessage });
+    res.end();
+
+    await notifyAiResponse(req, userId, sessionId, session);
+  } catch (error) {
+    console.error('Error streaming tutoring response:', error);
+    send('error', { error: 'Failed to process message' });
+    res.end();
+  }
+}
+
 // Get learning recommendations
 router.get('/recommendations', authenticateToken, async (req: AuthRequest, res: Response) => {
   try {
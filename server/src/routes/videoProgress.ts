@@ -1,12 +1,23 @@
 import { Router, Request, Response } from 'express';
-import { v4 as uuidv4 } from 'uuid';
 import sql from 'mssql';
 import { authenticateToken } from '../middleware/auth';
 import { DatabaseService } from '../services/DatabaseService';
 import { NotificationService } from '../services/NotificationService';
+import { VideoProgressBuffer } from '../services/VideoProgressBuffer';
+import { TtlLruCache } from '../utils/TtlLruCache';
 
 const router = Router();
 const db = DatabaseService.getInstance();
+const progressBuffer = VideoProgressBuffer.getInstance();
+
+type VideoData = Awaited<ReturnType<typeof getVideoDataFromContentItemId>>;
+
+// Heartbeats repeat the same lesson/access lookup every few seconds; reuse it briefly per user and item
+const heartbeatVideoDataCache = new TtlLruCache<string, VideoData>(
+  'videoHeartbeatAccess',
+  parseInt(process.env.VIDEO_PROGRESS_ACCESS_CACHE_MAX || '20000', 10),
+  parseInt(process.env.VIDEO_PROGRESS_ACCESS_CACHE_TTL_MS || '120000', 10)
+);
 
 // Helper function to parse contentItemId and get lesson/video data
 // ContentItemId format: {lessonId}-{type}-{uniqueId} where uniqueId is UUID suffix
@@ -55,29 +66,60 @@ const getVideoDataFromContentItemId = async (contentItemId: string, userId: stri
   };
 };
 
+// VideoProgress stores positions as INT seconds and PlaybackSpeed as DECIMAL(3,2)
+const MAX_VIDEO_SECONDS = 2147483647;
+const MAX_PLAYBACK_SPEED = 9.99;
+
+// A finite, non-negative number of seconds that fits the INT columns, or null
+const parseSeconds = (value: unknown): number | null =>
+  typeof value === 'number' && Number.isFinite(value) && value >= 0 && value <= MAX_VIDEO_SECONDS ? value : null;
+
 // POST /api/video-progress/:videoLessonId/update - Update video watch progress
 // Note: Route param is named videoLessonId for backward compatibility, but it's actually contentItemId format
 router.post('/:videoLessonId/update', authenticateToken, async (req: Request, res: Response) => {
   try {
     const contentItemId = req.params.videoLessonId; // Route param named videoLessonId for backward compatibility
-    const { lastPosition, watchedDuration, playbackSpeed } = req.body;
     const userId = (req as any).user.userId;
 
     // Validate required fields
-    if (lastPosition === undefined) {
+    if (req.body.lastPosition === undefined) {
       return res.status(400).json({ 
         error: 'lastPosition is required' 
       });
     }
 
-    // Use contentItemId format: {lessonId}-{type}-{index}
-    
-    let videoDuration = 0;
+    // Bad values would be rejected by the batched MERGE, so refuse them here
+    const lastPosition = parseSeconds(req.body.lastPosition);
+    if (lastPosition === null) {
+      return res.status(400).json({ error: 'lastPosition must be a non-negative number of seconds' });
+    }
 
-    // Get video data from contentItemId
-    const videoData = await getVideoDataFromContentItemId(contentItemId, userId);
-    videoDuration = videoData.videoDuration;
-    console.log(`[VIDEO-PROGRESS] Using contentItemId: ${contentItemId}`);
+    let watchedDuration = lastPosition;
+    if (req.body.watchedDuration !== undefined && req.body.watchedDuration !== null) {
+      const parsed = parseSeconds(req.body.watchedDuration);
+      if (parsed === null) {
+        return res.status(400).json({ error: 'watchedDuration must be a non-negative number of seconds' });
+      }
+      watchedDuration = parsed || lastPosition;
+    }
+
+    let playbackSpeed = 1.00;
+    if (req.body.playbackSpeed !== undefined && req.body.playbackSpeed !== null) {
+      const speed = req.body.playbackSpeed;
+      if (typeof speed !== 'number' || !Number.isFinite(speed) || speed < 0) {
+        return res.status(400).json({ error: 'playbackSpeed must be a non-negative number' });
+      }
+      playbackSpeed = speed > 0 ? Math.min(Math.max(speed, 0.01), MAX_PLAYBACK_SPEED) : 1.00;
+    }
+
+    // Use contentItemId format: {lessonId}-{type}-{index}
+    const cacheKey = `${userId}|${contentItemId}`;
+    let videoData = heartbeatVideoDataCache.get(cacheKey);
+    if (!videoData) {
+      videoData = await getVideoDataFromContentItemId(contentItemId, userId);
+      heartbeatVideoDataCache.set(cacheKey, videoData);
+    }
+    const videoDuration = videoData.videoDuration;
     
     // Calculate completion percentage
     const completionPercentage = videoDuration > 0 
@@ -87,104 +129,28 @@ router.post('/:videoLessonId/update', authenticateToken, async (req: Request, re
     // Mark as completed if watched >= 90% of the video
     const isCompleted = completionPercentage >= 90;
 
-    // Check if progress record exists using ContentItemId
-    const existingProgress = await db.query(
-      'SELECT Id FROM dbo.VideoProgress WHERE UserId = @userId AND ContentItemId = @contentItemId',
-      { userId, contentItemId }
-    );
-
-    const request = await db.getRequest();
-    request.input('userId', sql.UniqueIdentifier, userId);
-    request.input('contentItemId', sql.NVarChar(100), contentItemId);
-    request.input('lastPosition', sql.Int, lastPosition);
-    request.input('watchedDuration', sql.Int, watchedDuration || lastPosition);
-    request.input('completionPercentage', sql.Decimal(5, 2), completionPercentage);
-    request.input('isCompleted', sql.Bit, isCompleted);
-    request.input('playbackSpeed', sql.Decimal(3, 2), playbackSpeed || 1.00);
-    request.input('lastWatchedAt', sql.DateTime2, new Date());
-
-    if (existingProgress.length > 0) {
-      // Update existing progress
-      const updateQuery = `
-        UPDATE dbo.VideoProgress 
-        SET 
-          WatchedDuration = CASE 
-            WHEN @watchedDuration > WatchedDuration THEN @watchedDuration 
-            ELSE WatchedDuration 
-          END,
-          LastPosition = @lastPosition,
-          CompletionPercentage = @completionPercentage,
-          IsCompleted = CASE 
-            WHEN IsCompleted = 1 THEN 1 
-            ELSE @isCompleted 
-          END,
-          PlaybackSpeed = @playbackSpeed,
-          LastWatchedAt = @lastWatchedAt,
-          CompletedAt = CASE 
-            WHEN @isCompleted = 1 AND CompletedAt IS NULL THEN @lastWatchedAt 
-            ELSE CompletedAt 
-          END,
-          UpdatedAt = GETUTCDATE()
-        WHERE UserId = @userId AND ContentItemId = @contentItemId
-      `;
-      await request.query(updateQuery);
-    } else {
-      // Insert new progress record
-      request.input('id', sql.UniqueIdentifier, uuidv4());
-      request.input('completedAt', sql.DateTime2, isCompleted ? new Date() : null);
-      
-      try {
-        const insertQuery = `
-          INSERT INTO dbo.VideoProgress 
-          (Id, UserId, ContentItemId, WatchedDuration, LastPosition, CompletionPercentage, 
-           IsCompleted, PlaybackSpeed, LastWatchedAt, CompletedAt, CreatedAt, UpdatedAt)
-          VALUES 
-          (@id, @userId, @contentItemId, @watchedDuration, @lastPosition, @completionPercentage,
-           @isCompleted, @playbackSpeed, @lastWatchedAt, @completedAt, GETUTCDATE(), GETUTCDATE())
-        `;
-        await request.query(insertQuery);
-      } catch (insertError: any) {
-        // If duplicate key error (race condition), update instead
-        if (insertError.message?.includes('UNIQUE KEY constraint') || insertError.message?.includes('duplicate key')) {
-          console.log('Race condition detected, performing UPDATE instead of INSERT');
-          const updateQuery = `
-            UPDATE dbo.VideoProgress 
-            SET 
-              WatchedDuration = CASE 
-                WHEN @watchedDuration > WatchedDuration THEN @watchedDuration 
-                ELSE WatchedDuration 
-              END,
-              LastPosition = @lastPosition,
-              ContentItemId = @contentItemId,
-              CompletionPercentage = @completionPercentage,
-              IsCompleted = CASE 
-                WHEN IsCompleted = 1 THEN 1 
-                ELSE @isCompleted 
-              END,
-              PlaybackSpeed = @playbackSpeed,
-              LastWatchedAt = @lastWatchedAt,
-              CompletedAt = CASE 
-                WHEN @isCompleted = 1 AND CompletedAt IS NULL THEN @lastWatchedAt 
-                ELSE CompletedAt 
-              END,
-              UpdatedAt = GETUTCDATE()
-            WHERE UserId = @userId AND ContentItemId = @contentItemId
-          `;
-          await request.query(updateQuery);
-        } else {
-          throw insertError;
-        }
-      }
-    }
+    // Write-behind: coalesced in memory and MERGEd in batches by VideoProgressBuffer
+    const now = new Date();
+    progressBuffer.record({
+      userId,
+      contentItemId,
+      lastPosition,
+      watchedDuration,
+      completionPercentage: parseFloat(completionPercentage.toFixed(2)),
+      isCompleted,
+      playbackSpeed,
+      lastWatchedAt: now,
+      completedAt: isCompleted ? now : null
+    });
 
     res.json({
       success: true,
       progress: {
         lastPosition,
-        watchedDuration: watchedDuration || lastPosition,
+        watchedDuration,
         completionPercentage: parseFloat(completionPercentage.toFixed(2)),
         isCompleted,
-        playbackSpeed: playbackSpeed || 1.00
+        playbackSpeed
       }
     });
 
@@ -215,6 +181,24 @@ router.get('/:videoLessonId', authenticateToken, async (req: Request, res: Respo
       WHERE UserId = @userId AND ContentItemId = @contentItemId
     `, { userId, contentItemId });
 
+    // Heartbeats not yet flushed are newer than the row
+    const buffered = progressBuffer.peek(userId, contentItemId);
+
+    if (!result.length && buffered) {
+      return res.json({
+        progress: {
+          hasProgress: true,
+          lastPosition: buffered.lastPosition,
+          watchedDuration: buffered.watchedDuration,
+          completionPercentage: buffered.completionPercentage,
+          isCompleted: buffered.isCompleted,
+          playbackSpeed: buffered.playbackSpeed,
+          lastWatchedAt: buffered.lastWatchedAt,
+          completedAt: buffered.completedAt
+        }
+      });
+    }
+
     if (!result.length) {
       // No progress yet - return default values
       return res.json({
@@ -234,13 +218,13 @@ router.get('/:videoLessonId', authenticateToken, async (req: Request, res: Respo
       progress: {
         hasProgress: true,
         id: progress.Id,
-        lastPosition: progress.LastPosition,
-        watchedDuration: progress.WatchedDuration,
-        completionPercentage: parseFloat(progress.CompletionPercentage),
-        isCompleted: progress.IsCompleted,
-        playbackSpeed: parseFloat(progress.PlaybackSpeed),
-        lastWatchedAt: progress.LastWatchedAt,
-        completedAt: progress.CompletedAt
+        lastPosition: buffered ? buffered.lastPosition : progress.LastPosition,
+        watchedDuration: Math.max(progress.WatchedDuration, buffered?.watchedDuration || 0),
+        completionPercentage: buffered ? buffered.completionPercentage : parseFloat(progress.CompletionPercentage),
+        isCompleted: progress.IsCompleted || Boolean(buffered?.isCompleted),
+        playbackSpeed: buffered ? buffered.playbackSpeed : parseFloat(progress.PlaybackSpeed),
+        lastWatchedAt: buffered ? buffered.lastWatchedAt : progress.LastWatchedAt,
+        completedAt: progress.CompletedAt || buffered?.completedAt || null
       }
     });
 
@@ -267,6 +251,9 @@ router.post('/:videoLessonId/complete', authenticateToken, async (req: Request,
     lessonId = videoData.lessonId;
     lessonTitle = videoData.lessonTitle;
     courseId = videoData.courseId;
+
+    // Land buffered heartbeats first so the MERGE below sees the latest row
+    await progressBuffer.flushEntry(userId, contentItemId);
       
     // Update or create progress record marking as completed
     const request = await db.getRequest();
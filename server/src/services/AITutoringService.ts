@@ -1,5 +1,6 @@
 import OpenAI from 'openai';
 import { DatabaseService } from './DatabaseService';
+import { LatencyStats } from '../utils/LatencyStats';
 
 export interface TutoringContext {
   userId: string;
@@ -18,52 +19,60 @@ export interface AIResponse {
   followUpQuestions?: string[];
 }
 
+export interface TutoringStreamHandlers {
+  onToken: (delta: string) => void;
+  onSuggestions?: (suggestions: string[]) => void; // Called as soon as suggestions are ready
+}
+
+const VALID_MODELS = ['gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo'];
+
+const UNAVAILABLE_RESPONSE: AIResponse = {
+  content: "I'm sorry, but I'm currently experiencing technical difficulties. This might be due to:\n\n• Invalid or missing OpenAI API key\n• Network connectivity issues\n• API rate limits\n\nPlease check your API key configuration and try again. If the problem persists, contact support.",
+  suggestions: ["Check your OpenAI API key", "Verify network connection", "Try again in a moment"],
+  followUpQuestions: []
+};
+
+// Time to first token (streaming) and to the full answer (both modes), shown in admin system health
+const firstTokenLatency = new LatencyStats('aiTutorFirstToken');
+const completionLatency = new LatencyStats('aiTutorCompletion');
+const suggestionLatency = new LatencyStats('aiTutorSuggestions');
+
 export class AITutoringService {
   private openai: OpenAI;
   private db: DatabaseService;
 
   constructor() {
     const apiKey = process.env.OPENAI_API_KEY;
+    // OpenAI-compatible endpoint override, e.g. the local stub (scripts/openai-stub.js)
+    const baseURL = process.env.OPENAI_BASE_URL || undefined;
     
-    if (!apiKey || apiKey === 'your-openai-api-key-here') {
+    if (!baseURL && (!apiKey || apiKey === 'your-openai-api-key-here')) {
       throw new Error('❌ OpenAI API key is required! Please add your API key to the .env file. Get one free at: https://platform.openai.com/api-keys');
     }
 
     this.openai = new OpenAI({
-      apiKey: apiKey,
+      apiKey: apiKey || 'local-stub',
+      baseURL,
     });
     
     this.db = DatabaseService.getInstance();
-    console.log('✅ AI Tutoring Service initialized with OpenAI API');
+    console.log(`✅ AI Tutoring Service initialized with ${baseURL ? `OpenAI-compatible API at ${baseURL}` : 'OpenAI API'}`);
   }
 
   /**
-   * Generate AI tutoring response based on user message and context
+   * Generate AI tutoring response based on user message and context.
+   * Follow-up suggestions are generated concurrently with the answer.
    */
   async generateResponse(
     message: string,
     context: TutoringContext,
     model: string = 'gpt-4o-mini' // Default model
   ): Promise<AIResponse> {
+    const startedAt = Date.now();
+    const suggestionsPromise = this.generateFollowUpSuggestions(message, context);
+
     try {
-      // Validate and sanitize model selection
-      const validModels = ['gpt-4o', 'gpt-4o-mini', 'gpt-3.5-turbo'];
-      const selectedModel = validModels.includes(model) ? model : 'gpt-4o-mini';
-      
-      console.log(`🤖 Generating AI response using model: ${selectedModel}`);
-      
-      // Build context-aware system prompt
-      const systemPrompt = await this.buildSystemPrompt(context);
-      
-      // Prepare conversation history
-      const messages: OpenAI.ChatCompletionMessageParam[] = [
-        { role: 'system', content: systemPrompt },
-        ...(context.previousMessages?.map(msg => ({
-          role: msg.role as 'user' | 'assistant',
-          content: msg.content
-        })) || []),
-        { role: 'user', content: message }
-      ];
+      const { selectedModel, messages } = await this.prepareConversation(message, context, model);
 
       // Generate AI response
       const completion = await this.openai.chat.completions.create({
@@ -76,9 +85,9 @@ export class AITutoringService {
       });
 
       const aiContent = completion.choices[0]?.message?.content || '';
+      completionLatency.record(Date.now() - startedAt);
 
-      // Generate follow-up suggestions
-      const suggestions = await this.generateFollowUpSuggestions(message, aiContent, context);
+      const suggestions = await suggestionsPromise;
 
       return {
         content: aiContent,
@@ -90,12 +99,110 @@ export class AITutoringService {
       console.error('AI Tutoring Service Error:', error);
       
       // Return a helpful error message instead of fallback
-      return {
-        content: "I'm sorry, but I'm currently experiencing technical difficulties. This might be due to:\n\n• Invalid or missing OpenAI API key\n• Network connectivity issues\n• API rate limits\n\nPlease check your API key configuration and try again. If the problem persists, contact support.",
-        suggestions: ["Check your OpenAI API key", "Verify network connection", "Try again in a moment"],
-        followUpQuestions: []
-      };
+      return UNAVAILABLE_RESPONSE;
+    }
+  }
+
+  /**
+   * Stream the AI tutoring response token by token.
+   *
+   * Tokens are passed to handlers.onToken as they arrive and suggestions to
+   * handlers.onSuggestions as soon as their (concurrent) completion finishes.
+   * Resolves with the full response once both are done. If the model fails before
+   * the first token, the unavailable message is streamed instead; after that, the
+   * partial answer is kept. Aborting `signal` (client went away) ends the stream early
+   * with whatever was generated so far (empty content if nothing was).
+   */
+  async streamResponse(
+    message: string,
+    context: TutoringContext,
+    model: string = 'gpt-4o-mini',
+    handlers: TutoringStreamHandlers,
+    signal?: AbortSignal
+  ): Promise<AIResponse> {
+    const startedAt = Date.now();
+    const suggestionsPromise = this.generateFollowUpSuggestions(message, context).then(suggestions => {
+      handlers.onSuggestions?.(suggestions);
+      return suggestions;
+    });
+
+    let content = '';
+    try {
+      const { selectedModel, messages } = await this.prepareConversation(message, context, model);
+
+      const stream = await this.openai.chat.completions.create({
+        model: selectedModel,
+        messages,
+        max_tokens: 1000,
+        temperature: 0.7,
+        presence_penalty: 0.1,
+        frequency_penalty: 0.1,
+        stream: true,
+      }, { signal });
+
+      for await (const chunk of stream) {
+        const delta = chunk.choices[0]?.delta?.content;
+        if (!delta) {
+          continue;
+        }
+        if (content.length === 0) {
+          firstTokenLatency.record(Date.now() - startedAt);
+        }
+        content += delta;
+        handlers.onToken(delta);
+      }
+      completionLatency.record(Date.now() - startedAt);
+
+    } catch (error) {
+      if (signal?.aborted) {
+        console.log(`🤖 AI response stream aborted by client after ${content.length} chars`);
+      } else {
+        console.error('AI Tutoring Service Error (stream):', error);
+      }
+      if (content.length === 0) {
+        if (signal?.aborted) {
+          return { content: '', suggestions: [], followUpQuestions: [] };
+        }
+        handlers.onToken(UNAVAILABLE_RESPONSE.content);
+        return UNAVAILABLE_RESPONSE;
+      }
     }
+
+    const suggestions = await suggestionsPromise;
+    return {
+      content,
+      suggestions,
+      followUpQuestions: suggestions.slice(0, 3),
+    };
+  }
+
+  /**
+   * Validate the model and build the prompt plus conversation history
+   */
+  private async prepareConversation(
+    message: string,
+    context: TutoringContext,
+    model: string
+  ): Promise<{ selectedModel: string; messages: OpenAI.ChatCompletionMessageParam[] }> {
+    // Validate and sanitize model selection
+    const selectedModel = VALID_MODELS.includes(model) ? model : 'gpt-4o-mini';
+
+    console.log(`🤖 Generating AI response using model: ${selectedModel}`);
+
+    // Build context-aware system prompt
+    const systemPrompt = await this.buildSystemPrompt(context);
+
+    // Prepare conversation history
+    const messages: OpenAI.ChatCompletionMessageParam[] = [
+      { role: 'system', content: systemPrompt },
+      ...(context.previousMessages?.map(msg => ({
+        role: msg.role as 'user' | 'assistant',
+        content: msg.content
+      })) || []),
+      { role: 'user', content: message }
+    ];
+
+    return { selectedModel, messages };
   }
 
   /**
@@ -185,19 +292,21 @@ Guidelines:
   }
 
   /**
-   * Generate follow-up suggestions
+   * Generate follow-up suggestions.
+   * Built from the student's question and the previous tutor reply (not the answer
+   * being generated), so this call runs alongside the main completion.
    */
   private async generateFollowUpSuggestions(
     userMessage: string,
-    aiResponse: string,
     context: TutoringContext
   ): Promise<string[]> {
+    const startedAt = Date.now();
     try {
+      const lastReply = [...(context.previousMessages || [])].reverse().find(msg => msg.role === 'assistant');
       const prompt = `Based on this tutoring conversation, suggest 3-5 helpful follow-up questions or topics the student might want to explore next:
-
+${lastReply ? `\nPrevious Tutor Reply: "${lastReply.content.substring(0, 1500)}"` : ''}
 Student Message: "${userMessage}"
-AI Response: "${aiResponse}"
-
+${context.currentTopic ? `Current Topic: ${context.currentTopic}\n` : ''}
 Generate short, actionable suggestions that would help the student learn more effectively.`;
 
       const completion = await this.openai.chat.completions.create({
@@ -212,6 +321,7 @@ Generate short, actionable suggestions that would help the student learn more ef
         .filter(line => line.trim().length > 0)
         .slice(0, 5) || [];
 
+      suggestionLatency.record(Date.now() - startedAt);
       return suggestions;
     } catch (error) {
       console.error('Error generating suggestions:', error);
@@ -4,6 +4,9 @@ import { DatabaseService } from './DatabaseService';
 import { StripeService } from './StripeService';
 import { NotificationService } from './NotificationService';
 import { CourseManagementService } from './CourseManagementService';
+import { ActiveUserCache } from './ActiveUserCache';
+import { CourseCounterService } from './CourseCounterService';
+import { ChatService } from './ChatService';
 import EmailService from './EmailService';
 import { Server as SocketIOServer } from 'socket.io';
 
@@ -647,6 +650,12 @@ export class AccountDeletionService {
       // 4. Cancel Stripe subscriptions
       await this.cancelStripeSubscriptions(userId);
 
+      // Courses whose EnrollmentCount drops when this user's enrollments cascade-delete
+      const enrolledCourses = await this.db.query<{ CourseId: string }>(
+        'SELECT DISTINCT CourseId FROM dbo.Enrollments WHERE UserId = @userId',
+        { userId }
+      );
+
       // 5. Start database transaction for data deletion
       const pool = await this.db.getPool();
       const transaction = new sql.Transaction(pool);
@@ -664,7 +673,12 @@ export class AccountDeletionService {
           .query('DELETE FROM dbo.Users WHERE Id = @userId');
 
         await transaction.commit();
+        ActiveUserCache.invalidate(userId);
+        await CourseCounterService.refreshEnrollmentCounts(enrolledCourses.map(e => e.CourseId));
         console.log('✅ Database transaction committed - user deleted');
+
+        // Buffered recent chat messages still show the user's original content
+        ChatService.invalidateRecentMessages();
       } catch (error) {
         await transaction.rollback();
         console.error('❌ Database transaction rolled back:', error);
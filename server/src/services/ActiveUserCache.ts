@@ -0,0 +1,64 @@
+import { DatabaseService } from './DatabaseService';
+import { TtlLruCache, CacheStats } from '../utils/TtlLruCache';
+
+export interface ActiveUserRow {
+  Id: string;
+  Email: string;
+  Username: string;
+  FirstName: string;
+  LastName: string;
+  Role: string;
+  IsActive: boolean;
+}
+
+/**
+ * ActiveUserCache — active Users rows looked up by authenticateToken/optionalAuth
+ *
+ * Only active users are cached, so a deactivated or deleted account is re-checked
+ * against the DB on every request. Anything that changes Role or IsActive, or deletes
+ * a user, must call invalidate(); the TTL covers writes made by other server nodes.
+ */
+export class ActiveUserCache {
+  private static cache = new TtlLruCache<string, ActiveUserRow>(
+    'activeUsers',
+    parseInt(process.env.AUTH_USER_CACHE_MAX || '10000'),
+    parseInt(process.env.AUTH_USER_CACHE_TTL_MS || '60000')
+  );
+
+  // GUIDs come back upper-case from SQL Server but may arrive lower-case in route params
+  private static key(userId: string): string {
+    return userId.toUpperCase();
+  }
+
+  /**
+   * Active user row, or null if the user does not exist or is inactive.
+   * DB errors propagate so callers can fall back to the token claims.
+   */
+  static async getActiveUser(userId: string): Promise<ActiveUserRow | null> {
+    const key = this.key(userId);
+    const cached = this.cache.get(key);
+    if (cached) {
+      return cached;
+    }
+
+    const db = DatabaseService.getInstance();
+    const users = await db.query<ActiveUserRow>(
+      'SELECT Id, Email, Username, FirstName, LastName, Role, IsActive FROM dbo.Users WHERE Id = @userId AND IsActive = 1',
+      { userId }
+    );
+    if (users.length === 0) {
+      return null;
+    }
+
+    this.cache.set(key, users[0]);
+    return users[0];
+  }
+
+  static invalidate(userId: string): void {
+    this.cache.delete(this.key(userId));
+  }
+
+  static getStats(): CacheStats {
+    return this.cache.getStats();
+  }
+}
@@ -1,4 +1,6 @@
 import { DatabaseService } from './DatabaseService';
+import { QuestionStatsService, QuestionOutcome, difficultyFromStats, DEFAULT_DIFFICULTY } from './QuestionStatsService';
+import { GradedAnswer } from './AssessmentAnswerService';
 
 export interface AdaptiveAssessmentConfig {
   initialDifficulty: number; // 1-10
@@ -32,6 +34,7 @@ export interface AdaptiveScoring {
   timeBonus: number;
   finalScore: number;
   skillUpdates: Record<string, number>;
+  questionOutcomes: QuestionOutcome[]; // Answered questions only (timeSpent filled in by the caller)
 }
 
 export class AdaptiveAssessmentService {
@@ -221,95 +224,35 @@ export class AdaptiveAssessmentService {
     return diversityScore;
   }
 
-  // Calculate question difficulty based on historical performance
+  // Calculate question difficulty based on historical performance (one QuestionStats row)
   async calculateQuestionDifficulty(questionId: string): Promise<number> {
     try {
-      const db = DatabaseService.getInstance();
-      
-      // Get historical performance data for this question
-      const performanceData = await db.query(`
-        SELECT 
-          COUNT(*) as totalAttempts,
-          COUNT(CASE WHEN JSON_VALUE(s.Feedback, CONCAT('$.["', CAST(@questionId as NVARCHAR(36)), '"].isCorrect')) = 'true' THEN 1 END) as correctAnswers,
-          AVG(CASE WHEN JSON_VALUE(s.Feedback, CONCAT('$.["', CAST(@questionId as NVARCHAR(36)), '"].timeSpent')) IS NOT NULL 
-                   THEN CAST(JSON_VALUE(s.Feedback, CONCAT('$.["', CAST(@questionId as NVARCHAR(36)), '"].timeSpent')) as FLOAT) 
-                   ELSE NULL END) as avgTimeSpent
-        FROM dbo.AssessmentSubmissions s
-        JOIN dbo.Questions q ON q.AssessmentId = s.AssessmentId
-        WHERE q.Id = @questionId AND s.Status = 'completed'
-        AND JSON_VALUE(s.Feedback, CONCAT('$.["', CAST(@questionId as NVARCHAR(36)), '"]')) IS NOT NULL
-      `, { questionId });
-
-      const stats = performanceData[0];
-      
-      if (!stats || stats.totalAttempts < 5) {
-        // Not enough data, return default difficulty
-        return 5;
-      }
-
-      const successRate = stats.totalAttempts > 0 ? stats.correctAnswers / stats.totalAttempts : 0.5;
-      const avgTime = stats.avgTimeSpent || 60; // Default to 1 minute
-
-      // Calculate difficulty based on success rate and time spent
-      // Lower success rate = higher difficulty
-      let difficulty = 10 - (successRate * 8); // Range 2-10 based on success rate
-      
-      // Adjust based on time spent (longer time = higher difficulty)
-      if (avgTime > 120) difficulty += 1; // Very long time
-      else if (avgTime > 90) difficulty += 0.5; // Long time
-      else if (avgTime < 30) difficulty -= 0.5; // Quick answers
-      
-      // Ensure difficulty is within bounds
-      return Math.max(1, Math.min(10, Math.round(difficulty)));
+      return difficultyFromStats(await QuestionStatsService.getStats(questionId));
     } catch (error) {
       console.error('Error calculating question difficulty:', error);
-      return 5; // Default difficulty
+      return DEFAULT_DIFFICULTY; // Default difficulty
     }
   }
 
   // Update question difficulties based on new performance data
   async updateQuestionDifficulties(assessmentId: string): Promise<void> {
     try {
-      const db = DatabaseService.getInstance();
-      
-      // Get all questions for this assessment
-      const questions = await db.query(`
-        SELECT Id FROM dbo.Questions WHERE AssessmentId = @assessmentId
-      `, { assessmentId });
-
-      // Update difficulty for each question
-      for (const question of questions) {
-        const newDifficulty = await this.calculateQuestionDifficulty(question.Id);
-        
-        await db.query(`
-          UPDATE dbo.Questions 
-          SET Difficulty = @difficulty 
-          WHERE Id = @questionId
-        `, { questionId: question.Id, difficulty: newDifficulty });
-      }
-      
-      console.log(`Updated difficulties for ${questions.length} questions in assessment ${assessmentId}`);
+      const result = await QuestionStatsService.refreshDifficulties([assessmentId]);
+      console.log(`Updated difficulties for ${result.difficultiesChanged} of ${result.questionsChecked} questions in assessment ${assessmentId}`);
     } catch (error) {
       console.error('Error updating question difficulties:', error);
     }
   }
 
-  // Calculate adaptive scoring
+  // Calculate adaptive scoring from the submission's graded answers
+  // (AssessmentAnswerService.gradeSubmission, one row per question in order)
   async calculateAdaptiveScore(
     assessmentId: string,
     userId: string,
-    answers: Record<string, any>,
+    questions: GradedAnswer[],
     timeSpent: number
   ): Promise<AdaptiveScoring> {
     try {
-      // Get questions with their difficulties and correct answers
-      const questions = await this.db.query(`
-        SELECT Id, Type, CorrectAnswer, Difficulty, AdaptiveWeight, Tags
-        FROM dbo.Questions 
-        WHERE AssessmentId = @assessmentId 
-        ORDER BY OrderIndex
-      `, { assessmentId });
-
       // Get user's skill profile
       const assessment = await this.db.query(`
         SELECT l.CourseId FROM dbo.Assessments a
@@ -325,23 +268,17 @@ export class AdaptiveAssessmentService {
       let difficultySum = 0;
       let correctAnswers = 0;
       const skillUpdates: Record<string, number> = {};
+      const questionOutcomes: QuestionOutcome[] = [];
 
       // Calculate base scores
       for (const question of questions) {
-        const userAnswer = answers[question.Id];
-        const correctAnswer = JSON.parse(question.CorrectAnswer);
         const weight = question.AdaptiveWeight || 1;
         const difficulty = question.Difficulty || 5;
-        
-        let isCorrect = false;
-        
-        // Basic scoring logic (enhanced from the main routes)
-        if (question.Type === 'multiple_choice' || question.Type === 'true_false') {
-          isCorrect = userAnswer === correctAnswer;
-        } else if (question.Type === 'short_answer') {
-          isCorrect = userAnswer?.toLowerCase().trim() === correctAnswer?.toLowerCase().trim();
+        const isCorrect = question.IsCorrect;
+
+        if (question.Answer !== null) {
+          questionOutcomes.push({ questionId: question.QuestionId, isCorrect, timeSpent: question.TimeSpent });
         }
-        // Add more sophisticated scoring for other question types
 
         if (isCorrect) {
           const questionScore = 100 * weight;
@@ -387,7 +324,8 @@ export class AdaptiveAssessmentService {
         consistencyBonus,
         timeBonus,
         finalScore,
-        skillUpdates
+        skillUpdates,
+        questionOutcomes
       };
     } catch (error) {
       console.error('Error calculating adaptive score:', error);
@@ -399,7 +337,8 @@ export class AdaptiveAssessmentService {
         consistencyBonus: 0,
         timeBonus: 0,
         finalScore: 0,
-        skillUpdates: {}
+        skillUpdates: {},
+        questionOutcomes: []
       };
     }
   }
@@ -499,20 +438,8 @@ export class AdaptiveAssessmentService {
   // Schedule difficulty updates for all assessments
   async scheduleQuestionDifficultyUpdates(): Promise<void> {
     try {
-      const db = DatabaseService.getInstance();
-      
-      // Get all adaptive assessments
-      const assessments = await db.query(`
-        SELECT Id FROM dbo.Assessments WHERE IsAdaptive = 1
-      `);
-
-      console.log(`Updating difficulties for ${assessments.length} adaptive assessments...`);
-      
-      // Update difficulties for each assessment
-      for (const assessment of assessments) {
-        await this.updateQuestionDifficulties(assessment.Id);
-      }
-      
+      // Every adaptive assessment at once; cost depends on the number of questions, not submissions
+      await QuestionStatsService.refreshDifficulties();
       console.log('Question difficulty update completed');
     } catch (error) {
       console.error('Error in scheduled difficulty update:', error);
@@ -1,6 +1,32 @@
 import sql from 'mssql';
 import { DatabaseService } from './DatabaseService';
 import { logger } from '../utils/logger';
+import { ActiveUserCache } from './ActiveUserCache';
+import { TtlLruCache, CacheStats } from '../utils/TtlLruCache';
+import { WorkQueue, WorkQueueStats } from '../utils/WorkQueue';
+import { VideoProgressBuffer, VideoProgressBufferStats } from './VideoProgressBuffer';
+import { PresenceService, PresenceStats } from './PresenceService';
+import { ChatReadReceiptBuffer, ChatReadReceiptStats } from './ChatReadReceiptBuffer';
+import { CourseEventService } from './CourseEventService';
+import { SocketClusterService, SocketClusterStats } from './SocketClusterService';
+import { LeaderElectionService, LeaderElectionStats } from './LeaderElectionService';
+import { LatencyStats, LatencySummary } from '../utils/LatencyStats';
+import { RequestGovernor, RequestGovernorStats } from '../utils/RequestGovernor';
+import { KeysetSort, decodeCursor, cursorKeyExpr, keysetCondition, takeKeysetPage, getCachedTotal } from '../utils/pagination';
+
+/**
+ * Pagination block returned by the admin listings. page/OFFSET and cursor
+ * (keyset) paging both work; nextCursor continues from the last row.
+ */
+export interface AdminPagination {
+  page: number;
+  limit: number;
+  total: number;
+  totalPages: number;
+  hasNext: boolean;
+  hasPrev: boolean;
+  nextCursor: string | null;
+}
 
 /**
  * AdminService — Platform-level administration queries
@@ -293,6 +319,41 @@ export class AdminService {
     }
   }
 
+  // ─── Listing Pagination ────────────────────────────────────────
+
+  /**
+   * Bind paging inputs on a listing request and return its WHERE clause.
+   * With a cursor issued for the same sort, the page seeks past the cursor row
+   * (keyset); otherwise it skips `offset` rows. @limit is bound as limit + 1 so
+   * takeKeysetPage() can tell whether another page follows.
+   */
+  private applyKeyset(
+    request: sql.Request,
+    cursor: string | undefined,
+    sortKey: string,
+    sort: KeysetSort,
+    idExpr: string,
+    sortDir: 'ASC' | 'DESC',
+    filterClause: string,
+    offset: number,
+    limit: number,
+    idType: sql.ISqlType | (() => sql.ISqlType) = sql.UniqueIdentifier
+  ): string {
+    const decoded = decodeCursor(cursor);
+    const conditions = filterClause ? [filterClause] : [];
+
+    if (decoded && decoded.s === sortKey) {
+      request.input('cursorValue', sql.NVarChar, String(decoded.v));
+      request.input('cursorId', idType, decoded.id);
+      conditions.push(keysetCondition(sort, idExpr, sortDir));
+      offset = 0;
+    }
+    request.input('offset', sql.Int, offset);
+    request.input('limit', sql.Int, limit + 1);
+
+    return conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : '';
+  }
+
   // ─── User Management ───────────────────────────────────────────
 
   /**
@@ -301,6 +362,7 @@ export class AdminService {
   async getUsers(opts: {
     page?: number;
     limit?: number;
+    cursor?: string;
     search?: string;
     role?: string;
     status?: string;
@@ -322,14 +384,7 @@ export class AdminService {
       enrollmentCount: number;
       totalSpent: number;
     }>;
-    pagination: {
-      page: number;
-      limit: number;
-      total: number;
-      totalPages: number;
-      hasNext: boolean;
-      hasPrev: boolean;
-    };
+    pagination: AdminPagination;
   }> {
     try {
       const page = Math.max(1, opts.page || 1);
@@ -339,8 +394,6 @@ export class AdminService {
       // Build WHERE clause dynamically
       const conditions: string[] = [];
       const request = await this.db.getRequest();
-      request.input('offset', sql.Int, offset);
-      request.input('limit', sql.Int, limit);
 
       if (opts.search) {
         conditions.push(`(u.Email LIKE @search OR u.FirstName LIKE @search OR u.LastName LIKE @search OR u.Username LIKE @search)`);
@@ -356,22 +409,28 @@ export class AdminService {
         conditions.push(`u.IsActive = 0`);
       }
 
-      const whereClause = conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : '';
+      const filterClause = conditions.join(' AND ');
+      const whereClause = conditions.length > 0 ? `WHERE ${filterClause}` : '';
 
-      // Validate sort column against allowlist
-      const allowedSorts: Record<string, string> = {
-        name: 'u.FirstName',
-        email: 'u.Email',
-        role: 'u.Role',
-        created: 'u.CreatedAt',
-        lastLogin: 'u.LastLoginAt',
+      // Validate sort column against allowlist (NULL last-login sorts as oldest, as before)
+      const allowedSorts: Record<string, KeysetSort> = {
+        name: { expr: 'u.FirstName', type: 'value' },
+        email: { expr: 'u.Email', type: 'value' },
+        role: { expr: 'u.Role', type: 'value' },
+        created: { expr: 'u.CreatedAt', type: 'date' },
+        lastLogin: { expr: "ISNULL(u.LastLoginAt, '0001-01-01')", type: 'date' },
       };
-      const sortCol = allowedSorts[opts.sortBy || 'created'] || 'u.CreatedAt';
+      const sortName = allowedSorts[opts.sortBy || 'created'] ? (opts.sortBy || 'created') : 'created';
+      const sort = allowedSorts[sortName];
       const sortDir = opts.sortOrder === 'asc' ? 'ASC' : 'DESC';
+      const sortKey = `${sortName}:${sortDir}`;
+
+      const pageWhere = this.applyKeyset(request, opts.cursor, sortKey, sort, 'u.Id', sortDir, filterClause, offset, limit);
 
-      const [dataResult, countResult] = await Promise.all([
+      const [dataResult, total] = await Promise.all([
         request.query(`
           SELECT
+            ${cursorKeyExpr(sort)} AS cursorKey,
             u.Id AS id,
             u.Email AS email,
             u.Username AS username,
@@ -386,37 +445,38 @@ export class AdminService {
             ISNULL(e.cnt, 0) AS enrollmentCount,
             ISNULL(t.total, 0) AS totalSpent
           FROM dbo.Users u
-          LEFT JOIN (
-            SELECT UserId, COUNT(*) AS cnt FROM dbo.Enrollments GROUP BY UserId
-          ) e ON e.UserId = u.Id
-          LEFT JOIN (
-            SELECT UserId, SUM(Amount) AS total FROM dbo.Transactions WHERE Status = 'completed' GROUP BY UserId
-          ) t ON t.UserId = u.Id
-          ${whereClause}
-          ORDER BY ${sortCol} ${sortDir}
+          OUTER APPLY (
+            SELECT COUNT(*) AS cnt FROM dbo.Enrollments WHERE UserId = u.Id
+          ) e
+          OUTER APPLY (
+            SELECT SUM(Amount) AS total FROM dbo.Transactions WHERE UserId = u.Id AND Status = 'completed'
+          ) t
+          ${pageWhere}
+          ORDER BY ${sort.expr} ${sortDir}, u.Id ${sortDir}
           OFFSET @offset ROWS FETCH NEXT @limit ROWS ONLY
         `),
         // Count query uses a separate request (mssql limitation: can't reuse request)
-        (async () => {
+        getCachedTotal(`admin:users:${JSON.stringify([opts.search, opts.role, opts.status])}`, async () => {
           const countReq = await this.db.getRequest();
           if (opts.search) countReq.input('search', sql.NVarChar, `%${opts.search}%`);
           if (opts.role && ['student', 'instructor', 'admin'].includes(opts.role)) countReq.input('role', sql.NVarChar, opts.role);
-          return countReq.query(`SELECT COUNT(*) AS total FROM dbo.Users u ${whereClause}`);
-        })(),
+          const countResult = await countReq.query(`SELECT COUNT(*) AS total FROM dbo.Users u ${whereClause}`);
+          return countResult.recordset[0]?.total || 0;
+        }),
       ]);
 
-      const users = dataResult.recordset.map((r: any) => ({
+      const { rows, hasNext, nextCursor } = takeKeysetPage(dataResult.recordset, limit, sortKey, 'id');
+      const users = rows.map((r: any) => ({
         ...r,
         isActive: Boolean(r.isActive),
         emailVerified: Boolean(r.emailVerified),
       }));
-      const total = countResult.recordset[0]?.total || 0;
       const totalPages = Math.ceil(total / limit);
 
-      logger.info('Admin: fetched users', { page, limit, total, filters: { search: opts.search, role: opts.role, status: opts.status } });
+      logger.info('Admin: fetched users', { page, limit, total, cursor: Boolean(opts.cursor), filters: { search: opts.search, role: opts.role, status: opts.status } });
       return {
         users,
-        pagination: { page, limit, total, totalPages, hasNext: page < totalPages, hasPrev: page > 1 },
+        pagination: { page, limit, total, totalPages, hasNext, hasPrev: page > 1 || Boolean(opts.cursor), nextCursor },
       };
     } catch (error) {
       logger.error('AdminService.getUsers failed', { error });
@@ -559,6 +619,7 @@ export class AdminService {
         UPDATE dbo.Users SET Role = @role, UpdatedAt = GETUTCDATE() WHERE Id = @userId
       `);
       if (result.rowsAffected[0] === 0) throw new Error('User not found');
+      ActiveUserCache.invalidate(userId);
       logger.info('Admin: updated user role', { userId, newRole });
     } catch (error) {
       logger.error('AdminService.updateUserRole failed', { error, userId, newRole });
@@ -578,6 +639,7 @@ export class AdminService {
         UPDATE dbo.Users SET IsActive = @isActive, UpdatedAt = GETUTCDATE() WHERE Id = @userId
       `);
       if (result.rowsAffected[0] === 0) throw new Error('User not found');
+      ActiveUserCache.invalidate(userId);
       logger.info('Admin: updated user status', { userId, isActive });
     } catch (error) {
       logger.error('AdminService.updateUserStatus failed', { error, userId, isActive });
@@ -624,6 +686,7 @@ export class AdminService {
   async getCourses(opts: {
     page?: number;
     limit?: number;
+    cursor?: string;
     search?: string;
     status?: string;
     category?: string;
@@ -650,14 +713,7 @@ export class AdminService {
       createdAt: string;
       updatedAt: string;
     }>;
-    pagination: {
-      page: number;
-      limit: number;
-      total: number;
-      totalPages: number;
-      hasNext: boolean;
-      hasPrev: boolean;
-    };
+    pagination: AdminPagination;
   }> {
     try {
       const page = Math.max(1, opts.page || 1);
@@ -666,8 +722,6 @@ export class AdminService {
 
       const conditions: string[] = [];
       const request = await this.db.getRequest();
-      request.input('offset', sql.Int, offset);
-      request.input('limit', sql.Int, limit);
 
       if (opts.search) {
         conditions.push(`(c.Title LIKE @search OR c.Description LIKE @search)`);
@@ -690,23 +744,29 @@ export class AdminService {
         request.input('instructorId', sql.UniqueIdentifier, opts.instructorId);
       }
 
-      const whereClause = conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : '';
-
-      const allowedSorts: Record<string, string> = {
-        title: 'c.Title',
-        created: 'c.CreatedAt',
-        updated: 'c.UpdatedAt',
-        price: 'c.Price',
-        rating: 'c.Rating',
-        enrollments: 'c.EnrollmentCount',
-        status: 'c.Status',
+      const filterClause = conditions.join(' AND ');
+      const whereClause = conditions.length > 0 ? `WHERE ${filterClause}` : '';
+
+      const allowedSorts: Record<string, KeysetSort> = {
+        title: { expr: 'c.Title', type: 'value' },
+        created: { expr: 'c.CreatedAt', type: 'date' },
+        updated: { expr: 'c.UpdatedAt', type: 'date' },
+        price: { expr: 'c.Price', type: 'value' },
+        rating: { expr: 'c.Rating', type: 'value' },
+        enrollments: { expr: 'c.EnrollmentCount', type: 'value' },
+        status: { expr: 'c.Status', type: 'value' },
       };
-      const sortCol = allowedSorts[opts.sortBy || 'updated'] || 'c.UpdatedAt';
+      const sortName = allowedSorts[opts.sortBy || 'updated'] ? (opts.sortBy || 'updated') : 'updated';
+      const sort = allowedSorts[sortName];
       const sortDir = opts.sortOrder === 'asc' ? 'ASC' : 'DESC';
+      const sortKey = `${sortName}:${sortDir}`;
+
+      const pageWhere = this.applyKeyset(request, opts.cursor, sortKey, sort, 'c.Id', sortDir, filterClause, offset, limit);
 
-      const [dataResult, countResult] = await Promise.all([
+      const [dataResult, total] = await Promise.all([
         request.query(`
           SELECT
+            ${cursorKeyExpr(sort)} AS cursorKey,
             c.Id AS id,
             c.Title AS title,
             c.Thumbnail AS thumbnail,
@@ -718,38 +778,36 @@ export class AdminService {
             c.Rating AS rating,
             c.RatingCount AS ratingCount,
             c.EnrollmentCount AS enrollmentCount,
-            ISNULL(lc.cnt, 0) AS lessonCount,
+            c.LessonCount AS lessonCount,
             c.Status AS status,
             c.Visibility AS visibility,
             c.CreatedAt AS createdAt,
             c.UpdatedAt AS updatedAt
           FROM dbo.Courses c
           LEFT JOIN dbo.Users u ON u.Id = c.InstructorId
-          LEFT JOIN (
-            SELECT CourseId, COUNT(*) AS cnt FROM dbo.Lessons GROUP BY CourseId
-          ) lc ON lc.CourseId = c.Id
-          ${whereClause}
-          ORDER BY ${sortCol} ${sortDir}
+          ${pageWhere}
+          ORDER BY ${sort.expr} ${sortDir}, c.Id ${sortDir}
           OFFSET @offset ROWS FETCH NEXT @limit ROWS ONLY
         `),
-        (async () => {
+        getCachedTotal(`admin:courses:${JSON.stringify([opts.search, opts.status, opts.category, opts.level, opts.instructorId])}`, async () => {
           const countReq = await this.db.getRequest();
           if (opts.search) countReq.input('search', sql.NVarChar, `%${opts.search}%`);
           if (opts.status && ['draft', 'published', 'archived', 'deleted'].includes(opts.status)) countReq.input('status', sql.NVarChar, opts.status);
           if (opts.category) countReq.input('category', sql.NVarChar, opts.category);
           if (opts.level && ['beginner', 'intermediate', 'advanced', 'expert'].includes(opts.level)) countReq.input('level', sql.NVarChar, opts.level);
           if (opts.instructorId) countReq.input('instructorId', sql.UniqueIdentifier, opts.instructorId);
-          return countReq.query(`SELECT COUNT(*) AS total FROM dbo.Courses c ${whereClause}`);
-        })(),
+          const countResult = await countReq.query(`SELECT COUNT(*) AS total FROM dbo.Courses c ${whereClause}`);
+          return countResult.recordset[0]?.total || 0;
+        }),
       ]);
 
-      const total = countResult.recordset[0]?.total || 0;
+      const { rows, hasNext, nextCursor } = takeKeysetPage(dataResult.recordset, limit, sortKey, 'id');
       const totalPages = Math.ceil(total / limit);
 
-      logger.info('Admin: fetched courses', { page, limit, total });
+      logger.info('Admin: fetched courses', { page, limit, total, cursor: Boolean(opts.cursor) });
       return {
-        courses: dataResult.recordset,
-        pagination: { page, limit, total, totalPages, hasNext: page < totalPages, hasPrev: page > 1 },
+        courses: rows,
+        pagination: { page, limit, total, totalPages, hasNext, hasPrev: page > 1 || Boolean(opts.cursor), nextCursor },
       };
     } catch (error) {
       logger.error('AdminService.getCourses failed', { error });
@@ -954,6 +1012,9 @@ export class AdminService {
         VALUES (@courseId, @fromId, @toId, 'admin_action', @adminId)
       `);
 
+      CourseEventService.getInstance().invalidateUserCourseRooms(oldInstructorId);
+      CourseEventService.getInstance().invalidateUserCourseRooms(newInstructorId);
+
       logger.info('Admin: reassigned course', { courseId, from: oldInstructorId, to: newInstructorId, adminId });
     } catch (error) {
       logger.error('AdminService.reassignCourse failed', { error, courseId, newInstructorId });
@@ -989,6 +1050,7 @@ export class AdminService {
   async getTransactions(opts: {
     page?: number;
     limit?: number;
+    cursor?: string;
     search?: string;
     status?: string;
     dateFrom?: string;
@@ -1016,14 +1078,7 @@ export class AdminService {
       completedAt: string | null;
       refundedAt: string | null;
     }>;
-    pagination: {
-      page: number;
-      limit: number;
-      total: number;
-      totalPages: number;
-      hasNext: boolean;
-      hasPrev: boolean;
-    };
+    pagination: AdminPagination;
   }> {
     try {
       const page = Math.max(1, opts.page || 1);
@@ -1032,8 +1087,6 @@ export class AdminService {
 
       const conditions: string[] = [];
       const request = await this.db.getRequest();
-      request.input('offset', sql.Int, offset);
-      request.input('limit', sql.Int, limit);
 
       if (opts.search) {
         conditions.push(`(u.Email LIKE @search OR u.FirstName LIKE @search OR u.LastName LIKE @search OR c.Title LIKE @search)`);
@@ -1060,21 +1113,27 @@ export class AdminService {
         request.input('userId', sql.UniqueIdentifier, opts.userId);
       }
 
-      const whereClause = conditions.length > 0 ? `WHERE ${conditions.join(' AND ')}` : '';
+      const filterClause = conditions.join(' AND ');
+      const whereClause = conditions.length > 0 ? `WHERE ${filterClause}` : '';
 
-      const allowedSorts: Record<string, string> = {
-        date: 't.CreatedAt',
-        amount: 't.Amount',
-        status: 't.Status',
-        user: 'u.Email',
-        course: 'c.Title',
+      const allowedSorts: Record<string, KeysetSort> = {
+        date: { expr: 't.CreatedAt', type: 'date' },
+        amount: { expr: 't.Amount', type: 'value' },
+        status: { expr: 't.Status', type: 'value' },
+        user: { expr: 'u.Email', type: 'value' },
+        course: { expr: 'c.Title', type: 'value' },
       };
-      const sortCol = allowedSorts[opts.sortBy || 'date'] || 't.CreatedAt';
+      const sortName = allowedSorts[opts.sortBy || 'date'] ? (opts.sortBy || 'date') : 'date';
+      const sort = allowedSorts[sortName];
       const sortDir = opts.sortOrder === 'asc' ? 'ASC' : 'DESC';
+      const sortKey = `${sortName}:${sortDir}`;
+
+      const pageWhere = this.applyKeyset(request, opts.cursor, sortKey, sort, 't.Id', sortDir, filterClause, offset, limit);
 
-      const [dataResult, countResult] = await Promise.all([
+      const [dataResult, total] = await Promise.all([
         request.query(`
           SELECT
+            ${cursorKeyExpr(sort)} AS cursorKey,
             t.Id AS id,
             t.UserId AS userId,
             LTRIM(RTRIM(ISNULL(u.FirstName, '') + ' ' + ISNULL(u.LastName, ''))) AS userName,
@@ -1094,11 +1153,11 @@ export class AdminService {
           FROM dbo.Transactions t
           JOIN dbo.Users u ON u.Id = t.UserId
           JOIN dbo.Courses c ON c.Id = t.CourseId
-          ${whereClause}
-          ORDER BY ${sortCol} ${sortDir}
+          ${pageWhere}
+          ORDER BY ${sort.expr} ${sortDir}, t.Id ${sortDir}
           OFFSET @offset ROWS FETCH NEXT @limit ROWS ONLY
         `),
-        (async () => {
+        getCachedTotal(`admin:transactions:${JSON.stringify([opts.search, opts.status, opts.dateFrom, opts.dateTo, opts.courseId, opts.userId])}`, async () => {
           const countReq = await this.db.getRequest();
           if (opts.search) countReq.input('search', sql.NVarChar, `%${opts.search}%`);
           if (opts.status && ['pending', 'completed', 'failed', 'refunded'].includes(opts.status)) countReq.input('status', sql.NVarChar, opts.status);
@@ -1106,23 +1165,24 @@ export class AdminService {
           if (opts.dateTo) countReq.input('dateTo', sql.DateTime2, opts.dateTo);
           if (opts.courseId) countReq.input('courseId', sql.UniqueIdentifier, opts.courseId);
           if (opts.userId) countReq.input('userId', sql.UniqueIdentifier, opts.userId);
-          return countReq.query(`
+          const countResult = await countReq.query(`
             SELECT COUNT(*) AS total
             FROM dbo.Transactions t
             JOIN dbo.Users u ON u.Id = t.UserId
             JOIN dbo.Courses c ON c.Id = t.CourseId
             ${whereClause}
           `);
-        })(),
+          return countResult.recordset[0]?.total || 0;
+        }),
       ]);
 
-      const total = countResult.recordset[0]?.total || 0;
+      const { rows, hasNext, nextCursor } = takeKeysetPage(dataResult.recordset, limit, sortKey, 'id');
       const totalPages = Math.ceil(total / limit);
 
-      logger.info('Admin: fetched transactions', { page, limit, total });
+      logger.info('Admin: fetched transactions', { page, limit, total, cursor: Boolean(opts.cursor) });
       return {
-        transactions: dataResult.recordset,
-        pagination: { page, limit, total, totalPages, hasNext: page < totalPages, hasPrev: page > 1 },
+        transactions: rows,
+        pagination: { page, limit, total, totalPages, hasNext, hasPrev: page > 1 || Boolean(opts.cursor), nextCursor },
       };
     } catch (error) {
       logger.error('AdminService.getTransactions failed', { error });
@@ -1367,6 +1427,15 @@ export class AdminService {
       loggedInToday: number;
       loggedInThisWeek: number;
     };
+    caches: CacheStats[];
+    queues: WorkQueueStats[];
+    videoProgressBuffer: VideoProgressBufferStats;
+    presence: PresenceStats;
+    chatReadReceipts: ChatReadReceiptStats;
+    latencies: LatencySummary[];
+    governors: RequestGovernorStats[];
+    cluster: SocketClusterStats;
+    leaderElection: LeaderElectionStats;
   }> {
     try {
       const [statsReq, activityReq, userSummaryReq] = await Promise.all([
@@ -1424,6 +1493,20 @@ export class AdminService {
           loggedInToday: userSum.loggedInToday,
           loggedInThisWeek: userSum.loggedInThisWeek,
         },
+        // In-process cache hit rates (auth user rows, ...) for this server node
+        caches: TtlLruCache.getAllStats(),
+        // Background job queues (notification emails, ...) for this server node
+        queues: WorkQueue.getAllStats(),
+        videoProgressBuffer: VideoProgressBuffer.getInstance().getStats(),
+        presence: PresenceService.getStats(),
+        chatReadReceipts: ChatReadReceiptBuffer.getInstance().getStats(),
+        // Rolling latency summaries (socket handshakes, ...) for this server node
+        latencies: LatencyStats.getAllStats(),
+        // Concurrency / token-rate limits on outbound API calls (OpenAI feedback, ...)
+        governors: RequestGovernor.getAllStats(),
+        // Socket.IO adapter / cross-node bus and scheduler leadership of this node
+        cluster: SocketClusterService.getStats(),
+        leaderElection: LeaderElectionService.getInstance().getStats(),
       };
     } catch (error) {
       logger.error('AdminService.getSystemHealth failed', { error });
@@ -1438,6 +1521,7 @@ export class AdminService {
   async getAuditLog(opts: {
     page?: number;
     limit?: number;
+    cursor?: string;
     type?: string; // 'all' | 'deletion' | 'ownership'
   } = {}): Promise<{
     entries: Array<{
@@ -1447,7 +1531,7 @@ export class AdminService {
       details: string;
       timestamp: string;
     }>;
-    pagination: { page: number; limit: number; total: number; totalPages: number; hasNext: boolean; hasPrev: boolean };
+    pagination: AdminPagination;
   }> {
     try {
       const page = Math.max(1, opts.page || 1);
@@ -1496,43 +1580,49 @@ export class AdminService {
       if (cteFragments.length === 0) {
         return {
           entries: [],
-          pagination: { page, limit, total: 0, totalPages: 0, hasNext: false, hasPrev: false },
+          pagination: { page, limit, total: 0, totalPages: 0, hasNext: false, hasPrev: false, nextCursor: null },
         };
       }
 
       const unionSql = cteFragments.join(' UNION ALL ');
 
-      // Data query
+      // Data query (newest first; keyset continues from (timestamp, id))
+      const sort: KeysetSort = { expr: 'timestamp', type: 'date' };
+      const sortKey = `timestamp:${typeFilter}`;
       const dataReq = await this.db.getRequest();
-      dataReq.input('offset', sql.Int, offset);
-      dataReq.input('limit', sql.Int, limit);
+      const pageWhere = this.applyKeyset(dataReq, opts.cursor, sortKey, sort, 'id', 'DESC', '', offset, limit, sql.NVarChar);
       const dataResult = await dataReq.query(`
         WITH AuditCTE AS (${unionSql})
-        SELECT * FROM AuditCTE
-        ORDER BY timestamp DESC
+        SELECT ${cursorKeyExpr(sort)} AS cursorKey, * FROM AuditCTE
+        ${pageWhere}
+        ORDER BY timestamp DESC, id DESC
         OFFSET @offset ROWS FETCH NEXT @limit ROWS ONLY
       `);
 
       // Count query
-      const countReq = await this.db.getRequest();
-      const countResult = await countReq.query(`
-        WITH AuditCTE AS (${unionSql})
-        SELECT COUNT(*) AS total FROM AuditCTE
-      `);
+      const total = await getCachedTotal(`admin:audit:${typeFilter}`, async () => {
+        const countReq = await this.db.getRequest();
+        const countResult = await countReq.query(`
+          WITH AuditCTE AS (${unionSql})
+          SELECT COUNT(*) AS total FROM AuditCTE
+        `);
+        return countResult.recordset[0].total;
+      });
 
-      const total = countResult.recordset[0].total;
+      const { rows, hasNext, nextCursor } = takeKeysetPage(dataResult.recordset, limit, sortKey, 'id');
       const totalPages = Math.ceil(total / limit);
 
-      logger.info('Admin: fetched audit log', { page, total, type: typeFilter });
+      logger.info('Admin: fetched audit log', { page, total, type: typeFilter, cursor: Boolean(opts.cursor) });
       return {
-        entries: dataResult.recordset,
+        entries: rows,
         pagination: {
           page,
           limit,
           total,
           totalPages,
-          hasNext: page < totalPages,
-          hasPrev: page > 1,
+          hasNext,
+          hasPrev: page > 1 || Boolean(opts.cursor),
+          nextCursor,
         },
       };
     } catch (error) {
@@ -0,0 +1,209 @@
+import sql from 'mssql';
+import { DatabaseService } from './DatabaseService';
+import { LatencyStats } from '../utils/LatencyStats';
+import { logger } from '../utils/logger';
+
+/**
+ * AssessmentAnswerService — per-question answer storage for in-progress submissions
+ *
+ * dbo.AssessmentAnswers holds one row per (submission, question), so saving an answer
+ * touches only that row instead of reading, re-serializing and rewriting the whole
+ * Answers JSON (which also let two tabs overwrite each other's answers).
+ *
+ * Writes are coalesced per submission: while one batch is being written, further
+ * deltas for the same submission are merged (last value per question wins) and written
+ * together as the next batch. Each batch is one MERGE that only applies to the
+ * submission while it is still in progress and only to questions of its assessment.
+ *
+ * At submit, gradeSubmission() scores every question in one query over those rows.
+ * AssessmentSubmissions.Answers remains the snapshot written when a submission completes.
+ */
+
+export interface AnswerDelta {
+  questionId: string;
+  answer: any; // null, undefined or '' clears the saved answer
+  timeSpent?: number | null; // seconds spent on the question, when the client tracks it
+}
+
+export interface GradedAnswer {
+  QuestionId: string;
+  Type: string;
+  CorrectAnswer: string; // JSON
+  Difficulty: number;
+  AdaptiveWeight: number | null;
+  Tags: string | null; // JSON array
+  Answer: string | null; // JSON; null when unanswered
+  TimeSpent: number | null;
+  IsCorrect: boolean;
+}
+
+interface PendingBatch {
+  deltas: Map<string, { questionId: string; answer: string | null; timeSpent: number | null }>;
+  promise: Promise<void>;
+  resolve: () => void;
+  reject: (error: unknown) => void;
+}
+
+export const MAX_ANSWER_DELTAS = 200; // Per request
+const MAX_ANSWER_LENGTH = 100000; // Characters of serialized JSON per answer
+
+const saveLatency = new LatencyStats('assessmentAnswerSave');
+
+export class AssessmentAnswerService {
+  private static pending = new Map<string, PendingBatch>();
+  private static flushing = new Set<string>();
+
+  /**
+   * Whether a value can be saved as an answer (JSON-serializable and not oversized)
+   */
+  static isValidAnswer(answer: any): boolean {
+    if (answer === undefined || answer === null) {
+      return true;
+    }
+    try {
+      const json = JSON.stringify(answer);
+      return json !== undefined && json.length <= MAX_ANSWER_LENGTH;
+    } catch {
+      return false;
+    }
+  }
+
+  /**
+   * Save answer deltas for an in-progress submission. Resolves once the batch that
+   * contains them has been written.
+   */
+  static saveAnswers(submissionId: string, deltas: AnswerDelta[]): Promise<void> {
+    if (deltas.length === 0) {
+      return Promise.resolve();
+    }
+
+    let batch = this.pending.get(submissionId);
+    if (!batch) {
+      let resolve!: () => void;
+      let reject!: (error: unknown) => void;
+      const promise = new Promise<void>((res, rej) => {
+        resolve = res;
+        reject = rej;
+      });
+      batch = { deltas: new Map(), promise, resolve, reject };
+      this.pending.set(submissionId, batch);
+    }
+
+    for (const delta of deltas) {
+      const previous = batch.deltas.get(delta.questionId);
+      batch.deltas.set(delta.questionId, {
+        questionId: delta.questionId,
+        answer: delta.answer === undefined || delta.answer === null || delta.answer === '' ? null : JSON.stringify(delta.answer),
+        timeSpent: delta.timeSpent ?? previous?.timeSpent ?? null
+      });
+    }
+
+    if (!this.flushing.has(submissionId)) {
+      void this.flush(submissionId);
+    }
+    return batch.promise;
+  }
+
+  /**
+   * Write pending batches for a submission one at a time until none are left
+   */
+  private static async flush(submissionId: string): Promise<void> {
+    this.flushing.add(submissionId);
+    try {
+      let batch: PendingBatch | undefined;
+      while ((batch = this.pending.get(submissionId))) {
+        this.pending.delete(submissionId);
+        const startedAt = Date.now();
+        try {
+          await this.writeBatch(submissionId, [...batch.deltas.values()]);
+          saveLatency.record(Date.now() - startedAt);
+          batch.resolve();
+        } catch (error) {
+          logger.error('[AssessmentAnswerService] Failed to save answers', { submissionId, count: batch.deltas.size, error });
+          batch.reject(error);
+        }
+      }
+    } finally {
+      this.flushing.delete(submissionId);
+    }
+  }
+
+  private static async writeBatch(
+    submissionId: string,
+    deltas: Array<{ questionId: string; answer: string | null; timeSpent: number | null }>
+  ): Promise<void> {
+    await (await DatabaseService.getInstance().getRequest())
+      .input('SubmissionId', sql.UniqueIdentifier, submissionId)
+      .input('Deltas', sql.NVarChar(sql.MAX), JSON.stringify(deltas))
+      .query(`
+        MERGE dbo.AssessmentAnswers WITH (HOLDLOCK) AS target
+        USING (
+          SELECT d.QuestionId, d.Answer, d.TimeSpent
+          FROM OPENJSON(@Deltas) WITH (
+            QuestionId UNIQUEIDENTIFIER '$.questionId',
+            Answer NVARCHAR(MAX) '$.answer',
+            TimeSpent INT '$.timeSpent'
+          ) d
+          INNER JOIN dbo.AssessmentSubmissions s ON s.Id = @SubmissionId AND s.Status = 'in_progress'
+          INNER JOIN dbo.Questions q ON q.Id = d.QuestionId AND q.AssessmentId = s.AssessmentId
+        ) AS source
+        ON target.SubmissionId = @SubmissionId AND target.QuestionId = source.QuestionId
+        WHEN MATCHED AND source.Answer IS NULL THEN
+          DELETE
+        WHEN MATCHED THEN
+          UPDATE SET
+            Answer = source.Answer,
+            TimeSpent = ISNULL(source.TimeSpent, target.TimeSpent),
+            UpdatedAt = SYSUTCDATETIME()
+        WHEN NOT MATCHED AND source.Answer IS NOT NULL THEN
+          INSERT (SubmissionId, QuestionId, Answer, TimeSpent, UpdatedAt)
+          VALUES (@SubmissionId, source.QuestionId, source.Answer, source.TimeSpent, SYSUTCDATETIME());
+      `);
+  }
+
+  /**
+   * Every question of the assessment with the submission's saved answer and whether it is
+   * correct, scored in one query: multiple choice / true-false need the same JSON value
+   * (type and case-sensitive text), short answers compare trimmed and case-insensitively.
+   * Other question types are not auto-graded.
+   */
+  static async gradeSubmission(submissionId: string, assessmentId: string): Promise<GradedAnswer[]> {
+    const rows = await DatabaseService.getInstance().query<GradedAnswer>(`
+      SELECT
+        q.Id AS QuestionId, q.Type, q.CorrectAnswer, q.Difficulty, q.AdaptiveWeight, q.Tags,
+        a.Answer, a.TimeSpent,
+        CAST(CASE
+          WHEN a.Answer IS NULL THEN 0
+          WHEN q.Type IN ('multiple_choice', 'true_false') THEN
+            CASE WHEN ua.[type] = ca.[type] AND ua.[value] = ca.[value] COLLATE Latin1_General_BIN2 THEN 1 ELSE 0 END
+          WHEN q.Type = 'short_answer' THEN
+            CASE WHEN ua.[type] = 1 AND ca.[type] = 1
+                  AND LOWER(LTRIM(RTRIM(ua.[value]))) = LOWER(LTRIM(RTRIM(ca.[value]))) COLLATE Latin1_General_BIN2
+                 THEN 1 ELSE 0 END
+          ELSE 0
+        END AS BIT) AS IsCorrect
+      FROM dbo.Questions q
+      LEFT JOIN dbo.AssessmentAnswers a ON a.SubmissionId = @submissionId AND a.QuestionId = q.Id
+      OUTER APPLY (SELECT TOP 1 [value], [type] FROM OPENJSON(CONCAT('[', a.Answer, ']'))) ua
+      OUTER APPLY (SELECT TOP 1 [value], [type] FROM OPENJSON(CONCAT('[', q.CorrectAnswer, ']'))) ca
+      WHERE q.AssessmentId = @assessmentId
+      ORDER BY q.OrderIndex
+    `, { submissionId, assessmentId });
+
+    return rows.map(row => ({ ...row, IsCorrect: Boolean(row.IsCorrect) }));
+  }
+
+  /**
+   * Answers object (question id -> answer) of graded rows, as stored in
+   * AssessmentSubmissions.Answers
+   */
+  static toAnswersObject(graded: GradedAnswer[]): Record<string, any> {
+    const answers: Record<string, any> = {};
+    for (const row of graded) {
+      if (row.Answer !== null) {
+        answers[row.QuestionId] = JSON.parse(row.Answer);
+      }
+    }
+    return answers;
+  }
+}
@@ -1,6 +1,11 @@
+import crypto from 'crypto';
+import sql from 'mssql';
 import OpenAI from 'openai';
 import { DatabaseService } from './DatabaseService';
 import { AITutoringService } from './AITutoringService';
+import { TtlLruCache } from '../utils/TtlLruCache';
+import { RequestGovernor } from '../utils/RequestGovernor';
+import { LatencyStats } from '../utils/LatencyStats';
 
 export interface QuestionAnalysis {
   questionId: string;
@@ -36,6 +41,140 @@ export interface AssessmentFeedbackAnalysis {
   motivationalMessage: string;
 }
 
+/**
+ * Explanation of one (question, answer) pair. It depends only on the question and the
+ * normalized answer, never on the student, so it is shared by everyone who gives that answer.
+ */
+interface QuestionInsights {
+  personalizedExplanation: string;
+  conceptsToReview: string[];
+  improvementSuggestions: string[];
+  commonMistakes: string[];
+}
+
+interface QuestionItem {
+  question: any;
+  questionFeedback: any;
+  userAnswer: any;
+  answerHash: string;
+}
+
+/**
+ * Feedback engine: per-question explanations are cached by (question, normalized answer,
+ * model) in memory (LRU) and in dbo.AIFeedbackCache, identical misses from concurrent
+ * submissions share one generation, and the remaining misses are sent
+ * AI_FEEDBACK_BATCH_SIZE questions per structured-output completion. Every OpenAI call
+ * goes through one process-wide RequestGovernor (concurrency + tokens per minute), so cost
+ * and latency grow with distinct mistakes rather than with submissions.
+ */
+const FEEDBACK_MODEL = process.env.AI_FEEDBACK_MODEL || 'gpt-4o-mini';
+const BATCH_SIZE = Math.max(1, parseInt(process.env.AI_FEEDBACK_BATCH_SIZE || '8', 10));
+const TOKENS_PER_BATCH_ITEM = 350; // Output budget per question in a batch
+
+const insightsCache = new TtlLruCache<string, QuestionInsights>(
+  'aiFeedbackInsights',
+  parseInt(process.env.AI_FEEDBACK_CACHE_MAX || '5000', 10),
+  parseInt(process.env.AI_FEEDBACK_CACHE_TTL_MS || '86400000', 10)
+);
+
+// Generations in flight, by cache key; concurrent submissions with the same mistake await one call
+const inflightInsights = new Map<string, Promise<QuestionInsights | null>>();
+
+const openAIGovernor = new RequestGovernor(
+  'openaiFeedback',
+  parseInt(process.env.AI_FEEDBACK_MAX_CONCURRENT || '4', 10),
+  parseInt(process.env.AI_FEEDBACK_TOKENS_PER_MINUTE || '60000', 10),
+  parseInt(process.env.AI_FEEDBACK_MAX_WAITING || '200', 10)
+);
+
+const batchLatency = new LatencyStats('aiFeedbackBatch');
+const feedbackLatency = new LatencyStats('aiFeedbackSubmission');
+
+const INSIGHTS_SCHEMA = {
+  type: 'object',
+  properties: {
+    items: {
+      type: 'array',
+      items: {
+        type: 'object',
+        properties: {
+          key: { type: 'string' },
+          personalizedExplanation: { type: 'string' },
+          conceptsToReview: { type: 'array', items: { type: 'string' } },
+          improvementSuggestions: { type: 'array', items: { type: 'string' } },
+          commonMistakes: { type: 'array', items: { type: 'string' } }
+        },
+        required: ['key', 'personalizedExplanation', 'conceptsToReview', 'improvementSuggestions', 'commonMistakes'],
+        additionalProperties: false
+      }
+    }
+  },
+  required: ['items'],
+  additionalProperties: false
+};
+
+// Question types whose text answers are compared exactly (case and whitespace matter)
+const EXACT_ANSWER_TYPES = new Set(['code']);
+// Question types whose array answers are a selection rather than a sequence
+const UNORDERED_ANSWER_TYPES = new Set(['multiple_choice']);
+
+/**
+ * Canonical form of an answer for its question type: object key order never makes two
+ * answers different; case and surrounding/repeated whitespace don't except for code;
+ * element order only doesn't for multi-select (drag_drop and fill_blank keep their order)
+ */
+function normalizeAnswer(answer: any, type: string): string {
+  if (answer === null || answer === undefined) {
+    return '';
+  }
+  if (Array.isArray(answer)) {
+    const items = answer.map(item => normalizeAnswer(item, type));
+    return JSON.stringify(UNORDERED_ANSWER_TYPES.has(type) ? items.sort() : items);
+  }
+  if (typeof answer === 'object') {
+    return JSON.stringify(Object.keys(answer).sort().map(key => [key, normalizeAnswer(answer[key], type)]));
+  }
+  if (EXACT_ANSWER_TYPES.has(type)) {
+    return String(answer);
+  }
+  return String(answer).trim().replace(/\s+/g, ' ').toLowerCase();
+}
+
+/**
+ * Cache key material. Includes the question's text and correct answer, so editing a
+ * question retires its cached explanations.
+ */
+function answerHash(question: any, questionFeedback: any, userAnswer: any): string {
+  return crypto.createHash('sha256').update(JSON.stringify([
+    String(question.Id).toUpperCase(),
+    question.Type,
+    question.Question,
+    normalizeAnswer(questionFeedback.correctAnswer, question.Type),
+    Boolean(questionFeedback.isCorrect),
+    normalizeAnswer(userAnswer, question.Type)
+  ])).digest('hex');
+}
+
+function cacheKey(hash: string): string {
+  return `${FEEDBACK_MODEL}|${hash}`;
+}
+
+function difficultyLabel(difficulty: any): 'Easy' | 'Medium' | 'Hard' {
+  if (difficulty === 'Easy' || difficulty === 'Medium' || difficulty === 'Hard') {
+    return difficulty;
+  }
+  const value = Number(difficulty);
+  if (!Number.isFinite(value)) {
+    return 'Medium';
+  }
+  return value <= 3 ? 'Easy' : value <= 6 ? 'Medium' : 'Hard';
+}
+
+// Rough prompt size for the governor (about 4 characters per token)
+function estimateTokens(prompt: string, maxTokens: number): number {
+  return Math.ceil(prompt.length / 4) + maxTokens;
+}
+
 export class AssessmentFeedbackService {
   private openai: OpenAI;
   private db: DatabaseService;
@@ -43,12 +182,13 @@ export class AssessmentFeedbackService {
 
   constructor() {
     const apiKey = process.env.OPENAI_API_KEY;
+    const baseURL = process.env.OPENAI_BASE_URL || undefined;
     
-    if (!apiKey || apiKey === 'your-openai-api-key-here') {
+    if (!baseURL && (!apiKey || apiKey === 'your-openai-api-key-here')) {
       console.warn('⚠️ OpenAI API key not configured for AI feedback. Falling back to basic feedback.');
       this.openai = null as any;
     } else {
-      this.openai = new OpenAI({ apiKey });
+      this.openai = new OpenAI({ apiKey: apiKey || 'local-stub', baseURL });
     }
     
     this.db = DatabaseService.getInstance();
@@ -99,139 +239,325 @@ export class AssessmentFeedbackService {
     questions: any[],
     userContext: any
   ): Promise<AssessmentFeedbackAnalysis> {
+    const startedAt = Date.now();
     const feedback = JSON.parse(submission.Feedback || '{}');
     const answers = JSON.parse(submission.Answers || '{}');
-    
-    // Analyze each question
-    const questionAnalyses = await Promise.all(
-      questions.map(async (question) => {
-        const questionFeedback = feedback[question.Id];
-        if (!questionFeedback) {
-          return null;
-        }
 
-        return await this.analyzeQuestionWithAI(
-          question,
-          questionFeedback,
-          answers[question.Id],
-          userContext
-        );
-      })
-    );
-
-    const validAnalyses = questionAnalyses.filter(Boolean) as QuestionAnalysis[];
+    const items: QuestionItem[] = questions
+      .filter(question => feedback[question.Id])
+      .map(question => ({
+        question,
+        questionFeedback: feedback[question.Id],
+        userAnswer: answers[question.Id],
+        answerHash: answerHash(question, feedback[question.Id], answers[question.Id])
+      }));
+
+    // Analyze each question (cached, deduplicated and batched)
+    const insights = await this.getQuestionInsights(items, assessment, userContext);
+
+    const validAnalyses = items.map((item, index) => {
+      const itemInsights = insights[index];
+      if (!itemInsights) {
+        return this.generateBasicQuestionAnalysis(item.question, item.questionFeedback, item.userAnswer);
+      }
+      return {
+        questionId: item.question.Id,
+        question: item.question.Question,
+        userAnswer: item.userAnswer,
+        correctAnswer: item.questionFeedback.correctAnswer,
+        isCorrect: item.questionFeedback.isCorrect,
+        explanation: item.question.Explanation,
+        aiInsights: {
+          personalizedExplanation: itemInsights.personalizedExplanation || 'Great effort on this question!',
+          conceptsToReview: itemInsights.conceptsToReview,
+          improvementSuggestions: itemInsights.improvementSuggestions,
+          difficulty: difficultyLabel(item.question.Difficulty),
+          commonMistakes: itemInsights.commonMistakes
+        }
+      };
+    });
 
-    // Generate overall assessment analysis
-    const overallAnalysis = await this.generateOverallAnalysisWithAI(
+    // Overall analysis, performance insights and motivational message (student-specific, one call)
+    const summary = await this.generateSubmissionSummaryWithAI(
       submission,
       assessment,
       validAnalyses,
       userContext
     );
 
-    // Generate performance insights
-    const performanceInsights = await this.generatePerformanceInsightsWithAI(
-      submission,
-      validAnalyses,
-      userContext
-    );
-
-    // Generate motivational message
-    const motivationalMessage = await this.generateMotivationalMessage(
-      submission,
-      assessment,
-      userContext
-    );
+    feedbackLatency.record(Date.now() - startedAt);
 
     return {
-      overallAnalysis,
-      questionAnalyses: validAnalyses,
-      performanceInsights,
-      motivationalMessage
+      ...summary,
+      questionAnalyses: validAnalyses
     };
   }
 
   /**
-   * Analyze individual question with AI
+   * Explanations for each item (null where AI generation failed), in item order.
+   * Memory cache → in-flight generation → dbo.AIFeedbackCache → batched completions.
    */
-  private async analyzeQuestionWithAI(
-    question: any,
-    questionFeedback: any,
-    userAnswer: any,
+  private async getQuestionInsights(
+    items: QuestionItem[],
+    assessment: any,
     userContext: any
-  ): Promise<QuestionAnalysis> {
-    try {
-      const prompt = `Analyze this student's answer and provide detailed feedback:
+  ): Promise<Array<QuestionInsights | null>> {
+    const pending = new Map<string, Promise<QuestionInsights | null>>();
+    const misses: QuestionItem[] = [];
+    const missKeys = new Set<string>();
+
+    for (const item of items) {
+      const key = cacheKey(item.answerHash);
+      if (pending.has(key) || missKeys.has(key)) {
+        continue; // Same answer to the same question twice in one submission
+      }
+      const cached = insightsCache.get(key);
+      if (cached) {
+        pending.set(key, Promise.resolve(cached));
+        continue;
+      }
+      const inflight = inflightInsights.get(key);
+      if (inflight) {
+        pending.set(key, inflight);
+        continue;
+      }
+      misses.push(item);
+      missKeys.add(key);
+    }
+
+    if (misses.length > 0) {
+      const resolved = this.resolveMisses(misses, assessment, userContext);
+      for (const item of misses) {
+        const key = cacheKey(item.answerHash);
+        const promise = resolved
+          .then(results => results.get(item.answerHash) || null)
+          .catch(() => null)
+          .finally(() => inflightInsights.delete(key));
+        inflightInsights.set(key, promise);
+        pending.set(key, promise);
+      }
+    }
 
-Question: "${question.QuestionText}"
-Question Type: ${question.Type}
-Correct Answer: ${JSON.stringify(questionFeedback.correctAnswer)}
-Student Answer: ${JSON.stringify(userAnswer)}
-Is Correct: ${questionFeedback.isCorrect}
-Question Difficulty: ${question.Difficulty || 'Medium'}
+    return Promise.all(items.map(item => pending.get(cacheKey(item.answerHash))!));
+  }
 
-Student Context:
-- Course: ${userContext.course?.title}
-- Level: ${userContext.course?.level}
-- Previous Performance: ${userContext.averageScore}%
+  /**
+   * Look the misses up in dbo.AIFeedbackCache, generate the rest in batches and persist them
+   */
+  private async resolveMisses(
+    misses: QuestionItem[],
+    assessment: any,
+    userContext: any
+  ): Promise<Map<string, QuestionInsights>> {
+    const results = await this.loadPersistedInsights(misses.map(item => item.answerHash));
+
+    const toGenerate = misses.filter(item => !results.has(item.answerHash));
+    if (toGenerate.length > 0) {
+      const batches: QuestionItem[][] = [];
+      for (let i = 0; i < toGenerate.length; i += BATCH_SIZE) {
+        batches.push(toGenerate.slice(i, i + BATCH_SIZE));
+      }
 
-Provide a JSON response with:
-1. personalizedExplanation: Clear explanation tailored to this student
+      const generated = new Map<string, QuestionInsights>();
+      await Promise.all(batches.map(async batch => {
+        const batchResults = await this.generateInsightsBatch(batch, assessment, userContext);
+        batchResults.forEach((value, hash) => generated.set(hash, value));
+      }));
+
+      await this.persistInsights(toGenerate, generated);
+      generated.forEach((value, hash) => results.set(hash, value));
+    }
+
+    results.forEach((value, hash) => insightsCache.set(cacheKey(hash), value));
+    return results;
+  }
+
+  /**
+   * One structured-output completion for up to AI_FEEDBACK_BATCH_SIZE questions.
+   * Items missing from the model's answer are left out (they fall back to basic feedback
+   * and are retried on the next request).
+   */
+  private async generateInsightsBatch(
+    batch: QuestionItem[],
+    assessment: any,
+    userContext: any
+  ): Promise<Map<string, QuestionInsights>> {
+    const results = new Map<string, QuestionInsights>();
+    const startedAt = Date.now();
+
+    try {
+      const questionList = batch.map((item, index) => ({
+        key: String(index + 1),
+        question: item.question.Question,
+        type: item.question.Type,
+        difficulty: difficultyLabel(item.question.Difficulty),
+        correctAnswer: item.questionFeedback.correctAnswer,
+        studentAnswer: item.userAnswer ?? null,
+        isCorrect: Boolean(item.questionFeedback.isCorrect)
+      }));
+
+      const prompt = `Analyze these answers to questions from the assessment "${assessment?.title || 'Assessment'}" and provide feedback for each one:
+
+Course: ${userContext.course?.title || 'General'}
+Course Level: ${userContext.course?.level || 'Not specified'}
+
+Questions (JSON):
+${JSON.stringify(questionList, null, 2)}
+
+For every question return an item with its "key" and:
+1. personalizedExplanation: Clear explanation of why this answer is right or wrong
 2. conceptsToReview: Array of 2-3 key concepts to study
 3. improvementSuggestions: Array of 2-3 actionable improvement tips
-4. commonMistakes: Array of common mistakes for this question type (if incorrect)
+4. commonMistakes: Array of common mistakes for this question type (empty if the answer is correct)
 
 Be encouraging and constructive. Focus on learning, not just correctness.`;
 
-      const completion = await this.openai.chat.completions.create({
-        model: 'gpt-4o-mini',
-        messages: [{ role: 'user', content: prompt }],
-        max_tokens: 800,
-        temperature: 0.7,
-        response_format: { type: "json_object" }
-      });
+      const maxTokens = Math.min(4000, TOKENS_PER_BATCH_ITEM * batch.length + 100);
+      const estimatedTokens = estimateTokens(prompt, maxTokens);
+
+      const completion = await openAIGovernor.run(estimatedTokens, () =>
+        this.openai.chat.completions.create({
+          model: FEEDBACK_MODEL,
+          messages: [{ role: 'user', content: prompt }],
+          max_tokens: maxTokens,
+          temperature: 0.7,
+          response_format: {
+            type: 'json_schema',
+            json_schema: { name: 'question_feedback', strict: true, schema: INSIGHTS_SCHEMA }
+          }
+        })
+      );
+      openAIGovernor.reconcile(estimatedTokens, completion.usage?.total_tokens ?? estimatedTokens);
+
+      const parsed = JSON.parse(completion.choices[0]?.message?.content || '{}');
+      for (const entry of parsed.items || []) {
+        const item = batch[parseInt(entry.key, 10) - 1];
+        if (!item) {
+          continue;
+        }
+        results.set(item.answerHash, {
+          personalizedExplanation: entry.personalizedExplanation || '',
+          conceptsToReview: entry.conceptsToReview || [],
+          improvementSuggestions: entry.improvementSuggestions || [],
+          commonMistakes: entry.commonMistakes || []
+        });
+      }
+      batchLatency.record(Date.now() - startedAt);
+    } catch (error) {
+      console.error(`Error analyzing ${batch.length} question(s) with AI:`, error);
+    }
 
-      const aiAnalysis = JSON.parse(completion.choices[0]?.message?.content || '{}');
+    return results;
+  }
 
-      return {
-        questionId: question.Id,
-        question: question.QuestionText,
-        userAnswer,
-        correctAnswer: questionFeedback.correctAnswer,
-        isCorrect: questionFeedback.isCorrect,
-        explanation: question.Explanation,
-        aiInsights: {
-          personalizedExplanation: aiAnalysis.personalizedExplanation || 'Great effort on this question!',
-          conceptsToReview: aiAnalysis.conceptsToReview || [],
-          improvementSuggestions: aiAnalysis.improvementSuggestions || [],
-          difficulty: question.Difficulty || 'Medium',
-          commonMistakes: aiAnalysis.commonMistakes || []
+  /**
+   * Persisted explanations for these hashes (one round trip; also marks them as used)
+   */
+  private async loadPersistedInsights(hashes: string[]): Promise<Map<string, QuestionInsights>> {
+    const results = new Map<string, QuestionInsights>();
+    try {
+      const result = await (await this.db.getRequest())
+        .input('Hashes', sql.NVarChar(sql.MAX), JSON.stringify(hashes))
+        .input('Model', sql.NVarChar(50), FEEDBACK_MODEL)
+        .query(`
+          UPDATE c
+          SET HitCount = c.HitCount + 1, LastUsedAt = SYSUTCDATETIME()
+          OUTPUT INSERTED.AnswerHash, INSERTED.Insights
+          FROM dbo.AIFeedbackCache c
+          INNER JOIN OPENJSON(@Hashes) WITH (AnswerHash CHAR(64) '$') h ON h.AnswerHash = c.AnswerHash
+          WHERE c.Model = @Model
+        `);
+
+      for (const row of result.recordset) {
+        try {
+          results.set(row.AnswerHash, JSON.parse(row.Insights));
+        } catch {
+          // Unreadable row: regenerate (the MERGE in persistInsights overwrites it)
         }
-      };
+      }
+    } catch (error) {
+      console.error('Error loading cached AI feedback:', error);
+    }
+    return results;
+  }
+
+  /**
+   * Save new explanations with one MERGE
+   */
+  private async persistInsights(items: QuestionItem[], insights: Map<string, QuestionInsights>): Promise<void> {
+    const rows = items
+      .filter(item => insights.has(item.answerHash))
+      .map(item => ({
+        questionId: item.question.Id,
+        answerHash: item.answerHash,
+        insights: JSON.stringify(insights.get(item.answerHash))
+      }));
+    if (rows.length === 0) {
+      return;
+    }
+
+    try {
+      await (await this.db.getRequest())
+        .input('Rows', sql.NVarChar(sql.MAX), JSON.stringify(rows))
+        .input('Model', sql.NVarChar(50), FEEDBACK_MODEL)
+        .query(`
+          MERGE dbo.AIFeedbackCache WITH (HOLDLOCK) AS target
+          USING (
+            SELECT QuestionId, AnswerHash, Insights
+            FROM OPENJSON(@Rows) WITH (
+              QuestionId UNIQUEIDENTIFIER '$.questionId',
+              AnswerHash CHAR(64) '$.answerHash',
+              Insights NVARCHAR(MAX) '$.insights'
+            )
+          ) AS source
+          ON target.AnswerHash = source.AnswerHash AND target.Model = @Model
+          WHEN MATCHED THEN
+            UPDATE SET Insights = source.Insights, LastUsedAt = SYSUTCDATETIME()
+          WHEN NOT MATCHED THEN
+            INSERT (QuestionId, AnswerHash, Model, Insights, HitCount, CreatedAt, LastUsedAt)
+            VALUES (source.QuestionId, source.AnswerHash, @Model, source.Insights, 0, SYSUTCDATETIME(), SYSUTCDATETIME());
+        `);
     } catch (error) {
-      console.error('Error analyzing question with AI:', error);
-      return this.generateBasicQuestionAnalysis(question, questionFeedback, userAnswer);
+      // Still served from memory; the next miss on another node regenerates it
+      console.error('Error saving AI feedback cache:', error);
     }
   }
 
   /**
-   * Generate overall assessment analysis with AI
+   * Delete persisted explanations whose question no longer exists (assessment, lesson or
+   * course deleted, or the question removed in an edit). Entries touched in the last hour
+   * are kept so a prune that runs while an edit re-inserts its questions does not remove them.
+   */
+  static async pruneOrphanedInsights(): Promise<number> {
+    const result = await DatabaseService.getInstance().execute(`
+      DELETE f
+      FROM dbo.AIFeedbackCache f
+      WHERE NOT EXISTS (SELECT 1 FROM dbo.Questions q WHERE q.Id = f.QuestionId)
+        AND f.LastUsedAt < DATEADD(HOUR, -1, SYSUTCDATETIME())
+    `);
+    return result.rowsAffected[0] || 0;
+  }
+
+  /**
+   * Overall analysis, performance insights and motivational message in one completion
    */
-  private async generateOverallAnalysisWithAI(
+  private async generateSubmissionSummaryWithAI(
     submission: any,
     assessment: any,
     questionAnalyses: QuestionAnalysis[],
     userContext: any
-  ): Promise<any> {
+  ): Promise<Omit<AssessmentFeedbackAnalysis, 'questionAnalyses'>> {
+    const passed = submission.Score >= submission.PassingScore;
+
     try {
       const correctCount = questionAnalyses.filter(q => q.isCorrect).length;
       const totalQuestions = questionAnalyses.length;
-      const scorePercentage = submission.Score;
 
       const prompt = `Analyze this student's overall assessment performance:
 
 Assessment: "${assessment.title}" (${assessment.type})
-Score: ${scorePercentage}% (${correctCount}/${totalQuestions} correct)
+Result: ${passed ? 'PASSED' : 'NOT PASSED'}
+Score: ${submission.Score}% (${correctCount}/${totalQuestions} correct)
 Passing Score: ${submission.PassingScore}%
 Time Spent: ${submission.TimeSpent} seconds
 Attempt Number: ${submission.AttemptNumber}
@@ -245,119 +571,53 @@ Question Performance Summary:
 ${questionAnalyses.map((q, i) => `${i+1}. ${q.isCorrect ? '✓' : '✗'} - ${q.aiInsights.difficulty}`).join('\n')}
 
 Provide a JSON response with:
-1. strengths: Array of 2-3 specific strengths shown
-2. weaknesses: Array of 2-3 areas needing improvement
-3. nextSteps: Array of 3-4 immediate next learning steps
-4. personalizedMessage: Encouraging 2-3 sentence summary
-5. studyPlan: Array of 3-5 specific study recommendations
+1. overallAnalysis: object with
+   - strengths: Array of 2-3 specific strengths shown
+   - weaknesses: Array of 2-3 areas needing improvement
+   - nextSteps: Array of 3-4 immediate next learning steps
+   - personalizedMessage: Encouraging 2-3 sentence summary
+   - studyPlan: Array of 3-5 specific study recommendations
+2. performanceInsights: object with
+   - learningVelocity: "Fast", "Moderate", or "Slow"
+   - comprehensionLevel: "Excellent", "Good", "Fair", or "Needs Improvement"
+   - recommendedPace: Specific pacing recommendation
+   - skillGaps: Array of 2-3 specific skill gaps to address
+3. motivationalMessage: Encouraging 2-3 sentence message specific to their performance, with appropriate emoji.
+   ${passed ? 'Celebrate their success and encourage continued progress.' : 'Be supportive and encouraging about improvement opportunities.'}
 
 Be specific, actionable, and encouraging.`;
 
-      const completion = await this.openai.chat.completions.create({
-        model: 'gpt-4o-mini',
-        messages: [{ role: 'user', content: prompt }],
-        max_tokens: 1000,
-        temperature: 0.7,
-        response_format: { type: "json_object" }
-      });
+      const maxTokens = 1500;
+      const estimatedTokens = estimateTokens(prompt, maxTokens);
 
-      return JSON.parse(completion.choices[0]?.message?.content || '{}');
-    } catch (error) {
-      console.error('Error generating overall analysis:', error);
-      return this.generateBasicOverallAnalysis(submission, questionAnalyses);
-    }
-  }
+      const completion = await openAIGovernor.run(estimatedTokens, () =>
+        this.openai.chat.completions.create({
+          model: FEEDBACK_MODEL,
+          messages: [{ role: 'user', content: prompt }],
+          max_tokens: maxTokens,
+          temperature: 0.7,
+          response_format: { type: "json_object" }
+        })
+      );
+      openAIGovernor.reconcile(estimatedTokens, completion.usage?.total_tokens ?? estimatedTokens);
+
+      const parsed = JSON.parse(completion.choices[0]?.message?.content || '{}');
 
-  /**
-   * Generate performance insights with AI
-   */
-  private async generatePerformanceInsightsWithAI(
-    submission: any,
-    questionAnalyses: QuestionAnalysis[],
-    userContext: any
-  ): Promise<any> {
-    try {
-      const prompt = `Analyze learning performance and provide insights:
-
-Performance Data:
-- Current Score: ${submission.Score}%
-- Time Spent: ${submission.TimeSpent} seconds
-- Questions: ${questionAnalyses.length}
-- Correct: ${questionAnalyses.filter(q => q.isCorrect).length}
-- Average Course Performance: ${userContext.averageScore}%
-
-Question Difficulties:
-${questionAnalyses.map(q => `- ${q.aiInsights.difficulty}: ${q.isCorrect ? 'Correct' : 'Incorrect'}`).join('\n')}
-
-Provide JSON with:
-1. learningVelocity: "Fast", "Moderate", or "Slow"
-2. comprehensionLevel: "Excellent", "Good", "Fair", or "Needs Improvement"  
-3. recommendedPace: Specific pacing recommendation
-4. skillGaps: Array of 2-3 specific skill gaps to address
-
-Base recommendations on performance patterns and learning context.`;
-
-      const completion = await this.openai.chat.completions.create({
-        model: 'gpt-4o-mini',
-        messages: [{ role: 'user', content: prompt }],
-        max_tokens: 600,
-        temperature: 0.6,
-        response_format: { type: "json_object" }
-      });
-
-      return JSON.parse(completion.choices[0]?.message?.content || '{}');
-    } catch (error) {
-      console.error('Error generating performance insights:', error);
       return {
-        learningVelocity: 'Moderate',
-        comprehensionLevel: submission.Score >= 80 ? 'Good' : 'Fair',
-        recommendedPace: 'Continue at your current pace',
-        skillGaps: ['Practice more problems', 'Review fundamentals']
+        overallAnalysis: parsed.overallAnalysis || this.generateBasicOverallAnalysis(submission, questionAnalyses),
+        performanceInsights: parsed.performanceInsights || this.generateBasicPerformanceInsights(submission),
+        motivationalMessage: parsed.motivationalMessage ||
+          (passed ? '🎉 Great job! Keep up the excellent work!' : '💪 You\'re making progress! Keep learning and you\'ll succeed!')
       };
-    }
-  }
-
-  /**
-   * Generate motivational message
-   */
-  private async generateMotivationalMessage(
-    submission: any,
-    assessment: any,
-    userContext: any
-  ): Promise<string> {
-    try {
-      const passed = submission.Score >= submission.PassingScore;
-      
-      const prompt = `Generate a personalized, motivational message for this student:
-
-Assessment Result: ${passed ? 'PASSED' : 'NOT PASSED'}
-Score: ${submission.Score}%
-Attempt: ${submission.AttemptNumber}
-Course Level: ${userContext.course?.level}
-
-The message should be:
-- Encouraging and positive
-- 2-3 sentences long
-- Specific to their performance
-- Motivating for continued learning
-- Include appropriate emoji
-
-${passed ? 'Celebrate their success and encourage continued progress.' : 'Be supportive and encouraging about improvement opportunities.'}`;
-
-      const completion = await this.openai.chat.completions.create({
-        model: 'gpt-4o-mini',
-        messages: [{ role: 'user', content: prompt }],
-        max_tokens: 200,
-        temperature: 0.8
-      });
-
-      return completion.choices[0]?.message?.content || 
-        (passed ? '🎉 Great job! Keep up the excellent work!' : '💪 You\'re making progress! Keep learning and you\'ll succeed!');
     } catch (error) {
-      console.error('Error generating motivational message:', error);
-      return submission.Score >= submission.PassingScore 
-        ? '🎉 Congratulations on passing! Keep up the great work!' 
-        : '💪 Keep practicing! You\'re on the right track to success!';
+      console.error('Error generating overall analysis:', error);
+      return {
+        overallAnalysis: this.generateBasicOverallAnalysis(submission, questionAnalyses),
+        performanceInsights: this.generateBasicPerformanceInsights(submission),
+        motivationalMessage: passed 
+          ? '🎉 Congratulations on passing! Keep up the great work!' 
+          : '💪 Keep practicing! You\'re on the right track to success!'
+      };
     }
   }
 
@@ -401,7 +661,7 @@ ${passed ? 'Celebrate their success and encourage continued progress.' : 'Be sup
   private generateBasicQuestionAnalysis(question: any, questionFeedback: any, userAnswer: any): QuestionAnalysis {
     return {
       questionId: question.Id,
-      question: question.QuestionText,
+      question: question.Question,
       userAnswer,
       correctAnswer: questionFeedback.correctAnswer,
       isCorrect: questionFeedback.isCorrect,
@@ -412,12 +672,24 @@ ${passed ? 'Celebrate their success and encourage continued progress.' : 'Be sup
           : 'This one needs more practice. Review the explanation below.',
         conceptsToReview: questionFeedback.isCorrect ? [] : ['Review this topic area'],
         improvementSuggestions: questionFeedback.isCorrect ? [] : ['Practice similar questions'],
-        difficulty: question.Difficulty || 'Medium',
+        difficulty: difficultyLabel(question.Difficulty),
         commonMistakes: []
       }
     };
   }
 
+  /**
+   * Helper method to generate basic performance insights
+   */
+  private generateBasicPerformanceInsights(submission: any): AssessmentFeedbackAnalysis['performanceInsights'] {
+    return {
+      learningVelocity: 'Moderate',
+      comprehensionLevel: submission.Score >= 80 ? 'Good' : 'Fair',
+      recommendedPace: 'Continue at your current pace',
+      skillGaps: ['Practice more problems', 'Review fundamentals']
+    };
+  }
+
   /**
    * Helper method to generate basic overall analysis
    */
@@ -0,0 +1,237 @@
+import sql from 'mssql';
+import { DatabaseService } from './DatabaseService';
+import { logger } from '../utils/logger';
+import { isRowDataError } from '../utils/sqlErrors';
+
+/**
+ * ChatReadReceiptBuffer — write-behind buffer for chat read receipts
+ *
+ * Clients mark a room read every time a message arrives while it is open, so a busy
+ * course room produces one ChatParticipants UPDATE per member per message. record()
+ * keeps only the latest read time per (room, user) and flush() writes all of them with
+ * one set-based UPDATE every CHAT_READ_FLUSH_MS. The chat:read socket event is still
+ * emitted immediately by ChatService; only the LastReadAt write is deferred.
+ *
+ * LastReadAt never moves backwards. Unread counts for a user are computed from
+ * LastReadAt, so getUserRooms() calls flushUser() first; batches that fail transiently
+ * are put back for the next flush and stop() flushes on shutdown. Ids are converted
+ * with TRY_CAST, so a malformed id only fails to match; a batch the database rejects
+ * for its data anyway is retried row by row and only the rejected receipts are dropped.
+ */
+
+interface PendingReadReceipt {
+  roomId: string;
+  userId: string;
+  readAt: Date;
+}
+
+export interface ChatReadReceiptStats {
+  pendingReceipts: number;
+  flushIntervalMs: number;
+  receiptsReceived: number;
+  receiptsCoalesced: number;
+  flushes: number;
+  rowsFlushed: number;
+  flushFailures: number;
+  droppedReceipts: number;
+}
+
+const FLUSH_INTERVAL_MS = parseInt(process.env.CHAT_READ_FLUSH_MS || '2000', 10);
+const FLUSH_BATCH_SIZE = 1000;
+
+export class ChatReadReceiptBuffer {
+  private static instance: ChatReadReceiptBuffer | null = null;
+
+  private pending = new Map<string, PendingReadReceipt>();
+  private flushTimer: NodeJS.Timeout | null = null;
+  private currentFlush: Promise<void> | null = null;
+
+  private receiptsReceived = 0;
+  private receiptsCoalesced = 0;
+  private flushes = 0;
+  private rowsFlushed = 0;
+  private flushFailures = 0;
+  private droppedReceipts = 0;
+
+  static getInstance(): ChatReadReceiptBuffer {
+    if (!ChatReadReceiptBuffer.instance) {
+      ChatReadReceiptBuffer.instance = new ChatReadReceiptBuffer();
+    }
+    return ChatReadReceiptBuffer.instance;
+  }
+
+  private static key(roomId: string, userId: string): string {
+    return `${roomId.toUpperCase()}|${userId.toUpperCase()}`;
+  }
+
+  start(): void {
+    if (this.flushTimer) {
+      return;
+    }
+    this.flushTimer = setInterval(() => {
+      this.flush().catch(error => logger.error('❌ [ChatReadReceipts] Scheduled flush failed:', error));
+    }, FLUSH_INTERVAL_MS);
+    logger.info(`✅ [ChatReadReceipts] Started (flush every ${FLUSH_INTERVAL_MS}ms)`);
+  }
+
+  async stop(): Promise<void> {
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = null;
+    }
+    await this.flush();
+    logger.info('[ChatReadReceipts] Stopped — buffer flushed');
+  }
+
+  record(roomId: string, userId: string, readAt: Date): void {
+    this.receiptsReceived++;
+    const key = ChatReadReceiptBuffer.key(roomId, userId);
+    const existing = this.pending.get(key);
+    if (existing) {
+      this.receiptsCoalesced++;
+      if (readAt > existing.readAt) {
+        existing.readAt = readAt;
+      }
+      return;
+    }
+    this.pending.set(key, { roomId, userId, readAt });
+  }
+
+  /**
+   * Write one user's pending receipts now (before their unread counts are read)
+   */
+  async flushUser(userId: string): Promise<void> {
+    if (this.currentFlush) {
+      await this.currentFlush;
+    }
+    const suffix = `|${userId.toUpperCase()}`;
+    const entries: PendingReadReceipt[] = [];
+    for (const [key, entry] of this.pending) {
+      if (key.endsWith(suffix)) {
+        entries.push(entry);
+        this.pending.delete(key);
+      }
+    }
+    if (entries.length > 0) {
+      await this.writeBatches(entries);
+    }
+  }
+
+  /**
+   * Write every pending receipt. Concurrent calls share one flush.
+   */
+  flush(): Promise<void> {
+    if (this.currentFlush) {
+      return this.currentFlush;
+    }
+    if (this.pending.size === 0) {
+      return Promise.resolve();
+    }
+
+    const entries = Array.from(this.pending.values());
+    this.pending = new Map();
+
+    this.currentFlush = this.writeBatches(entries).finally(() => {
+      this.currentFlush = null;
+    });
+    return this.currentFlush;
+  }
+
+  private async writeBatches(entries: PendingReadReceipt[]): Promise<void> {
+    for (let i = 0; i < entries.length; i += FLUSH_BATCH_SIZE) {
+      const batch = entries.slice(i, i + FLUSH_BATCH_SIZE);
+      try {
+        await this.updateRows(batch);
+        this.rowsFlushed += batch.length;
+      } catch (error) {
+        this.flushFailures++;
+        if (!isRowDataError(error)) {
+          logger.error(`❌ [ChatReadReceipts] UPDATE of ${batch.length} receipt(s) failed - re-buffering`, error);
+          this.requeue(batch);
+        } else if (batch.length === 1) {
+          this.drop(batch[0], error);
+        } else {
+          logger.warn(`⚠️ [ChatReadReceipts] UPDATE of ${batch.length} receipt(s) rejected a row - retrying row by row`, error);
+          await this.writeRowByRow(batch);
+        }
+      }
+    }
+    this.flushes++;
+  }
+
+  /**
+   * Write a rejected batch one receipt at a time: receipts the database rejects are dropped,
+   * receipts that fail transiently are put back
+   */
+  private async writeRowByRow(batch: PendingReadReceipt[]): Promise<void> {
+    for (const entry of batch) {
+      try {
+        await this.updateRows([entry]);
+        this.rowsFlushed++;
+      } catch (error) {
+        if (isRowDataError(error)) {
+          this.drop(entry, error);
+        } else {
+          this.requeue([entry]);
+        }
+      }
+    }
+  }
+
+  private drop(entry: PendingReadReceipt, error: unknown): void {
+    this.droppedReceipts++;
+    logger.error(
+      `❌ [ChatReadReceipts] Dropping receipt for user ${entry.userId}, room ${entry.roomId} - rejected by the database`,
+      error
+    );
+  }
+
+  private async updateRows(batch: PendingReadReceipt[]): Promise<void> {
+    const payload = batch.map(entry => ({
+      roomId: entry.roomId,
+      userId: entry.userId,
+      readAt: entry.readAt.toISOString()
+    }));
+
+    await (await DatabaseService.getInstance().getRequest())
+      .input('Rows', sql.NVarChar(sql.MAX), JSON.stringify(payload))
+      .query(`
+        UPDATE cp
+        SET LastReadAt = CAST(j.ReadAt AS DATETIME2)
+        FROM dbo.ChatParticipants cp
+        INNER JOIN OPENJSON(@Rows) WITH (
+          RoomId NVARCHAR(100) '$.roomId',
+          UserId NVARCHAR(100) '$.userId',
+          ReadAt DATETIMEOFFSET '$.readAt'
+        ) j ON TRY_CAST(j.RoomId AS UNIQUEIDENTIFIER) = cp.RoomId
+           AND TRY_CAST(j.UserId AS UNIQUEIDENTIFIER) = cp.UserId
+        WHERE cp.LastReadAt IS NULL OR cp.LastReadAt < CAST(j.ReadAt AS DATETIME2)
+      `);
+  }
+
+  /**
+   * Put a failed batch back, keeping the later read time if the user read again since
+   */
+  private requeue(batch: PendingReadReceipt[]): void {
+    for (const entry of batch) {
+      const key = ChatReadReceiptBuffer.key(entry.roomId, entry.userId);
+      const newer = this.pending.get(key);
+      if (!newer || newer.readAt < entry.readAt) {
+        this.pending.set(key, entry);
+      }
+    }
+  }
+
+  getStats(): ChatReadReceiptStats {
+    return {
+      pendingReceipts: this.pending.size,
+      flushIntervalMs: FLUSH_INTERVAL_MS,
+      receiptsReceived: this.receiptsReceived,
+      receiptsCoalesced: this.receiptsCoalesced,
+      flushes: this.flushes,
+      rowsFlushed: this.rowsFlushed,
+      flushFailures: this.flushFailures,
+      droppedReceipts: this.droppedReceipts
+    };
+  }
+}
@@ -1,6 +1,11 @@
 import { DatabaseService } from './DatabaseService';
 import { SettingsService } from './SettingsService';
-import { NotificationService } from './NotificationService';
+import { NotificationService, CreateNotificationParams } from './NotificationService';
+import { ChatReadReceiptBuffer } from './ChatReadReceiptBuffer';
+import { SocketClusterService } from './SocketClusterService';
+import { TtlLruCache } from '../utils/TtlLruCache';
+import { RingBuffer } from '../utils/RingBuffer';
+import { decodeCursor, encodeCursor, keysetCondition, cursorKeyExpr, KeysetSort } from '../utils/pagination';
 import { v4 as uuidv4 } from 'uuid';
 import { Server as SocketIOServer } from 'socket.io';
 
@@ -54,6 +59,102 @@ export interface ChatParticipant {
   };
 }
 
+export interface ChatMessagesPage {
+  messages: ChatMessage[]; // Chronological (oldest first)
+  nextCursor: string | null; // Pass as ?cursor= to load the page of older messages
+}
+
+/**
+ * Recent messages of active rooms, newest CHAT_RECENT_BUFFER_SIZE per room.
+ *
+ * The first page of a room (no cursor) is served from here; sendMessage() appends to it,
+ * so an active room is read from SQL Server once per TTL instead of on every open.
+ * Each entry keeps the SQL-formatted CreatedAt for building the next cursor.
+ * `complete` means the buffer holds every message of the room (nothing older exists).
+ */
+interface RecentMessages {
+  ring: RingBuffer<{ message: ChatMessage; cursorKey: string }>;
+  complete: boolean;
+}
+
+const RECENT_BUFFER_SIZE = parseInt(process.env.CHAT_RECENT_BUFFER_SIZE || '100', 10);
+
+const recentMessages = new TtlLruCache<string, RecentMessages>(
+  'chatRecentMessages',
+  parseInt(process.env.CHAT_RECENT_ROOMS_MAX || '2000', 10),
+  parseInt(process.env.CHAT_RECENT_TTL_MS || '600000', 10)
+);
+
+// In-flight buffer loads; `stale` is set when a message is sent (or invalidated) during the load
+const recentLoads = new Map<string, { promise: Promise<RecentMessages>; stale: boolean }>();
+
+function forgetRecentMessages(roomId: string | null): void {
+  if (roomId) {
+    recentMessages.delete(roomId.toUpperCase());
+    const load = recentLoads.get(roomId.toUpperCase());
+    if (load) {
+      load.stale = true;
+    }
+  } else {
+    recentMessages.clear();
+    recentLoads.forEach(load => { load.stale = true; });
+  }
+}
+
+// Messages sent through another node are not in this node's buffers
+let clusterSubscribed = false;
+function subscribeToCluster(): void {
+  if (clusterSubscribed) {
+    return;
+  }
+  clusterSubscribed = true;
+  SocketClusterService.subscribe<{ roomId: string | null }>('chat:recent-invalidate', ({ roomId }) => {
+    forgetRecentMessages(roomId);
+  });
+}
+
+const MESSAGE_SORT: KeysetSort = { expr: 'cm.CreatedAt', type: 'date' };
+const MESSAGE_SORT_KEY = 'chat:created:DESC';
+
+const MESSAGE_COLUMNS = `
+        cm.Id,
+        cm.RoomId,
+        cm.UserId,
+        cm.Content,
+        cm.Type,
+        cm.ReplyTo,
+        cm.IsEdited,
+        cm.IsSystemMessage,
+        cm.CreatedAt,
+        cm.EditedAt,
+        ${cursorKeyExpr(MESSAGE_SORT)} AS cursorKey,
+        u.FirstName,
+        u.LastName,
+        u.Avatar,
+        u.Role`;
+
+function toChatMessage(msg: any): ChatMessage {
+  return {
+    Id: msg.Id,
+    RoomId: msg.RoomId,
+    UserId: msg.UserId,
+    Content: msg.Content,
+    Type: msg.Type,
+    ReplyTo: msg.ReplyTo,
+    IsEdited: msg.IsEdited,
+    IsSystemMessage: msg.IsSystemMessage,
+    CreatedAt: msg.CreatedAt,
+    EditedAt: msg.EditedAt,
+    User: {
+      Id: msg.UserId,
+      FirstName: msg.FirstName,
+      LastName: msg.LastName,
+      Avatar: msg.Avatar,
+      Role: msg.Role
+    }
+  };
+}
+
 export class ChatService {
   private db: DatabaseService;
   private settingsService: SettingsService;
@@ -65,12 +166,27 @@ export class ChatService {
     this.settingsService = new SettingsService();
     this.notificationService = io ? new NotificationService(io) : null;
     this.io = io || null;
+    if (io) {
+      subscribeToCluster();
+    }
+  }
+
+  /**
+   * Drop buffered recent messages (one room, or all rooms) on this and every other node.
+   * Call after changing stored messages outside sendMessage (e.g. anonymizing a deleted user).
+   */
+  static invalidateRecentMessages(roomId: string | null = null): void {
+    forgetRecentMessages(roomId);
+    SocketClusterService.publish('chat:recent-invalidate', { roomId });
   }
 
   /**
    * Get all chat rooms for a user
    */
   async getUserRooms(userId: string): Promise<ChatRoom[]> {
+    // Unread counts compare against LastReadAt; write this user's buffered read receipts first
+    await ChatReadReceiptBuffer.getInstance().flushUser(userId);
+
     const result = await this.db.query(`
       SELECT 
         cr.Id,
@@ -102,14 +218,17 @@ export class ChatService {
   }
 
   /**
-   * Get messages for a room with pagination
+   * Get messages for a room, newest page first, as keyset pages on (CreatedAt, Id).
+   * Without a cursor the page comes from the room's recent-message buffer when it can.
    */
   async getRoomMessages(
     roomId: string,
     userId: string,
-    options: { limit?: number; offset?: number; beforeTimestamp?: string } = {}
-  ): Promise<ChatMessage[]> {
-    const { limit = 50, offset = 0, beforeTimestamp } = options;
+    options: { limit?: number; cursor?: string; beforeTimestamp?: string } = {}
+  ): Promise<ChatMessagesPage> {
+    const limit = Math.min(Math.max(options.limit || 50, 1), 200);
+    const cursor = decodeCursor(options.cursor);
+    const validCursor = cursor && cursor.s === MESSAGE_SORT_KEY ? cursor : null;
 
     // Verify user is participant
     const isParticipant = await this.isRoomParticipant(roomId, userId);
@@ -117,58 +236,109 @@ export class ChatService {
       throw new Error('User is not a participant of this room');
     }
 
-    const query = `
-      SELECT
-        cm.Id,
-        cm.RoomId,
-        cm.UserId,
-        cm.Content,
-        cm.Type,
-        cm.ReplyTo,
-        cm.IsEdited,
-        cm.IsSystemMessage,
-        cm.CreatedAt,
-        cm.EditedAt,
-        u.FirstName,
-        u.LastName,
-        u.Avatar,
-        u.Role
+    if (!validCursor && !options.beforeTimestamp && limit <= RECENT_BUFFER_SIZE) {
+      const recent = await this.getRecentMessages(roomId);
+      const entries = recent.ring.last(limit);
+      const hasOlder = recent.ring.size > entries.length || !recent.complete;
+      return {
+        messages: entries.map(entry => entry.message),
+        nextCursor: hasOlder && entries.length > 0
+          ? encodeCursor(MESSAGE_SORT_KEY, entries[0].cursorKey, entries[0].message.Id)
+          : null
+      };
+    }
+
+    const rows = await this.db.query(`
+      SELECT TOP (@take) ${MESSAGE_COLUMNS}
       FROM dbo.ChatMessages cm
       INNER JOIN dbo.Users u ON cm.UserId = u.Id
       WHERE cm.RoomId = @roomId
-        ${beforeTimestamp ? 'AND cm.CreatedAt < @beforeTimestamp' : ''}
-      ORDER BY cm.CreatedAt DESC
-      OFFSET @offset ROWS
-      FETCH NEXT @limit ROWS ONLY
-    `;
-
-    const result = await this.db.query(query, { 
-      roomId, 
-      limit, 
-      offset, 
-      beforeTimestamp: beforeTimestamp || null 
+        ${validCursor ? `AND ${keysetCondition(MESSAGE_SORT, 'cm.Id', 'DESC')}` : ''}
+        ${!validCursor && options.beforeTimestamp ? 'AND cm.CreatedAt < @beforeTimestamp' : ''}
+      ORDER BY cm.CreatedAt DESC, cm.Id DESC
+    `, {
+      roomId,
+      take: limit + 1,
+      cursorValue: validCursor ? String(validCursor.v) : null,
+      cursorId: validCursor ? validCursor.id : null,
+      beforeTimestamp: options.beforeTimestamp || null
     });
 
-    // Reverse to chronological order
-    return result.reverse().map((msg: any) => ({
-      Id: msg.Id,
-      RoomId: msg.RoomId,
-      UserId: msg.UserId,
-      Content: msg.Content,
-      Type: msg.Type,
-      ReplyTo: msg.ReplyTo,
-      IsEdited: msg.IsEdited,
-      IsSystemMessage: msg.IsSystemMessage,
-      CreatedAt: msg.CreatedAt,
-      EditedAt: msg.EditedAt,
-      User: {
-        Id: msg.UserId,
-        FirstName: msg.FirstName,
-        LastName: msg.LastName,
-        Avatar: msg.Avatar,
-        Role: msg.Role
+    const hasOlder = rows.length > limit;
+    const page = rows.slice(0, limit);
+    const oldest = page[page.length - 1];
+
+    return {
+      // Reverse to chronological order
+      messages: page.reverse().map(toChatMessage),
+      nextCursor: hasOlder && oldest ? encodeCursor(MESSAGE_SORT_KEY, oldest.cursorKey, oldest.Id) : null
+    };
+  }
+
+  /**
+   * The room's recent-message buffer; concurrent misses for one room share a single query
+   */
+  private async getRecentMessages(roomId: string): Promise<RecentMessages> {
+    const key = roomId.toUpperCase();
+    const cached = recentMessages.get(key);
+    if (cached) {
+      return cached;
+    }
+
+    let load = recentLoads.get(key);
+    if (!load) {
+      const entry = { promise: this.loadRecentMessages(roomId), stale: false };
+      recentLoads.set(key, entry);
+      entry.promise
+        .then(recent => {
+          if (!entry.stale) {
+            recentMessages.set(key, recent);
+          }
+        })
+        .catch(() => undefined)
+        .finally(() => recentLoads.delete(key));
+      load = entry;
+    }
+    return load.promise;
+  }
+
+  private async loadRecentMessages(roomId: string): Promise<RecentMessages> {
+    const rows = await this.db.query(`
+      SELECT TOP (@take) ${MESSAGE_COLUMNS}
+      FROM dbo.ChatMessages cm
+      INNER JOIN dbo.Users u ON cm.UserId = u.Id
+      WHERE cm.RoomId = @roomId
+      ORDER BY cm.CreatedAt DESC, cm.Id DESC
+    `, { roomId, take: RECENT_BUFFER_SIZE + 1 });
+
+    const recent: RecentMessages = {
+      ring: new RingBuffer(RECENT_BUFFER_SIZE),
+      complete: rows.length <= RECENT_BUFFER_SIZE
+    };
+    for (const row of rows.slice(0, RECENT_BUFFER_SIZE).reverse()) {
+      recent.ring.push({ message: toChatMessage(row), cursorKey: row.cursorKey });
+    }
+    return recent;
+  }
+
+  /**
+   * Append a just-sent message to the room's buffer (if the room is buffered) and
+   * make other nodes drop theirs
+   */
+  private bufferSentMessage(message: ChatMessage, cursorKey: string): void {
+    const key = message.RoomId.toUpperCase();
+    const recent = recentMessages.get(key);
+    if (recent) {
+      recent.ring.push({ message, cursorKey });
+      if (recent.ring.hasDropped) {
+        recent.complete = false;
       }
-    }));
+    }
+    const load = recentLoads.get(key);
+    if (load) {
+      load.stale = true;
+    }
+    SocketClusterService.publish('chat:recent-invalidate', { roomId: message.RoomId });
   }
 
   /**
@@ -181,40 +351,35 @@ export class ChatService {
     type: string = 'text',
     replyTo: string | null = null
   ): Promise<ChatMessage> {
-    // Verify user is participant (check existence regardless of IsActive status)
-    // We'll reactivate inactive participants below
-    const participantCheck = await this.db.query(`
-      SELECT 1 FROM dbo.ChatParticipants
-      WHERE RoomId = @roomId AND UserId = @userId
+    // Verify user is participant (check existence regardless of IsActive status;
+    // inactive participants are reactivated below) and load the room in one round trip
+    const roomCheck = await this.db.query<{ Type: ChatRoom['Type']; IsActive: boolean; IsParticipant: number }>(`
+      SELECT r.Type, r.IsActive,
+             CASE WHEN EXISTS (
+               SELECT 1 FROM dbo.ChatParticipants WHERE RoomId = @roomId AND UserId = @userId
+             ) THEN 1 ELSE 0 END AS IsParticipant
+      FROM dbo.ChatRooms r
+      WHERE r.Id = @roomId
     `, { roomId, userId });
-    
-    if (participantCheck.length === 0) {
+
+    if (roomCheck.length === 0 || !roomCheck[0].IsParticipant) {
       throw new Error('User is not a participant of this room');
     }
 
-    // Get room details
-    const room = await this.getRoomById(roomId);
-    if (!room || !room.IsActive) {
+    const room = roomCheck[0];
+    if (!room.IsActive) {
       throw new Error('Room not found or inactive');
     }
 
-    // Find inactive participants who deleted this conversation
+    // Auto-reactivate any inactive participants (handles deleted conversations)
+    // This allows messages to be sent to users who deleted the conversation
     const inactiveParticipants = await this.db.query<{ UserId: string }>(`
-      SELECT UserId 
-      FROM dbo.ChatParticipants
+      UPDATE dbo.ChatParticipants
+      SET IsActive = 1, LeftAt = NULL
+      OUTPUT INSERTED.UserId
       WHERE RoomId = @roomId AND IsActive = 0
     `, { roomId });
 
-    // Auto-reactivate any inactive participants (handles deleted conversations)
-    // This allows messages to be sent to users who deleted the conversation
-    if (inactiveParticipants.length > 0) {
-      await this.db.query(`
-        UPDATE dbo.ChatParticipants
-        SET IsActive = 1, LeftAt = NULL
-        WHERE RoomId = @roomId AND IsActive = 0
-      `, { roomId });
-    }
-
     // For direct messages, check privacy settings
     if (room.Type === 'direct_message') {
       const recipientId = await this.getDirectMessageRecipient(roomId, userId);
@@ -227,57 +392,28 @@ export class ChatService {
 
     const messageId = uuidv4();
     const timestamp = new Date().toISOString();
+    const preview = content.length > 200 ? content.substring(0, 197) + '...' : content;
 
-    // Insert message
-    await this.db.query(`
+    // Insert message, update the room's last message and read the full message back
+    const messageResult = await this.db.query(`
       INSERT INTO dbo.ChatMessages (Id, RoomId, UserId, Content, Type, ReplyTo, CreatedAt)
-      VALUES (@messageId, @roomId, @userId, @content, @type, @replyTo, @timestamp)
-    `, { messageId, roomId, userId, content, type, replyTo: replyTo || null, timestamp });
+      VALUES (@messageId, @roomId, @userId, @content, @type, @replyTo, @timestamp);
 
-    // Update room's last message
-    const preview = content.length > 200 ? content.substring(0, 197) + '...' : content;
-    await this.db.query(`
       UPDATE dbo.ChatRooms
       SET LastMessageAt = @timestamp,
           LastMessagePreview = @preview,
           UpdatedAt = @timestamp
-      WHERE Id = @roomId
-    `, { roomId, timestamp, preview });
+      WHERE Id = @roomId;
 
-    // Get full message with user data
-    const messageResult = await this.db.query(`
-      SELECT 
-        cm.*,
-        u.FirstName,
-        u.LastName,
-        u.Avatar,
-        u.Role
+      SELECT ${MESSAGE_COLUMNS}
       FROM dbo.ChatMessages cm
       INNER JOIN dbo.Users u ON cm.UserId = u.Id
-      WHERE cm.Id = @messageId
-    `, { messageId });
+      WHERE cm.Id = @messageId;
+    `, { messageId, roomId, userId, content, type, replyTo: replyTo || null, timestamp, preview });
 
     const msgData = messageResult[0];
-
-    const message: ChatMessage = {
-      Id: msgData.Id,
-      RoomId: msgData.RoomId,
-      UserId: msgData.UserId,
-      Content: msgData.Content,
-      Type: msgData.Type,
-      ReplyTo: msgData.ReplyTo,
-      IsEdited: msgData.IsEdited,
-      IsSystemMessage: msgData.IsSystemMessage,
-      CreatedAt: msgData.CreatedAt,
-      EditedAt: msgData.EditedAt,
-      User: {
-        Id: msgData.UserId,
-        FirstName: msgData.FirstName,
-        LastName: msgData.LastName,
-        Avatar: msgData.Avatar,
-        Role: msgData.Role
-      }
-    };
+    const message = toChatMessage(msgData);
+    this.bufferSentMessage(message, msgData.cursorKey);
 
     // Emit Socket.IO event to room
     if (this.io) {
@@ -305,8 +441,8 @@ export class ChatService {
       }
     }
 
-    // Send notifications to offline participants
-    await this.sendMessageNotifications(roomId, userId, content, room.Type);
+    // Send notifications to the other participants (one bulk call, whatever the room size)
+    await this.sendMessageNotifications(roomId, message, content);
 
     return message;
   }
@@ -498,61 +634,54 @@ export class ChatService {
   }
 
   /**
-   * Send notifications to offline participants
+   * Notify the room's other active participants with one bulk call
+   * (preferences, quiet hours and emails are resolved in batches, not per participant)
    */
   private async sendMessageNotifications(
     roomId: string,
-    senderId: string,
-    content: string,
-    roomType: string
+    message: ChatMessage,
+    content: string
   ): Promise<void> {
     if (!this.notificationService) return;
 
     try {
       // Get room participants (excluding sender)
-      const participants = await this.db.query(`
-        SELECT cp.UserId, u.FirstName, u.LastName
+      const participants = await this.db.query<{ UserId: string }>(`
+        SELECT cp.UserId
         FROM dbo.ChatParticipants cp
-        INNER JOIN dbo.Users u ON cp.UserId = u.Id
         WHERE cp.RoomId = @roomId 
           AND cp.UserId != @senderId
           AND cp.IsActive = 1
-      `, { roomId, senderId });
+      `, { roomId, senderId: message.UserId });
 
-      // Get sender info
-      const senderResult = await this.db.query(`
-        SELECT FirstName, LastName, Role FROM dbo.Users WHERE Id = @senderId
-      `, { senderId });
+      if (participants.length === 0) {
+        return;
+      }
 
-      const sender = senderResult[0];
-      const senderName = `${sender.FirstName} ${sender.LastName}`;
+      // Sender details come with the message row
+      const senderName = `${message.User?.FirstName} ${message.User?.LastName}`;
       const messagePreview = content.length > 100 ? content.substring(0, 100) + '...' : content;
 
       // Determine notification type and priority
-      const isInstructorMessage = sender.Role === 'instructor';
+      const isInstructorMessage = message.User?.Role === 'instructor';
       const priority = isInstructorMessage ? 'high' : 'normal';
-      const type = 'community';
-
-      // Send notification to each participant
-      for (const participant of participants) {
-        await this.notificationService.createNotificationWithControls(
-          {
-            userId: participant.UserId,
-            type,
-            priority,
-            title: isInstructorMessage 
-              ? `Message from Instructor ${senderName}`
-              : `New Message from ${senderName}`,
-            message: messagePreview,
-            actionUrl: `/chat?roomId=${roomId}`,
-            actionText: 'View Message'
-          },
-          { 
-            category: 'community', 
-            subcategory: 'DirectMessages'
-          }
-        );
-      }
+
+      const notifications: CreateNotificationParams[] = participants.map(participant => ({
+        userId: participant.UserId,
+        type: 'community',
+        priority,
+        title: isInstructorMessage 
+          ? `Message from Instructor ${senderName}`
+          : `New Message from ${senderName}`,
+        message: messagePreview,
+        actionUrl: `/chat?roomId=${roomId}`,
+        actionText: 'View Message'
+      }));
+
+      await this.notificationService.createNotificationsBulk(notifications, {
+        category: 'community',
+        subcategory: 'DirectMessages'
+      });
     } catch (error) {
       console.error('Error sending message notifications:', error);
       // Don't throw - notifications are non-blocking
@@ -563,14 +692,16 @@ export class ChatService {
    * Mark messages as read
    */
   async markMessagesAsRead(roomId: string, userId: string): Promise<void> {
+    // Only buffer receipts that match a participant row; the batched UPDATE can't report a bad one
+    const isParticipant = await this.isRoomParticipant(roomId, userId);
+    if (!isParticipant) {
+      throw new Error('User is not a participant of this room');
+    }
+
     const timestamp = new Date().toISOString();
 
-    // Update participant's LastReadAt
-    await this.db.query(`
-      UPDATE dbo.ChatParticipants
-      SET LastReadAt = @timestamp
-      WHERE RoomId = @roomId AND UserId = @userId
-    `, { roomId, userId, timestamp });
+    // LastReadAt is written in batches (ChatReadReceiptBuffer)
+    ChatReadReceiptBuffer.getInstance().record(roomId, userId, new Date(timestamp));
 
     // Emit read receipt event
     if (this.io) {
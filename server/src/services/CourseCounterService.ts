@@ -0,0 +1,124 @@
+import sql from 'mssql';
+import { DatabaseService } from './DatabaseService';
+import { logger } from '../utils/logger';
+
+/**
+ * CourseCounterService — maintains the denormalized Courses.EnrollmentCount and Courses.LessonCount
+ *
+ * EnrollmentCount = enrollments in a counted status (active, completed); LessonCount = Lessons rows.
+ * Every code path that inserts, deletes or changes the Status of an Enrollments row (or inserts/deletes
+ * a Lessons row) calls the matching refresh after its write. A refresh recomputes the course's counter
+ * from the source table (an index seek on CourseId), so it is idempotent and needs no knowledge of the
+ * previous status — unlike `+ 1` / `- 1` deltas, a retried webhook or a double call cannot drift it.
+ *
+ * Refresh failures are logged, not thrown: the write that triggered them has already happened, and
+ * reconcileAll() (nightly job) repairs any counter that is still off, including writes made outside
+ * the API (seed scripts, manual SQL).
+ */
+
+export const COUNTED_ENROLLMENT_STATUSES = ['active', 'completed'];
+
+const COUNTED_STATUS_SQL = COUNTED_ENROLLMENT_STATUSES.map(s => `'${s}'`).join(', ');
+
+export interface CounterReconciliationResult {
+  enrollmentCountsFixed: number;
+  lessonCountsFixed: number;
+  durationMs: number;
+}
+
+export class CourseCounterService {
+  /**
+   * Recompute EnrollmentCount for one course (call after any Enrollments insert/delete/status change)
+   */
+  static async refreshEnrollmentCount(courseId: string): Promise<void> {
+    await this.refreshEnrollmentCounts([courseId]);
+  }
+
+  /**
+   * Recompute EnrollmentCount for several courses in one statement (e.g. after a user's enrollments cascade-delete)
+   */
+  static async refreshEnrollmentCounts(courseIds: string[]): Promise<void> {
+    if (courseIds.length === 0) {
+      return;
+    }
+
+    try {
+      const request = await DatabaseService.getInstance().getRequest();
+      await request
+        .input('CourseIds', sql.NVarChar(sql.MAX), JSON.stringify([...new Set(courseIds)]))
+        .query(`
+          UPDATE c
+          SET EnrollmentCount = (
+            SELECT COUNT(*) FROM dbo.Enrollments e
+            WHERE e.CourseId = c.Id AND e.Status IN (${COUNTED_STATUS_SQL})
+          )
+          FROM dbo.Courses c
+          WHERE c.Id IN (SELECT CAST(value AS UNIQUEIDENTIFIER) FROM OPENJSON(@CourseIds))
+        `);
+    } catch (error) {
+      logger.error('[CourseCounterService] Failed to refresh EnrollmentCount', { courseIds, error });
+    }
+  }
+
+  /**
+   * Recompute LessonCount for one course (call after a lesson is created or deleted)
+   */
+  static async refreshLessonCount(courseId: string): Promise<void> {
+    try {
+      await DatabaseService.getInstance().execute(`
+        UPDATE dbo.Courses
+        SET LessonCount = (SELECT COUNT(*) FROM dbo.Lessons l WHERE l.CourseId = @courseId)
+        WHERE Id = @courseId
+      `, { courseId });
+    } catch (error) {
+      logger.error('[CourseCounterService] Failed to refresh LessonCount', { courseId, error });
+    }
+  }
+
+  /**
+   * Set-based repair of every course whose counters disagree with Enrollments/Lessons.
+   * Only drifted rows are written, so a clean run touches nothing.
+   */
+  static async reconcileAll(): Promise<CounterReconciliationResult> {
+    const started = Date.now();
+    const db = DatabaseService.getInstance();
+
+    const enrollmentResult = await db.execute(`
+      UPDATE c
+      SET EnrollmentCount = ISNULL(x.Total, 0)
+      FROM dbo.Courses c
+      LEFT JOIN (
+        SELECT CourseId, COUNT(*) AS Total
+        FROM dbo.Enrollments
+        WHERE Status IN (${COUNTED_STATUS_SQL})
+        GROUP BY CourseId
+      ) x ON x.CourseId = c.Id
+      WHERE c.EnrollmentCount <> ISNULL(x.Total, 0)
+    `);
+
+    const lessonResult = await db.execute(`
+      UPDATE c
+      SET LessonCount = ISNULL(x.Total, 0)
+      FROM dbo.Courses c
+      LEFT JOIN (
+        SELECT CourseId, COUNT(*) AS Total
+        FROM dbo.Lessons
+        GROUP BY CourseId
+      ) x ON x.CourseId = c.Id
+      WHERE c.LessonCount <> ISNULL(x.Total, 0)
+    `);
+
+    const result: CounterReconciliationResult = {
+      enrollmentCountsFixed: enrollmentResult.rowsAffected[0] || 0,
+      lessonCountsFixed: lessonResult.rowsAffected[0] || 0,
+      durationMs: Date.now() - started
+    };
+
+    if (result.enrollmentCountsFixed > 0 || result.lessonCountsFixed > 0) {
+      logger.warn('[CourseCounterService] Reconciliation repaired drifted counters', result);
+    } else {
+      logger.info(`[CourseCounterService] Counters consistent (${result.durationMs}ms)`);
+    }
+    return result;
+  }
+}
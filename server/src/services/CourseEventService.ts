@@ -1,4 +1,7 @@
 import { Server as SocketIOServer } from 'socket.io';
+import { DatabaseService } from './DatabaseService';
+import { SocketClusterService } from './SocketClusterService';
+import { TtlLruCache } from '../utils/TtlLruCache';
 import { logger } from '../utils/logger';
 
 /**
@@ -13,6 +16,17 @@ import { logger } from '../utils/logger';
  * - course:enrollment-changed → course-{courseId} + courses-catalog rooms (deduplicated)
  * 
  * Design: Lightweight payloads (courseId + field names only). Clients re-fetch fresh data from API.
+ * Server-side consumers can subscribe with onCourseUpdated() / onCatalogChanged().
+ *
+ * Course room membership (which course-{id} rooms a user's sockets join on connect) is cached
+ * per user. Enroll/activate paths call joinUserToCourseRoom(), unenroll/revoke paths call
+ * removeUserFromCourseRoom(), and ownership transfers invalidate both instructors, so a
+ * reconnect (e.g. every client after a deploy) normally costs no query; the TTL bounds
+ * staleness from writes made elsewhere.
+ *
+ * Multi-node: room joins/leaves go through the adapter (socketsJoin/socketsLeave), and
+ * membership changes, cache invalidations and the in-process listener events are published
+ * to the other nodes so their caches, search index and response cache stay in step.
  */
 
 export interface CourseUpdatedPayload {
@@ -32,6 +46,8 @@ export interface CourseEnrollmentChangedPayload {
   timestamp: string;
 }
 
+const COURSE_ROOM_CACHE_TTL_MS = parseInt(process.env.SOCKET_ROOM_CACHE_TTL_MS || '1800000', 10);
+
 export class CourseEventService {
   private static instance: CourseEventService | null = null;
   private io: SocketIOServer | null = null;
@@ -40,6 +56,20 @@ export class CourseEventService {
   private updateTimers: Map<string, NodeJS.Timeout> = new Map();
   private pendingFields: Map<string, Set<string>> = new Map();
 
+  // In-process subscribers (e.g. the course search index, the response cache)
+  private catalogListeners: Set<(payload: CourseCatalogChangedPayload) => void> = new Set();
+  private courseUpdatedListeners: Set<(payload: CourseUpdatedPayload) => void> = new Set();
+
+  // userId → course ids whose rooms the user's sockets join (enrolled active/completed + taught)
+  private courseRooms = new TtlLruCache<string, Set<string>>(
+    'socketCourseRooms',
+    parseInt(process.env.SOCKET_ROOM_CACHE_MAX || '50000', 10),
+    COURSE_ROOM_CACHE_TTL_MS
+  );
+  // In-flight membership loads; `stale` is set when a join/leave lands during the load
+  private courseRoomLoads: Map<string, { promise: Promise<Set<string>>; stale: boolean }> = new Map();
+  private clusterSubscribed = false;
+
   private constructor(io?: SocketIOServer) {
     if (io) {
       this.io = io;
@@ -55,9 +85,32 @@ export class CourseEventService {
     } else {
       CourseEventService.instance.io = io;
     }
+    CourseEventService.instance.subscribeToCluster();
     logger.info('✅ [CourseEventService] Socket.IO instance set');
   }
 
+  /**
+   * Apply events published by other nodes to this node's listeners and membership cache
+   */
+  private subscribeToCluster(): void {
+    if (this.clusterSubscribed) {
+      return;
+    }
+    this.clusterSubscribed = true;
+    SocketClusterService.subscribe<CourseUpdatedPayload>('course-events:updated', payload => {
+      this.notifyCourseUpdatedListeners(payload);
+    });
+    SocketClusterService.subscribe<CourseCatalogChangedPayload>('course-events:catalog-changed', payload => {
+      this.notifyCatalogListeners(payload);
+    });
+    SocketClusterService.subscribe<{ userId: string; courseId: string; member: boolean }>('course-rooms:membership', message => {
+      this.updateCourseRoomMembership(message.userId, message.courseId, message.member);
+    });
+    SocketClusterService.subscribe<{ userId: string }>('course-rooms:invalidate', message => {
+      this.forgetUserCourseRooms(message.userId);
+    });
+  }
+
   /**
    * Get the singleton instance
    */
@@ -101,6 +154,11 @@ export class CourseEventService {
    * (both enrolled users AND unenrolled users browsing the catalog/detail page)
    */
   emitCourseUpdated(courseId: string, fields: string[]): void {
+    // Server-side subscribers are notified immediately (not debounced) so caches never serve the old data
+    const listenerPayload: CourseUpdatedPayload = { courseId, fields, timestamp: new Date().toISOString() };
+    this.notifyCourseUpdatedListeners(listenerPayload);
+    SocketClusterService.publish('course-events:updated', listenerPayload);
+
     if (!this.io) {
       logger.warn('[CourseEventService] Cannot emit course:updated - no io instance');
       return;
@@ -150,21 +208,67 @@ export class CourseEventService {
    * Targets: courses-catalog room (all authenticated users browsing catalog)
    */
   emitCourseCatalogChanged(action: CourseCatalogChangedPayload['action'], courseId: string): void {
-    if (!this.io) {
-      logger.warn('[CourseEventService] Cannot emit course:catalog-changed - no io instance');
-      return;
-    }
-
     const payload: CourseCatalogChangedPayload = {
       action,
       courseId,
       timestamp: new Date().toISOString()
     };
 
+    // Server-side subscribers run even without Socket.IO (e.g. scripts, tests)
+    this.notifyCatalogListeners(payload);
+    SocketClusterService.publish('course-events:catalog-changed', payload);
+
+    if (!this.io) {
+      logger.warn('[CourseEventService] Cannot emit course:catalog-changed - no io instance');
+      return;
+    }
+
     this.io.to('courses-catalog').emit('course:catalog-changed', payload);
     logger.info('[CourseEventService] Emitted course:catalog-changed', { action, courseId });
   }
 
+  private notifyCourseUpdatedListeners(payload: CourseUpdatedPayload): void {
+    this.courseUpdatedListeners.forEach(listener => {
+      try {
+        listener(payload);
+      } catch (err) {
+        logger.warn('[CourseEventService] course-updated listener failed', { courseId: payload.courseId, error: err });
+      }
+    });
+  }
+
+  private notifyCatalogListeners(payload: CourseCatalogChangedPayload): void {
+    this.catalogListeners.forEach(listener => {
+      try {
+        listener(payload);
+      } catch (err) {
+        logger.warn('[CourseEventService] catalog-changed listener failed', { courseId: payload.courseId, error: err });
+      }
+    });
+  }
+
+  /**
+   * Subscribe to course updates in-process (called per emit, before the socket debounce).
+   * Returns an unsubscribe function.
+   */
+  onCourseUpdated(listener: (payload: CourseUpdatedPayload) => void): () => void {
+    this.courseUpdatedListeners.add(listener);
+    return () => {
+      this.courseUpdatedListeners.delete(listener);
+    };
+  }
+
+  /**
+   * Subscribe to catalog changes in-process (same payload as the socket event).
+   * Returns an unsubscribe function.
+   */
+  onCatalogChanged(listener: (payload: CourseCatalogChangedPayload) => void): () => void {
+    this.catalogListeners.add(listener);
+    return () => {
+      this.catalogListeners.delete(listener);
+    };
+  }
+
   /**
    * Emit when enrollment count changes.
    * Sent to both the specific course room and the catalog room
@@ -189,23 +293,106 @@ export class CourseEventService {
     logger.info('[CourseEventService] Emitted course:enrollment-changed', { courseId });
   }
 
+  /**
+   * Course rooms (course-{id}) a user's sockets should join on connect.
+   * Served from the membership cache; concurrent misses for one user share a single query.
+   */
+  async getUserCourseRooms(userId: string): Promise<string[]> {
+    const key = userId.toUpperCase();
+    let courseIds = this.courseRooms.get(key);
+
+    if (!courseIds) {
+      let load = this.courseRoomLoads.get(key);
+      if (!load) {
+        const entry = { promise: this.loadUserCourseIds(userId), stale: false };
+        this.courseRoomLoads.set(key, entry);
+        entry.promise
+          .then(ids => {
+            if (!entry.stale) {
+              this.courseRooms.set(key, ids);
+            }
+          })
+          .catch(() => undefined)
+          .finally(() => this.courseRoomLoads.delete(key));
+        load = entry;
+      }
+      courseIds = await load.promise;
+    }
+
+    return Array.from(courseIds, courseId => `course-${courseId}`);
+  }
+
+  private async loadUserCourseIds(userId: string): Promise<Set<string>> {
+    const rows = await DatabaseService.getInstance().query<{ CourseId: string }>(`
+      SELECT CourseId FROM dbo.Enrollments WHERE UserId = @userId AND Status IN ('active', 'completed')
+      UNION
+      SELECT Id FROM dbo.Courses WHERE InstructorId = @userId
+    `, { userId });
+    return new Set(rows.filter(r => r.CourseId).map(r => String(r.CourseId).toUpperCase()));
+  }
+
+  private updateCourseRoomMembership(userId: string, courseId: string, member: boolean): void {
+    const key = userId.toUpperCase();
+    const load = this.courseRoomLoads.get(key);
+    if (load) {
+      load.stale = true;
+    }
+    const cached = this.courseRooms.get(key);
+    if (cached) {
+      if (member) {
+        cached.add(courseId.toUpperCase());
+      } else {
+        cached.delete(courseId.toUpperCase());
+      }
+    }
+  }
+
+  /**
+   * Forget a user's cached course rooms (e.g. after a course ownership transfer)
+   */
+  invalidateUserCourseRooms(userId: string): void {
+    this.forgetUserCourseRooms(userId);
+    SocketClusterService.publish('course-rooms:invalidate', { userId });
+  }
+
+  private forgetUserCourseRooms(userId: string): void {
+    const key = userId.toUpperCase();
+    const load = this.courseRoomLoads.get(key);
+    if (load) {
+      load.stale = true;
+    }
+    this.courseRooms.delete(key);
+  }
+
   /**
    * Join a user's socket(s) to a course room.
-   * Called when a user enrolls so they start receiving course:updated events immediately
-   * without needing to reconnect.
+   * Called when a user enrolls (or an enrollment becomes active) so they start receiving
+   * course:updated events immediately without needing to reconnect.
    */
   async joinUserToCourseRoom(userId: string, courseId: string): Promise<void> {
+    this.updateCourseRoomMembership(userId, courseId, true);
+    SocketClusterService.publish('course-rooms:membership', { userId, courseId, member: true });
     if (!this.io) return;
     try {
-      const sockets = await this.io.in(`user-${userId}`).fetchSockets();
-      for (const s of sockets) {
-        s.join(`course-${courseId}`);
-      }
-      if (sockets.length > 0) {
-        logger.info('[CourseEventService] Joined user to course room', { userId, courseId, socketCount: sockets.length });
-      }
+      // Through the adapter: reaches the user's sockets on every node
+      this.io.in(`user-${userId}`).socketsJoin(`course-${courseId.toUpperCase()}`);
+      logger.info('[CourseEventService] Joined user to course room', { userId, courseId });
     } catch (err) {
       logger.warn('[CourseEventService] Failed to join user to course room', { userId, courseId, error: err });
     }
   }
+
+  /**
+   * Remove a user's socket(s) from a course room (unenrolled, refunded, suspended, ...)
+   */
+  async removeUserFromCourseRoom(userId: string, courseId: string): Promise<void> {
+    this.updateCourseRoomMembership(userId, courseId, false);
+    SocketClusterService.publish('course-rooms:membership', { userId, courseId, member: false });
+    if (!this.io) return;
+    try {
+      this.io.in(`user-${userId}`).socketsLeave(`course-${courseId.toUpperCase()}`);
+    } catch (err) {
+      logger.warn('[CourseEventService] Failed to remove user from course room', { userId, courseId, error: err });
+    }
+  }
 }
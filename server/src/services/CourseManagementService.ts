@@ -298,6 +298,10 @@ export class CourseManagementService {
 
       await transaction.commit();
 
+      // Both instructors' course rooms changed; reload them on next connect
+      CourseEventService.getInstance().invalidateUserCourseRooms(fromInstructorId);
+      CourseEventService.getInstance().invalidateUserCourseRooms(toInstructorId);
+
       // Send notifications (non-blocking)
       const targetInstructorInfo = targetInstructor.recordset[0];
       this.notifyInstructorsOfTransfer(
@@ -0,0 +1,482 @@
+import { DatabaseService } from './DatabaseService';
+import { CourseEventService, CourseCatalogChangedPayload } from './CourseEventService';
+import { logger } from '../utils/logger';
+
+/**
+ * CourseSearchIndex - In-process inverted index over the public course catalog
+ *
+ * Backs `GET /api/courses?search=` so catalog search no longer runs a leading-%
+ * LIKE scan over Courses on every keystroke.
+ *
+ * - Terms come from Title, Tags, Category and Description (field-weighted, BM25 ranked)
+ * - Every query term also matches as a prefix ("pyth" → "python"); exact hits rank higher
+ * - All query terms must match (AND); category/level/instructor filters apply in-index
+ * - Hits carry highlighted title + description snippet (HTML-escaped, terms wrapped in <mark>)
+ *
+ * Freshness: courses are re-read on every course:catalog-changed event (CourseEventService),
+ * and the whole index is rebuilt every COURSE_SEARCH_REBUILD_MS to pick up writes that bypass
+ * the API (seed scripts, manual SQL). The route falls back to LIKE until the first build finishes.
+ */
+
+export interface CourseSearchFilters {
+  category?: string;
+  level?: string;
+  instructorId?: string;
+}
+
+export interface CourseSearchHit {
+  courseId: string;
+  score: number;
+  highlights: {
+    title: string;
+    snippet: string;
+  };
+}
+
+export interface CourseSearchResult {
+  total: number;
+  hits: CourseSearchHit[];
+}
+
+interface IndexedCourse {
+  id: string;
+  title: string;
+  description: string;
+  category: string;
+  level: string;
+  instructorId: string;
+  createdAt: number;
+  length: number; // Weighted token count (BM25 length normalisation)
+  terms: string[]; // Distinct terms, for removal on update
+}
+
+interface CatalogRow {
+  Id: string;
+  Title: string;
+  Description: string | null;
+  Tags: string | null;
+  Category: string | null;
+  Level: string | null;
+  InstructorId: string;
+  CreatedAt: Date;
+}
+
+// Field weights: a title hit outranks the same word buried in a description
+const FIELD_WEIGHTS = { title: 3, tags: 2, category: 2, description: 1 };
+
+// BM25 parameters
+const K1 = 1.2;
+const B = 0.75;
+
+// Prefix expansions score lower than exact term hits, and are capped per query term;
+// a single character only matches whole terms (it would expand to most of the vocabulary)
+const PREFIX_WEIGHT = 0.6;
+const MAX_PREFIX_EXPANSIONS = 64;
+const MIN_PREFIX_LENGTH = 2;
+
+// Only the start of a description is kept in memory, for snippets
+const SNIPPET_SOURCE_CHARS = 2000;
+const SNIPPET_CHARS = 160;
+
+const CATALOG_WHERE = `
+  (c.Status = 'published' OR (c.Status IS NULL AND c.IsPublished = 1))
+  AND ISNULL(c.Visibility, 'public') = 'public'
+`;
+
+const CATALOG_COLUMNS = 'c.Id, c.Title, c.Description, c.Tags, c.Category, c.Level, c.InstructorId, c.CreatedAt';
+
+const WORD_PATTERN = /[\p{L}\p{N}]+/gu;
+
+/**
+ * Lower-case, accent-folded term (so "Résumé" and "resume" match)
+ */
+function normalizeTerm(word: string): string {
+  return word.normalize('NFKD').replace(/[\u0300-\u036f]/g, '').toLowerCase();
+}
+
+function tokenize(text: string | null | undefined): string[] {
+  if (!text) {
+    return [];
+  }
+  return (text.match(WORD_PATTERN) || []).map(normalizeTerm);
+}
+
+function parseTags(tags: string | null): string {
+  if (!tags) {
+    return '';
+  }
+  try {
+    const parsed = JSON.parse(tags);
+    return Array.isArray(parsed) ? parsed.join(' ') : String(parsed);
+  } catch {
+    return tags;
+  }
+}
+
+function escapeHtml(text: string): string {
+  return text
+    .replace(/&/g, '&amp;')
+    .replace(/</g, '&lt;')
+    .replace(/>/g, '&gt;')
+    .replace(/"/g, '&quot;')
+    .replace(/'/g, '&#39;');
+}
+
+export class CourseSearchIndex {
+  private static instance: CourseSearchIndex | null = null;
+
+  private courses = new Map<string, IndexedCourse>();
+  private postings = new Map<string, Map<string, number>>(); // term → courseId → weighted tf
+  private totalLength = 0;
+  private sortedTerms: string[] = [];
+  private sortedTermsStale = true;
+  private ready = false;
+  private building: Promise<void> | null = null;
+  private rebuildTimer: NodeJS.Timeout | null = null;
+  private unsubscribe: (() => void) | null = null;
+  private lastBuildMs = 0;
+  private lastBuiltAt: Date | null = null;
+
+  static getInstance(): CourseSearchIndex {
+    if (!CourseSearchIndex.instance) {
+      CourseSearchIndex.instance = new CourseSearchIndex();
+    }
+    return CourseSearchIndex.instance;
+  }
+
+  /**
+   * Build the index, follow catalog-changed events and schedule periodic rebuilds
+   */
+  start(): void {
+    if (this.unsubscribe) {
+      return;
+    }
+
+    this.unsubscribe = CourseEventService.getInstance().onCatalogChanged(payload => {
+      this.refreshCourse(payload).catch(error => {
+        logger.warn('[CourseSearchIndex] Failed to refresh course after catalog change', { courseId: payload.courseId, error });
+      });
+    });
+
+    const rebuildMs = parseInt(process.env.COURSE_SEARCH_REBUILD_MS || '600000');
+    this.rebuildTimer = setInterval(() => {
+      this.rebuild().catch(error => logger.error('[CourseSearchIndex] Scheduled rebuild failed', { error }));
+    }, rebuildMs);
+
+    this.rebuild().catch(error => logger.error('[CourseSearchIndex] Initial build failed', { error }));
+  }
+
+  stop(): void {
+    if (this.rebuildTimer) {
+      clearInterval(this.rebuildTimer);
+      this.rebuildTimer = null;
+    }
+    if (this.unsubscribe) {
+      this.unsubscribe();
+      this.unsubscribe = null;
+    }
+  }
+
+  isReady(): boolean {
+    return this.ready;
+  }
+
+  /**
+   * Reload every public published course into a fresh index, then swap it in
+   */
+  async rebuild(): Promise<void> {
+    if (this.building) {
+      return this.building;
+    }
+
+    this.building = (async () => {
+      const started = Date.now();
+      const db = DatabaseService.getInstance();
+      const rows = await db.query<CatalogRow>(`
+        SELECT ${CATALOG_COLUMNS}
+        FROM Courses c
+        WHERE ${CATALOG_WHERE}
+      `);
+
+      const fresh = new CourseSearchIndex();
+      for (const row of rows) {
+        fresh.add(row);
+      }
+
+      this.courses = fresh.courses;
+      this.postings = fresh.postings;
+      this.totalLength = fresh.totalLength;
+      this.sortedTermsStale = true;
+      this.ready = true;
+      this.lastBuildMs = Date.now() - started;
+      this.lastBuiltAt = new Date();
+      logger.info(`[CourseSearchIndex] Indexed ${this.courses.size} courses, ${this.postings.size} terms in ${this.lastBuildMs}ms`);
+    })();
+
+    try {
+      await this.building;
+    } finally {
+      this.building = null;
+    }
+  }
+
+  /**
+   * Re-read one course after a catalog change: re-index it if still public, else drop it
+   */
+  private async refreshCourse(payload: CourseCatalogChangedPayload): Promise<void> {
+    // Apply the change on top of an in-flight rebuild, which may have read the old row
+    if (this.building) {
+      await this.building.catch(() => undefined);
+    }
+    if (!this.ready) {
+      return;
+    }
+
+    const db = DatabaseService.getInstance();
+    const rows = payload.action === 'removed'
+      ? []
+      : await db.query<CatalogRow>(`
+          SELECT ${CATALOG_COLUMNS}
+          FROM Courses c
+          WHERE c.Id = @courseId AND ${CATALOG_WHERE}
+        `, { courseId: payload.courseId });
+
+    this.remove(payload.courseId);
+    if (rows.length > 0) {
+      this.add(rows[0]);
+    }
+  }
+
+  private add(row: CatalogRow): void {
+    const id = String(row.Id).toUpperCase();
+    const fields: Array<[string[], number]> = [
+      [tokenize(row.Title), FIELD_WEIGHTS.title],
+      [tokenize(parseTags(row.Tags)), FIELD_WEIGHTS.tags],
+      [tokenize(row.Category), FIELD_WEIGHTS.category],
+      [tokenize(row.Description), FIELD_WEIGHTS.description]
+    ];
+
+    const frequencies = new Map<string, number>();
+    let length = 0;
+    for (const [terms, weight] of fields) {
+      for (const term of terms) {
+        frequencies.set(term, (frequencies.get(term) || 0) + weight);
+        length += weight;
+      }
+    }
+
+    for (const [term, tf] of frequencies) {
+      let posting = this.postings.get(term);
+      if (!posting) {
+        posting = new Map();
+        this.postings.set(term, posting);
+        this.sortedTermsStale = true;
+      }
+      posting.set(id, tf);
+    }
+
+    this.courses.set(id, {
+      id,
+      title: row.Title || '',
+      description: (row.Description || '').slice(0, SNIPPET_SOURCE_CHARS),
+      category: (row.Category || '').toLowerCase(),
+      level: (row.Level || '').toLowerCase(),
+      instructorId: String(row.InstructorId || '').toUpperCase(),
+      createdAt: row.CreatedAt ? new Date(row.CreatedAt).getTime() : 0,
+      length,
+      terms: [...frequencies.keys()]
+    });
+    this.totalLength += length;
+  }
+
+  private remove(courseId: string): void {
+    const id = courseId.toUpperCase();
+    const course = this.courses.get(id);
+    if (!course) {
+      return;
+    }
+
+    for (const term of course.terms) {
+      const posting = this.postings.get(term);
+      if (!posting) {
+        continue;
+      }
+      posting.delete(id);
+      if (posting.size === 0) {
+        this.postings.delete(term);
+        this.sortedTermsStale = true;
+      }
+    }
+    this.courses.delete(id);
+    this.totalLength -= course.length;
+  }
+
+  /**
+   * Terms starting with `prefix`, most common first (binary search over the sorted vocabulary)
+   */
+  private expandPrefix(prefix: string): string[] {
+    if (this.sortedTermsStale) {
+      this.sortedTerms = [...this.postings.keys()].sort();
+      this.sortedTermsStale = false;
+    }
+
+    let low = 0;
+    let high = this.sortedTerms.length;
+    while (low < high) {
+      const mid = (low + high) >>> 1;
+      if (this.sortedTerms[mid] < prefix) {
+        low = mid + 1;
+      } else {
+        high = mid;
+      }
+    }
+
+    const matches: string[] = [];
+    for (let i = low; i < this.sortedTerms.length && this.sortedTerms[i].startsWith(prefix); i++) {
+      if (this.sortedTerms[i] !== prefix) {
+        matches.push(this.sortedTerms[i]);
+      }
+    }
+
+    if (matches.length > MAX_PREFIX_EXPANSIONS) {
+      matches.sort((a, b) => this.postings.get(b)!.size - this.postings.get(a)!.size);
+      matches.length = MAX_PREFIX_EXPANSIONS;
+    }
+    return matches;
+  }
+
+  /**
+   * Ranked, filtered search; returns the total hit count and the requested page
+   */
+  search(query: string, filters: CourseSearchFilters, offset: number, limit: number): CourseSearchResult {
+    const queryTerms = [...new Set(tokenize(query))];
+    if (queryTerms.length === 0) {
+      return { total: 0, hits: [] };
+    }
+
+    const courseCount = this.courses.size;
+    const averageLength = courseCount > 0 ? this.totalLength / courseCount : 1;
+    const category = filters.category?.toLowerCase();
+    const level = filters.level?.toLowerCase();
+    const instructorId = filters.instructorId?.toUpperCase();
+
+    let scores: Map<string, number> | null = null;
+
+    for (const queryTerm of queryTerms) {
+      const termScores = new Map<string, number>();
+      const expansions: Array<[string, number]> = [[queryTerm, 1]];
+      if (queryTerm.length >= MIN_PREFIX_LENGTH) {
+        for (const term of this.expandPrefix(queryTerm)) {
+          expansions.push([term, PREFIX_WEIGHT]);
+        }
+      }
+
+      for (const [term, weight] of expansions) {
+        const posting = this.postings.get(term);
+        if (!posting) {
+          continue;
+        }
+        const idf = Math.log(1 + (courseCount - posting.size + 0.5) / (posting.size + 0.5));
+        for (const [courseId, tf] of posting) {
+          if (scores && !scores.has(courseId)) {
+            continue; // Already failed an earlier query term
+          }
+          const course = this.courses.get(courseId)!;
+          const bm25 = idf * (tf * (K1 + 1)) / (tf + K1 * (1 - B + B * course.length / averageLength));
+          // Best expansion per query term counts, so "data" doesn't score once per "data*" term
+          termScores.set(courseId, Math.max(termScores.get(courseId) || 0, bm25 * weight));
+        }
+      }
+
+      if (scores) {
+        for (const [courseId, score] of termScores) {
+          termScores.set(courseId, score + scores.get(courseId)!);
+        }
+      }
+      scores = termScores;
+      if (scores.size === 0) {
+        break;
+      }
+    }
+
+    const ranked: IndexedCourse[] = [];
+    const rankScores = scores || new Map<string, number>();
+    for (const courseId of rankScores.keys()) {
+      const course = this.courses.get(courseId)!;
+      if (category && course.category !== category) continue;
+      if (level && course.level !== level) continue;
+      if (instructorId && course.instructorId !== instructorId) continue;
+      ranked.push(course);
+    }
+
+    ranked.sort((a, b) => (rankScores.get(b.id)! - rankScores.get(a.id)!) || (b.createdAt - a.createdAt));
+
+    return {
+      total: ranked.length,
+      hits: ranked.slice(offset, offset + limit).map(course => ({
+        courseId: course.id,
+        score: Math.round(rankScores.get(course.id)! * 1000) / 1000,
+        highlights: {
+          title: this.highlight(course.title, queryTerms),
+          snippet: this.snippet(course.description, queryTerms)
+        }
+      }))
+    };
+  }
+
+  /**
+   * HTML-escape `text` and wrap words matching (or extending) a query term in <mark>
+   */
+  private highlight(text: string, queryTerms: string[]): string {
+    let html = '';
+    let last = 0;
+    for (const match of text.matchAll(WORD_PATTERN)) {
+      const term = normalizeTerm(match[0]);
+      if (queryTerms.some(q => term.startsWith(q))) {
+        html += escapeHtml(text.slice(last, match.index!));
+        html += `<mark>${escapeHtml(match[0])}</mark>`;
+        last = match.index! + match[0].length;
+      }
+    }
+    return html + escapeHtml(text.slice(last));
+  }
+
+  /**
+   * Description window around the first matching word, highlighted
+   */
+  private snippet(description: string, queryTerms: string[]): string {
+    let start = 0;
+    for (const match of description.matchAll(WORD_PATTERN)) {
+      const term = normalizeTerm(match[0]);
+      if (queryTerms.some(q => term.startsWith(q))) {
+        start = Math.max(0, match.index! - SNIPPET_CHARS / 4);
+        break;
+      }
+    }
+
+    // Don't cut a word in half at either end
+    if (start > 0) {
+      const space = description.indexOf(' ', start);
+      start = space === -1 ? start : space + 1;
+    }
+    let end = Math.min(description.length, start + SNIPPET_CHARS);
+    if (end < description.length) {
+      const space = description.lastIndexOf(' ', end);
+      end = space > start ? space : end;
+    }
+
+    const prefix = start > 0 ? '… ' : '';
+    const suffix = end < description.length ? ' …' : '';
+    return prefix + this.highlight(description.slice(start, end), queryTerms) + suffix;
+  }
+
+  getStats(): { ready: boolean; courses: number; terms: number; lastBuildMs: number; lastBuiltAt: string | null } {
+    return {
+      ready: this.ready,
+      courses: this.courses.size,
+      terms: this.postings.size,
+      lastBuildMs: this.lastBuildMs,
+      lastBuiltAt: this.lastBuiltAt ? this.lastBuiltAt.toISOString() : null
+    };
+  }
+}
@@ -3,6 +3,8 @@ import { DatabaseService } from './DatabaseService';
 import * as fs from 'fs';
 import * as path from 'path';
 import archiver from 'archiver';
+import { PassThrough } from 'stream';
+import { finished } from 'stream/promises';
 import { promisify } from 'util';
 import { exec } from 'child_process';
 
@@ -21,13 +23,295 @@ export interface ExportRequest {
   DownloadCount: number;
   LastDownloadedAt: Date | null;
   ErrorMessage: string | null;
+  ProgressPercent: number | null;
+  ProgressStep: string | null;
 }
 
+/**
+ * One file of the export archive, filled from one query (parameter @userId).
+ * Multi-row sections are streamed row by row; `csv` adds a spreadsheet copy.
+ */
+interface ExportSection {
+  file: string;
+  query: string;
+  single?: boolean; // One object instead of an array
+  csv?: string;
+}
+
+/**
+ * zlib level 0-9 for export archives (default 6: level 9 costs much more CPU for a few percent on JSON)
+ */
+function parseCompressionLevel(value: string | undefined): number {
+  const level = parseInt(value || '', 10);
+  return Number.isNaN(level) ? 6 : Math.min(9, Math.max(0, level));
+}
+
+const EXPORT_SECTIONS: ExportSection[] = [
+  {
+    file: 'profile/personal-info.json',
+    single: true,
+    query: `
+      SELECT 
+        Id, Email, Username, FirstName, LastName, Avatar, Role, LearningStyle,
+        BillingStreetAddress, BillingCity, BillingState, BillingPostalCode, BillingCountry,
+        EmailVerified, CreatedAt, UpdatedAt, LastLoginAt
+      FROM Users
+      WHERE Id = @userId
+    `
+  },
+  {
+    file: 'profile/settings.json',
+    single: true,
+    query: `SELECT * FROM UserSettings WHERE UserId = @userId`
+  },
+  {
+    file: 'profile/notification-preferences.json',
+    single: true,
+    query: `SELECT * FROM NotificationPreferences WHERE UserId = @userId`
+  },
+  {
+    // Terms & Privacy Acceptance History (GDPR audit trail)
+    file: 'profile/terms-acceptance.json',
+    query: `
+      SELECT 
+        uta.Id, uta.AcceptedAt, uta.IpAddress, uta.UserAgent,
+        tv.DocumentType, tv.Version, tv.Title, tv.EffectiveDate
+      FROM UserTermsAcceptance uta
+      INNER JOIN TermsVersions tv ON uta.TermsVersionId = tv.Id
+      WHERE uta.UserId = @userId
+      ORDER BY uta.AcceptedAt DESC
+    `
+  },
+  {
+    file: 'learning/enrollments.json',
+    csv: 'csv/enrollments.csv',
+    query: `
+      SELECT 
+        e.Id, e.CourseId, c.Title as CourseTitle, c.Category, c.Level,
+        e.EnrolledAt, e.CompletedAt, e.Status
+      FROM Enrollments e
+      INNER JOIN Courses c ON e.CourseId = c.Id
+      WHERE e.UserId = @userId
+      ORDER BY e.EnrolledAt DESC
+    `
+  },
+  {
+    file: 'learning/course-progress.json',
+    csv: 'csv/course-progress.csv',
+    query: `
+      SELECT 
+        cp.Id, cp.CourseId, c.Title as CourseTitle,
+        cp.OverallProgress, cp.TimeSpent, cp.LastAccessedAt, cp.CompletedAt
+      FROM CourseProgress cp
+      INNER JOIN Courses c ON cp.CourseId = c.Id
+      WHERE cp.UserId = @userId
+      ORDER BY cp.LastAccessedAt DESC
+    `
+  },
+  {
+    file: 'learning/lesson-progress.json',
+    query: `
+      SELECT 
+        up.Id, up.LessonId, l.Title as LessonTitle, up.CourseId, c.Title as CourseTitle,
+        up.Status, up.ProgressPercentage, up.LastAccessedAt, up.CompletedAt, up.TimeSpent
+      FROM UserProgress up
+      INNER JOIN Lessons l ON up.LessonId = l.Id
+      INNER JOIN Courses c ON up.CourseId = c.Id
+      WHERE up.UserId = @userId
+      ORDER BY up.LastAccessedAt DESC
+    `
+  },
+  {
+    file: 'learning/video-progress.json',
+    query: `
+      SELECT * FROM VideoProgress
+      WHERE UserId = @userId
+      ORDER BY LastWatchedAt DESC
+    `
+  },
+  {
+    file: 'learning/assessments.json',
+    csv: 'csv/assessments.csv',
+    query: `
+      SELECT 
+        asub.Id, asub.AssessmentId, a.Title as AssessmentTitle,
+        a.LessonId, l.Title as LessonTitle, l.CourseId, c.Title as CourseTitle,
+        asub.Score, asub.MaxScore, asub.TimeSpent, asub.AttemptNumber,
+        asub.Status, asub.StartedAt, asub.CompletedAt
+      FROM AssessmentSubmissions asub
+      INNER JOIN Assessments a ON asub.AssessmentId = a.Id
+      INNER JOIN Lessons l ON a.LessonId = l.Id
+      INNER JOIN Courses c ON l.CourseId = c.Id
+      WHERE asub.UserId = @userId
+      ORDER BY asub.StartedAt DESC
+    `
+  },
+  {
+    file: 'learning/certificates.json',
+    csv: 'csv/certificates.csv',
+    query: `
+      SELECT * FROM Certificates
+      WHERE UserId = @userId
+      ORDER BY IssuedAt DESC
+    `
+  },
+  {
+    file: 'learning/learning-activities.json',
+    query: `
+      SELECT TOP 1000 * FROM LearningActivities
+      WHERE UserId = @userId
+      ORDER BY CreatedAt DESC
+    `
+  },
+  {
+    file: 'community/comments.json',
+    query: `
+      SELECT * FROM Comments
+      WHERE UserId = @userId AND IsDeleted = 0
+      ORDER BY CreatedAt DESC
+    `
+  },
+  {
+    file: 'community/course-ratings.json',
+    query: `
+      SELECT cr.*, c.Title as CourseTitle
+      FROM CourseRatings cr
+      INNER JOIN Courses c ON cr.CourseId = c.Id
+      WHERE cr.UserId = @userId
+      ORDER BY cr.CreatedAt DESC
+    `
+  },
+  {
+    file: 'community/comment-likes.json',
+    query: `
+      SELECT cl.*, c.EntityType, c.EntityId
+      FROM CommentLikes cl
+      INNER JOIN Comments c ON cl.CommentId = c.Id
+      WHERE cl.UserId = @userId
+      ORDER BY cl.CreatedAt DESC
+    `
+  },
+  {
+    file: 'community/chat-rooms.json',
+    query: `
+      SELECT DISTINCT cr.*
+      FROM ChatRooms cr
+      INNER JOIN ChatParticipants cp ON cr.Id = cp.RoomId
+      WHERE cp.UserId = @userId
+      ORDER BY cr.LastMessageAt DESC
+    `
+  },
+  {
+    file: 'community/chat-messages.json',
+    query: `
+      SELECT cm.*, cr.Name as RoomName, cr.Type as RoomType
+      FROM ChatMessages cm
+      INNER JOIN ChatRooms cr ON cm.RoomId = cr.Id
+      WHERE cm.UserId = @userId
+      ORDER BY cm.CreatedAt DESC
+    `
+  },
+  {
+    file: 'community/study-groups.json',
+    query: `
+      SELECT 
+        sg.*, sgm.Role, sgm.JoinedAt,
+        c.Title as CourseTitle
+      FROM StudyGroupMembers sgm
+      INNER JOIN StudyGroups sg ON sgm.GroupId = sg.Id
+      LEFT JOIN Courses c ON sg.CourseId = c.Id
+      WHERE sgm.UserId = @userId
+      ORDER BY sgm.JoinedAt DESC
+    `
+  },
+  {
+    file: 'ai-tutoring/sessions.json',
+    query: `
+      SELECT * FROM TutoringSessions
+      WHERE UserId = @userId
+      ORDER BY CreatedAt DESC
+    `
+  },
+  {
+    file: 'ai-tutoring/messages.json',
+    query: `
+      SELECT tm.*
+      FROM TutoringMessages tm
+      INNER JOIN TutoringSessions ts ON tm.SessionId = ts.Id
+      WHERE ts.UserId = @userId
+      ORDER BY tm.Timestamp DESC
+    `
+  },
+  {
+    file: 'transactions/payments.json',
+    csv: 'csv/transactions.csv',
+    query: `
+      SELECT 
+        t.Id, t.CourseId, c.Title as CourseTitle,
+        t.Amount, t.Currency, t.Status,
+        t.PaymentMethod, t.PaymentMethodLast4, t.PaymentMethodBrand,
+        t.RefundReason, t.RefundAmount,
+        t.CreatedAt, t.CompletedAt, t.RefundedAt
+      FROM Transactions t
+      LEFT JOIN Courses c ON t.CourseId = c.Id
+      WHERE t.UserId = @userId
+      ORDER BY t.CreatedAt DESC
+    `
+  },
+  {
+    file: 'transactions/invoices.json',
+    query: `
+      SELECT 
+        i.*, t.CourseId, t.Status as TransactionStatus
+      FROM Invoices i
+      INNER JOIN Transactions t ON i.TransactionId = t.Id
+      WHERE t.UserId = @userId
+      ORDER BY i.CreatedAt DESC
+    `
+  },
+  {
+    file: 'activity/bookmarks.json',
+    query: `
+      SELECT 
+        b.Id, b.CourseId, c.Title as CourseTitle, c.Category, c.Level,
+        b.BookmarkedAt, b.Notes
+      FROM Bookmarks b
+      INNER JOIN Courses c ON b.CourseId = c.Id
+      WHERE b.UserId = @userId
+      ORDER BY b.BookmarkedAt DESC
+    `
+  },
+  {
+    // Last 1000
+    file: 'activity/notifications.json',
+    query: `
+      SELECT TOP 1000 * FROM Notifications
+      WHERE UserId = @userId
+      ORDER BY CreatedAt DESC
+    `
+  },
+  {
+    file: 'activity/live-sessions.json',
+    query: `
+      SELECT 
+        lsa.*, ls.Title as SessionTitle, ls.ScheduledAt, ls.Duration,
+        ls.InstructorId, c.Title as CourseTitle
+      FROM LiveSessionAttendees lsa
+      INNER JOIN LiveSessions ls ON lsa.SessionId = ls.Id
+      LEFT JOIN Courses c ON ls.CourseId = c.Id
+      WHERE lsa.UserId = @userId
+      ORDER BY lsa.JoinedAt DESC
+    `
+  }
+];
+
 export class DataExportService {
   private readonly EXPORT_DIR = path.join(__dirname, '../../uploads/exports');
   private readonly EXPIRY_DAYS = 7;
   private readonly MAX_EXPORT_SIZE_MB = 500; // Maximum 500MB per export
   private readonly MIN_DISK_SPACE_MB = 1024; // Require at least 1GB free disk space
+  private readonly COMPRESSION_LEVEL = parseCompressionLevel(process.env.DATA_EXPORT_COMPRESSION_LEVEL);
+  private readonly PROGRESS_INTERVAL_MS = 1000; // Throttle progress updates
   private dbService: DatabaseService;
 
   constructor() {
@@ -151,6 +435,8 @@ export class DataExportService {
         UPDATE DataExportRequests
         SET 
           Status = @status,
+          ProgressPercent = CASE @status WHEN 'processing' THEN 0 WHEN 'completed' THEN 100 ELSE ProgressPercent END,
+          ProgressStep = CASE WHEN @status = 'processing' THEN NULL ELSE ProgressStep END,
           CompletedAt = @completedAt,
           ExpiresAt = @expiresAt,
           FilePath = @filePath,
@@ -219,16 +505,13 @@ export class DataExportService {
         fs.mkdirSync(userExportDir, { recursive: true });
       }
 
-      // Collect all data
-      const exportData = await this.collectUserData(userId);
-
       // Generate timestamp for filename
       const timestamp = new Date().toISOString().replace(/[:.]/g, '-');
       const fileName = `mishin-learn-export-${timestamp}.zip`;
       filePath = path.join(userExportDir, fileName);
 
-      // Create ZIP file with size validation
-      await this.createZipExport(exportData, filePath, userId);
+      // Stream all data into the ZIP file (stops early if it grows past the size limit)
+      await this.writeZipExport(userId, filePath, requestId);
 
       // Get file size and validate
       const stats = fs.statSync(filePath);
@@ -264,419 +547,201 @@ export class DataExportService {
   }
 
   /**
-   * Collect all user data from database
+   * Stream every export section into a ZIP file, one entry at a time
+   *
+   * Rows are pulled from a streaming query and serialized one at a time into the entry;
+   * when the archive falls behind, the query is paused until it drains. Memory therefore
+   * stays bounded by the stream buffers, not by the size of the account. Writing stops as
+   * soon as the file passes MAX_EXPORT_SIZE_MB; generateExport() re-checks the finished file.
    */
-  private async collectUserData(userId: string): Promise<any> {
-    // Profile Data
-    const request1 = await this.dbService.getRequest();
-    const profileResult = await request1
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          Id, Email, Username, FirstName, LastName, Avatar, Role, LearningStyle,
-          BillingStreetAddress, BillingCity, BillingState, BillingPostalCode, BillingCountry,
-          EmailVerified, CreatedAt, UpdatedAt, LastLoginAt
-        FROM Users
-        WHERE Id = @userId
-      `);
-
-    // User Settings
-    const request2 = await this.dbService.getRequest();
-    const settingsResult = await request2
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM UserSettings WHERE UserId = @userId
-      `);
-
-    // Notification Preferences
-    const request3 = await this.dbService.getRequest();
-    const notifPrefsResult = await request3
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM NotificationPreferences WHERE UserId = @userId
-      `);
-
-    // Enrollments
-    const request4 = await this.dbService.getRequest();
-    const enrollmentsResult = await request4
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          e.Id, e.CourseId, c.Title as CourseTitle, c.Category, c.Level,
-          e.EnrolledAt, e.CompletedAt, e.Status
-        FROM Enrollments e
-        INNER JOIN Courses c ON e.CourseId = c.Id
-        WHERE e.UserId = @userId
-        ORDER BY e.EnrolledAt DESC
-      `);
-
-    // Course Progress
-    const request5 = await this.dbService.getRequest();
-    const courseProgressResult = await request5
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          cp.Id, cp.CourseId, c.Title as CourseTitle,
-          cp.OverallProgress, cp.TimeSpent, cp.LastAccessedAt, cp.CompletedAt
-        FROM CourseProgress cp
-        INNER JOIN Courses c ON cp.CourseId = c.Id
-        WHERE cp.UserId = @userId
-        ORDER BY cp.LastAccessedAt DESC
-      `);
-
-    // Lesson Progress
-    const request6 = await this.dbService.getRequest();
-    const lessonProgressResult = await request6
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          up.Id, up.LessonId, l.Title as LessonTitle, up.CourseId, c.Title as CourseTitle,
-          up.Status, up.ProgressPercentage, up.LastAccessedAt, up.CompletedAt, up.TimeSpent
-        FROM UserProgress up
-        INNER JOIN Lessons l ON up.LessonId = l.Id
-        INNER JOIN Courses c ON up.CourseId = c.Id
-        WHERE up.UserId = @userId
-        ORDER BY up.LastAccessedAt DESC
-      `);
-
-    // Video Progress
-    const request7 = await this.dbService.getRequest();
-    const videoProgressResult = await request7
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM VideoProgress
-        WHERE UserId = @userId
-        ORDER BY LastWatchedAt DESC
-      `);
-
-    // Assessment Submissions
-    const request8 = await this.dbService.getRequest();
-    const assessmentsResult = await request8
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          asub.Id, asub.AssessmentId, a.Title as AssessmentTitle,
-          a.LessonId, l.Title as LessonTitle, l.CourseId, c.Title as CourseTitle,
-          asub.Score, asub.MaxScore, asub.TimeSpent, asub.AttemptNumber,
-          asub.Status, asub.StartedAt, asub.CompletedAt
-        FROM AssessmentSubmissions asub
-        INNER JOIN Assessments a ON asub.AssessmentId = a.Id
-        INNER JOIN Lessons l ON a.LessonId = l.Id
-        INNER JOIN Courses c ON l.CourseId = c.Id
-        WHERE asub.UserId = @userId
-        ORDER BY asub.StartedAt DESC
-      `);
-
-    // Certificates
-    const request9 = await this.dbService.getRequest();
-    const certificatesResult = await request9
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM Certificates
-        WHERE UserId = @userId
-        ORDER BY IssuedAt DESC
-      `);
-
-    // Transactions
-    const request10 = await this.dbService.getRequest();
-    const transactionsResult = await request10
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          t.Id, t.CourseId, c.Title as CourseTitle,
-          t.Amount, t.Currency, t.Status,
-          t.PaymentMethod, t.PaymentMethodLast4, t.PaymentMethodBrand,
-          t.RefundReason, t.RefundAmount,
-          t.CreatedAt, t.CompletedAt, t.RefundedAt
-        FROM Transactions t
-        LEFT JOIN Courses c ON t.CourseId = c.Id
-        WHERE t.UserId = @userId
-        ORDER BY t.CreatedAt DESC
-      `);
-
-    // Invoices
-    const request11 = await this.dbService.getRequest();
-    const invoicesResult = await request11
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          i.*, t.CourseId, t.Status as TransactionStatus
-        FROM Invoices i
-        INNER JOIN Transactions t ON i.TransactionId = t.Id
-        WHERE t.UserId = @userId
-        ORDER BY i.CreatedAt DESC
-      `);
-
-    // Bookmarks
-    const request12 = await this.dbService.getRequest();
-    const bookmarksResult = await request12
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          b.Id, b.CourseId, c.Title as CourseTitle, c.Category, c.Level,
-          b.BookmarkedAt, b.Notes
-        FROM Bookmarks b
-        INNER JOIN Courses c ON b.CourseId = c.Id
-        WHERE b.UserId = @userId
-        ORDER BY b.BookmarkedAt DESC
-      `);
-
-    // Notifications (last 1000)
-    const request13 = await this.dbService.getRequest();
-    const notificationsResult = await request13
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT TOP 1000 * FROM Notifications
-        WHERE UserId = @userId
-        ORDER BY CreatedAt DESC
-      `);
-
-    // Comments
-    const request14 = await this.dbService.getRequest();
-    const commentsResult = await request14
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM Comments
-        WHERE UserId = @userId AND IsDeleted = 0
-        ORDER BY CreatedAt DESC
-      `);
-
-    // Course Ratings
-    const request14b = await this.dbService.getRequest();
-    const courseRatingsResult = await request14b
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT cr.*, c.Title as CourseTitle
-        FROM CourseRatings cr
-        INNER JOIN Courses c ON cr.CourseId = c.Id
-        WHERE cr.UserId = @userId
-        ORDER BY cr.CreatedAt DESC
-      `);
-
-    // Comment Likes
-    const request15 = await this.dbService.getRequest();
-    const commentLikesResult = await request15
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT cl.*, c.EntityType, c.EntityId
-        FROM CommentLikes cl
-        INNER JOIN Comments c ON cl.CommentId = c.Id
-        WHERE cl.UserId = @userId
-        ORDER BY cl.CreatedAt DESC
-      `);
-
-    // Chat Rooms
-    const request16 = await this.dbService.getRequest();
-    const chatRoomsResult = await request16
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT DISTINCT cr.*
-        FROM ChatRooms cr
-        INNER JOIN ChatParticipants cp ON cr.Id = cp.RoomId
-        WHERE cp.UserId = @userId
-        ORDER BY cr.LastMessageAt DESC
-      `);
+  private async writeZipExport(userId: string, outputPath: string, requestId: string): Promise<void> {
+    const output = fs.createWriteStream(outputPath);
+    const archive = archiver('zip', { zlib: { level: this.COMPRESSION_LEVEL } });
+    const maxBytes = this.MAX_EXPORT_SIZE_MB * 1024 * 1024;
 
-    // Chat Messages
-    const request17 = await this.dbService.getRequest();
-    const chatMessagesResult = await request17
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT cm.*, cr.Name as RoomName, cr.Type as RoomType
-        FROM ChatMessages cm
-        INNER JOIN ChatRooms cr ON cm.RoomId = cr.Id
-        WHERE cm.UserId = @userId
-        ORDER BY cm.CreatedAt DESC
-      `);
-
-    // Tutoring Sessions
-    const request18 = await this.dbService.getRequest();
-    const tutoringSessionsResult = await request18
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM TutoringSessions
-        WHERE UserId = @userId
-        ORDER BY CreatedAt DESC
-      `);
-
-    // Tutoring Messages
-    const request19 = await this.dbService.getRequest();
-    const tutoringMessagesResult = await request19
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT tm.*
-        FROM TutoringMessages tm
-        INNER JOIN TutoringSessions ts ON tm.SessionId = ts.Id
-        WHERE ts.UserId = @userId
-        ORDER BY tm.Timestamp DESC
-      `);
-
-    // Live Session Attendance
-    const request20 = await this.dbService.getRequest();
-    const liveSessionsResult = await request20
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          lsa.*, ls.Title as SessionTitle, ls.ScheduledAt, ls.Duration,
-          ls.InstructorId, c.Title as CourseTitle
-        FROM LiveSessionAttendees lsa
-        INNER JOIN LiveSessions ls ON lsa.SessionId = ls.Id
-        LEFT JOIN Courses c ON ls.CourseId = c.Id
-        WHERE lsa.UserId = @userId
-        ORDER BY lsa.JoinedAt DESC
-      `);
-
-    // Study Groups
-    const request21 = await this.dbService.getRequest();
-    const studyGroupsResult = await request21
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          sg.*, sgm.Role, sgm.JoinedAt,
-          c.Title as CourseTitle
-        FROM StudyGroupMembers sgm
-        INNER JOIN StudyGroups sg ON sgm.GroupId = sg.Id
-        LEFT JOIN Courses c ON sg.CourseId = c.Id
-        WHERE sgm.UserId = @userId
-        ORDER BY sgm.JoinedAt DESC
-      `);
+    const closed = new Promise<void>((resolve, reject) => {
+      output.on('close', () => resolve());
+      output.on('error', (err) => reject(err));
+      archive.on('error', (err) => reject(err));
+    });
+    // Rejections are observed through the awaits below
+    closed.catch(() => undefined);
+
+    archive.pipe(output);
+
+    const csvSections = EXPORT_SECTIONS.filter(section => section.csv);
+    const totalSteps = EXPORT_SECTIONS.length + csvSections.length;
+    let completedSteps = 0;
+    let lastReportAt = 0;
+    const reportProgress = async (step: string) => {
+      completedSteps++;
+      const now = Date.now();
+      if (now - lastReportAt >= this.PROGRESS_INTERVAL_MS || completedSteps === totalSteps) {
+        lastReportAt = now;
+        await this.updateExportProgress(requestId, Math.round((completedSteps / totalSteps) * 100), step);
+      }
+    };
 
-    // Learning Activities
-    const request22 = await this.dbService.getRequest();
-    const learningActivitiesResult = await request22
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT TOP 1000 * FROM LearningActivities
-        WHERE UserId = @userId
-        ORDER BY CreatedAt DESC
-      `);
+    let entry: PassThrough | null = null;
+    try {
+      let profile: any = {};
+
+      for (const section of EXPORT_SECTIONS) {
+        entry = this.appendEntry(archive, section.file);
+        if (section.single) {
+          const request = await this.dbService.getRequest();
+          const result = await request.input('userId', sql.UniqueIdentifier, userId).query(section.query);
+          const row = result.recordset[0] || {};
+          if (section.file === 'profile/personal-info.json') {
+            profile = row;
+          }
+          entry.end(JSON.stringify(row, null, 2));
+        } else {
+          let first = true;
+          entry.write('[');
+          await Promise.race([
+            this.streamRows(section.query, userId, entry, output, maxBytes, (row) => {
+              const chunk = (first ? '\n  ' : ',\n  ') + JSON.stringify(row, null, 2).replace(/\n/g, '\n  ');
+              first = false;
+              return chunk;
+            }),
+            closed
+          ]);
+          entry.end(first ? ']' : '\n]');
+        }
+        await Promise.race([finished(entry), closed]);
+        await reportProgress(section.file);
+      }
 
-    // Terms & Privacy Acceptance History (GDPR audit trail)
-    const request23 = await this.dbService.getRequest();
-    const termsAcceptanceResult = await request23
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT 
-          uta.Id, uta.AcceptedAt, uta.IpAddress, uta.UserAgent,
-          tv.DocumentType, tv.Version, tv.Title, tv.EffectiveDate
-        FROM UserTermsAcceptance uta
-        INNER JOIN TermsVersions tv ON uta.TermsVersionId = tv.Id
-        WHERE uta.UserId = @userId
-        ORDER BY uta.AcceptedAt DESC
-      `);
+      // Spreadsheet copies of the summary sections (a second, equally streamed pass)
+      for (const section of csvSections) {
+        entry = this.appendEntry(archive, section.csv!);
+        let headers: string[] | null = null;
+        await Promise.race([
+          this.streamRows(section.query, userId, entry, output, maxBytes, (row) => {
+            let chunk = '';
+            if (!headers) {
+              headers = Object.keys(row);
+              chunk = headers.join(',') + '\n';
+            }
+            return chunk + this.toCSVRow(headers, row) + '\n';
+          }),
+          closed
+        ]);
+        entry.end(headers ? '' : 'No data available\n');
+        await Promise.race([finished(entry), closed]);
+        await reportProgress(section.csv!);
+      }
 
-    return {
-      profile: profileResult.recordset[0] || {},
-      settings: settingsResult.recordset[0] || {},
-      notificationPreferences: notifPrefsResult.recordset[0] || {},
-      enrollments: enrollmentsResult.recordset,
-      courseProgress: courseProgressResult.recordset,
-      lessonProgress: lessonProgressResult.recordset,
-      videoProgress: videoProgressResult.recordset,
-      assessments: assessmentsResult.recordset,
-      certificates: certificatesResult.recordset,
-      transactions: transactionsResult.recordset,
-      invoices: invoicesResult.recordset,
-      bookmarks: bookmarksResult.recordset,
-      notifications: notificationsResult.recordset,
-      comments: commentsResult.recordset,
-      courseRatings: courseRatingsResult.recordset,
-      commentLikes: commentLikesResult.recordset,
-      chatRooms: chatRoomsResult.recordset,
-      chatMessages: chatMessagesResult.recordset,
-      tutoringSessions: tutoringSessionsResult.recordset,
-      tutoringMessages: tutoringMessagesResult.recordset,
-      liveSessionAttendance: liveSessionsResult.recordset,
-      studyGroups: studyGroupsResult.recordset,
-      learningActivities: learningActivitiesResult.recordset,
-      termsAcceptance: termsAcceptanceResult.recordset,
-    };
+      archive.append(this.generateReadme(profile), { name: 'README.txt' });
+      await archive.finalize();
+      await closed;
+    } catch (error) {
+      // Destroying the open entry also cancels its query if it is still running
+      entry?.destroy();
+      archive.abort();
+      output.destroy();
+      throw error;
+    }
   }
 
   /**
-   * Create ZIP file with all export data
+   * Add an entry whose content is written incrementally
    */
-  private async createZipExport(data: any, outputPath: string, userId: string): Promise<void> {
-    return new Promise((resolve, reject) => {
-      const output = fs.createWriteStream(outputPath);
-      const archive = archiver('zip', { zlib: { level: 9 } });
-
-      output.on('close', () => resolve());
-      output.on('error', (err) => reject(err));
-      archive.on('error', (err) => reject(err));
-      
-      // Note: Size validation happens after ZIP creation in generateExport()
-      // This ensures we don't create oversized exports
-
-      archive.pipe(output);
-
-      // Add JSON files
-      archive.append(JSON.stringify(data.profile, null, 2), { name: 'profile/personal-info.json' });
-      archive.append(JSON.stringify(data.settings, null, 2), { name: 'profile/settings.json' });
-      archive.append(JSON.stringify(data.notificationPreferences, null, 2), { name: 'profile/notification-preferences.json' });
-
-      archive.append(JSON.stringify(data.enrollments, null, 2), { name: 'learning/enrollments.json' });
-      archive.append(JSON.stringify(data.courseProgress, null, 2), { name: 'learning/course-progress.json' });
-      archive.append(JSON.stringify(data.lessonProgress, null, 2), { name: 'learning/lesson-progress.json' });
-      archive.append(JSON.stringify(data.videoProgress, null, 2), { name: 'learning/video-progress.json' });
-      archive.append(JSON.stringify(data.assessments, null, 2), { name: 'learning/assessments.json' });
-      archive.append(JSON.stringify(data.certificates, null, 2), { name: 'learning/certificates.json' });
-      archive.append(JSON.stringify(data.learningActivities, null, 2), { name: 'learning/learning-activities.json' });
-
-      archive.append(JSON.stringify(data.comments, null, 2), { name: 'community/comments.json' });
-      archive.append(JSON.stringify(data.courseRatings, null, 2), { name: 'community/course-ratings.json' });
-      archive.append(JSON.stringify(data.commentLikes, null, 2), { name: 'community/comment-likes.json' });
-      archive.append(JSON.stringify(data.chatRooms, null, 2), { name: 'community/chat-rooms.json' });
-      archive.append(JSON.stringify(data.chatMessages, null, 2), { name: 'community/chat-messages.json' });
-      archive.append(JSON.stringify(data.studyGroups, null, 2), { name: 'community/study-groups.json' });
-
-      archive.append(JSON.stringify(data.tutoringSessions, null, 2), { name: 'ai-tutoring/sessions.json' });
-      archive.append(JSON.stringify(data.tutoringMessages, null, 2), { name: 'ai-tutoring/messages.json' });
-
-      archive.append(JSON.stringify(data.transactions, null, 2), { name: 'transactions/payments.json' });
-      archive.append(JSON.stringify(data.invoices, null, 2), { name: 'transactions/invoices.json' });
-
-      archive.append(JSON.stringify(data.bookmarks, null, 2), { name: 'activity/bookmarks.json' });
-      archive.append(JSON.stringify(data.notifications, null, 2), { name: 'activity/notifications.json' });
-      archive.append(JSON.stringify(data.liveSessionAttendance, null, 2), { name: 'activity/live-sessions.json' });
-
-      // Add CSV files (summary data)
-      archive.append(this.convertToCSV(data.enrollments), { name: 'csv/enrollments.csv' });
-      archive.append(this.convertToCSV(data.courseProgress), { name: 'csv/course-progress.csv' });
-      archive.append(this.convertToCSV(data.assessments), { name: 'csv/assessments.csv' });
-      archive.append(this.convertToCSV(data.transactions), { name: 'csv/transactions.csv' });
-      archive.append(this.convertToCSV(data.certificates), { name: 'csv/certificates.csv' });
-
-      // Add README
-      const readme = this.generateReadme(data.profile);
-      archive.append(readme, { name: 'README.txt' });
-
-      archive.finalize();
-    });
+  private appendEntry(archive: archiver.Archiver, name: string): PassThrough {
+    const entry = new PassThrough();
+    archive.append(entry, { name });
+    return entry;
   }
 
   /**
-   * Convert JSON array to CSV
+   * Run a query in streaming mode and write each row, formatted, into `sink`.
+   * The query is paused while the sink is over its buffer limit.
    */
-  private convertToCSV(data: any[]): string {
-    if (!data || data.length === 0) {
-      return 'No data available\n';
-    }
+  private async streamRows(
+    query: string,
+    userId: string,
+    sink: PassThrough,
+    output: fs.WriteStream,
+    maxBytes: number,
+    format: (row: any) => string
+  ): Promise<number> {
+    const request = await this.dbService.getRequest();
+    request.stream = true;
+    request.input('userId', sql.UniqueIdentifier, userId);
+
+    return new Promise<number>((resolve, reject) => {
+      let count = 0;
+      let settled = false;
+      let paused = false;
+      const fail = (error: Error) => {
+        if (!settled) {
+          settled = true;
+          request.cancel();
+          reject(error);
+        }
+      };
 
-    const headers = Object.keys(data[0]);
-    const csvRows = [headers.join(',')];
+      sink.once('close', () => fail(new Error('Export entry closed before its query finished')));
 
-    for (const row of data) {
-      const values = headers.map(header => {
-        const value = row[header];
-        if (value === null || value === undefined) return '';
-        const escaped = String(value).replace(/"/g, '""');
-        return `"${escaped}"`;
+      request.on('row', (row) => {
+        if (settled) return;
+        if (output.bytesWritten > maxBytes) {
+          fail(new Error(`Export too large: exceeds maximum ${this.MAX_EXPORT_SIZE_MB}MB`));
+          return;
+        }
+        count++;
+        if (!sink.write(format(row)) && !paused) {
+          paused = true;
+          request.pause();
+          sink.once('drain', () => {
+            paused = false;
+            request.resume();
+          });
+        }
       });
-      csvRows.push(values.join(','));
+      request.on('error', (err) => fail(err));
+      request.on('done', () => {
+        if (!settled) {
+          settled = true;
+          resolve(count);
+        }
+      });
+
+      request.query(query);
+    });
+  }
+
+  /**
+   * Record how far an export has got (shown on the settings page)
+   */
+  private async updateExportProgress(requestId: string, percent: number, step: string): Promise<void> {
+    try {
+      const request = await this.dbService.getRequest();
+      await request
+        .input('requestId', sql.UniqueIdentifier, requestId)
+        .input('progressPercent', sql.Int, percent)
+        .input('progressStep', sql.NVarChar(100), step)
+        .query(`
+          UPDATE DataExportRequests
+          SET ProgressPercent = @progressPercent, ProgressStep = @progressStep, UpdatedAt = GETUTCDATE()
+          WHERE Id = @requestId
+        `);
+    } catch (error) {
+      console.warn('Could not update export progress:', error);
     }
+  }
 
-    return csvRows.join('\n');
+  /**
+   * Convert one row to a CSV line
+   */
+  private toCSVRow(headers: string[], row: any): string {
+    return headers.map(header => {
+      const value = row[header];
+      if (value === null || value === undefined) return '';
+      const escaped = String(value).replace(/"/g, '""');
+      return `"${escaped}"`;
+    }).join(',');
   }
 
   /**
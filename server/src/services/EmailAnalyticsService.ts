@@ -1,6 +1,7 @@
 import crypto from 'crypto';
 import sql from 'mssql';
 import { DatabaseService } from './DatabaseService';
+import { NotificationService } from './NotificationService';
 
 /**
  * EmailAnalyticsService
@@ -364,6 +365,7 @@ class EmailAnalyticsService {
             WHERE UserId = @UserId
           `);
 
+        NotificationService.invalidatePreferences(tokenData.UserId);
         console.log(`📭 User ${tokenData.Email} unsubscribed from ALL emails`);
         
         return {
@@ -386,6 +388,7 @@ class EmailAnalyticsService {
             WHERE UserId = @UserId
           `);
 
+        NotificationService.invalidatePreferences(tokenData.UserId);
         console.log(`📭 User ${tokenData.Email} unsubscribed from ${tokenData.EmailType} emails`);
         
         return {
@@ -68,6 +68,40 @@ export class EmailDigestService {
     }
   }
 
+  /**
+   * Add many notifications to the digest queue in one INSERT (bulk notification fan-outs)
+   */
+  async addManyToDigest(
+    entries: Array<{ userId: string; notificationId: string }>,
+    frequency: 'daily' | 'weekly'
+  ): Promise<number> {
+    if (entries.length === 0) {
+      return 0;
+    }
+
+    try {
+      const request = await this.dbService.getRequest();
+      const result = await request
+        .input('Entries', sql.NVarChar(sql.MAX), JSON.stringify(entries))
+        .input('Frequency', sql.NVarChar(20), frequency)
+        .input('ScheduledFor', sql.DateTime2, this.calculateScheduledTime(frequency))
+        .query(`
+          INSERT INTO EmailDigests (UserId, NotificationId, Frequency, ScheduledFor)
+          SELECT UserId, NotificationId, @Frequency, @ScheduledFor
+          FROM OPENJSON(@Entries) WITH (
+            UserId UNIQUEIDENTIFIER '$.userId',
+            NotificationId UNIQUEIDENTIFIER '$.notificationId'
+          )
+        `);
+
+      console.log(`📬 ${result.rowsAffected[0]} notification(s) added to ${frequency} digest`);
+      return result.rowsAffected[0];
+    } catch (error) {
+      console.error('❌ Error adding to digest:', error);
+      throw error;
+    }
+  }
+
   /**
    * Calculate the next scheduled delivery time based on frequency
    * Uses UTC timezone for consistent scheduling across all users
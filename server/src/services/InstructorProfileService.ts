@@ -42,30 +42,7 @@ export class InstructorProfileService {
         // If settings retrieval fails, default to allowing public access
       }
 
-      // 3. Aggregate stats across all published courses
-      const statsResult = await this.db.query(`
-        SELECT 
-          COUNT(DISTINCT c.Id) as totalCourses,
-          ISNULL(SUM(c.EnrollmentCount), 0) as totalStudents,
-          CASE 
-            WHEN SUM(CASE WHEN c.RatingCount > 0 THEN 1 ELSE 0 END) > 0
-            THEN CAST(SUM(c.Rating * c.RatingCount) AS FLOAT) / NULLIF(SUM(c.RatingCount), 0)
-            ELSE 0
-          END as averageRating,
-          ISNULL(SUM(c.RatingCount), 0) as totalReviews
-        FROM dbo.Courses c
-        WHERE c.InstructorId = @instructorId
-          AND c.Status = 'published'
-      `, { instructorId });
-
-      const stats = statsResult[0] || {
-        totalCourses: 0,
-        totalStudents: 0,
-        averageRating: 0,
-        totalReviews: 0
-      };
-
-      // 4. Published courses list
+      // 3. Published courses list (EnrollmentCount/RatingCount are maintained counters)
       const coursesResult = await this.db.query(`
         SELECT 
           Id, Title, Description, Thumbnail, Category, Level,
@@ -90,6 +67,16 @@ export class InstructorProfileService {
         duration: c.Duration || 0
       }));
 
+      // 4. Stats are summed from the course rows above instead of a second aggregate query
+      const totalReviews = courses.reduce((sum, c) => sum + (c.ratingCount || 0), 0);
+      const weightedRating = courses.reduce((sum, c) => sum + (c.rating || 0) * (c.ratingCount || 0), 0);
+      const stats = {
+        totalCourses: courses.length,
+        totalStudents: courses.reduce((sum, c) => sum + (c.enrollmentCount || 0), 0),
+        averageRating: totalReviews > 0 ? weightedRating / totalReviews : 0,
+        totalReviews
+      };
+
       // 5. Assemble response
       const profile: InstructorPublicProfile = {
         id: user.Id,
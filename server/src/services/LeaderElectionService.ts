@@ -0,0 +1,182 @@
+import crypto from 'crypto';
+import sql from 'mssql';
+import { DatabaseService } from './DatabaseService';
+import { SocketClusterService } from './SocketClusterService';
+import { logger } from '../utils/logger';
+
+/**
+ * LeaderElectionService — one scheduler leader across all server nodes
+ *
+ * Cron jobs (NotificationScheduler, digests, the notification queue, export processing)
+ * and the presence inactivity sweep must run once per cluster, not once per process.
+ * The leader is whoever holds the 'scheduler' row in dbo.SchedulerLeases: every node
+ * tries to take or renew the lease every LEADER_RENEW_MS, and a lease nobody renews for
+ * LEADER_LEASE_MS can be taken over. A node steps down on its own when its last
+ * successful renewal is older than the lease (e.g. it lost the database), so two nodes
+ * never both believe they lead; on shutdown the lease is released for a fast handover.
+ *
+ * LEADER_ELECTION: 'sql' uses the lease, 'none' makes this process the leader. The default
+ * is 'sql' when Socket.IO runs with a shared adapter and 'none' for a single process.
+ */
+
+export interface LeaderElectionStats {
+  mode: 'sql' | 'none';
+  holderId: string;
+  isLeader: boolean;
+  currentLeader: string | null;
+  leaseMs: number;
+  elections: number;
+  renewFailures: number;
+  jobsRun: number;
+  jobsSkipped: number;
+}
+
+const LEASE_NAME = 'scheduler';
+const LEASE_MS = parseInt(process.env.LEADER_LEASE_MS || '30000', 10);
+const RENEW_MS = parseInt(process.env.LEADER_RENEW_MS || '10000', 10);
+
+export class LeaderElectionService {
+  private static instance: LeaderElectionService | null = null;
+
+  private readonly holderId = `${SocketClusterService.getNodeId()}:${crypto.randomBytes(4).toString('hex')}`;
+  private mode: 'sql' | 'none' = 'none';
+  private renewTimer: NodeJS.Timeout | null = null;
+  private leaseValidUntil = 0;
+  private currentLeader: string | null = null;
+
+  private elections = 0;
+  private renewFailures = 0;
+  private jobsRun = 0;
+  private jobsSkipped = 0;
+
+  static getInstance(): LeaderElectionService {
+    if (!LeaderElectionService.instance) {
+      LeaderElectionService.instance = new LeaderElectionService();
+    }
+    return LeaderElectionService.instance;
+  }
+
+  start(): void {
+    if (this.renewTimer) {
+      return;
+    }
+
+    const configured = process.env.LEADER_ELECTION || (SocketClusterService.isClustered() ? 'sql' : 'none');
+    this.mode = configured === 'sql' ? 'sql' : 'none';
+
+    if (this.mode === 'none') {
+      this.currentLeader = this.holderId;
+      logger.info('✅ [LeaderElection] Single-process mode - this node runs the scheduled jobs');
+      return;
+    }
+
+    this.renew().catch(() => undefined);
+    this.renewTimer = setInterval(() => {
+      this.renew().catch(() => undefined);
+    }, RENEW_MS);
+    logger.info(`✅ [LeaderElection] Started (lease ${LEASE_MS}ms, renew every ${RENEW_MS}ms, holder ${this.holderId})`);
+  }
+
+  /**
+   * Stop renewing and release the lease if held, so another node takes over at its next renewal
+   */
+  async stop(): Promise<void> {
+    if (this.renewTimer) {
+      clearInterval(this.renewTimer);
+      this.renewTimer = null;
+    }
+    if (this.mode !== 'sql' || !this.isLeader()) {
+      return;
+    }
+    this.leaseValidUntil = 0;
+    try {
+      await (await DatabaseService.getInstance().getRequest())
+        .input('Name', sql.NVarChar(100), LEASE_NAME)
+        .input('HolderId', sql.NVarChar(200), this.holderId)
+        .query(`
+          UPDATE dbo.SchedulerLeases SET ExpiresAt = SYSUTCDATETIME()
+          WHERE Name = @Name AND HolderId = @HolderId
+        `);
+      logger.info('[LeaderElection] Lease released');
+    } catch (error) {
+      logger.warn('[LeaderElection] Failed to release lease (it will expire)', { error });
+    }
+  }
+
+  isLeader(): boolean {
+    return this.mode === 'none' || Date.now() < this.leaseValidUntil;
+  }
+
+  /**
+   * Run a scheduled job only on the leader
+   */
+  async runIfLeader(jobName: string, job: () => Promise<void>): Promise<void> {
+    if (!this.isLeader()) {
+      this.jobsSkipped++;
+      logger.debug(`[LeaderElection] Skipping ${jobName} - not the scheduler leader`);
+      return;
+    }
+    this.jobsRun++;
+    await job();
+  }
+
+  /**
+   * Take the lease if it is free or expired, or extend it if this node holds it
+   */
+  private async renew(): Promise<void> {
+    const attemptedAt = Date.now();
+    const wasLeader = this.isLeader();
+
+    try {
+      const result = await (await DatabaseService.getInstance().getRequest())
+        .input('Name', sql.NVarChar(100), LEASE_NAME)
+        .input('HolderId', sql.NVarChar(200), this.holderId)
+        .input('LeaseMs', sql.Int, LEASE_MS)
+        .query(`
+          MERGE dbo.SchedulerLeases WITH (HOLDLOCK) AS target
+          USING (SELECT @Name AS Name) AS source
+          ON target.Name = source.Name
+          WHEN MATCHED AND (target.HolderId = @HolderId OR target.ExpiresAt < SYSUTCDATETIME()) THEN
+            UPDATE SET
+              AcquiredAt = CASE WHEN target.HolderId = @HolderId THEN target.AcquiredAt ELSE SYSUTCDATETIME() END,
+              HolderId = @HolderId,
+              ExpiresAt = DATEADD(MILLISECOND, @LeaseMs, SYSUTCDATETIME()),
+              RenewedAt = SYSUTCDATETIME()
+          WHEN NOT MATCHED THEN
+            INSERT (Name, HolderId, AcquiredAt, RenewedAt, ExpiresAt)
+            VALUES (@Name, @HolderId, SYSUTCDATETIME(), SYSUTCDATETIME(), DATEADD(MILLISECOND, @LeaseMs, SYSUTCDATETIME()));
+
+          SELECT HolderId FROM dbo.SchedulerLeases WHERE Name = @Name;
+        `);
+
+      this.currentLeader = result.recordset[0]?.HolderId ?? null;
+      // Measured from before the round trip, so the local view never outlives the row
+      this.leaseValidUntil = this.currentLeader === this.holderId ? attemptedAt + LEASE_MS : 0;
+    } catch (error) {
+      this.renewFailures++;
+      logger.warn('[LeaderElection] Lease renewal failed', { error });
+    }
+
+    const isLeader = this.isLeader();
+    if (isLeader && !wasLeader) {
+      this.elections++;
+      logger.info(`👑 [LeaderElection] This node is now the scheduler leader (${this.holderId})`);
+    } else if (!isLeader && wasLeader) {
+      logger.warn(`[LeaderElection] Lost scheduler leadership (current leader: ${this.currentLeader || 'unknown'})`);
+    }
+  }
+
+  getStats(): LeaderElectionStats {
+    return {
+      mode: this.mode,
+      holderId: this.holderId,
+      isLeader: this.isLeader(),
+      currentLeader: this.currentLeader,
+      leaseMs: LEASE_MS,
+      elections: this.elections,
+      renewFailures: this.renewFailures,
+      jobsRun: this.jobsRun,
+      jobsSkipped: this.jobsSkipped
+    };
+  }
+}
@@ -0,0 +1,356 @@
+import sql from 'mssql';
+import { Server } from 'socket.io';
+import { DatabaseService } from './DatabaseService';
+import { NotificationService } from './NotificationService';
+import { CertificateService } from './CertificateService';
+import { WorkQueue } from '../utils/WorkQueue';
+import { logger } from '../utils/logger';
+
+/**
+ * LessonCompletionService — POST /api/progress/lessons/:lessonId/complete
+ *
+ * The whole write path is one T-SQL batch (one round trip, one transaction): lesson and
+ * access lookup, the UserProgress upsert, the CourseProgress update and the enrollment
+ * completion. Course progress is maintained incrementally: CourseProgress.ProgressPoints
+ * holds the sum of the user's lesson percentages, so completing a lesson adds
+ * (100 - previous percentage) and OverallProgress = ProgressPoints / LessonCount, instead
+ * of re-reading every lesson and progress row of the course. A missing CourseProgress row
+ * is created from one recount, and deleting a lesson (DELETE /api/lessons/:id) rebuilds
+ * ProgressPoints for the course from the remaining UserProgress rows.
+ *
+ * The UserProgress row is read WITH (UPDLOCK, HOLDLOCK), so two concurrent completions of
+ * the same lesson serialize and only the first one sees WasCompleted = 0 and adds points.
+ *
+ * Notifications and the certificate run after COMMIT on a bounded in-process queue; the
+ * request does not wait for them, and they are skipped when the lesson was already completed.
+ */
+
+export type LessonCompletionOutcome = 'ok' | 'not_found' | 'forbidden';
+
+export interface LessonCompletionResult {
+  outcome: LessonCompletionOutcome;
+  courseId?: string;
+  wasAlreadyCompleted?: boolean;
+  overallProgress?: number;
+  previousOverallProgress?: number;
+  courseCompleted?: boolean;
+}
+
+interface CompletionSideEffects {
+  userId: string;
+  courseId: string;
+  lessonTitle: string;
+  courseTitle: string;
+  instructorId: string | null;
+  certificateEnabled: boolean;
+  overallProgress: number;
+  previousOverallProgress: number;
+}
+
+const MILESTONES = [25, 50, 75, 100];
+
+const sideEffectQueue = new WorkQueue(
+  'lessonCompletionSideEffects',
+  parseInt(process.env.LESSON_COMPLETION_SIDE_EFFECT_CONCURRENCY || '4', 10),
+  parseInt(process.env.LESSON_COMPLETION_SIDE_EFFECT_QUEUE_MAX || '10000', 10)
+);
+
+const COMPLETE_LESSON_SQL = `
+  SET NOCOUNT ON;
+  SET XACT_ABORT ON;
+
+  DECLARE @LessonGuid UNIQUEIDENTIFIER = TRY_CAST(@LessonId AS UNIQUEIDENTIFIER);
+  DECLARE @CourseId UNIQUEIDENTIFIER, @LessonTitle NVARCHAR(200), @CourseTitle NVARCHAR(200),
+          @InstructorId UNIQUEIDENTIFIER, @CertificateEnabled BIT, @LessonCount INT, @HasAccess BIT;
+
+  SELECT @CourseId = l.CourseId,
+         @LessonTitle = l.Title,
+         @CourseTitle = c.Title,
+         @InstructorId = c.InstructorId,
+         @CertificateEnabled = c.CertificateEnabled,
+         @LessonCount = c.LessonCount,
+         @HasAccess = CASE
+           WHEN c.InstructorId = @UserId THEN 1
+           WHEN EXISTS (SELECT 1 FROM dbo.Enrollments e WHERE e.UserId = @UserId AND e.CourseId = c.Id) THEN 1
+           ELSE 0
+         END
+  FROM dbo.Lessons l
+  INNER JOIN dbo.Courses c ON c.Id = l.CourseId
+  WHERE l.Id = @LessonGuid;
+
+  IF @CourseId IS NULL
+  BEGIN
+    SELECT 'not_found' AS Outcome;
+    RETURN;
+  END
+
+  IF @HasAccess = 0
+  BEGIN
+    SELECT 'forbidden' AS Outcome, @CourseId AS CourseId;
+    RETURN;
+  END
+
+  -- Courses.LessonCount is maintained by CourseCounterService; fall back to a count if it was never filled
+  IF ISNULL(@LessonCount, 0) = 0
+    SELECT @LessonCount = COUNT(*) FROM dbo.Lessons WHERE CourseId = @CourseId;
+
+  DECLARE @Now DATETIME2 = GETUTCDATE();
+  DECLARE @PrevPct DECIMAL(5,2), @PrevTime INT, @WasCompleted BIT = 0;
+  DECLARE @Points DECIMAL(9,2), @PrevOverall INT = 0, @Overall INT, @TotalTime INT;
+
+  BEGIN TRANSACTION;
+
+  SELECT @PrevPct = ProgressPercentage,
+         @PrevTime = TimeSpent,
+         @WasCompleted = CASE WHEN Status = 'completed' AND CompletedAt IS NOT NULL THEN 1 ELSE 0 END
+  FROM dbo.UserProgress WITH (UPDLOCK, HOLDLOCK)
+  WHERE UserId = @UserId AND LessonId = @LessonGuid;
+
+  IF @@ROWCOUNT > 0
+    UPDATE dbo.UserProgress
+    SET CompletedAt = ISNULL(CompletedAt, @Now),
+        TimeSpent = @TimeSpent,
+        ProgressPercentage = 100,
+        NotesJson = @Notes,
+        LastAccessedAt = @Now,
+        Status = 'completed'
+    WHERE UserId = @UserId AND LessonId = @LessonGuid;
+  ELSE
+    INSERT INTO dbo.UserProgress (Id, UserId, CourseId, LessonId, CompletedAt, TimeSpent, ProgressPercentage, NotesJson, LastAccessedAt, Status)
+    VALUES (NEWID(), @UserId, @CourseId, @LessonGuid, @Now, @TimeSpent, 100, @Notes, @Now, 'completed');
+
+  SELECT @PrevOverall = OverallProgress, @Points = ProgressPoints
+  FROM dbo.CourseProgress WITH (UPDLOCK, HOLDLOCK)
+  WHERE UserId = @UserId AND CourseId = @CourseId;
+
+  IF @@ROWCOUNT > 0
+  BEGIN
+    -- Incremental: only this lesson's percentage and time changed
+    SET @Points = @Points + (100 - ISNULL(@PrevPct, 0));
+    IF @Points > 100.0 * @LessonCount SET @Points = 100.0 * @LessonCount;
+    SET @Overall = ROUND(@Points / @LessonCount, 0);
+
+    UPDATE dbo.CourseProgress
+    SET ProgressPoints = @Points,
+        OverallProgress = @Overall,
+        TimeSpent = CASE WHEN TimeSpent + @TimeSpent - ISNULL(@PrevTime, 0) < 0 THEN 0
+                         ELSE TimeSpent + @TimeSpent - ISNULL(@PrevTime, 0) END,
+        CompletedLessons = CASE WHEN ISNULL(@PrevPct, 0) < 100
+                                THEN JSON_MODIFY(ISNULL(CompletedLessons, '[]'), 'append $', CAST(@LessonGuid AS NVARCHAR(36)))
+                                ELSE CompletedLessons END,
+        LastAccessedAt = @Now,
+        UpdatedAt = @Now
+    WHERE UserId = @UserId AND CourseId = @CourseId;
+  END
+  ELSE
+  BEGIN
+    -- First progress write for this course: build the row from one recount
+    SET @PrevOverall = 0;
+    SELECT @Points = ISNULL(SUM(ProgressPercentage), 0), @TotalTime = ISNULL(SUM(TimeSpent), 0)
+    FROM dbo.UserProgress
+    WHERE UserId = @UserId AND CourseId = @CourseId;
+    IF @Points > 100.0 * @LessonCount SET @Points = 100.0 * @LessonCount;
+    SET @Overall = ROUND(@Points / @LessonCount, 0);
+
+    INSERT INTO dbo.CourseProgress (Id, UserId, CourseId, OverallProgress, ProgressPoints, CompletedLessons, TimeSpent, LastAccessedAt, CreatedAt, UpdatedAt)
+    VALUES (
+      NEWID(), @UserId, @CourseId, @Overall, @Points,
+      '[' + ISNULL(STUFF((
+        SELECT ',"' + CAST(up.LessonId AS NVARCHAR(36)) + '"'
+        FROM dbo.UserProgress up
+        WHERE up.UserId = @UserId AND up.CourseId = @CourseId AND up.ProgressPercentage >= 100
+        FOR XML PATH('')
+      ), 1, 1, ''), '') + ']',
+      @TotalTime, @Now, @Now, @Now
+    );
+  END
+
+  IF @Points >= 100.0 * @LessonCount
+    UPDATE dbo.Enrollments
+    SET Status = 'completed', CompletedAt = ISNULL(CompletedAt, @Now)
+    WHERE UserId = @UserId AND CourseId = @CourseId;
+
+  COMMIT TRANSACTION;
+
+  SELECT 'ok' AS Outcome,
+         @CourseId AS CourseId,
+         @WasCompleted AS WasCompleted,
+         @Overall AS OverallProgress,
+         @PrevOverall AS PreviousOverallProgress,
+         @LessonTitle AS LessonTitle,
+         @CourseTitle AS CourseTitle,
+         @InstructorId AS InstructorId,
+         @CertificateEnabled AS CertificateEnabled;
+`;
+
+export class LessonCompletionService {
+  /**
+   * Mark a lesson completed and update course progress in one transaction,
+   * then queue the notifications/certificate for a first-time completion
+   */
+  static async completeLesson(
+    userId: string,
+    lessonId: string,
+    timeSpent: number,
+    notes: string,
+    io?: Server
+  ): Promise<LessonCompletionResult> {
+    const request = await DatabaseService.getInstance().getRequest();
+    const result = await request
+      .input('UserId', sql.UniqueIdentifier, userId)
+      .input('LessonId', sql.NVarChar(100), lessonId)
+      .input('TimeSpent', sql.Int, Math.max(0, Math.floor(Number(timeSpent) || 0)))
+      .input('Notes', sql.NVarChar(sql.MAX), notes)
+      .query(COMPLETE_LESSON_SQL);
+
+    const row = result.recordset?.[0];
+    if (!row || row.Outcome !== 'ok') {
+      return { outcome: row?.Outcome === 'forbidden' ? 'forbidden' : 'not_found', courseId: row?.CourseId };
+    }
+
+    const completion: LessonCompletionResult = {
+      outcome: 'ok',
+      courseId: row.CourseId,
+      wasAlreadyCompleted: row.WasCompleted === true || row.WasCompleted === 1,
+      overallProgress: row.OverallProgress,
+      previousOverallProgress: row.PreviousOverallProgress,
+      courseCompleted: row.OverallProgress >= 100
+    };
+
+    if (completion.wasAlreadyCompleted) {
+      logger.info(`ℹ️ Lesson already completed, skipping duplicate notifications for user ${userId}`);
+      return completion;
+    }
+
+    const effects: CompletionSideEffects = {
+      userId,
+      courseId: row.CourseId,
+      lessonTitle: row.LessonTitle,
+      courseTitle: row.CourseTitle || 'your course',
+      instructorId: row.InstructorId || null,
+      // Default to true for backward compatibility
+      certificateEnabled: row.CertificateEnabled !== null && row.CertificateEnabled !== undefined
+        ? Boolean(row.CertificateEnabled)
+        : true,
+      overallProgress: row.OverallProgress,
+      previousOverallProgress: row.PreviousOverallProgress
+    };
+    sideEffectQueue.enqueue(() => this.runSideEffects(effects, new NotificationService(io)));
+
+    return completion;
+  }
+
+  /**
+   * Post-commit work for a first-time lesson completion. Each step is independent:
+   * a failed notification does not stop the certificate, and vice versa.
+   */
+  private static async runSideEffects(effects: CompletionSideEffects, notificationService: NotificationService): Promise<void> {
+    const { userId, courseId, courseTitle, overallProgress } = effects;
+
+    try {
+      await notificationService.createNotificationWithControls(
+        {
+          userId,
+          type: 'progress',
+          priority: 'normal',
+          title: 'Lesson Completed!',
+          message: `Great work! You completed "${effects.lessonTitle}" in ${courseTitle}. Course progress: ${Math.floor(overallProgress)}%`,
+          actionUrl: `/courses/${courseId}`,
+          actionText: 'Continue Learning'
+        },
+        {
+          category: 'progress',
+          subcategory: 'LessonCompletion'
+        }
+      );
+    } catch (error) {
+      logger.error('⚠️ Failed to send lesson completion notification:', error);
+    }
+
+    // Highest milestone crossed by this completion (progress can jump past an exact 25/50/75)
+    const milestone = MILESTONES.filter(m => effects.previousOverallProgress < m && overallProgress >= m).pop();
+
+    if (milestone && effects.instructorId) {
+      try {
+        const studentInfo = await DatabaseService.getInstance().query(`
+          SELECT FirstName, LastName FROM dbo.Users WHERE Id = @userId
+        `, { userId });
+
+        const studentName = studentInfo[0]
+          ? `${studentInfo[0].FirstName} ${studentInfo[0].LastName}`.trim()
+          : 'A student';
+
+        await notificationService.createNotificationWithControls(
+          {
+            userId: effects.instructorId,
+            type: 'progress',
+            priority: 'normal',
+            title: 'Student Progress Milestone',
+            message: `${studentName} reached ${milestone}% completion in "${courseTitle}"`,
+            actionUrl: `/instructor/students`,
+            actionText: 'View Students'
+          },
+          {
+            category: 'progress',
+            subcategory: 'CourseMilestones'
+          }
+        );
+      } catch (error) {
+        logger.error('⚠️ Failed to send milestone notification:', error);
+      }
+    }
+
+    if (milestone !== 100) {
+      return;
+    }
+
+    if (!effects.certificateEnabled) {
+      logger.info(`ℹ️ Certificates disabled for course ${courseId}, skipping certificate issuance`);
+    } else {
+      try {
+        const certificate = await new CertificateService().issueCertificate(userId, courseId);
+        logger.info(`✅ Certificate issued: ${certificate.CertificateNumber} for user ${userId} course ${courseId}`);
+
+        // Public shareable link so it works regardless of who's logged in
+        await notificationService.createNotificationWithControls(
+          {
+            userId,
+            type: 'achievement',
+            priority: 'high',
+            title: '🎓 Certificate Earned!',
+            message: `Congratulations! Your certificate for "${courseTitle}" is ready. Download it now!`,
+            actionUrl: `/certificate/${certificate.VerificationCode}`,
+            actionText: 'Download Certificate'
+          },
+          {
+            category: 'system',
+            subcategory: 'Certificates'
+          }
+        );
+      } catch (error) {
+        logger.error('⚠️ Failed to issue certificate or send notification:', error);
+      }
+    }
+
+    // Course completion congratulations (always, regardless of certificate setting)
+    try {
+      await notificationService.createNotificationWithControls(
+        {
+          userId,
+          type: 'progress',
+          priority: 'high',
+          title: '🎉 Congratulations! Course Completed!',
+          message: `You've completed "${courseTitle}"! Great achievement!`,
+          actionUrl: `/courses/${courseId}`,
+          actionText: 'View Course'
+        },
+        {
+          category: 'progress',
+          subcategory: 'CourseCompletion'
+        }
+      );
+    } catch (error) {
+      logger.error('⚠️ Failed to send course completion notification:', error);
+    }
+  }
+}
@@ -1,5 +1,6 @@
 import { DatabaseService } from './DatabaseService';
 import { logger } from '../utils/logger';
+import { PresenceService } from './PresenceService';
 
 /**
  * Helper functions for notification triggers
@@ -332,15 +333,8 @@ export async function getPendingSubmissionCount(assessmentId: string): Promise<n
  */
 export async function isUserOnline(userId: string): Promise<boolean> {
   try {
-    const db = DatabaseService.getInstance();
-    
-    const result = await db.query(`
-      SELECT Status
-      FROM dbo.UserPresence
-      WHERE UserId = @userId
-    `, { userId });
-    
-    return result[0]?.Status === 'online';
+    const presence = await PresenceService.getUserPresence(userId);
+    return presence?.Status === 'online';
   } catch (error) {
     logger.error('Error checking user online status:', error);
     return false;
@@ -1,11 +1,15 @@
 import cron from 'node-cron';
 import { Server } from 'socket.io';
-import { NotificationService } from './NotificationService';
+import { NotificationService, BulkNotificationResult, CreateNotificationParams } from './NotificationService';
 import { getUpcomingAssessmentsDue, getWeeklyActivitySummaries, getUpcomingLiveSessions, getAtRiskStudents } from './NotificationHelpers';
 import { logger } from '../utils/logger';
 import { format } from 'date-fns';
 import { ExportJobProcessor } from './ExportJobProcessor';
 import { DataExportService } from './DataExportService';
+import { CourseCounterService } from './CourseCounterService';
+import { QuestionStatsService } from './QuestionStatsService';
+import { AssessmentFeedbackService } from './AssessmentFeedbackService';
+import { LeaderElectionService } from './LeaderElectionService';
 
 /**
  * Notification Scheduler Service
@@ -15,6 +19,14 @@ import { DataExportService } from './DataExportService';
 let io: Server;
 let isInitialized = false;
 
+/**
+ * One-line outcome of a createNotificationsBulk call for the job logs
+ */
+function describeBulkResult(result: BulkNotificationResult): string {
+  return `${result.created} sent, ${result.queued} queued (quiet hours), ${result.emailOnly} email-only, ` +
+    `${result.skipped} skipped by preferences, ${result.failed} failed`;
+}
+
 /**
  * Initialize the scheduler with Socket.io instance
  */
@@ -30,39 +42,31 @@ export function initializeScheduler(socketIoInstance: Server): void {
   logger.info('🕐 NotificationScheduler initializing...');
 
   // Schedule: Daily at 9 AM UTC - Assessment Due Date Reminders
-  cron.schedule('0 9 * * *', async () => {
-    logger.info('⏰ Running scheduled job: Assessment Due Date Reminders');
-    await sendAssessmentDueReminders();
-  });
+  scheduleLeaderJob('0 9 * * *', 'Assessment Due Date Reminders', sendAssessmentDueReminders);
 
   // Schedule: Weekly on Monday at 8 AM UTC - Weekly Progress Summary
-  cron.schedule('0 8 * * 1', async () => {
-    logger.info('⏰ Running scheduled job: Weekly Progress Summary');
-    await sendWeeklyProgressSummaries();
-  });
+  scheduleLeaderJob('0 8 * * 1', 'Weekly Progress Summary', sendWeeklyProgressSummaries);
 
   // Schedule: Every 15 minutes - Live Session Starting Soon
-  cron.schedule('*/15 * * * *', async () => {
-    logger.info('⏰ Running scheduled job: Live Session Starting Soon');
-    await sendLiveSessionReminders();
-  });
+  scheduleLeaderJob('*/15 * * * *', 'Live Session Starting Soon', sendLiveSessionReminders);
 
   // Schedule: Weekly on Monday at 10 AM UTC - At-Risk Student Detection
-  cron.schedule('0 10 * * 1', async () => {
-    logger.info('⏰ Running scheduled job: At-Risk Student Detection');
-    await detectAndNotifyAtRiskStudents();
-  });
+  scheduleLeaderJob('0 10 * * 1', 'At-Risk Student Detection', detectAndNotifyAtRiskStudents);
 
   // Schedule: Every minute - Process Pending Data Exports
-  cron.schedule('* * * * *', async () => {
-    await processPendingDataExports();
-  });
+  scheduleLeaderJob('* * * * *', 'Process Pending Data Exports', processPendingDataExports, false);
 
   // Schedule: Daily at 3 AM UTC - Cleanup Expired Data Exports
-  cron.schedule('0 3 * * *', async () => {
-    logger.info('⏰ Running scheduled job: Cleanup Expired Data Exports');
-    await cleanupExpiredExports();
-  });
+  scheduleLeaderJob('0 3 * * *', 'Cleanup Expired Data Exports', cleanupExpiredExports);
+
+  // Schedule: Daily at 3:30 AM UTC - Reconcile Course Counters
+  scheduleLeaderJob('30 3 * * *', 'Reconcile Course Counters', reconcileCourseCounters);
+
+  // Schedule: Daily at 3:45 AM UTC - Refresh Adaptive Question Difficulties
+  scheduleLeaderJob('45 3 * * *', 'Refresh Question Difficulties', refreshQuestionDifficulties);
+
+  // Schedule: Daily at 4 AM UTC - Prune data of deleted questions
+  scheduleLeaderJob('0 4 * * *', 'Prune Orphaned Question Data', pruneOrphanedQuestionData);
 
   logger.info('✅ NotificationScheduler started successfully');
   logger.info('   - Assessment Due Reminders: Daily at 9:00 AM UTC');
@@ -71,6 +75,24 @@ export function initializeScheduler(socketIoInstance: Server): void {
   logger.info('   - At-Risk Student Alerts: Monday at 10:00 AM UTC');
   logger.info('   - Data Export Processing: Every minute');
   logger.info('   - Export Cleanup: Daily at 3:00 AM UTC');
+  logger.info('   - Course Counter Reconciliation: Daily at 3:30 AM UTC');
+  logger.info('   - Question Difficulty Refresh: Daily at 3:45 AM UTC');
+  logger.info('   - Orphaned Question Data Prune: Daily at 4:00 AM UTC');
+  logger.info('   (jobs run only on the scheduler leader node)');
+}
+
+/**
+ * Schedule a cron job that runs only on the scheduler leader (one node per cluster)
+ */
+export function scheduleLeaderJob(expression: string, name: string, job: () => Promise<void>, logRun: boolean = true): void {
+  cron.schedule(expression, async () => {
+    await LeaderElectionService.getInstance().runIfLeader(name, async () => {
+      if (logRun) {
+        logger.info(`⏰ Running scheduled job: ${name}`);
+      }
+      await job();
+    });
+  });
 }
 
 /**
@@ -94,45 +116,33 @@ async function sendAssessmentDueReminders(): Promise<void> {
     logger.info(`Found ${upcomingAssessments.length} assessment(s) due in 2 days`);
 
     const notificationService = new NotificationService(io);
-    let successCount = 0;
-    let failureCount = 0;
-
-    // Send notification to each student
-    for (const assessment of upcomingAssessments) {
-      try {
-        const dueDate = new Date(assessment.dueDate);
-        const now = new Date();
-        const dueDateFormatted = format(dueDate, 'MMM dd, yyyy');
-        const daysUntilDue = Math.ceil((dueDate.getTime() - now.getTime()) / (1000 * 60 * 60 * 24));
-
-        await notificationService.createNotificationWithControls(
-          {
-            userId: assessment.userId,
-            type: 'assignment',
-            priority: 'urgent',
-            title: 'Assignment Due Soon!',
-            message: `"${assessment.assessmentTitle}" is due in ${daysUntilDue} day${daysUntilDue !== 1 ? 's' : ''} (${dueDateFormatted})`,
-            actionUrl: `/courses/${assessment.courseId}/lessons/${assessment.lessonId}`,
-            actionText: 'Work on Assignment',
-            relatedEntityId: assessment.assessmentId,
-            relatedEntityType: 'assessment'
-          },
-          {
-            category: 'assessment',
-            subcategory: 'AssessmentDue'
-          }
-        );
-
-        successCount++;
-        
-        logger.debug(`Sent due reminder to ${assessment.userName} for "${assessment.assessmentTitle}"`);
-      } catch (error) {
-        failureCount++;
-        logger.error(`Failed to send due reminder to ${assessment.userName}:`, error);
-      }
-    }
+    const now = new Date();
 
-    logger.info(`Assessment due reminders completed: ${successCount} sent, ${failureCount} failed`);
+    // One notification per student per assessment, created in bulk
+    const notifications = upcomingAssessments.map((assessment): CreateNotificationParams => {
+      const dueDate = new Date(assessment.dueDate);
+      const dueDateFormatted = format(dueDate, 'MMM dd, yyyy');
+      const daysUntilDue = Math.ceil((dueDate.getTime() - now.getTime()) / (1000 * 60 * 60 * 24));
+
+      return {
+        userId: assessment.userId,
+        type: 'assignment',
+        priority: 'urgent',
+        title: 'Assignment Due Soon!',
+        message: `"${assessment.assessmentTitle}" is due in ${daysUntilDue} day${daysUntilDue !== 1 ? 's' : ''} (${dueDateFormatted})`,
+        actionUrl: `/courses/${assessment.courseId}/lessons/${assessment.lessonId}`,
+        actionText: 'Work on Assignment',
+        relatedEntityId: assessment.assessmentId,
+        relatedEntityType: 'assessment'
+      };
+    });
+
+    const result = await notificationService.createNotificationsBulk(notifications, {
+      category: 'assessment',
+      subcategory: 'AssessmentDue'
+    });
+
+    logger.info(`Assessment due reminders completed: ${describeBulkResult(result)}`);
   } catch (error) {
     logger.error('Error in sendAssessmentDueReminders:', error);
   }
@@ -186,51 +196,39 @@ async function sendWeeklyProgressSummaries(): Promise<void> {
     logger.info(`Found ${summaries.length} student(s) with activity in the past week`);
 
     const notificationService = new NotificationService(io);
-    let successCount = 0;
-    let failureCount = 0;
-
-    // Send notification to each active student
-    for (const summary of summaries) {
-      try {
-        // Format message with activity summary
-        const messageLines = [
-          'Great work this week! Here\'s your learning summary:',
-          '',
-          `✅ ${summary.lessonsCompleted} lesson${summary.lessonsCompleted !== 1 ? 's' : ''} completed`,
-          `🎥 ${summary.videosWatched} video${summary.videosWatched !== 1 ? 's' : ''} watched`,
-          `📝 ${summary.assessmentsSubmitted} assessment${summary.assessmentsSubmitted !== 1 ? 's' : ''} submitted`,
-          `⏱️ ${summary.totalTimeSpent} minutes of focused learning`,
-          `📚 Active in ${summary.coursesActive} course${summary.coursesActive !== 1 ? 's' : ''}`
-        ];
-
-        await notificationService.createNotificationWithControls(
-          {
-            userId: summary.userId,
-            type: 'progress',
-            priority: 'normal',
-            title: '📊 Your Weekly Progress Summary',
-            message: messageLines.join('\n'),
-            actionUrl: '/my-learning',
-            actionText: 'View My Progress',
-            relatedEntityId: summary.userId,
-            relatedEntityType: 'student'
-          },
-          {
-            category: 'progress',
-            subcategory: 'ProgressSummary'
-          }
-        );
-
-        successCount++;
-        
-        logger.debug(`Sent weekly summary to ${summary.userName}: ${summary.lessonsCompleted} lessons, ${summary.totalTimeSpent} min`);
-      } catch (error) {
-        failureCount++;
-        logger.error(`Failed to send weekly summary to ${summary.userName}:`, error);
-      }
-    }
 
-    logger.info(`Weekly progress summaries completed: ${successCount} sent, ${failureCount} failed`);
+    // One summary per active student, created in bulk
+    const notifications = summaries.map((summary): CreateNotificationParams => {
+      // Format message with activity summary
+      const messageLines = [
+        'Great work this week! Here\'s your learning summary:',
+        '',
+        `✅ ${summary.lessonsCompleted} lesson${summary.lessonsCompleted !== 1 ? 's' : ''} completed`,
+        `🎥 ${summary.videosWatched} video${summary.videosWatched !== 1 ? 's' : ''} watched`,
+        `📝 ${summary.assessmentsSubmitted} assessment${summary.assessmentsSubmitted !== 1 ? 's' : ''} submitted`,
+        `⏱️ ${summary.totalTimeSpent} minutes of focused learning`,
+        `📚 Active in ${summary.coursesActive} course${summary.coursesActive !== 1 ? 's' : ''}`
+      ];
+
+      return {
+        userId: summary.userId,
+        type: 'progress',
+        priority: 'normal',
+        title: '📊 Your Weekly Progress Summary',
+        message: messageLines.join('\n'),
+        actionUrl: '/my-learning',
+        actionText: 'View My Progress',
+        relatedEntityId: summary.userId,
+        relatedEntityType: 'student'
+      };
+    });
+
+    const result = await notificationService.createNotificationsBulk(notifications, {
+      category: 'progress',
+      subcategory: 'ProgressSummary'
+    });
+
+    logger.info(`Weekly progress summaries completed: ${describeBulkResult(result)}`);
   } catch (error) {
     logger.error('Error in sendWeeklyProgressSummaries:', error);
   }
@@ -284,8 +282,6 @@ async function sendLiveSessionReminders(): Promise<void> {
     logger.info(`Found ${upcomingSessions.length} notification(s) for session(s) starting in ~1 hour`);
 
     const notificationService = new NotificationService(io);
-    let successCount = 0;
-    let failureCount = 0;
 
     // Group by session to get unique session count
     const sessionMap = new Map<string, typeof upcomingSessions>();
@@ -298,50 +294,31 @@ async function sendLiveSessionReminders(): Promise<void> {
 
     logger.info(`Sending reminders for ${sessionMap.size} session(s) to ${upcomingSessions.length} student(s)`);
 
-    // Send notification to each student for each session
-    for (const [sessionId, students] of sessionMap) {
+    // One notification per student per session, all sessions in a single bulk call
+    const notifications = [...sessionMap.values()].flatMap(students => {
       const session = students[0]; // Get session details
       const scheduledTime = new Date(session.scheduledAt);
       const formattedTime = format(scheduledTime, 'MMM dd, yyyy h:mm a');
 
-      for (const student of students) {
-        try {
-          await notificationService.createNotificationWithControls(
-            {
-              userId: student.userId,
-              type: 'course',
-              priority: 'urgent',
-              title: 'Live Session Starting Soon!',
-              message: `"${session.sessionTitle}" starts in 1 hour (${formattedTime})`,
-              actionUrl: `/live-sessions/${session.sessionId}`,
-              actionText: 'Join Session',
-              relatedEntityId: session.sessionId,
-              relatedEntityType: 'live-session'
-            },
-            {
-              category: 'course',
-              subcategory: 'LiveSessions'
-            }
-          );
-
-          successCount++;
-          
-          logger.debug(
-            `Sent live session reminder to ${student.userName} for "${session.sessionTitle}"`
-          );
-        } catch (error) {
-          failureCount++;
-          logger.error(
-            `Failed to send live session reminder to ${student.userName}:`, 
-            error
-          );
-        }
-      }
-    }
+      return students.map((student): CreateNotificationParams => ({
+        userId: student.userId,
+        type: 'course',
+        priority: 'urgent',
+        title: 'Live Session Starting Soon!',
+        message: `"${session.sessionTitle}" starts in 1 hour (${formattedTime})`,
+        actionUrl: `/live-sessions/${session.sessionId}`,
+        actionText: 'Join Session',
+        relatedEntityId: session.sessionId,
+        relatedEntityType: 'live-session'
+      }));
+    });
 
-    logger.info(
-      `Live session reminders completed: ${successCount} sent, ${failureCount} failed`
-    );
+    const result = await notificationService.createNotificationsBulk(notifications, {
+      category: 'course',
+      subcategory: 'LiveSessions'
+    });
+
+    logger.info(`Live session reminders completed: ${describeBulkResult(result)}`);
   } catch (error) {
     logger.error('Error in sendLiveSessionReminders:', error);
   }
@@ -419,66 +396,57 @@ async function detectAndNotifyAtRiskStudents(): Promise<void> {
     }
 
     const notificationService = new NotificationService(io);
-    let successCount = 0;
-    let errorCount = 0;
+    const notifications: CreateNotificationParams[] = [];
 
-    // Send one notification per instructor per course
+    // One notification per instructor per course
     for (const [instructorId, courseMap] of instructorCourseMap) {
       for (const [courseId, students] of courseMap) {
-        try {
-          const courseTitle = students[0].courseTitle;
-          const studentCount = students.length;
-          
-          // Build risk breakdown message
-          const criticalCount = students.filter(s => s.riskLevel === 'critical').length;
-          const highCount = students.filter(s => s.riskLevel === 'high').length;
-          const mediumCount = students.filter(s => s.riskLevel === 'medium').length;
-          
-          let riskBreakdown = '';
-          if (criticalCount > 0) riskBreakdown += `${criticalCount} critical, `;
-          if (highCount > 0) riskBreakdown += `${highCount} high, `;
-          if (mediumCount > 0) riskBreakdown += `${mediumCount} medium`;
-          riskBreakdown = riskBreakdown.replace(/, $/, '');
-
-          await notificationService.createNotificationWithControls(
-            {
-              userId: instructorId,
-              type: 'intervention',
-              priority: criticalCount > 0 ? 'urgent' : 'high',
-              title: '⚠️ At-Risk Student Alert',
-              message: `${studentCount} student${studentCount > 1 ? 's' : ''} need${studentCount === 1 ? 's' : ''} attention in "${courseTitle}" (${riskBreakdown})`,
-              actionUrl: `/instructor/interventions?tab=at-risk&courseId=${courseId}`,
-              actionText: 'Review Students',
-              relatedEntityId: courseId,
-              relatedEntityType: 'course',
-              data: JSON.stringify({ 
-                studentCount,
-                criticalCount,
-                highCount,
-                mediumCount,
-                students: students.map(s => ({
-                  id: s.studentId,
-                  name: s.studentName,
-                  riskLevel: s.riskLevel,
-                  daysSinceLastActivity: s.daysSinceLastActivity
-                }))
-              })
-            },
-            {
-              category: 'system',
-              subcategory: 'RiskAlerts'
-            }
-          );
-
-          successCount++;
-        } catch (error) {
-          console.error(`❌ Failed to notify instructor ${instructorId} about course ${courseId}:`, error);
-          errorCount++;
-        }
+        const courseTitle = students[0].courseTitle;
+        const studentCount = students.length;
+        
+        // Build risk breakdown message
+        const criticalCount = students.filter(s => s.riskLevel === 'critical').length;
+        const highCount = students.filter(s => s.riskLevel === 'high').length;
+        const mediumCount = students.filter(s => s.riskLevel === 'medium').length;
+        
+        let riskBreakdown = '';
+        if (criticalCount > 0) riskBreakdown += `${criticalCount} critical, `;
+        if (highCount > 0) riskBreakdown += `${highCount} high, `;
+        if (mediumCount > 0) riskBreakdown += `${mediumCount} medium`;
+        riskBreakdown = riskBreakdown.replace(/, $/, '');
+
+        notifications.push({
+          userId: instructorId,
+          type: 'intervention',
+          priority: criticalCount > 0 ? 'urgent' : 'high',
+          title: '⚠️ At-Risk Student Alert',
+          message: `${studentCount} student${studentCount > 1 ? 's' : ''} need${studentCount === 1 ? 's' : ''} attention in "${courseTitle}" (${riskBreakdown})`,
+          actionUrl: `/instructor/interventions?tab=at-risk&courseId=${courseId}`,
+          actionText: 'Review Students',
+          relatedEntityId: courseId,
+          relatedEntityType: 'course',
+          data: JSON.stringify({ 
+            studentCount,
+            criticalCount,
+            highCount,
+            mediumCount,
+            students: students.map(s => ({
+              id: s.studentId,
+              name: s.studentName,
+              riskLevel: s.riskLevel,
+              daysSinceLastActivity: s.daysSinceLastActivity
+            }))
+          })
+        });
       }
     }
 
-    logger.info(`✅ At-risk detection complete: ${successCount} notification(s) sent, ${errorCount} error(s)`);
+    const result = await notificationService.createNotificationsBulk(notifications, {
+      category: 'system',
+      subcategory: 'RiskAlerts'
+    });
+
+    logger.info(`✅ At-risk detection complete: ${describeBulkResult(result)}`);
     
   } catch (error) {
     logger.error('❌ At-risk student detection failed:', error);
@@ -563,3 +531,43 @@ async function cleanupExpiredExports(): Promise<void> {
     logger.error('Error cleaning up expired exports:', error);
   }
 }
+
+/**
+ * Repair Courses.EnrollmentCount / LessonCount drift (writes made outside the API)
+ * Runs daily at 3:30 AM UTC
+ */
+async function reconcileCourseCounters(): Promise<void> {
+  try {
+    await CourseCounterService.reconcileAll();
+  } catch (error) {
+    logger.error('Error reconciling course counters:', error);
+  }
+}
+
+/**
+ * Re-derive the difficulty of every adaptive assessment question from QuestionStats
+ * Runs daily at 3:45 AM UTC
+ */
+async function refreshQuestionDifficulties(): Promise<void> {
+  try {
+    await QuestionStatsService.refreshDifficulties();
+  } catch (error) {
+    logger.error('Error refreshing question difficulties:', error);
+  }
+}
+
+/**
+ * Delete question stats and cached AI explanations of questions that no longer exist
+ * Runs daily at 4 AM UTC
+ */
+async function pruneOrphanedQuestionData(): Promise<void> {
+  try {
+    const stats = await QuestionStatsService.pruneOrphanedStats();
+    const insights = await AssessmentFeedbackService.pruneOrphanedInsights();
+    if (stats > 0 || insights > 0) {
+      logger.info(`🧹 Pruned ${stats} question stats row(s) and ${insights} cached AI explanation(s) of deleted questions`);
+    }
+  } catch (error) {
+    logger.error('Error pruning orphaned question data:', error);
+  }
+}
@@ -4,6 +4,9 @@ import { Server } from 'socket.io';
 import EmailService from './EmailService';
 import EmailDigestService from './EmailDigestService';
 import { logger } from '../utils/logger';
+import { TtlLruCache } from '../utils/TtlLruCache';
+import { WorkQueue } from '../utils/WorkQueue';
+import { v4 as uuidv4 } from 'uuid';
 
 export interface CreateNotificationParams {
   userId: string;
@@ -142,6 +145,152 @@ export interface NotificationCheckParams {
   checkEmail?: boolean; // Check email-specific toggle
 }
 
+type NotificationCategory = NotificationCheckParams['category'];
+
+/**
+ * Effective on/off per category and subcategory for one channel (in-app or email),
+ * with the global toggle applied and NULL subcategories inherited from their category
+ */
+interface ResolvedChannelPreferences {
+  categories: Record<NotificationCategory, boolean>;
+  subcategories: Record<string, boolean>;
+}
+
+export interface ResolvedNotificationPreferences {
+  preferences: NotificationPreferences; // Row as stored (NULL = inherit), as shown in settings
+  inApp: ResolvedChannelPreferences;
+  email: ResolvedChannelPreferences;
+}
+
+type NotificationEmailContent = {
+  id: string;
+  type: CreateNotificationParams['type'];
+  priority: CreateNotificationParams['priority'];
+  title: string;
+  message: string;
+  actionUrl?: string;
+  actionText?: string;
+};
+
+export interface BulkNotificationResult {
+  created: number; // In-app notifications inserted (and emitted)
+  queued: number; // Held in NotificationQueue for quiet hours
+  emailOnly: number; // In-app disabled, realtime email queued without a DB record
+  skipped: number; // Both channels disabled
+  failed: number; // Rows in batches whose INSERT failed
+  notificationIds: string[];
+}
+
+const CATEGORY_TOGGLES: Record<NotificationCategory, keyof NotificationPreferences> = {
+  progress: 'EnableProgressUpdates',
+  course: 'EnableCourseUpdates',
+  assessment: 'EnableAssessmentUpdates',
+  community: 'EnableCommunityUpdates',
+  system: 'EnableSystemAlerts'
+};
+
+const SUBCATEGORIES: Record<NotificationCategory, string[]> = {
+  progress: ['LessonCompletion', 'VideoCompletion', 'CourseMilestones', 'CourseCompletion', 'ProgressSummary'],
+  course: ['CourseEnrollment', 'NewLessons', 'LiveSessions', 'CoursePublished', 'InstructorAnnouncements',
+    'EnrollmentRequest', 'EnrollmentApproved', 'EnrollmentRejected', 'EnrollmentSuspended',
+    'EnrollmentCancelled', 'CourseRatings'],
+  assessment: ['AssessmentSubmitted', 'AssessmentGraded', 'NewAssessment', 'AssessmentDue', 'SubmissionToGrade'],
+  community: ['Comments', 'Replies', 'Mentions', 'DirectMessages', 'GroupInvites', 'GroupActivity',
+    'OfficeHours', 'AITutoring'],
+  system: ['PaymentConfirmation', 'PaymentReceipt', 'RefundConfirmation', 'Certificates', 'SecurityAlerts',
+    'ProfileUpdates', 'RiskAlerts']
+};
+
+const PREFERENCE_COLUMNS = `
+  UserId, EnableInAppNotifications, EnableProgressUpdates, EnableSystemAlerts,
+  EnableCommunityUpdates, EnableCourseUpdates,
+  EnableAssessmentUpdates, EnableEmailNotifications,
+  EmailDigestFrequency, QuietHoursStart, QuietHoursEnd,
+  EnableLessonCompletion, EmailLessonCompletion,
+  EnableVideoCompletion, EmailVideoCompletion,
+  EnableCourseMilestones, EmailCourseMilestones,
+  EnableCourseCompletion, EmailCourseCompletion,
+  EnableProgressSummary, EmailProgressSummary,
+  EnableCourseEnrollment, EmailCourseEnrollment,
+  EnableNewLessons, EmailNewLessons,
+  EnableLiveSessions, EmailLiveSessions,
+  EnableCoursePublished, EmailCoursePublished,
+  EnableInstructorAnnouncements, EmailInstructorAnnouncements,
+  EnableEnrollmentRequest, EmailEnrollmentRequest,
+  EnableEnrollmentApproved, EmailEnrollmentApproved,
+  EnableEnrollmentRejected, EmailEnrollmentRejected,
+  EnableEnrollmentSuspended, EmailEnrollmentSuspended,
+  EnableEnrollmentCancelled, EmailEnrollmentCancelled,
+  EnableCourseRatings, EmailCourseRatings,
+  EnableAssessmentSubmitted, EmailAssessmentSubmitted,
+  EnableAssessmentGraded, EmailAssessmentGraded,
+  EnableNewAssessment, EmailNewAssessment,
+  EnableAssessmentDue, EmailAssessmentDue,
+  EnableSubmissionToGrade, EmailSubmissionToGrade,
+  EnableComments, EmailComments,
+  EnableReplies, EmailReplies,
+  EnableMentions, EmailMentions,
+  EnableDirectMessages, EmailDirectMessages,
+  EnableGroupInvites, EmailGroupInvites,
+  EnableGroupActivity, EmailGroupActivity,
+  EnableOfficeHours, EmailOfficeHours,
+  EnableAITutoring, EmailAITutoring,
+  EnableRiskAlerts, EmailRiskAlerts,
+  EnablePaymentConfirmation, EmailPaymentConfirmation,
+  EnablePaymentReceipt, EmailPaymentReceipt,
+  EnableRefundConfirmation, EmailRefundConfirmation,
+  EnableCertificates, EmailCertificates,
+  EnableSecurityAlerts, EmailSecurityAlerts,
+  EnableProfileUpdates, EmailProfileUpdates`;
+
+// SQL Server allows 2100 parameters per request
+const PREFERENCES_BATCH_SIZE = 1000;
+
+// Shared by every NotificationService instance (routes create one per request)
+const preferencesCache = new TtlLruCache<string, ResolvedNotificationPreferences>(
+  'notificationPreferences',
+  parseInt(process.env.NOTIFICATION_PREFS_CACHE_MAX || '50000'),
+  parseInt(process.env.NOTIFICATION_PREFS_CACHE_TTL_MS || '300000')
+);
+
+const preferencesCacheKey = (userId: string): string => userId.toUpperCase();
+
+// Rows per multi-row INSERT in createNotificationsBulk (one JSON parameter per batch)
+const BULK_INSERT_BATCH_SIZE = parseInt(process.env.NOTIFICATION_BULK_BATCH_SIZE || '1000');
+
+// Realtime emails from bulk sends; bounded so a 50k-recipient job cannot flood the mail provider
+const emailQueue = new WorkQueue(
+  'notificationEmails',
+  parseInt(process.env.NOTIFICATION_EMAIL_CONCURRENCY || '5'),
+  parseInt(process.env.NOTIFICATION_EMAIL_QUEUE_MAX || '100000')
+);
+
+/**
+ * Resolve Global → Category → Subcategory once per preferences row
+ * (subcategory NULL = inherit from category, 0 = OFF, 1 = ON)
+ */
+export function resolvePreferences(preferences: NotificationPreferences): ResolvedNotificationPreferences {
+  const resolveChannel = (globalEnabled: boolean, prefix: 'Enable' | 'Email'): ResolvedChannelPreferences => {
+    const categories = {} as Record<NotificationCategory, boolean>;
+    const subcategories: Record<string, boolean> = {};
+    for (const category of Object.keys(CATEGORY_TOGGLES) as NotificationCategory[]) {
+      const categoryEnabled = globalEnabled && !!preferences[CATEGORY_TOGGLES[category]];
+      categories[category] = categoryEnabled;
+      for (const subcategory of SUBCATEGORIES[category]) {
+        const value = preferences[`${prefix}${subcategory}` as keyof NotificationPreferences];
+        subcategories[subcategory] = categoryEnabled && value !== false;
+      }
+    }
+    return { categories, subcategories };
+  };
+
+  return {
+    preferences,
+    inApp: resolveChannel(!!preferences.EnableInAppNotifications, 'Enable'),
+    email: resolveChannel(!!preferences.EnableEmailNotifications, 'Email')
+  };
+}
+
 export class NotificationService {
   private dbService: DatabaseService;
   private io: Server | null = null;
@@ -160,6 +309,13 @@ export class NotificationService {
     this.io = io;
   }
 
+  /**
+   * Drop a user's cached preferences (call after writing NotificationPreferences directly)
+   */
+  static invalidatePreferences(userId: string): void {
+    preferencesCache.delete(preferencesCacheKey(userId));
+  }
+
   /**
    * Create a new notification
    */
@@ -277,11 +433,12 @@ export class NotificationService {
   ): Promise<string> {
     try {
       // Check user preferences with hybrid control system
-      const preferences = await this.getUserPreferences(params.userId);
+      const resolved = await this.getResolvedPreferences(params.userId);
+      const preferences = resolved.preferences;
       
       // Check if EITHER in-app OR email notification should be sent
-      const shouldSendInApp = this.shouldSendNotification(checkParams, preferences);
-      const shouldSendEmail = this.shouldSendNotification({ ...checkParams, checkEmail: true }, preferences);
+      const shouldSendInApp = this.shouldSendNotification(checkParams, resolved);
+      const shouldSendEmail = this.shouldSendNotification({ ...checkParams, checkEmail: true }, resolved);
       
       if (!shouldSendInApp && !shouldSendEmail) {
         logger.info(`📵 Notification completely blocked for user ${params.userId} - both in-app and email disabled`);
@@ -353,20 +510,6 @@ export class NotificationService {
       // Emit real-time notification via Socket.io
       if (this.io) {
         const roomName = `user-${params.userId}`;
-        const socketsInRoom = await this.io.in(roomName).fetchSockets();
-        logger.info(`🔍 [NotificationService] ===== SOCKET EMIT ATTEMPT =====`);
-        logger.info(`   - Target room: "${roomName}"`);
-        logger.info(`   - User ID: ${params.userId}`);
-        logger.info(`   - Sockets in room: ${socketsInRoom.length}`);
-        logger.info(`   - Notification type: ${params.type}`);
-        logger.info(`   - Notification title: "${params.title}"`);
-        
-        if (socketsInRoom.length > 0) {
-          logger.info(`   - Connected socket IDs: ${socketsInRoom.map(s => s.id).join(', ')}`);
-        } else {
-          logger.info(`   ⚠️  NO ACTIVE SOCKETS - user may not be connected`);
-        }
-        
         this.io.to(roomName).emit('notification-created', {
           id: notificationId,
           userId: params.userId,
@@ -379,6 +522,25 @@ export class NotificationService {
           createdAt: new Date().toISOString()
         });
         logger.info(`✅ [NotificationService] Socket event "notification-created" emitted to ${roomName}`);
+
+        // Delivery diagnostics only: with a shared adapter fetchSockets() asks every node, so it
+        // runs after the emit and a slow or missing node cannot hold up or fail the notification
+        this.io.in(roomName).fetchSockets()
+          .then(socketsInRoom => {
+            logger.info(`🔍 [NotificationService] ===== SOCKET EMIT ATTEMPT =====`);
+            logger.info(`   - Target room: "${roomName}"`);
+            logger.info(`   - User ID: ${params.userId}`);
+            logger.info(`   - Sockets in room: ${socketsInRoom.length}`);
+            logger.info(`   - Notification type: ${params.type}`);
+            logger.info(`   - Notification title: "${params.title}"`);
+
+            if (socketsInRoom.length > 0) {
+              logger.info(`   - Connected socket IDs: ${socketsInRoom.map(s => s.id).join(', ')}`);
+            } else {
+              logger.info(`   ⚠️  NO ACTIVE SOCKETS - user may not be connected`);
+            }
+          })
+          .catch(err => logger.warn(`[NotificationService] fetchSockets for ${roomName} failed (diagnostics only)`, err));
       } else {
         logger.warn(`⚠️ Socket.IO not available in NotificationService - notification ${notificationId} created in DB but NOT sent in real-time to user ${params.userId}`);
       }
@@ -422,6 +584,274 @@ export class NotificationService {
     }
   }
 
+  /**
+   * Create notifications for many recipients at once (scheduler fan-outs)
+   *
+   * Each recipient gets the same outcome as createNotificationWithControls, but
+   * preferences are loaded in one pass, rows are inserted in multi-row batches,
+   * socket events are emitted per room without fetchSockets, and emails are
+   * handed to the bounded email queue instead of being awaited.
+   */
+  async createNotificationsBulk(
+    notifications: CreateNotificationParams[],
+    checkParams: NotificationCheckParams
+  ): Promise<BulkNotificationResult> {
+    const result: BulkNotificationResult = {
+      created: 0, queued: 0, emailOnly: 0, skipped: 0, failed: 0, notificationIds: []
+    };
+    if (notifications.length === 0) {
+      return result;
+    }
+
+    const startedAt = Date.now();
+    const preferencesByUser = await this.getPreferencesForUsers(notifications.map(n => n.userId));
+
+    // Partition recipients the way createNotificationWithControls decides per user
+    const toInsert: Array<{ id: string; params: CreateNotificationParams; emailFrequency: string | null }> = [];
+    const toQueue: Array<{ id: string; params: CreateNotificationParams }> = [];
+    const emailOnly: CreateNotificationParams[] = [];
+
+    for (const params of notifications) {
+      const resolved = preferencesByUser.get(params.userId)!;
+      const shouldSendInApp = this.shouldSendNotification(checkParams, resolved);
+      const shouldSendEmail = this.shouldSendNotification({ ...checkParams, checkEmail: true }, resolved);
+      const frequency = resolved.preferences.EmailDigestFrequency;
+
+      if (shouldSendInApp && this.isInQuietHours(resolved.preferences)) {
+        toQueue.push({ id: uuidv4(), params });
+      } else if (shouldSendInApp) {
+        toInsert.push({ id: uuidv4(), params, emailFrequency: shouldSendEmail ? frequency : null });
+      } else if (shouldSendEmail && frequency === 'realtime') {
+        emailOnly.push(params);
+      } else {
+        result.skipped++;
+      }
+    }
+
+    const created: typeof toInsert = [];
+    for (let i = 0; i < toInsert.length; i += BULK_INSERT_BATCH_SIZE) {
+      const batch = toInsert.slice(i, i + BULK_INSERT_BATCH_SIZE);
+      const inserted = await this.insertNotificationBatch('Notifications', batch);
+      created.push(...inserted);
+      result.failed += batch.length - inserted.length;
+    }
+
+    for (let i = 0; i < toQueue.length; i += BULK_INSERT_BATCH_SIZE) {
+      const batch = toQueue.slice(i, i + BULK_INSERT_BATCH_SIZE);
+      const inserted = await this.insertNotificationBatch('NotificationQueue', batch);
+      result.queued += inserted.length;
+      result.failed += batch.length - inserted.length;
+    }
+
+    result.created = created.length;
+    result.notificationIds = created.map(entry => entry.id);
+
+    if (this.io) {
+      await this.emitCreatedByRoom(created);
+    } else if (created.length > 0) {
+      logger.warn(`⚠️ Socket.IO not available in NotificationService - ${created.length} bulk notification(s) created in DB but NOT sent in real-time`);
+    }
+
+    result.emailOnly = emailOnly.length;
+    try {
+      await this.dispatchBulkEmails(created, emailOnly);
+    } catch (error) {
+      logger.error('❌ Error dispatching bulk notification emails:', error);
+    }
+
+    logger.info(
+      `📬 Bulk notifications (${checkParams.category}/${checkParams.subcategory || '*'}): ` +
+      `${result.created} created, ${result.queued} queued, ${result.emailOnly} email-only, ` +
+      `${result.skipped} skipped, ${result.failed} failed in ${Date.now() - startedAt}ms`
+    );
+    return result;
+  }
+
+  /**
+   * Insert one batch of rows and return the rows that were stored.
+   * If the batch fails (e.g. one row violates a CHECK constraint or its user was deleted),
+   * its rows are retried one at a time so only the offending rows are lost.
+   */
+  private async insertNotificationBatch<T extends { id: string; params: CreateNotificationParams }>(
+    table: 'Notifications' | 'NotificationQueue',
+    batch: T[]
+  ): Promise<T[]> {
+    try {
+      await this.insertNotificationRows(table, batch);
+      return batch;
+    } catch (error) {
+      if (batch.length === 1) {
+        logger.error(`❌ ${table} insert failed for user ${batch[0].params.userId} (${batch[0].params.type}):`, error);
+        return [];
+      }
+      logger.warn(`⚠️ Bulk ${table} insert failed for ${batch.length} row(s), retrying row by row:`, error);
+    }
+
+    const inserted: T[] = [];
+    for (const row of batch) {
+      try {
+        await this.insertNotificationRows(table, [row]);
+        inserted.push(row);
+      } catch (error) {
+        logger.error(`❌ ${table} insert failed for user ${row.params.userId} (${row.params.type}):`, error);
+      }
+    }
+    return inserted;
+  }
+
+  /**
+   * Multi-row INSERT of notifications with client-generated ids.
+   * Rows travel as one JSON parameter, so a batch is not limited by the 2100-parameter cap.
+   */
+  private async insertNotificationRows(
+    table: 'Notifications' | 'NotificationQueue',
+    rows: Array<{ id: string; params: CreateNotificationParams }>
+  ): Promise<void> {
+    const payload = rows.map(({ id, params }) => ({
+      id,
+      userId: params.userId,
+      type: params.type,
+      priority: params.priority,
+      title: params.title,
+      message: params.message,
+      data: params.data ? JSON.stringify(params.data) : null,
+      actionUrl: params.actionUrl || null,
+      actionText: params.actionText || null,
+      relatedEntityId: params.relatedEntityId || null,
+      relatedEntityType: params.relatedEntityType || null,
+      expiresAt: params.expiresAt ? params.expiresAt.toISOString() : null
+    }));
+
+    const request = await this.dbService.getRequest();
+    await request
+      .input('Rows', sql.NVarChar(sql.MAX), JSON.stringify(payload))
+      .query(`
+        INSERT INTO ${table} (
+          Id, UserId, Type, Priority, Title, Message, Data,
+          ActionUrl, ActionText, RelatedEntityId, RelatedEntityType, ExpiresAt
+        )
+        SELECT
+          Id, UserId, Type, Priority, Title, Message, Data,
+          ActionUrl, ActionText, RelatedEntityId, RelatedEntityType, ExpiresAt
+        FROM OPENJSON(@Rows) WITH (
+          Id UNIQUEIDENTIFIER '$.id',
+          UserId UNIQUEIDENTIFIER '$.userId',
+          Type NVARCHAR(50) '$.type',
+          Priority NVARCHAR(20) '$.priority',
+          Title NVARCHAR(200) '$.title',
+          Message NVARCHAR(MAX) '$.message',
+          Data NVARCHAR(MAX) '$.data',
+          ActionUrl NVARCHAR(500) '$.actionUrl',
+          ActionText NVARCHAR(100) '$.actionText',
+          RelatedEntityId UNIQUEIDENTIFIER '$.relatedEntityId',
+          RelatedEntityType NVARCHAR(50) '$.relatedEntityType',
+          ExpiresAt DATETIMEOFFSET '$.expiresAt'
+        )
+      `);
+  }
+
+  /**
+   * Emit "notification-created" for bulk-created rows, grouped by user room.
+   * Yields to the event loop between chunks of rooms so large fan-outs don't stall requests.
+   */
+  private async emitCreatedByRoom(
+    created: Array<{ id: string; params: CreateNotificationParams }>
+  ): Promise<void> {
+    const byRoom = new Map<string, typeof created>();
+    for (const entry of created) {
+      const roomName = `user-${entry.params.userId}`;
+      if (!byRoom.has(roomName)) {
+        byRoom.set(roomName, []);
+      }
+      byRoom.get(roomName)!.push(entry);
+    }
+
+    const createdAt = new Date().toISOString();
+    let rooms = 0;
+    for (const [roomName, entries] of byRoom) {
+      const room = this.io!.to(roomName);
+      for (const { id, params } of entries) {
+        room.emit('notification-created', {
+          id,
+          userId: params.userId,
+          type: params.type,
+          priority: params.priority,
+          title: params.title,
+          message: params.message,
+          actionUrl: params.actionUrl,
+          actionText: params.actionText,
+          createdAt
+        });
+      }
+      if (++rooms % 1000 === 0) {
+        await new Promise(resolve => setImmediate(resolve));
+      }
+    }
+  }
+
+  /**
+   * Realtime emails go to the email queue (recipients looked up in batches);
+   * daily/weekly digests are added with one INSERT per batch
+   */
+  private async dispatchBulkEmails(
+    created: Array<{ id: string; params: CreateNotificationParams; emailFrequency: string | null }>,
+    emailOnly: CreateNotificationParams[]
+  ): Promise<void> {
+    const realtime: Array<{ id: string; params: CreateNotificationParams }> = emailOnly.map(params => ({
+      id: 'email-only', params
+    }));
+    const digests: Record<'daily' | 'weekly', Array<{ userId: string; notificationId: string }>> = {
+      daily: [], weekly: []
+    };
+
+    for (const entry of created) {
+      if (entry.emailFrequency === 'realtime') {
+        realtime.push(entry);
+      } else if (entry.emailFrequency === 'daily' || entry.emailFrequency === 'weekly') {
+        digests[entry.emailFrequency].push({ userId: entry.params.userId, notificationId: entry.id });
+      }
+    }
+
+    for (const frequency of ['daily', 'weekly'] as const) {
+      for (let i = 0; i < digests[frequency].length; i += BULK_INSERT_BATCH_SIZE) {
+        await EmailDigestService.addManyToDigest(digests[frequency].slice(i, i + BULK_INSERT_BATCH_SIZE), frequency);
+      }
+    }
+
+    for (let i = 0; i < realtime.length; i += BULK_INSERT_BATCH_SIZE) {
+      const batch = realtime.slice(i, i + BULK_INSERT_BATCH_SIZE);
+      const request = await this.dbService.getRequest();
+      const users = await request
+        .input('UserIds', sql.NVarChar(sql.MAX), JSON.stringify([...new Set(batch.map(e => e.params.userId))]))
+        .query(`
+          SELECT Id, Email, FirstName
+          FROM Users
+          WHERE Id IN (SELECT CAST(value AS UNIQUEIDENTIFIER) FROM OPENJSON(@UserIds))
+        `);
+
+      const usersByKey = new Map<string, { Email: string; FirstName: string }>();
+      for (const user of users.recordset) {
+        usersByKey.set(String(user.Id).toUpperCase(), user);
+      }
+
+      for (const { id, params } of batch) {
+        const user = usersByKey.get(params.userId.toUpperCase());
+        if (!user) {
+          continue;
+        }
+        emailQueue.enqueue(() => this.deliverEmailNotification(params.userId, user, {
+          id,
+          type: params.type,
+          priority: params.priority,
+          title: params.title,
+          message: params.message,
+          actionUrl: params.actionUrl,
+          actionText: params.actionText
+        }));
+      }
+    }
+  }
+
   /**
    * Get all notifications for a user
    * Respects EnableInAppNotifications preference - if OFF, returns empty array
@@ -609,71 +1039,101 @@ export class NotificationService {
   }
 
   /**
-   * Get user notification preferences
+   * Get user notification preferences (stored values, NULL = inherit)
    */
   async getUserPreferences(userId: string): Promise<NotificationPreferences> {
+    return (await this.getResolvedPreferences(userId)).preferences;
+  }
+
+  /**
+   * Get user notification preferences with inheritance resolved (cached)
+   */
+  async getResolvedPreferences(userId: string): Promise<ResolvedNotificationPreferences> {
+    const cached = preferencesCache.get(preferencesCacheKey(userId));
+    if (cached) {
+      return cached;
+    }
+
     try {
       const request = await this.dbService.getRequest();
       const result = await request
         .input('UserId', sql.UniqueIdentifier, userId)
         .query(`
-          SELECT 
-            UserId, EnableInAppNotifications, EnableProgressUpdates, EnableSystemAlerts,
-            EnableCommunityUpdates, EnableCourseUpdates,
-            EnableAssessmentUpdates, EnableEmailNotifications,
-            EmailDigestFrequency, QuietHoursStart, QuietHoursEnd,
-            EnableLessonCompletion, EmailLessonCompletion,
-            EnableVideoCompletion, EmailVideoCompletion,
-            EnableCourseMilestones, EmailCourseMilestones,
-            EnableCourseCompletion, EmailCourseCompletion,
-            EnableProgressSummary, EmailProgressSummary,
-            EnableCourseEnrollment, EmailCourseEnrollment,
-            EnableNewLessons, EmailNewLessons,
-            EnableLiveSessions, EmailLiveSessions,
-            EnableCoursePublished, EmailCoursePublished,
-            EnableInstructorAnnouncements, EmailInstructorAnnouncements,
-            EnableEnrollmentRequest, EmailEnrollmentRequest,
-            EnableEnrollmentApproved, EmailEnrollmentApproved,
-            EnableEnrollmentRejected, EmailEnrollmentRejected,
-            EnableEnrollmentSuspended, EmailEnrollmentSuspended,
-            EnableEnrollmentCancelled, EmailEnrollmentCancelled,
-            EnableCourseRatings, EmailCourseRatings,
-            EnableAssessmentSubmitted, EmailAssessmentSubmitted,
-            EnableAssessmentGraded, EmailAssessmentGraded,
-            EnableNewAssessment, EmailNewAssessment,
-            EnableAssessmentDue, EmailAssessmentDue,
-            EnableSubmissionToGrade, EmailSubmissionToGrade,
-            EnableComments, EmailComments,
-            EnableReplies, EmailReplies,
-            EnableMentions, EmailMentions,
-            EnableDirectMessages, EmailDirectMessages,
-            EnableGroupInvites, EmailGroupInvites,
-            EnableGroupActivity, EmailGroupActivity,
-            EnableOfficeHours, EmailOfficeHours,
-            EnableAITutoring, EmailAITutoring,
-            EnableRiskAlerts, EmailRiskAlerts,
-            EnablePaymentConfirmation, EmailPaymentConfirmation,
-            EnablePaymentReceipt, EmailPaymentReceipt,
-            EnableRefundConfirmation, EmailRefundConfirmation,
-            EnableCertificates, EmailCertificates,
-            EnableSecurityAlerts, EmailSecurityAlerts,
-            EnableProfileUpdates, EmailProfileUpdates
+          SELECT ${PREFERENCE_COLUMNS}
           FROM NotificationPreferences
           WHERE UserId = @UserId
         `);
 
-      if (result.recordset.length === 0) {
-        // Create default preferences if not exists
-        return await this.createDefaultPreferences(userId);
-      }
+      // Create default preferences if not exists
+      const preferences = result.recordset.length > 0
+        ? result.recordset[0]
+        : await this.createDefaultPreferences(userId);
 
-      return result.recordset[0];
+      const resolved = resolvePreferences(preferences);
+      preferencesCache.set(preferencesCacheKey(userId), resolved);
+      return resolved;
     } catch (error) {
       console.error('❌ Error fetching notification preferences:', error);
       throw error;
     }
   }
 
+  /**
+   * Resolved preferences for many users at once (bulk sends).
+   * Cache misses are read in batches; users without a row get defaults created.
+   */
+  async getPreferencesForUsers(userIds: string[]): Promise<Map<string, ResolvedNotificationPreferences>> {
+    const resolvedByUser = new Map<string, ResolvedNotificationPreferences>();
+    const missing: string[] = [];
+
+    for (const userId of new Set(userIds)) {
+      const cached = preferencesCache.get(preferencesCacheKey(userId));
+      if (cached) {
+        resolvedByUser.set(userId, cached);
+      } else {
+        missing.push(userId);
+      }
+    }
+
+    try {
+      for (let i = 0; i < missing.length; i += PREFERENCES_BATCH_SIZE) {
+        const batch = missing.slice(i, i + PREFERENCES_BATCH_SIZE);
+        const request = await this.dbService.getRequest();
+        const paramNames = batch.map((id, index) => {
+          request.input(`userId${index}`, sql.UniqueIdentifier, id);
+          return `@userId${index}`;
+        });
+
+        const result = await request.query(`
+          SELECT ${PREFERENCE_COLUMNS}
+          FROM NotificationPreferences
+          WHERE UserId IN (${paramNames.join(', ')})
+        `);
+
+        const rowsByKey = new Map<string, NotificationPreferences>();
+        for (const row of result.recordset as NotificationPreferences[]) {
+          rowsByKey.set(preferencesCacheKey(row.UserId), row);
+        }
+
+        for (const userId of batch) {
+          const row = rowsByKey.get(preferencesCacheKey(userId));
+          if (!row) {
+            resolvedByUser.set(userId, await this.getResolvedPreferences(userId));
+            continue;
+          }
+          const resolved = resolvePreferences(row);
+          preferencesCache.set(preferencesCacheKey(userId), resolved);
+          resolvedByUser.set(userId, resolved);
+        }
+      }
+    } catch (error) {
+      console.error('❌ Error fetching notification preferences in bulk:', error);
+      throw error;
+    }
+
+    return resolvedByUser;
+  }
+
   /**
    * Update user notification preferences
    */
@@ -821,6 +1281,7 @@ export class NotificationService {
       `);
 
       console.log('🔧 Update result - rowsAffected:', result.rowsAffected[0]);
+      NotificationService.invalidatePreferences(userId);
       return result.rowsAffected[0] > 0;
     } catch (error) {
       console.error('❌ Error updating notification preferences:', error);
@@ -832,6 +1293,7 @@ export class NotificationService {
    * Create default notification preferences for a user
    */
   private async createDefaultPreferences(userId: string): Promise<NotificationPreferences> {
+    NotificationService.invalidatePreferences(userId);
     try {
       const request = await this.dbService.getRequest();
       await request
@@ -960,70 +1422,28 @@ export class NotificationService {
    */
   private shouldSendNotification(
     params: NotificationCheckParams,
-    preferences: NotificationPreferences
+    resolved: ResolvedNotificationPreferences
   ): boolean {
     const { category, subcategory, checkEmail = false } = params;
+    const channel = checkEmail ? resolved.email : resolved.inApp;
 
-    // 1. Check global toggle
-    if (checkEmail) {
-      if (!preferences.EnableEmailNotifications) {
-        console.log(`📵 Email disabled globally for user`);
-        return false;
-      }
-    } else {
-      if (!preferences.EnableInAppNotifications) {
-        console.log(`📵 In-app notifications disabled globally for user`);
-        return false;
-      }
-    }
-
-    // 2. Check category toggle
-    let categoryEnabled = false;
-    switch (category) {
-      case 'progress':
-        categoryEnabled = preferences.EnableProgressUpdates;
-        break;
-      case 'course':
-        categoryEnabled = preferences.EnableCourseUpdates;
-        break;
-      case 'assessment':
-        categoryEnabled = preferences.EnableAssessmentUpdates;
-        break;
-      case 'community':
-        categoryEnabled = preferences.EnableCommunityUpdates;
-        break;
-      case 'system':
-        categoryEnabled = preferences.EnableSystemAlerts;
-        break;
-    }
-
-    if (!categoryEnabled) {
-      console.log(`📵 Category '${category}' disabled for user`);
+    // 1 + 2. Global and category toggles (already combined)
+    if (!channel.categories[category]) {
+      console.log(`📵 ${checkEmail ? 'Email' : 'In-app'} '${category}' notifications disabled for user`);
       return false;
     }
 
-    // 3. Check subcategory toggle (if specified)
+    // 3. Subcategory toggle (if specified); NULL was resolved to the category value
     if (subcategory) {
-      const subcategoryKey = (checkEmail ? `Email${subcategory}` : `Enable${subcategory}`) as keyof NotificationPreferences;
-      const subcategoryValue = preferences[subcategoryKey];
-
-      // NULL/undefined = inherit from category, 0 = OFF, 1 = ON
-      if (subcategoryValue === null || subcategoryValue === undefined) {
-        console.log(`✅ Subcategory '${subcategory}' inherits from category '${category}' (enabled)`);
-        return categoryEnabled; // Inherit from category
-      }
-
-      if (subcategoryValue === false) {
-        console.log(`📵 Subcategory '${subcategory}' explicitly disabled`);
-        return false;
+      if (SUBCATEGORIES[category].includes(subcategory)) {
+        return channel.subcategories[subcategory];
       }
-
-      console.log(`✅ Subcategory '${subcategory}' explicitly enabled`);
-      return true;
+      // Subcategory filed under another category by the caller: apply its own toggle
+      const subcategoryKey = (checkEmail ? `Email${subcategory}` : `Enable${subcategory}`) as keyof NotificationPreferences;
+      return resolved.preferences[subcategoryKey] !== false;
     }
 
-    console.log(`✅ Category '${category}' enabled (no subcategory check)`);
-    return categoryEnabled;
+    return true;
   }
 
   /**
@@ -1086,15 +1506,7 @@ export class NotificationService {
    */
   private async sendEmailNotification(
     userId: string,
-    notification: {
-      id: string;
-      type: 'progress' | 'risk' | 'achievement' | 'intervention' | 'assignment' | 'course' | 'assessment' | 'community';
-      priority: 'low' | 'normal' | 'high' | 'urgent';
-      title: string;
-      message: string;
-      actionUrl?: string;
-      actionText?: string;
-    }
+    notification: NotificationEmailContent
   ): Promise<void> {
     try {
       // Fetch user details (email and name)
@@ -1112,8 +1524,22 @@ export class NotificationService {
         return;
       }
 
-      const user = userResult.recordset[0];
-      
+      await this.deliverEmailNotification(userId, userResult.recordset[0], notification);
+    } catch (error) {
+      console.error('❌ Error in sendEmailNotification:', error);
+      // Don't throw - email failures shouldn't break notification creation
+    }
+  }
+
+  /**
+   * Send a notification email to a user whose Email/FirstName are already loaded
+   */
+  private async deliverEmailNotification(
+    userId: string,
+    user: { Email: string; FirstName: string },
+    notification: NotificationEmailContent
+  ): Promise<void> {
+    try {
       // Convert actionUrl to absolute URL if it's relative
       let absoluteActionUrl = notification.actionUrl;
       if (absoluteActionUrl && !absoluteActionUrl.startsWith('http')) {
@@ -1144,7 +1570,7 @@ export class NotificationService {
         console.error(`❌ Failed to send email notification to ${user.Email}`);
       }
     } catch (error) {
-      console.error('❌ Error in sendEmailNotification:', error);
+      console.error('❌ Error in deliverEmailNotification:', error);
       // Don't throw - email failures shouldn't break notification creation
     }
   }
@@ -1,7 +1,38 @@
 import sql from 'mssql';
 import { DatabaseService } from './DatabaseService';
 import { Server as SocketIOServer } from 'socket.io';
+import { SocketClusterService } from './SocketClusterService';
+import { LeaderElectionService } from './LeaderElectionService';
+import { TtlLruCache } from '../utils/TtlLruCache';
 import { logger } from '../utils/logger';
+import { isRowDataError } from '../utils/sqlErrors';
+
+/**
+ * PresenceService — in-memory presence registry
+ *
+ * The registry (one entry per user seen since startup) is the source of truth for
+ * status, activity and last-seen time. Status changes, heartbeats and activity updates
+ * only touch memory; dbo.UserPresence is a snapshot written every PRESENCE_SNAPSHOT_MS
+ * with batched MERGEs of the entries that changed, and on shutdown. Queries that join
+ * UserPresence in SQL (office hours) therefore see presence at most one snapshot old.
+ * On start the registry is seeded from the last snapshot (everyone not offline).
+ *
+ * Broadcasts are scoped and coalesced: a change is queued, and every PRESENCE_BROADCAST_MS
+ * one 'presence-batch' event ({ changes: [...] }, latest change per user) is emitted to each
+ * room that should see it — the user's course rooms, their study-group rooms, the personal
+ * rooms of their direct-message contacts, and their own room (other tabs). The audience per
+ * user is cached. Nothing is broadcast to every socket anymore.
+ *
+ * Inactive users (no heartbeat for OFFLINE_THRESHOLD_MS) are marked offline by an in-memory
+ * sweep, which also evicts offline entries that are already in the snapshot; presence of an
+ * evicted or never-seen user is read from the snapshot table.
+ *
+ * Multi-node: every node keeps a full replica. Entries changed locally (including heartbeats)
+ * are published to the other nodes once per broadcast interval ('presence:sync') and applied
+ * there last-writer-wins by UpdatedAt, without re-broadcasting. The node that made a change
+ * broadcasts it (the adapter delivers it to sockets on every node) and snapshots it; only the
+ * scheduler leader marks inactive users offline.
+ */
 
 export interface UserPresence {
   UserId: string;
@@ -17,157 +48,552 @@ export interface PresenceUpdate {
   activity?: string;
 }
 
+export interface PresenceChange {
+  userId: string;
+  status: UserPresence['Status'];
+  activity?: string | null;
+  updatedAt: Date;
+}
+
+interface PresenceSyncMessage {
+  entries: Array<{
+    UserId: string;
+    Status: UserPresence['Status'];
+    Activity: string | null;
+    LastSeenAt: string;
+    UpdatedAt: string;
+  }>;
+}
+
+export interface PresenceStats {
+  trackedUsers: number;
+  onlineUsers: number;
+  dirtyEntries: number;
+  pendingChanges: number;
+  snapshots: number;
+  rowsSnapshotted: number;
+  snapshotFailures: number;
+  droppedRows: number;
+  lastSnapshotMs: number;
+  batchesEmitted: number;
+  changesBroadcast: number;
+  changesCoalesced: number;
+  remoteUpdatesApplied: number;
+}
+
+const SNAPSHOT_INTERVAL_MS = parseInt(process.env.PRESENCE_SNAPSHOT_MS || '15000', 10);
+const SNAPSHOT_BATCH_SIZE = parseInt(process.env.PRESENCE_SNAPSHOT_BATCH_SIZE || '1000', 10);
+const BROADCAST_INTERVAL_MS = parseInt(process.env.PRESENCE_BROADCAST_MS || '1000', 10);
+const SWEEP_INTERVAL_MS = 2 * 60 * 1000;
+const ACTIVITY_MAX_LENGTH = 100; // UserPresence.Activity NVARCHAR(100)
+const PRESENCE_STATUSES: ReadonlyArray<UserPresence['Status']> = ['online', 'offline', 'away', 'busy'];
+
+// Socket payloads are not typed at runtime; UserPresence.Status has a CHECK constraint
+export function isPresenceStatus(status: unknown): status is UserPresence['Status'] {
+  return PRESENCE_STATUSES.includes(status as UserPresence['Status']);
+}
+
+// Rooms that receive a user's presence changes (course, study group, DM contacts)
+const audienceCache = new TtlLruCache<string, string[]>(
+  'presenceAudience',
+  parseInt(process.env.PRESENCE_AUDIENCE_CACHE_MAX || '50000', 10),
+  parseInt(process.env.PRESENCE_AUDIENCE_CACHE_TTL_MS || '300000', 10)
+);
+
 export class PresenceService {
   private static io: SocketIOServer | null = null;
-  private static presenceCheckInterval: NodeJS.Timeout | null = null;
   private static readonly OFFLINE_THRESHOLD_MS = 5 * 60 * 1000; // 5 minutes
 
+  private static registry = new Map<string, UserPresence>();
+  private static dirty = new Set<string>();
+  private static pendingChanges = new Map<string, PresenceChange>();
+  // Entries changed on this node since the last 'presence:sync' (clustered deployments only)
+  private static outbox = new Map<string, UserPresence>();
+  private static ready: Promise<void> = Promise.resolve();
+
+  private static sweepTimer: NodeJS.Timeout | null = null;
+  private static snapshotTimer: NodeJS.Timeout | null = null;
+  private static broadcastTimer: NodeJS.Timeout | null = null;
+  private static currentSnapshot: Promise<void> | null = null;
+
+  private static snapshots = 0;
+  private static rowsSnapshotted = 0;
+  private static snapshotFailures = 0;
+  private static droppedRows = 0;
+  private static lastSnapshotMs = 0;
+  private static batchesEmitted = 0;
+  private static changesBroadcast = 0;
+  private static changesCoalesced = 0;
+  private static remoteUpdatesApplied = 0;
+
+  private static key(userId: string): string {
+    return userId.toUpperCase();
+  }
+
   /**
    * Set Socket.IO instance for real-time broadcasts
    */
   static setSocketIO(io: SocketIOServer): void {
     this.io = io;
-    
-    // Start automatic offline detection
-    this.startPresenceMonitoring();
   }
 
   /**
-   * Start monitoring for inactive users
+   * Seed the registry from the last snapshot and start the sweep, snapshot and broadcast timers
    */
-  private static startPresenceMonitoring(): void {
-    // Check every 2 minutes for inactive users
-    if (this.presenceCheckInterval) {
-      clearInterval(this.presenceCheckInterval);
+  static start(): void {
+    if (this.sweepTimer) {
+      return;
     }
 
-    this.presenceCheckInterval = setInterval(async () => {
-      try {
-        await this.checkInactiveUsers();
-      } catch (error) {
-        console.error('Error checking inactive users:', error);
+    this.ready = this.loadSnapshot();
+    SocketClusterService.subscribe<PresenceSyncMessage>('presence:sync', message => this.applyRemote(message));
+
+    this.sweepTimer = setInterval(() => this.checkInactiveUsers(), SWEEP_INTERVAL_MS);
+    this.snapshotTimer = setInterval(() => {
+      this.snapshot().catch(error => logger.error('❌ [Presence] Scheduled snapshot failed:', error));
+    }, SNAPSHOT_INTERVAL_MS);
+    this.broadcastTimer = setInterval(() => {
+      this.publishSync();
+      this.flushBroadcasts().catch(error => logger.error('❌ [Presence] Broadcast flush failed:', error));
+    }, BROADCAST_INTERVAL_MS);
+
+    logger.info(`✅ [Presence] Started (snapshot every ${SNAPSHOT_INTERVAL_MS}ms, broadcast batches every ${BROADCAST_INTERVAL_MS}ms)`);
+  }
+
+  /**
+   * Stop the timers and write the final snapshot (graceful shutdown)
+   */
+  static async stop(): Promise<void> {
+    for (const timer of [this.sweepTimer, this.snapshotTimer, this.broadcastTimer]) {
+      if (timer) {
+        clearInterval(timer);
       }
-    }, 120000); // 2 minutes
+    }
+    this.sweepTimer = null;
+    this.snapshotTimer = null;
+    this.broadcastTimer = null;
+
+    this.publishSync();
+    await this.flushBroadcasts().catch(() => undefined);
+    await this.snapshot();
+    logger.info('[Presence] Stopped — snapshot written');
+  }
+
+  private static async loadSnapshot(): Promise<void> {
+    try {
+      const rows = await DatabaseService.getInstance().query<UserPresence>(`
+        SELECT UserId, Status, Activity, LastSeenAt, UpdatedAt
+        FROM dbo.UserPresence
+        WHERE Status != 'offline'
+      `);
+      // Entries written since startup are newer than the snapshot
+      for (const row of rows) {
+        const key = this.key(row.UserId);
+        if (!this.registry.has(key)) {
+          this.registry.set(key, row);
+        }
+      }
+      logger.info(`[Presence] Registry seeded with ${rows.length} user(s) from snapshot`);
+    } catch (error) {
+      logger.error('❌ [Presence] Failed to load presence snapshot:', error);
+    }
   }
 
   /**
-   * Stop presence monitoring
+   * Mark users without a heartbeat for OFFLINE_THRESHOLD_MS offline (leader only, the change
+   * replicates); evict offline entries already snapshotted
    */
-  static stopPresenceMonitoring(): void {
-    if (this.presenceCheckInterval) {
-      clearInterval(this.presenceCheckInterval);
-      this.presenceCheckInterval = null;
+  private static checkInactiveUsers(): void {
+    const threshold = Date.now() - this.OFFLINE_THRESHOLD_MS;
+    const isLeader = LeaderElectionService.getInstance().isLeader();
+
+    for (const [key, presence] of this.registry) {
+      if (presence.LastSeenAt.getTime() >= threshold) {
+        continue;
+      }
+      if (presence.Status !== 'offline') {
+        if (!isLeader) {
+          continue;
+        }
+        this.apply(presence.UserId, { Status: 'offline', UpdatedAt: new Date() });
+      } else if (!this.dirty.has(key)) {
+        this.registry.delete(key);
+      }
     }
   }
 
   /**
-   * Check for inactive users and mark them offline
+   * Registry entry for a user, loading it from the snapshot table on a miss
    */
-  private static async checkInactiveUsers(): Promise<void> {
-    const db = DatabaseService.getInstance();
-    const thresholdDate = new Date(Date.now() - this.OFFLINE_THRESHOLD_MS);
+  private static async getEntry(userId: string): Promise<UserPresence | null> {
+    await this.ready;
+    const cached = this.registry.get(this.key(userId));
+    if (cached) {
+      return cached;
+    }
 
-    const result = await (await db.getRequest())
-      .input('threshold', sql.DateTime2, thresholdDate)
+    const result = await (await DatabaseService.getInstance().getRequest())
+      .input('userId', sql.UniqueIdentifier, userId)
       .query(`
-        UPDATE dbo.UserPresence
-        SET Status = 'offline', UpdatedAt = GETUTCDATE()
-        OUTPUT INSERTED.UserId
-        WHERE Status != 'offline' AND LastSeenAt < @threshold
+        SELECT UserId, Status, Activity, LastSeenAt, UpdatedAt FROM dbo.UserPresence
+        WHERE UserId = @userId
       `);
 
-    // Broadcast offline status for each user
-    if (this.io && result.recordset.length > 0) {
-      result.recordset.forEach((row: any) => {
-        this.io!.emit('presence-changed', {
-          userId: row.UserId,
-          status: 'offline',
-          updatedAt: new Date()
-        });
-      });
+    const row = result.recordset[0] as UserPresence | undefined;
+    if (!row) {
+      return null;
+    }
+    // A concurrent write may have created the entry while the row was loading
+    const key = this.key(userId);
+    if (!this.registry.has(key)) {
+      this.registry.set(key, row);
     }
+    return this.registry.get(key)!;
   }
 
   /**
-   * Update user presence
+   * Apply a change to the registry, mark it for the next snapshot and queue a broadcast
+   * if the visible state (status or activity) changed
    */
-  static async updatePresence(update: PresenceUpdate): Promise<UserPresence> {
-    const db = DatabaseService.getInstance();
+  private static apply(userId: string, changes: Partial<UserPresence>): UserPresence {
+    const key = this.key(userId);
+    const previous = this.registry.get(key);
+    const now = new Date();
+    const presence: UserPresence = {
+      UserId: previous?.UserId || userId,
+      Status: previous?.Status || 'online',
+      Activity: previous?.Activity ?? null,
+      LastSeenAt: previous?.LastSeenAt || now,
+      UpdatedAt: previous?.UpdatedAt || now,
+      ...changes
+    };
+    presence.Activity = typeof presence.Activity === 'string' && presence.Activity
+      ? presence.Activity.slice(0, ACTIVITY_MAX_LENGTH)
+      : null;
+
+    this.registry.set(key, presence);
+    this.dirty.add(key);
+    this.markForSync(key, presence);
+
+    if (!previous || previous.Status !== presence.Status || (previous.Activity ?? null) !== (presence.Activity ?? null)) {
+      this.queueBroadcast(presence);
+    }
+    return { ...presence };
+  }
 
-    const result = await (await db.getRequest())
-      .input('userId', sql.UniqueIdentifier, update.userId)
-      .input('status', sql.NVarChar, update.status)
-      .input('activity', sql.NVarChar, update.activity || null)
-      .query(`
-        IF EXISTS (SELECT 1 FROM dbo.UserPresence WHERE UserId = @userId)
-        BEGIN
-          UPDATE dbo.UserPresence
-          SET Status = @status, Activity = @activity, LastSeenAt = GETUTCDATE(), UpdatedAt = GETUTCDATE()
-          OUTPUT INSERTED.*
-          WHERE UserId = @userId
-        END
-        ELSE
-        BEGIN
-          INSERT INTO dbo.UserPresence (UserId, Status, Activity)
-          OUTPUT INSERTED.*
-          VALUES (@userId, @status, @activity)
-        END
-      `);
+  private static queueBroadcast(presence: UserPresence): void {
+    const key = this.key(presence.UserId);
+    if (this.pendingChanges.has(key)) {
+      this.changesCoalesced++;
+    }
+    this.pendingChanges.set(key, {
+      userId: presence.UserId,
+      status: presence.Status,
+      activity: presence.Activity,
+      updatedAt: presence.UpdatedAt
+    });
+  }
 
-    const presence = result.recordset[0] as UserPresence;
+  private static markForSync(key: string, presence: UserPresence): void {
+    if (SocketClusterService.isClustered()) {
+      this.outbox.set(key, presence);
+    }
+  }
 
-    // Broadcast presence change to all connected clients
-    if (this.io) {
-      this.io.emit('presence-changed', {
-        userId: presence.UserId,
-        status: presence.Status,
-        activity: presence.Activity,
-        updatedAt: presence.UpdatedAt
+  /**
+   * Send this node's changed entries to the other nodes (one message per broadcast interval)
+   */
+  private static publishSync(): void {
+    if (this.outbox.size === 0) {
+      return;
+    }
+    const entries = Array.from(this.outbox.values()).map(presence => ({
+      UserId: presence.UserId,
+      Status: presence.Status,
+      Activity: presence.Activity ?? null,
+      LastSeenAt: presence.LastSeenAt.toISOString(),
+      UpdatedAt: presence.UpdatedAt.toISOString()
+    }));
+    this.outbox.clear();
+    SocketClusterService.publish('presence:sync', { entries });
+  }
+
+  /**
+   * Apply entries published by another node; the newer UpdatedAt wins
+   */
+  private static applyRemote(message: PresenceSyncMessage): void {
+    for (const entry of message.entries) {
+      const key = this.key(entry.UserId);
+      const updatedAt = new Date(entry.UpdatedAt);
+      const local = this.registry.get(key);
+      if (local && local.UpdatedAt.getTime() > updatedAt.getTime()) {
+        continue;
+      }
+      this.registry.set(key, {
+        UserId: entry.UserId,
+        Status: entry.Status,
+        Activity: entry.Activity,
+        LastSeenAt: new Date(entry.LastSeenAt),
+        UpdatedAt: updatedAt
       });
+      this.remoteUpdatesApplied++;
     }
+  }
 
-    return presence;
+  /**
+   * Emit one 'presence-batch' per audience room with the changes queued since the last flush
+   */
+  private static async flushBroadcasts(): Promise<void> {
+    if (this.pendingChanges.size === 0 || !this.io) {
+      return;
+    }
+
+    const changes = Array.from(this.pendingChanges.values());
+    this.pendingChanges.clear();
+
+    const audiences = await this.getAudiences(changes.map(change => change.userId));
+    const byRoom = new Map<string, PresenceChange[]>();
+    for (const change of changes) {
+      const rooms = [`user-${change.userId}`, ...(audiences.get(this.key(change.userId)) || [])];
+      for (const room of rooms) {
+        const list = byRoom.get(room);
+        if (list) {
+          list.push(change);
+        } else {
+          byRoom.set(room, [change]);
+        }
+      }
+    }
+
+    for (const [room, roomChanges] of byRoom) {
+      this.io.to(room).emit('presence-batch', { changes: roomChanges });
+    }
+    this.batchesEmitted += byRoom.size;
+    this.changesBroadcast += changes.length;
   }
 
   /**
-   * Update user's last seen timestamp (heartbeat)
+   * Rooms interested in each user's presence; uncached users are resolved with one query
    */
-  static async updateLastSeen(userId: string): Promise<void> {
-    const db = DatabaseService.getInstance();
+  private static async getAudiences(userIds: string[]): Promise<Map<string, string[]>> {
+    const audiences = new Map<string, string[]>();
+    const missing: string[] = [];
+
+    for (const userId of userIds) {
+      const cached = audienceCache.get(this.key(userId));
+      if (cached) {
+        audiences.set(this.key(userId), cached);
+      } else {
+        missing.push(userId);
+      }
+    }
 
-    // Use MERGE to insert if doesn't exist, update if exists
-    await (await db.getRequest())
-      .input('userId', sql.UniqueIdentifier, userId)
+    if (missing.length === 0) {
+      return audiences;
+    }
+
+    try {
+      const result = await (await DatabaseService.getInstance().getRequest())
+        .input('UserIds', sql.NVarChar(sql.MAX), JSON.stringify(missing))
+        .query(`
+          SELECT CAST(src.UserId AS NVARCHAR(36)) AS UserId, rooms.Room
+          FROM (SELECT CAST(value AS UNIQUEIDENTIFIER) AS UserId FROM OPENJSON(@UserIds)) src
+          CROSS APPLY (
+            SELECT 'course-' + CAST(e.CourseId AS NVARCHAR(36)) AS Room
+            FROM dbo.Enrollments e
+            WHERE e.UserId = src.UserId AND e.Status IN ('active', 'completed')
+            UNION
+            SELECT 'course-' + CAST(c.Id AS NVARCHAR(36))
+            FROM dbo.Courses c
+            WHERE c.InstructorId = src.UserId
+            UNION
+            SELECT 'study-group-' + CAST(m.GroupId AS NVARCHAR(36))
+            FROM dbo.StudyGroupMembers m
+            WHERE m.UserId = src.UserId
+            UNION
+            SELECT 'user-' + CAST(other.UserId AS NVARCHAR(36))
+            FROM dbo.ChatParticipants me
+            INNER JOIN dbo.ChatRooms r ON r.Id = me.RoomId AND r.Type = 'direct_message'
+            INNER JOIN dbo.ChatParticipants other ON other.RoomId = me.RoomId AND other.UserId <> me.UserId
+            WHERE me.UserId = src.UserId AND me.IsActive = 1
+          ) rooms
+        `);
+
+      for (const userId of missing) {
+        audiences.set(this.key(userId), []);
+      }
+      for (const row of result.recordset as Array<{ UserId: string; Room: string }>) {
+        audiences.get(this.key(row.UserId))?.push(row.Room);
+      }
+      for (const userId of missing) {
+        audienceCache.set(this.key(userId), audiences.get(this.key(userId))!);
+      }
+    } catch (error) {
+      // Without an audience the change still reaches the user's own room
+      logger.error('❌ [Presence] Failed to resolve presence audiences:', error);
+    }
+
+    return audiences;
+  }
+
+  /**
+   * Write every changed entry to dbo.UserPresence with batched MERGEs. Concurrent calls share one snapshot.
+   */
+  static snapshot(): Promise<void> {
+    if (this.currentSnapshot) {
+      return this.currentSnapshot;
+    }
+    if (this.dirty.size === 0) {
+      return Promise.resolve();
+    }
+
+    const keys = Array.from(this.dirty);
+    this.dirty.clear();
+
+    this.currentSnapshot = this.writeSnapshot(keys).finally(() => {
+      this.currentSnapshot = null;
+    });
+    return this.currentSnapshot;
+  }
+
+  private static async writeSnapshot(keys: string[]): Promise<void> {
+    const started = Date.now();
+
+    for (let i = 0; i < keys.length; i += SNAPSHOT_BATCH_SIZE) {
+      const batchKeys = keys.slice(i, i + SNAPSHOT_BATCH_SIZE)
+        .filter(key => this.registry.has(key));
+      if (batchKeys.length === 0) {
+        continue;
+      }
+
+      try {
+        await this.mergeSnapshot(batchKeys);
+        this.rowsSnapshotted += batchKeys.length;
+      } catch (error) {
+        this.snapshotFailures++;
+        if (!isRowDataError(error)) {
+          logger.error(`❌ [Presence] Snapshot of ${batchKeys.length} row(s) failed - retrying next interval`, error);
+          batchKeys.forEach(key => this.dirty.add(key));
+        } else if (batchKeys.length === 1) {
+          this.drop(batchKeys[0], error);
+        } else {
+          logger.warn(`⚠️ [Presence] Snapshot of ${batchKeys.length} row(s) rejected a row - retrying row by row`, error);
+          await this.snapshotRowByRow(batchKeys);
+        }
+      }
+    }
+
+    this.snapshots++;
+    this.lastSnapshotMs = Date.now() - started;
+  }
+
+  /**
+   * Write a rejected batch one row at a time: rows the database rejects are dropped,
+   * rows that fail transiently are marked dirty again
+   */
+  private static async snapshotRowByRow(keys: string[]): Promise<void> {
+    for (const key of keys) {
+      try {
+        await this.mergeSnapshot([key]);
+        this.rowsSnapshotted++;
+      } catch (error) {
+        if (isRowDataError(error)) {
+          this.drop(key, error);
+        } else {
+          this.dirty.add(key);
+        }
+      }
+    }
+  }
+
+  private static drop(key: string, error: unknown): void {
+    this.droppedRows++;
+    logger.error(`❌ [Presence] Dropping snapshot row ${key} - rejected by the database`, error);
+  }
+
+  private static async mergeSnapshot(keys: string[]): Promise<void> {
+    const rows = keys
+      .map(key => this.registry.get(key))
+      .filter((presence): presence is UserPresence => !!presence)
+      .map(presence => ({
+        userId: presence.UserId,
+        status: presence.Status,
+        activity: presence.Activity ?? null,
+        lastSeenAt: presence.LastSeenAt.toISOString(),
+        updatedAt: presence.UpdatedAt.toISOString()
+      }));
+
+    await (await DatabaseService.getInstance().getRequest())
+      .input('Rows', sql.NVarChar(sql.MAX), JSON.stringify(rows))
       .query(`
-        MERGE dbo.UserPresence AS target
-        USING (SELECT @userId AS UserId) AS source
+        MERGE dbo.UserPresence WITH (HOLDLOCK) AS target
+        USING (
+          SELECT j.UserId, j.Status, j.Activity,
+                 CAST(j.LastSeenAt AS DATETIME2) AS LastSeenAt,
+                 CAST(j.UpdatedAt AS DATETIME2) AS UpdatedAt
+          FROM OPENJSON(@Rows) WITH (
+            UserId UNIQUEIDENTIFIER '$.userId',
+            Status NVARCHAR(20) '$.status',
+            Activity NVARCHAR(100) '$.activity',
+            LastSeenAt DATETIMEOFFSET '$.lastSeenAt',
+            UpdatedAt DATETIMEOFFSET '$.updatedAt'
+          ) j
+          -- Users deleted since their last heartbeat are skipped (FK to Users)
+          WHERE EXISTS (SELECT 1 FROM dbo.Users u WHERE u.Id = j.UserId)
+        ) AS source
         ON target.UserId = source.UserId
         WHEN MATCHED THEN
-          UPDATE SET LastSeenAt = GETUTCDATE(), UpdatedAt = GETUTCDATE()
+          UPDATE SET
+            Status = source.Status,
+            Activity = source.Activity,
+            LastSeenAt = source.LastSeenAt,
+            UpdatedAt = source.UpdatedAt
         WHEN NOT MATCHED THEN
-          INSERT (UserId, Status, LastSeenAt, UpdatedAt)
-          VALUES (@userId, 'online', GETUTCDATE(), GETUTCDATE());
+          INSERT (UserId, Status, Activity, LastSeenAt, UpdatedAt)
+          VALUES (source.UserId, source.Status, source.Activity, source.LastSeenAt, source.UpdatedAt);
       `);
   }
 
   /**
-   * Get user presence by ID
+   * Update user presence
    */
-  static async getUserPresence(userId: string): Promise<UserPresence | null> {
-    const db = DatabaseService.getInstance();
-
-    const result = await (await db.getRequest())
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        SELECT * FROM dbo.UserPresence
-        WHERE UserId = @userId
-      `);
+  static async updatePresence(update: PresenceUpdate): Promise<UserPresence> {
+    if (!isPresenceStatus(update.status)) {
+      throw new Error('Invalid presence status');
+    }
+    await this.ready;
+    const now = new Date();
+    return this.apply(update.userId, {
+      Status: update.status,
+      Activity: update.activity || null,
+      LastSeenAt: now,
+      UpdatedAt: now
+    });
+  }
 
-    if (result.recordset.length === 0) {
-      return null;
+  /**
+   * Update user's last seen timestamp (heartbeat)
+   */
+  static async updateLastSeen(userId: string): Promise<void> {
+    const existing = await this.getEntry(userId);
+    const now = new Date();
+    if (existing) {
+      // Heartbeats do not change what others see; no broadcast
+      existing.LastSeenAt = now;
+      existing.UpdatedAt = now;
+      this.dirty.add(this.key(userId));
+      this.markForSync(this.key(userId), existing);
+    } else {
+      this.apply(userId, { Status: 'online', LastSeenAt: now, UpdatedAt: now });
     }
+  }
 
-    return result.recordset[0] as UserPresence;
+  /**
+   * Get user presence by ID
+   */
+  static async getUserPresence(userId: string): Promise<UserPresence | null> {
+    const presence = await this.getEntry(userId);
+    return presence ? { ...presence } : null;
   }
 
   /**
@@ -177,79 +603,99 @@ export class PresenceService {
     if (userIds.length === 0) {
       return [];
     }
+    await this.ready;
+
+    const found: UserPresence[] = [];
+    const missing: string[] = [];
+    for (const userId of userIds) {
+      const presence = this.registry.get(this.key(userId));
+      if (presence) {
+        found.push({ ...presence });
+      } else {
+        missing.push(userId);
+      }
+    }
 
-    const db = DatabaseService.getInstance();
+    if (missing.length > 0) {
+      const result = await (await DatabaseService.getInstance().getRequest())
+        .input('UserIds', sql.NVarChar(sql.MAX), JSON.stringify(missing))
+        .query(`
+          SELECT up.UserId, up.Status, up.Activity, up.LastSeenAt, up.UpdatedAt
+          FROM dbo.UserPresence up
+          WHERE up.UserId IN (SELECT TRY_CAST(value AS UNIQUEIDENTIFIER) FROM OPENJSON(@UserIds))
+        `);
+      found.push(...(result.recordset as UserPresence[]));
+    }
 
-    // Build parameterized query with individual parameters
-    const request = await db.getRequest();
-    const paramNames = userIds.map((id, index) => {
-      const paramName = `userId${index}`;
-      request.input(paramName, sql.UniqueIdentifier, id);
-      return `@${paramName}`;
-    });
+    return found;
+  }
+
+  /**
+   * Registry entries in the given statuses, most recently updated first
+   */
+  private static async listByStatus(statuses: Array<UserPresence['Status']>): Promise<UserPresence[]> {
+    await this.ready;
+    return Array.from(this.registry.values())
+      .filter(presence => statuses.includes(presence.Status))
+      .sort((a, b) => b.UpdatedAt.getTime() - a.UpdatedAt.getTime());
+  }
+
+  /**
+   * Attach user profile columns to presence entries (one query), keeping their order
+   */
+  private static async withUserDetails(presences: UserPresence[], courseId?: string): Promise<UserPresence[]> {
+    if (presences.length === 0) {
+      return [];
+    }
+
+    const request = await DatabaseService.getInstance().getRequest();
+    request.input('UserIds', sql.NVarChar(sql.MAX), JSON.stringify(presences.map(p => p.UserId)));
+    if (courseId) {
+      request.input('courseId', sql.UniqueIdentifier, courseId);
+    }
 
     const result = await request.query(`
-      SELECT up.* 
-      FROM dbo.UserPresence up
-      WHERE up.UserId IN (${paramNames.join(', ')})
+      SELECT u.Id, u.FirstName, u.LastName, u.Email, u.Avatar, u.Role
+      FROM dbo.Users u
+      WHERE u.Id IN (SELECT CAST(value AS UNIQUEIDENTIFIER) FROM OPENJSON(@UserIds))
+      ${courseId ? 'AND EXISTS (SELECT 1 FROM dbo.Enrollments e WHERE e.UserId = u.Id AND e.CourseId = @courseId)' : ''}
     `);
 
-    return result.recordset as UserPresence[];
+    const users = new Map<string, any>();
+    for (const row of result.recordset) {
+      users.set(this.key(row.Id), row);
+    }
+
+    return presences
+      .filter(presence => users.has(this.key(presence.UserId)))
+      .map(presence => {
+        const { Id, ...details } = users.get(this.key(presence.UserId));
+        return { ...presence, ...details };
+      });
   }
 
   /**
    * Get all online users
    */
   static async getOnlineUsers(limit: number = 100): Promise<UserPresence[]> {
-    const db = DatabaseService.getInstance();
-
-    const result = await (await db.getRequest())
-      .input('limit', sql.Int, limit)
-      .query(`
-        SELECT TOP(@limit) up.*, u.FirstName, u.LastName, u.Email, u.Avatar, u.Role
-        FROM dbo.UserPresence up
-        JOIN dbo.Users u ON up.UserId = u.Id
-        WHERE up.Status = 'online'
-        ORDER BY up.UpdatedAt DESC
-      `);
-
-    return result.recordset as UserPresence[];
+    const online = await this.listByStatus(['online']);
+    return this.withUserDetails(online.slice(0, limit));
   }
 
   /**
    * Get online users count
    */
   static async getOnlineUsersCount(): Promise<number> {
-    const db = DatabaseService.getInstance();
-
-    const result = await (await db.getRequest())
-      .query(`
-        SELECT COUNT(*) as Count
-        FROM dbo.UserPresence
-        WHERE Status = 'online'
-      `);
-
-    return result.recordset[0].Count;
+    await this.ready;
+    return this.countOnline();
   }
 
   /**
    * Get online users in a specific course (based on enrollments)
    */
   static async getOnlineUsersInCourse(courseId: string): Promise<UserPresence[]> {
-    const db = DatabaseService.getInstance();
-
-    const result = await (await db.getRequest())
-      .input('courseId', sql.UniqueIdentifier, courseId)
-      .query(`
-        SELECT up.*, u.FirstName, u.LastName, u.Email, u.Avatar, u.Role
-        FROM dbo.UserPresence up
-        JOIN dbo.Users u ON up.UserId = u.Id
-        JOIN dbo.Enrollments e ON u.Id = e.UserId
-        WHERE up.Status IN ('online', 'away', 'busy') AND e.CourseId = @courseId
-        ORDER BY up.UpdatedAt DESC
-      `);
-
-    return result.recordset as UserPresence[];
+    const active = await this.listByStatus(['online', 'away', 'busy']);
+    return this.withUserDetails(active, courseId);
   }
 
   /**
@@ -257,30 +703,18 @@ export class PresenceService {
    * If user status is away or busy (not offline), preserve that status
    */
   static async setUserOnline(userId: string, activity?: string): Promise<UserPresence> {
-    // Ensure user has a presence record (creates if doesn't exist)
-    await this.ensureUserPresence(userId);
-    
-    // Check if user already has a presence status
-    const existing = await this.getUserPresence(userId);
-    
-    console.log('[PRESENCE] setUserOnline called for user:', userId);
-    
-    if (existing) {
-      console.log('[PRESENCE] Existing status:', existing.Status);
-      
-      // Preserve user's chosen status (away, busy, or offline) on reconnect
-      // This allows "appear offline" functionality and status persistence across page refreshes
-      if (existing.Status === 'away' || existing.Status === 'busy' || existing.Status === 'offline') {
-        console.log('[PRESENCE] Preserving user-selected status:', existing.Status);
-        return this.updatePresence({
-          userId,
-          status: existing.Status,
-          activity: activity || existing.Activity || undefined
-        });
-      }
+    const existing = await this.getEntry(userId);
+
+    // Preserve user's chosen status (away, busy, or offline) on reconnect
+    // This allows "appear offline" functionality and status persistence across page refreshes
+    if (existing && (existing.Status === 'away' || existing.Status === 'busy' || existing.Status === 'offline')) {
+      return this.updatePresence({
+        userId,
+        status: existing.Status,
+        activity: activity || existing.Activity || undefined
+      });
     }
-    
-    console.log('[PRESENCE] Setting status to online');
+
     // Otherwise, set to online (new user or first connection)
     return this.updatePresence({
       userId,
@@ -324,44 +758,26 @@ export class PresenceService {
    * Update user activity without changing status
    */
   static async updateActivity(userId: string, activity: string): Promise<void> {
-    const db = DatabaseService.getInstance();
-
-    await (await db.getRequest())
-      .input('userId', sql.UniqueIdentifier, userId)
-      .input('activity', sql.NVarChar, activity)
-      .query(`
-        UPDATE dbo.UserPresence
-        SET Activity = @activity, UpdatedAt = GETUTCDATE()
-        WHERE UserId = @userId
-      `);
-
-    // Broadcast activity update
-    if (this.io) {
-      const presence = await this.getUserPresence(userId);
-      if (presence) {
-        this.io.emit('presence-changed', {
-          userId: presence.UserId,
-          status: presence.Status,
-          activity: presence.Activity,
-          updatedAt: presence.UpdatedAt
-        });
-      }
+    const existing = await this.getEntry(userId);
+    if (!existing) {
+      return;
     }
+    this.apply(userId, { Activity: activity, UpdatedAt: new Date() });
   }
 
   /**
-   * Broadcast presence change to specific users
+   * Send a presence change to specific users right away (bypasses batching)
    */
   static broadcastPresenceToUsers(userIds: string[], presence: UserPresence): void {
-    if (!this.io) return;
+    if (!this.io || userIds.length === 0) return;
 
-    userIds.forEach(userId => {
-      this.io!.to(`user-${userId}`).emit('presence-changed', {
+    this.io.to(userIds.map(userId => `user-${userId}`)).emit('presence-batch', {
+      changes: [{
         userId: presence.UserId,
         status: presence.Status,
         activity: presence.Activity,
         updatedAt: presence.UpdatedAt
-      });
+      }]
     });
   }
 
@@ -370,7 +786,7 @@ export class PresenceService {
    */
   static async initializeUserPresence(userId: string): Promise<UserPresence> {
     const existing = await this.getUserPresence(userId);
-    
+
     if (existing) {
       return existing;
     }
@@ -381,24 +797,31 @@ export class PresenceService {
     });
   }
 
-  /**
-   * Ensure user has a presence record (create with online status if doesn't exist)
-   */
-  static async ensureUserPresence(userId: string): Promise<UserPresence> {
-    const db = DatabaseService.getInstance();
-
-    const result = await (await db.getRequest())
-      .input('userId', sql.UniqueIdentifier, userId)
-      .query(`
-        IF NOT EXISTS (SELECT 1 FROM dbo.UserPresence WHERE UserId = @userId)
-        BEGIN
-          INSERT INTO dbo.UserPresence (UserId, Status, LastSeenAt, UpdatedAt)
-          VALUES (@userId, 'online', GETUTCDATE(), GETUTCDATE())
-        END
-        
-        SELECT * FROM dbo.UserPresence WHERE UserId = @userId
-      `);
+  private static countOnline(): number {
+    let count = 0;
+    for (const presence of this.registry.values()) {
+      if (presence.Status === 'online') {
+        count++;
+      }
+    }
+    return count;
+  }
 
-    return result.recordset[0] as UserPresence;
+  static getStats(): PresenceStats {
+    return {
+      trackedUsers: this.registry.size,
+      onlineUsers: this.countOnline(),
+      dirtyEntries: this.dirty.size,
+      pendingChanges: this.pendingChanges.size,
+      snapshots: this.snapshots,
+      rowsSnapshotted: this.rowsSnapshotted,
+      snapshotFailures: this.snapshotFailures,
+      droppedRows: this.droppedRows,
+      lastSnapshotMs: this.lastSnapshotMs,
+      batchesEmitted: this.batchesEmitted,
+      changesBroadcast: this.changesBroadcast,
+      changesCoalesced: this.changesCoalesced,
+      remoteUpdatesApplied: this.remoteUpdatesApplied
+    };
   }
 }
@@ -0,0 +1,190 @@
+import sql from 'mssql';
+import { DatabaseService } from './DatabaseService';
+import { logger } from '../utils/logger';
+
+/**
+ * QuestionStatsService — running per-question answer statistics for adaptive difficulty
+ *
+ * dbo.QuestionStats keeps Attempts, CorrectCount and the summed time of every graded answer.
+ * The submit endpoint adds one submission's outcomes with a single MERGE, so a question's
+ * difficulty is derived from one row instead of re-scanning every submission's Feedback JSON,
+ * and refreshDifficulties() costs the same no matter how many submissions exist.
+ * Existing history is loaded once by database/add_question_stats.sql. Rows are keyed by question Id
+ * without a foreign key (see database/schema.sql); pruneOrphanedStats() removes deleted questions' rows.
+ *
+ * Recording failures are logged, not thrown: the submission itself is already saved.
+ */
+
+export interface QuestionOutcome {
+  questionId: string;
+  isCorrect: boolean;
+  timeSpent: number | null; // seconds; null when unknown
+}
+
+export interface QuestionStatsRow {
+  QuestionId: string;
+  Attempts: number;
+  CorrectCount: number;
+  TimedAttempts: number;
+  TotalTimeSpent: number;
+}
+
+export interface DifficultyRefreshResult {
+  questionsChecked: number;
+  difficultiesChanged: number;
+  durationMs: number;
+}
+
+export const DEFAULT_DIFFICULTY = 5;
+const MIN_ATTEMPTS = 5; // Fewer graded answers than this keep the default difficulty
+const DEFAULT_TIME_SECONDS = 60;
+
+/**
+ * Difficulty (1-10) from a question's running stats
+ */
+export function difficultyFromStats(stats: QuestionStatsRow | null | undefined): number {
+  if (!stats || stats.Attempts < MIN_ATTEMPTS) {
+    return DEFAULT_DIFFICULTY;
+  }
+
+  const successRate = stats.CorrectCount / stats.Attempts;
+  const avgTime = stats.TimedAttempts > 0 ? stats.TotalTimeSpent / stats.TimedAttempts : DEFAULT_TIME_SECONDS;
+
+  // Lower success rate = higher difficulty
+  let difficulty = 10 - (successRate * 8); // Range 2-10 based on success rate
+
+  // Adjust based on time spent (longer time = higher difficulty)
+  if (avgTime > 120) difficulty += 1; // Very long time
+  else if (avgTime > 90) difficulty += 0.5; // Long time
+  else if (avgTime < 30) difficulty -= 0.5; // Quick answers
+
+  return Math.max(1, Math.min(10, Math.round(difficulty)));
+}
+
+export class QuestionStatsService {
+  /**
+   * Add one submission's graded answers to the running stats (one statement)
+   */
+  static async recordOutcomes(outcomes: QuestionOutcome[]): Promise<void> {
+    if (outcomes.length === 0) {
+      return;
+    }
+
+    try {
+      await (await DatabaseService.getInstance().getRequest())
+        .input('Outcomes', sql.NVarChar(sql.MAX), JSON.stringify(outcomes))
+        .query(`
+          MERGE dbo.QuestionStats WITH (HOLDLOCK) AS target
+          USING (
+            SELECT
+              o.QuestionId,
+              COUNT(*) AS Attempts,
+              SUM(CASE WHEN o.IsCorrect = 1 THEN 1 ELSE 0 END) AS CorrectCount,
+              COUNT(o.TimeSpent) AS TimedAttempts,
+              ISNULL(SUM(CAST(o.TimeSpent AS BIGINT)), 0) AS TotalTimeSpent
+            FROM OPENJSON(@Outcomes) WITH (
+              QuestionId UNIQUEIDENTIFIER '$.questionId',
+              IsCorrect BIT '$.isCorrect',
+              TimeSpent INT '$.timeSpent'
+            ) o
+            INNER JOIN dbo.Questions q ON q.Id = o.QuestionId
+            GROUP BY o.QuestionId
+          ) AS source
+          ON target.QuestionId = source.QuestionId
+          WHEN MATCHED THEN
+            UPDATE SET
+              Attempts = target.Attempts + source.Attempts,
+              CorrectCount = target.CorrectCount + source.CorrectCount,
+              TimedAttempts = target.TimedAttempts + source.TimedAttempts,
+              TotalTimeSpent = target.TotalTimeSpent + source.TotalTimeSpent,
+              UpdatedAt = SYSUTCDATETIME()
+          WHEN NOT MATCHED THEN
+            INSERT (QuestionId, Attempts, CorrectCount, TimedAttempts, TotalTimeSpent, UpdatedAt)
+            VALUES (source.QuestionId, source.Attempts, source.CorrectCount, source.TimedAttempts, source.TotalTimeSpent, SYSUTCDATETIME());
+        `);
+    } catch (error) {
+      logger.error('[QuestionStatsService] Failed to record question outcomes', { count: outcomes.length, error });
+    }
+  }
+
+  /**
+   * Running stats of one question (null if it has never been answered)
+   */
+  static async getStats(questionId: string): Promise<QuestionStatsRow | null> {
+    const rows = await DatabaseService.getInstance().query<QuestionStatsRow>(`
+      SELECT QuestionId, Attempts, CorrectCount, TimedAttempts, TotalTimeSpent
+      FROM dbo.QuestionStats
+      WHERE QuestionId = @questionId
+    `, { questionId });
+    return rows[0] || null;
+  }
+
+  /**
+   * Delete stats rows whose question no longer exists. Rows updated in the last hour are
+   * kept, like the AI feedback prune, so a prune cannot race an edit re-inserting its questions.
+   */
+  static async pruneOrphanedStats(): Promise<number> {
+    const result = await DatabaseService.getInstance().execute(`
+      DELETE s
+      FROM dbo.QuestionStats s
+      WHERE NOT EXISTS (SELECT 1 FROM dbo.Questions q WHERE q.Id = s.QuestionId)
+        AND s.UpdatedAt < DATEADD(HOUR, -1, SYSUTCDATETIME())
+    `);
+    return result.rowsAffected[0] || 0;
+  }
+
+  /**
+   * Write derived difficulties to dbo.Questions for the given assessments (all adaptive
+   * assessments when omitted). Reads one stats row per question and updates only the
+   * questions whose difficulty changed, with one statement.
+   */
+  static async refreshDifficulties(assessmentIds?: string[]): Promise<DifficultyRefreshResult> {
+    const started = Date.now();
+
+    const request = await DatabaseService.getInstance().getRequest();
+    let scope = 'a.IsAdaptive = 1';
+    if (assessmentIds) {
+      request.input('AssessmentIds', sql.NVarChar(sql.MAX), JSON.stringify(assessmentIds));
+      scope = 'a.Id IN (SELECT CAST(value AS UNIQUEIDENTIFIER) FROM OPENJSON(@AssessmentIds))';
+    }
+
+    const result = await request.query(`
+      SELECT q.Id AS QuestionId, q.Difficulty,
+             ISNULL(qs.Attempts, 0) AS Attempts,
+             ISNULL(qs.CorrectCount, 0) AS CorrectCount,
+             ISNULL(qs.TimedAttempts, 0) AS TimedAttempts,
+             ISNULL(qs.TotalTimeSpent, 0) AS TotalTimeSpent
+      FROM dbo.Questions q
+      INNER JOIN dbo.Assessments a ON a.Id = q.AssessmentId
+      LEFT JOIN dbo.QuestionStats qs ON qs.QuestionId = q.Id
+      WHERE ${scope}
+    `);
+
+    const changes = (result.recordset as Array<QuestionStatsRow & { Difficulty: number }>)
+      .map(row => ({ questionId: row.QuestionId, difficulty: difficultyFromStats(row), current: row.Difficulty }))
+      .filter(change => change.difficulty !== change.current)
+      .map(({ questionId, difficulty }) => ({ questionId, difficulty }));
+
+    if (changes.length > 0) {
+      await (await DatabaseService.getInstance().getRequest())
+        .input('Changes', sql.NVarChar(sql.MAX), JSON.stringify(changes))
+        .query(`
+          UPDATE q
+          SET Difficulty = c.Difficulty
+          FROM dbo.Questions q
+          INNER JOIN OPENJSON(@Changes) WITH (
+            QuestionId UNIQUEIDENTIFIER '$.questionId',
+            Difficulty INT '$.difficulty'
+          ) c ON c.QuestionId = q.Id
+        `);
+    }
+
+    const refresh: DifficultyRefreshResult = {
+      questionsChecked: result.recordset.length,
+      difficultiesChanged: changes.length,
+      durationMs: Date.now() - started
+    };
+    logger.info(`[QuestionStatsService] Difficulty refresh: ${refresh.difficultiesChanged}/${refresh.questionsChecked} question(s) changed (${refresh.durationMs}ms)`);
+    return refresh;
+  }
+}
@@ -0,0 +1,151 @@
+import os from 'os';
+import cluster from 'cluster';
+import { Server as SocketIOServer } from 'socket.io';
+import { createAdapter } from '@socket.io/cluster-adapter';
+import { setupWorker } from '@socket.io/sticky';
+import { logger } from '../utils/logger';
+
+/**
+ * SocketClusterService — Socket.IO adapter selection and the cross-node message bus
+ *
+ * SOCKET_ADAPTER picks how rooms are shared between server processes:
+ * - 'memory' (default): one process; rooms, emits and fetchSockets() are local.
+ * - 'cluster': N workers on one host (started with `npm run start:cluster`, see cluster.ts).
+ *   Workers share rooms over Node IPC through the primary, and the primary's sticky
+ *   load balancer keeps each Socket.IO session on one worker.
+ *
+ * With a shared adapter, io.to(room).emit(), socketsJoin()/socketsLeave() and
+ * fetchSockets() reach sockets on every node. Another adapter (e.g. a Redis or Postgres
+ * adapter for several hosts) plugs in at createAdapterFor().
+ *
+ * Services that keep per-process state (presence registry, course-room cache, response
+ * cache, search index) stay coherent with publish()/subscribe(): messages go to every
+ * other node via io.serverSideEmit() and are a no-op with the memory adapter.
+ */
+
+export type SocketAdapterMode = 'memory' | 'cluster';
+
+export interface SocketClusterStats {
+  adapter: SocketAdapterMode;
+  nodeId: string;
+  messagesPublished: number;
+  messagesReceived: number;
+  handlerFailures: number;
+}
+
+const ADAPTER_REQUEST_TIMEOUT_MS = parseInt(process.env.SOCKET_ADAPTER_REQUEST_TIMEOUT_MS || '5000', 10);
+
+function resolveMode(): SocketAdapterMode {
+  const configured = (process.env.SOCKET_ADAPTER || 'memory').toLowerCase();
+  if (configured === 'cluster') {
+    return 'cluster';
+  }
+  if (configured !== 'memory') {
+    logger.warn(`⚠️ [SocketCluster] Unknown SOCKET_ADAPTER "${configured}" - using the in-memory adapter`);
+  }
+  return 'memory';
+}
+
+export class SocketClusterService {
+  private static io: SocketIOServer | null = null;
+  private static mode: SocketAdapterMode = resolveMode();
+  private static readonly nodeId = `${os.hostname()}:${process.pid}`;
+
+  private static messagesPublished = 0;
+  private static messagesReceived = 0;
+  private static handlerFailures = 0;
+
+  /**
+   * Install the configured adapter on the Socket.IO server (before handlers are set up)
+   */
+  static configure(io: SocketIOServer): void {
+    this.io = io;
+
+    if (this.mode === 'cluster' && !cluster.isWorker) {
+      logger.warn('⚠️ [SocketCluster] SOCKET_ADAPTER=cluster requires the cluster entry point (dist/cluster.js) - using the in-memory adapter');
+      this.mode = 'memory';
+    }
+
+    const adapter = this.createAdapterFor(this.mode);
+    if (adapter) {
+      io.adapter(adapter);
+    }
+    logger.info(`✅ [SocketCluster] Socket.IO adapter: ${this.mode} (node ${this.nodeId})`);
+  }
+
+  private static createAdapterFor(mode: SocketAdapterMode): any {
+    switch (mode) {
+      case 'cluster':
+        return createAdapter({ requestsTimeout: ADAPTER_REQUEST_TIMEOUT_MS });
+      default:
+        return null; // Socket.IO's built-in in-memory adapter
+    }
+  }
+
+  /**
+   * Whether other server nodes share this node's rooms (and receive publish() messages)
+   */
+  static isClustered(): boolean {
+    return this.mode !== 'memory';
+  }
+
+  static getNodeId(): string {
+    return this.nodeId;
+  }
+
+  /**
+   * Start accepting connections. Cluster workers receive them from the primary over IPC
+   * and must not bind the port themselves; returns false in that case.
+   */
+  static attachServer(io: SocketIOServer): boolean {
+    if (this.mode === 'cluster') {
+      setupWorker(io);
+      return false;
+    }
+    return true;
+  }
+
+  /**
+   * Send a message to every other node (not delivered locally)
+   */
+  static publish(event: string, payload: unknown): void {
+    if (!this.io || !this.isClustered()) {
+      return;
+    }
+    try {
+      this.io.serverSideEmit(event, payload);
+      this.messagesPublished++;
+    } catch (error) {
+      logger.warn(`[SocketCluster] Failed to publish ${event}`, { error });
+    }
+  }
+
+  /**
+   * Handle messages published by other nodes
+   */
+  static subscribe<T>(event: string, handler: (payload: T) => void): void {
+    if (!this.io) {
+      logger.warn(`[SocketCluster] subscribe(${event}) before configure() - ignored`);
+      return;
+    }
+    this.io.on(event, (payload: T) => {
+      this.messagesReceived++;
+      try {
+        handler(payload);
+      } catch (error) {
+        this.handlerFailures++;
+        logger.warn(`[SocketCluster] Handler for ${event} failed`, { error });
+      }
+    });
+  }
+
+  static getStats(): SocketClusterStats {
+    return {
+      adapter: this.mode,
+      nodeId: this.nodeId,
+      messagesPublished: this.messagesPublished,
+      messagesReceived: this.messagesReceived,
+      handlerFailures: this.handlerFailures
+    };
+  }
+}
@@ -2,6 +2,7 @@ import Stripe from 'stripe';
 import { DatabaseService } from './DatabaseService';
 import InvoicePdfService from './InvoicePdfService';
 import { CourseEventService } from './CourseEventService';
+import { CourseCounterService } from './CourseCounterService';
 import { logger } from '../utils/logger';
 import { Transaction } from '../types/database';
 
@@ -268,12 +269,10 @@ export class StripeService {
             `UPDATE dbo.Enrollments SET Status = 'active', EnrolledAt = GETUTCDATE() WHERE Id = @enrollmentId`,
             { enrollmentId: existingEnrollments[0].Id }
           );
-          // Increment enrollment count (was deferred until payment for paid+approval courses)
-          await db.query(
-            `UPDATE dbo.Courses SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1 WHERE Id = @courseId`,
-            { courseId }
-          );
+          // Enrollment count now includes this student (was deferred until payment for paid+approval courses)
+          await CourseCounterService.refreshEnrollmentCount(courseId);
           try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { logger.warn('[StripeService] Socket emit failed:', e); }
+          await CourseEventService.getInstance().joinUserToCourseRoom(userId, courseId);
           logger.info(`✅ Approved enrollment activated for user ${userId}, course ${courseId}`);
         } else if (existingStatus === 'active' || existingStatus === 'completed') {
           logger.info(`ℹ️ User ${userId} already enrolled (${existingStatus}) in course ${courseId}, skipping`);
@@ -287,11 +286,9 @@ export class StripeService {
             `UPDATE dbo.Enrollments SET Status = 'active', EnrolledAt = GETUTCDATE() WHERE Id = @enrollmentId`,
             { enrollmentId: existingEnrollments[0].Id }
           );
-          await db.query(
-            `UPDATE dbo.Courses SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1 WHERE Id = @courseId`,
-            { courseId }
-          );
+          await CourseCounterService.refreshEnrollmentCount(courseId);
           try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { logger.warn('[StripeService] Socket emit failed:', e); }
+          await CourseEventService.getInstance().joinUserToCourseRoom(userId, courseId);
           logger.info(`✅ Enrollment reactivated for user ${userId}, course ${courseId}`);
         }
       } else {
@@ -301,12 +298,9 @@ export class StripeService {
            VALUES (NEWID(), @userId, @courseId, GETUTCDATE(), 'active')`,
           { userId, courseId }
         );
-        // Increment enrollment count
-        await db.query(
-          `UPDATE dbo.Courses SET EnrollmentCount = ISNULL(EnrollmentCount, 0) + 1 WHERE Id = @courseId`,
-          { courseId }
-        );
+        await CourseCounterService.refreshEnrollmentCount(courseId);
         try { CourseEventService.getInstance().emitEnrollmentCountChanged(courseId); } catch (e) { logger.warn('[StripeService] Socket emit failed:', e); }
+        await CourseEventService.getInstance().joinUserToCourseRoom(userId, courseId);
         logger.info(`✅ Enrollment created for user ${userId}, course ${courseId}`);
       }
 
@@ -389,6 +383,9 @@ export class StripeService {
          WHERE UserId = @userId AND CourseId = @courseId`,
         { userId: transaction.UserId, courseId: transaction.CourseId }
       );
+      await CourseCounterService.refreshEnrollmentCount(transaction.CourseId);
+      try { CourseEventService.getInstance().emitEnrollmentCountChanged(transaction.CourseId); } catch (e) { logger.warn('[StripeService] Socket emit failed:', e); }
+      await CourseEventService.getInstance().removeUserFromCourseRoom(transaction.UserId, transaction.CourseId);
 
       logger.info(`✅ Refund processed: ${refund.id} for transaction ${transactionId}`);
 
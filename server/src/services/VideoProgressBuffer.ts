@@ -0,0 +1,333 @@
+import sql from 'mssql';
+import { DatabaseService } from './DatabaseService';
+import { logger } from '../utils/logger';
+import { isRowDataError } from '../utils/sqlErrors';
+
+/**
+ * VideoProgressBuffer — write-behind buffer for video-progress heartbeats
+ *
+ * The player posts its position every few seconds. Instead of a read + UPDATE/INSERT
+ * per heartbeat, record() coalesces heartbeats per (user, content item) in memory and
+ * flush() writes all pending rows with one set-based MERGE every VIDEO_PROGRESS_FLUSH_MS.
+ * Coalescing keeps the same rules the row-by-row path had: WatchedDuration only grows,
+ * IsCompleted never goes back to 0, CompletedAt keeps its first value.
+ *
+ * Crash-safety bounds: at most one flush interval of heartbeats (and never more than
+ * VIDEO_PROGRESS_BUFFER_MAX entries) is held in memory; reaching the cap triggers an
+ * immediate flush, batches that fail transiently are put back for the next flush, and
+ * stop() flushes on shutdown. A batch rejected for its data is retried row by row and
+ * only the rows the database rejects are dropped, so one bad row can't block the rest
+ * on every flush. A lost heartbeat only costs a few seconds of resume position.
+ *
+ * Reads that must see the latest position (GET progress, /complete) use peek() or
+ * flushEntry().
+ */
+
+export interface BufferedVideoProgress {
+  userId: string;
+  contentItemId: string;
+  lastPosition: number;
+  watchedDuration: number;
+  completionPercentage: number;
+  isCompleted: boolean;
+  playbackSpeed: number;
+  lastWatchedAt: Date;
+  completedAt: Date | null;
+}
+
+export interface VideoProgressBufferStats {
+  bufferedEntries: number;
+  maxEntries: number;
+  flushIntervalMs: number;
+  heartbeatsReceived: number;
+  heartbeatsCoalesced: number;
+  flushes: number;
+  rowsFlushed: number;
+  flushFailures: number;
+  droppedEntries: number;
+  lastFlushMs: number;
+  avgFlushMs: number;
+  maxFlushMs: number;
+}
+
+const FLUSH_INTERVAL_MS = parseInt(process.env.VIDEO_PROGRESS_FLUSH_MS || '5000', 10);
+const MAX_BUFFERED_ENTRIES = parseInt(process.env.VIDEO_PROGRESS_BUFFER_MAX || '20000', 10);
+const FLUSH_BATCH_SIZE = parseInt(process.env.VIDEO_PROGRESS_FLUSH_BATCH_SIZE || '1000', 10);
+
+export class VideoProgressBuffer {
+  private static instance: VideoProgressBuffer | null = null;
+
+  private pending = new Map<string, BufferedVideoProgress>();
+  // Entries taken by the running flush, still visible to peek() until the MERGE lands
+  private flushing = new Map<string, BufferedVideoProgress>();
+  private flushTimer: NodeJS.Timeout | null = null;
+  private currentFlush: Promise<void> | null = null;
+
+  private heartbeatsReceived = 0;
+  private heartbeatsCoalesced = 0;
+  private flushes = 0;
+  private rowsFlushed = 0;
+  private flushFailures = 0;
+  private droppedEntries = 0;
+  private lastFlushMs = 0;
+  private totalFlushMs = 0;
+  private maxFlushMs = 0;
+
+  static getInstance(): VideoProgressBuffer {
+    if (!VideoProgressBuffer.instance) {
+      VideoProgressBuffer.instance = new VideoProgressBuffer();
+    }
+    return VideoProgressBuffer.instance;
+  }
+
+  private static key(userId: string, contentItemId: string): string {
+    return `${userId.toUpperCase()}|${contentItemId}`;
+  }
+
+  start(): void {
+    if (this.flushTimer) {
+      return;
+    }
+    this.flushTimer = setInterval(() => {
+      this.flush().catch(error => logger.error('❌ [VideoProgressBuffer] Scheduled flush failed:', error));
+    }, FLUSH_INTERVAL_MS);
+    logger.info(`✅ [VideoProgressBuffer] Started (flush every ${FLUSH_INTERVAL_MS}ms, max ${MAX_BUFFERED_ENTRIES} entries)`);
+  }
+
+  /**
+   * Stop the timer and write everything still buffered (graceful shutdown)
+   */
+  async stop(): Promise<void> {
+    if (this.flushTimer) {
+      clearInterval(this.flushTimer);
+      this.flushTimer = null;
+    }
+    await this.flush();
+    logger.info('[VideoProgressBuffer] Stopped — buffer flushed');
+  }
+
+  /**
+   * Buffer one heartbeat, merging it into any pending heartbeat for the same user and item
+   */
+  record(heartbeat: BufferedVideoProgress): void {
+    this.heartbeatsReceived++;
+    const key = VideoProgressBuffer.key(heartbeat.userId, heartbeat.contentItemId);
+    const existing = this.pending.get(key);
+
+    if (existing) {
+      this.heartbeatsCoalesced++;
+      this.pending.set(key, this.coalesce(existing, heartbeat));
+    } else {
+      this.pending.set(key, { ...heartbeat });
+    }
+
+    if (this.pending.size >= MAX_BUFFERED_ENTRIES && !this.currentFlush) {
+      logger.warn(`⚠️ [VideoProgressBuffer] ${this.pending.size} entries buffered - flushing early`);
+      this.flush().catch(error => logger.error('❌ [VideoProgressBuffer] Early flush failed:', error));
+    }
+  }
+
+  /**
+   * Latest buffered (not yet written) progress for a user and item, if any
+   */
+  peek(userId: string, contentItemId: string): BufferedVideoProgress | undefined {
+    const key = VideoProgressBuffer.key(userId, contentItemId);
+    return this.pending.get(key) || this.flushing.get(key);
+  }
+
+  /**
+   * Write one user's pending progress for an item now (before /complete reads or overwrites it)
+   */
+  async flushEntry(userId: string, contentItemId: string): Promise<void> {
+    // A running flush may hold this entry in its batch; let it land first
+    if (this.currentFlush) {
+      await this.currentFlush;
+    }
+    const key = VideoProgressBuffer.key(userId, contentItemId);
+    const entry = this.pending.get(key);
+    if (!entry) {
+      return;
+    }
+    this.pending.delete(key);
+    await this.writeBatches([entry]);
+  }
+
+  /**
+   * Write every buffered entry with batched MERGEs. Concurrent calls share one flush.
+   */
+  flush(): Promise<void> {
+    if (this.currentFlush) {
+      return this.currentFlush;
+    }
+    if (this.pending.size === 0) {
+      return Promise.resolve();
+    }
+
+    this.flushing = this.pending;
+    this.pending = new Map();
+
+    this.currentFlush = this.writeBatches(Array.from(this.flushing.values())).finally(() => {
+      this.flushing = new Map();
+      this.currentFlush = null;
+    });
+    return this.currentFlush;
+  }
+
+  private async writeBatches(entries: BufferedVideoProgress[]): Promise<void> {
+    const started = Date.now();
+
+    for (let i = 0; i < entries.length; i += FLUSH_BATCH_SIZE) {
+      const batch = entries.slice(i, i + FLUSH_BATCH_SIZE);
+      try {
+        await this.mergeRows(batch);
+        this.rowsFlushed += batch.length;
+      } catch (error) {
+        this.flushFailures++;
+        if (!isRowDataError(error)) {
+          logger.error(`❌ [VideoProgressBuffer] MERGE of ${batch.length} row(s) failed - re-buffering`, error);
+          this.requeue(batch);
+        } else if (batch.length === 1) {
+          this.drop(batch[0], error);
+        } else {
+          logger.warn(`⚠️ [VideoProgressBuffer] MERGE of ${batch.length} row(s) rejected a row - retrying row by row`, error);
+          await this.writeRowByRow(batch);
+        }
+      }
+    }
+
+    const elapsed = Date.now() - started;
+    this.flushes++;
+    this.lastFlushMs = elapsed;
+    this.totalFlushMs += elapsed;
+    this.maxFlushMs = Math.max(this.maxFlushMs, elapsed);
+  }
+
+  /**
+   * Write a rejected batch one row at a time: rows the database rejects are dropped,
+   * rows that fail transiently are put back
+   */
+  private async writeRowByRow(batch: BufferedVideoProgress[]): Promise<void> {
+    for (const entry of batch) {
+      try {
+        await this.mergeRows([entry]);
+        this.rowsFlushed++;
+      } catch (error) {
+        if (isRowDataError(error)) {
+          this.drop(entry, error);
+        } else {
+          this.requeue([entry]);
+        }
+      }
+    }
+  }
+
+  private drop(entry: BufferedVideoProgress, error: unknown): void {
+    this.droppedEntries++;
+    logger.error(
+      `❌ [VideoProgressBuffer] Dropping progress for user ${entry.userId}, item ${entry.contentItemId} - rejected by the database`,
+      error
+    );
+  }
+
+  /**
+   * Put a failed batch back, merged with anything recorded since; beyond the cap the entries are dropped
+   */
+  private requeue(batch: BufferedVideoProgress[]): void {
+    for (const entry of batch) {
+      const key = VideoProgressBuffer.key(entry.userId, entry.contentItemId);
+      const newer = this.pending.get(key);
+      if (newer) {
+        this.pending.set(key, this.coalesce(entry, newer));
+      } else if (this.pending.size < MAX_BUFFERED_ENTRIES) {
+        this.pending.set(key, entry);
+      } else {
+        this.droppedEntries++;
+      }
+    }
+  }
+
+  private coalesce(older: BufferedVideoProgress, newer: BufferedVideoProgress): BufferedVideoProgress {
+    return {
+      ...newer,
+      watchedDuration: Math.max(older.watchedDuration, newer.watchedDuration),
+      isCompleted: older.isCompleted || newer.isCompleted,
+      completedAt: older.completedAt || newer.completedAt
+    };
+  }
+
+  /**
+   * One MERGE for the whole batch; rows travel as a single JSON parameter
+   */
+  private async mergeRows(batch: BufferedVideoProgress[]): Promise<void> {
+    const payload = batch.map(entry => ({
+      userId: entry.userId,
+      contentItemId: entry.contentItemId,
+      // INT columns: players report fractional seconds
+      lastPosition: Math.floor(entry.lastPosition),
+      watchedDuration: Math.floor(entry.watchedDuration),
+      completionPercentage: entry.completionPercentage,
+      isCompleted: entry.isCompleted ? 1 : 0,
+      playbackSpeed: entry.playbackSpeed,
+      lastWatchedAt: entry.lastWatchedAt.toISOString(),
+      completedAt: entry.completedAt ? entry.completedAt.toISOString() : null
+    }));
+
+    const request = await DatabaseService.getInstance().getRequest();
+    await request
+      .input('Rows', sql.NVarChar(sql.MAX), JSON.stringify(payload))
+      .query(`
+        MERGE dbo.VideoProgress WITH (HOLDLOCK) AS target
+        USING (
+          SELECT UserId, ContentItemId, LastPosition, WatchedDuration, CompletionPercentage,
+                 IsCompleted, PlaybackSpeed,
+                 CAST(LastWatchedAt AS DATETIME2) AS LastWatchedAt,
+                 CAST(CompletedAt AS DATETIME2) AS CompletedAt
+          FROM OPENJSON(@Rows) WITH (
+            UserId UNIQUEIDENTIFIER '$.userId',
+            ContentItemId NVARCHAR(100) '$.contentItemId',
+            LastPosition INT '$.lastPosition',
+            WatchedDuration INT '$.watchedDuration',
+            CompletionPercentage DECIMAL(5,2) '$.completionPercentage',
+            IsCompleted BIT '$.isCompleted',
+            PlaybackSpeed DECIMAL(3,2) '$.playbackSpeed',
+            LastWatchedAt DATETIMEOFFSET '$.lastWatchedAt',
+            CompletedAt DATETIMEOFFSET '$.completedAt'
+          )
+        ) AS source
+        ON target.UserId = source.UserId AND target.ContentItemId = source.ContentItemId
+        WHEN MATCHED THEN
+          UPDATE SET
+            WatchedDuration = CASE WHEN source.WatchedDuration > target.WatchedDuration THEN source.WatchedDuration ELSE target.WatchedDuration END,
+            LastPosition = source.LastPosition,
+            CompletionPercentage = source.CompletionPercentage,
+            IsCompleted = CASE WHEN target.IsCompleted = 1 THEN 1 ELSE source.IsCompleted END,
+            PlaybackSpeed = source.PlaybackSpeed,
+            LastWatchedAt = source.LastWatchedAt,
+            CompletedAt = CASE WHEN source.IsCompleted = 1 AND target.CompletedAt IS NULL THEN source.CompletedAt ELSE target.CompletedAt END,
+            UpdatedAt = GETUTCDATE()
+        WHEN NOT MATCHED THEN
+          INSERT (Id, UserId, ContentItemId, WatchedDuration, LastPosition, CompletionPercentage,
+                  IsCompleted, PlaybackSpeed, LastWatchedAt, CompletedAt, CreatedAt, UpdatedAt)
+          VALUES (NEWID(), source.UserId, source.ContentItemId, source.WatchedDuration, source.LastPosition,
+                  source.CompletionPercentage, source.IsCompleted, source.PlaybackSpeed,
+                  source.LastWatchedAt, source.CompletedAt, GETUTCDATE(), GETUTCDATE());
+      `);
+  }
+
+  getStats(): VideoProgressBufferStats {
+    return {
+      bufferedEntries: this.pending.size,
+      maxEntries: MAX_BUFFERED_ENTRIES,
+      flushIntervalMs: FLUSH_INTERVAL_MS,
+      heartbeatsReceived: this.heartbeatsReceived,
+      heartbeatsCoalesced: this.heartbeatsCoalesced,
+      flushes: this.flushes,
+      rowsFlushed: this.rowsFlushed,
+      flushFailures: this.flushFailures,
+      droppedEntries: this.droppedEntries,
+      lastFlushMs: this.lastFlushMs,
+      avgFlushMs: this.flushes > 0 ? Math.round(this.totalFlushMs / this.flushes) : 0,
+      maxFlushMs: this.maxFlushMs
+    };
+  }
+}
@@ -2,8 +2,11 @@ import { Server } from 'socket.io';
 import jwt from 'jsonwebtoken';
 import { DatabaseService } from './services/DatabaseService';
 import { LiveSessionService } from './services/LiveSessionService';
-import { PresenceService } from './services/PresenceService';
+import { PresenceService, isPresenceStatus } from './services/PresenceService';
 import { ChatService } from './services/ChatService';
+import { CourseEventService } from './services/CourseEventService';
+import { WorkQueue } from './utils/WorkQueue';
+import { LatencyStats } from './utils/LatencyStats';
 import { logger } from './utils/logger';
 import { 
   JwtPayload, 
@@ -20,10 +23,23 @@ import {
 
 const db = DatabaseService.getInstance();
 
+// Connection admission: at most SOCKET_ADMISSION_CONCURRENCY handshakes do their setup work
+// (course-room lookup) at once; the rest wait in FIFO order, and beyond SOCKET_ADMISSION_QUEUE_MAX
+// the handshake is refused with 'Server busy' so the client retries after a backoff.
+const admissionQueue = new WorkQueue(
+  'socketAdmissions',
+  parseInt(process.env.SOCKET_ADMISSION_CONCURRENCY || '50', 10),
+  parseInt(process.env.SOCKET_ADMISSION_QUEUE_MAX || '2000', 10)
+);
+
+// Handshake start → rooms resolved (includes time spent waiting for admission)
+const handshakeLatency = new LatencyStats('socketHandshake');
+
 interface AuthenticatedSocket {
   id: string;
   userId?: string;
   userEmail?: string;
+  data: { courseRooms?: string[] };
   join: (room: string) => void;
   leave: (room: string) => void;
   to: (room: string) => any;
@@ -49,6 +65,25 @@ export const setupSocketHandlers = (io: Server) => {
     }
   });
 
+  // Admission throttling + course-room lookup (membership cache, one query on a miss)
+  io.use((socket: any, next) => {
+    const started = Date.now();
+    const admitted = admissionQueue.enqueue(async () => {
+      try {
+        socket.data.courseRooms = await CourseEventService.getInstance().getUserCourseRooms(socket.userId);
+      } catch (err) {
+        logger.error('Error loading course rooms:', err);
+        socket.data.courseRooms = [];
+      }
+      handshakeLatency.record(Date.now() - started);
+      next();
+    });
+
+    if (!admitted) {
+      next(new Error('Server busy'));
+    }
+  });
+
   io.on('connection', (socket: AuthenticatedSocket) => {
     logger.info('🟢 [Socket.IO] ===== USER CONNECTED =====', {
       socketId: socket.id,
@@ -70,37 +105,10 @@ export const setupSocketHandlers = (io: Server) => {
         logger.error('Error setting user online:', err);
       });
 
-      // Join user to all their enrolled course rooms
-      db.query<{ CourseId: string }>(
-        `SELECT DISTINCT CourseId FROM Enrollments WHERE UserId = @userId AND Status IN ('active', 'completed')`,
-        { userId: socket.userId }
-      ).then(enrollments => {
-        enrollments.forEach(e => {
-          if (e.CourseId) {
-            socket.join(`course-${e.CourseId}`);
-          }
-        });
-        logger.info(`User ${socket.userId} joined ${enrollments.length} course rooms`);
-      }).catch(err => {
-        logger.error('Error joining course rooms:', err);
-      });
-
-      // Join instructor to all their course rooms
-      db.query<{ Id: string }>(
-        `SELECT DISTINCT Id FROM Courses WHERE InstructorId = @instructorId`,
-        { instructorId: socket.userId }
-      ).then(courses => {
-        courses.forEach(c => {
-          if (c.Id) {
-            socket.join(`course-${c.Id}`);
-          }
-        });
-        if (courses.length > 0) {
-          logger.info(`Instructor ${socket.userId} joined ${courses.length} course rooms`);
-        }
-      }).catch(err => {
-        logger.error('Error joining instructor course rooms:', err);
-      });
+      // Join user to all their enrolled and taught course rooms (resolved during the handshake)
+      const courseRooms = socket.data.courseRooms || [];
+      courseRooms.forEach(room => socket.join(room));
+      logger.info(`User ${socket.userId} joined ${courseRooms.length} course rooms`);
     }
 
     socket.on('disconnect', async () => {
@@ -114,15 +122,7 @@ export const setupSocketHandlers = (io: Server) => {
       // Just update LastSeenAt to current time
       if (socket.userId) {
         try {
-          const existing = await PresenceService.getUserPresence(socket.userId);
-          if (existing) {
-            await PresenceService.updatePresence({
-              userId: socket.userId,
-              status: existing.Status, // Keep existing status
-              activity: existing.Activity || undefined
-            });
-            logger.info('[PRESENCE] Socket disconnected, preserving status:', { status: existing.Status, userId: socket.userId });
-          }
+          await PresenceService.updateLastSeen(socket.userId);
         } catch (err) {
           logger.error('Error updating LastSeenAt on disconnect:', err);
         }
@@ -321,6 +321,11 @@ export const setupSocketHandlers = (io: Server) => {
           return;
         }
 
+        if (!isPresenceStatus(data?.status)) {
+          socket.emit('error', { message: 'Invalid presence status' });
+          return;
+        }
+
         await PresenceService.updatePresence({
           userId: socket.userId,
           status: data.status,
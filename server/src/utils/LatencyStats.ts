@@ -0,0 +1,71 @@
+/**
+ * LatencyStats — rolling latency summary for one operation (e.g. socket handshakes)
+ *
+ * Keeps count/avg/max over the process lifetime and percentiles over the last
+ * `window` samples (a ring buffer, so memory is fixed). Like the caches and work
+ * queues, every instance registers itself for admin system health.
+ */
+
+export interface LatencySummary {
+  name: string;
+  count: number;
+  lastMs: number;
+  avgMs: number;
+  p50Ms: number;
+  p95Ms: number;
+  maxMs: number;
+}
+
+export class LatencyStats {
+  private static registry: LatencyStats[] = [];
+
+  private samples: number[] = [];
+  private next = 0;
+  private count = 0;
+  private totalMs = 0;
+  private lastMs = 0;
+  private maxMs = 0;
+
+  constructor(
+    private readonly name: string,
+    private readonly window: number = 500
+  ) {
+    LatencyStats.registry.push(this);
+  }
+
+  /**
+   * Summaries of every tracker created in this process (for admin system health)
+   */
+  static getAllStats(): LatencySummary[] {
+    return LatencyStats.registry.map(stats => stats.getStats());
+  }
+
+  record(ms: number): void {
+    if (this.samples.length < this.window) {
+      this.samples.push(ms);
+    } else {
+      this.samples[this.next] = ms;
+      this.next = (this.next + 1) % this.window;
+    }
+    this.count++;
+    this.totalMs += ms;
+    this.lastMs = ms;
+    this.maxMs = Math.max(this.maxMs, ms);
+  }
+
+  getStats(): LatencySummary {
+    const sorted = [...this.samples].sort((a, b) => a - b);
+    const percentile = (p: number) =>
+      sorted.length > 0 ? sorted[Math.min(sorted.length - 1, Math.floor(sorted.length * p))] : 0;
+
+    return {
+      name: this.name,
+      count: this.count,
+      lastMs: this.lastMs,
+      avgMs: this.count > 0 ? Math.round(this.totalMs / this.count) : 0,
+      p50Ms: percentile(0.5),
+      p95Ms: percentile(0.95),
+      maxMs: this.maxMs
+    };
+  }
+}
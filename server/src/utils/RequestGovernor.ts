@@ -0,0 +1,162 @@
+/**
+ * RequestGovernor — concurrency cap plus token-rate budget for calls to a rate-limited API
+ *
+ * run() waits (FIFO) until fewer than `maxConcurrent` calls are in flight and the token
+ * bucket holds the call's estimated tokens. The bucket holds at most one minute of budget
+ * and refills continuously at `tokensPerMinute` (0 disables the rate limit). Callers that
+ * learn the real usage afterwards pass it to reconcile(), so estimates do not drift.
+ * When `maxWaiting` calls are already queued, run() rejects immediately instead of
+ * queueing more work than can be served. Like the caches and work queues, every instance
+ * registers itself for admin system health.
+ */
+
+export interface RequestGovernorStats {
+  name: string;
+  maxConcurrent: number;
+  tokensPerMinute: number;
+  running: number;
+  waiting: number;
+  maxWaiting: number;
+  tokensAvailable: number;
+  admitted: number;
+  rejected: number;
+  tokensUsed: number;
+  avgWaitMs: number;
+}
+
+interface Waiter {
+  tokens: number;
+  enqueuedAt: number;
+  resolve: () => void;
+}
+
+export class RequestGovernor {
+  private static registry: RequestGovernor[] = [];
+
+  private waiters: Waiter[] = [];
+  private running = 0;
+  private available: number;
+  private lastRefill = Date.now();
+  private retryTimer: NodeJS.Timeout | null = null;
+
+  private admitted = 0;
+  private rejected = 0;
+  private tokensUsed = 0;
+  private totalWaitMs = 0;
+
+  constructor(
+    private readonly name: string,
+    private readonly maxConcurrent: number,
+    private readonly tokensPerMinute: number,
+    private readonly maxWaiting: number
+  ) {
+    this.available = tokensPerMinute;
+    RequestGovernor.registry.push(this);
+  }
+
+  /**
+   * Stats of every governor created in this process (for admin system health)
+   */
+  static getAllStats(): RequestGovernorStats[] {
+    return RequestGovernor.registry.map(governor => governor.getStats());
+  }
+
+  /**
+   * Run `job` once a concurrency slot and `estimatedTokens` of budget are free
+   */
+  async run<T>(estimatedTokens: number, job: () => Promise<T>): Promise<T> {
+    // A call larger than the whole bucket would wait forever; let it drain the bucket instead
+    const tokens = this.tokensPerMinute > 0 ? Math.min(Math.max(0, estimatedTokens), this.tokensPerMinute) : 0;
+    await this.acquire(tokens);
+    try {
+      return await job();
+    } finally {
+      this.running--;
+      this.pump();
+    }
+  }
+
+  /**
+   * Correct the budget once the actual token usage of a call is known
+   */
+  reconcile(estimatedTokens: number, actualTokens: number): void {
+    this.tokensUsed += actualTokens;
+    if (this.tokensPerMinute > 0) {
+      this.refill();
+      this.available = Math.min(this.tokensPerMinute, this.available + estimatedTokens - actualTokens);
+      this.pump();
+    }
+  }
+
+  private acquire(tokens: number): Promise<void> {
+    if (this.waiters.length >= this.maxWaiting) {
+      this.rejected++;
+      return Promise.reject(new Error(`RequestGovernor "${this.name}" is saturated (${this.maxWaiting} calls waiting)`));
+    }
+    return new Promise(resolve => {
+      this.waiters.push({ tokens, enqueuedAt: Date.now(), resolve });
+      this.pump();
+    });
+  }
+
+  private refill(): void {
+    const now = Date.now();
+    if (this.tokensPerMinute > 0) {
+      this.available = Math.min(
+        this.tokensPerMinute,
+        this.available + ((now - this.lastRefill) * this.tokensPerMinute) / 60000
+      );
+    }
+    this.lastRefill = now;
+  }
+
+  private pump(): void {
+    this.refill();
+    while (this.waiters.length > 0 && this.running < this.maxConcurrent) {
+      const next = this.waiters[0];
+      if (this.tokensPerMinute > 0 && this.available < next.tokens) {
+        this.scheduleRetry(next.tokens - this.available);
+        return;
+      }
+      this.waiters.shift();
+      if (this.tokensPerMinute > 0) {
+        this.available -= next.tokens;
+      }
+      this.running++;
+      this.admitted++;
+      this.totalWaitMs += Date.now() - next.enqueuedAt;
+      next.resolve();
+    }
+  }
+
+  /**
+   * Wake up when the bucket will have refilled enough for the head of the queue
+   */
+  private scheduleRetry(deficit: number): void {
+    if (this.retryTimer) {
+      return;
+    }
+    const delayMs = Math.max(10, Math.ceil((deficit * 60000) / this.tokensPerMinute));
+    this.retryTimer = setTimeout(() => {
+      this.retryTimer = null;
+      this.pump();
+    }, delayMs);
+  }
+
+  getStats(): RequestGovernorStats {
+    this.refill();
+    return {
+      name: this.name,
+      maxConcurrent: this.maxConcurrent,
+      tokensPerMinute: this.tokensPerMinute,
+      running: this.running,
+      waiting: this.waiters.length,
+      maxWaiting: this.maxWaiting,
+      tokensAvailable: Math.floor(this.available),
+      admitted: this.admitted,
+      rejected: this.rejected,
+      tokensUsed: this.tokensUsed,
+      avgWaitMs: this.admitted > 0 ? Math.round(this.totalWaitMs / this.admitted) : 0
+    };
+  }
+}
@@ -0,0 +1,51 @@
+/**
+ * RingBuffer — fixed-capacity FIFO that overwrites its oldest item when full
+ *
+ * Pushes are O(1) and memory never grows past `capacity` items. Used for "latest N"
+ * views such as a chat room's recent messages.
+ */
+
+export class RingBuffer<T> {
+  private items: Array<T | undefined>;
+  private start = 0;
+  private count = 0;
+  private overwritten = false;
+
+  constructor(private readonly capacity: number) {
+    this.items = new Array(capacity);
+  }
+
+  push(item: T): void {
+    if (this.count < this.capacity) {
+      this.items[(this.start + this.count) % this.capacity] = item;
+      this.count++;
+      return;
+    }
+    this.items[this.start] = item;
+    this.start = (this.start + 1) % this.capacity;
+    this.overwritten = true;
+  }
+
+  get size(): number {
+    return this.count;
+  }
+
+  /**
+   * Whether an item has ever been dropped to make room for a newer one
+   */
+  get hasDropped(): boolean {
+    return this.overwritten;
+  }
+
+  /**
+   * The last `n` items (all by default), oldest first
+   */
+  last(n: number = this.count): T[] {
+    const take = Math.min(n, this.count);
+    const result: T[] = [];
+    for (let i = this.count - take; i < this.count; i++) {
+      result.push(this.items[(this.start + i) % this.capacity] as T);
+    }
+    return result;
+  }
+}
@@ -0,0 +1,109 @@
+/**
+ * TtlLruCache — bounded in-process cache with per-entry TTL and LRU eviction
+ *
+ * Map insertion order doubles as recency order: get() re-inserts a hit, so the
+ * first key is always the least recently used. Caches are per process; when the
+ * server runs on several nodes, the TTL bounds how long another node's write can
+ * go unseen.
+ */
+
+export interface CacheStats {
+  name: string;
+  size: number;
+  maxEntries: number;
+  ttlMs: number;
+  hits: number;
+  misses: number;
+  hitRate: number;
+  evictions: number;
+  expirations: number;
+  invalidations: number;
+}
+
+interface CacheEntry<V> {
+  value: V;
+  expiresAt: number;
+}
+
+export class TtlLruCache<K, V> {
+  private static registry: Array<{ getStats(): CacheStats }> = [];
+
+  private entries = new Map<K, CacheEntry<V>>();
+  private hits = 0;
+  private misses = 0;
+  private evictions = 0;
+  private expirations = 0;
+  private invalidations = 0;
+
+  constructor(
+    private readonly name: string,
+    private readonly maxEntries: number,
+    private readonly ttlMs: number
+  ) {
+    TtlLruCache.registry.push(this);
+  }
+
+  /**
+   * Stats of every cache created in this process (for admin system health)
+   */
+  static getAllStats(): CacheStats[] {
+    return TtlLruCache.registry.map(cache => cache.getStats());
+  }
+
+  get(key: K): V | undefined {
+    const entry = this.entries.get(key);
+    if (!entry) {
+      this.misses++;
+      return undefined;
+    }
+    this.entries.delete(key);
+    if (entry.expiresAt <= Date.now()) {
+      this.expirations++;
+      this.misses++;
+      return undefined;
+    }
+    this.entries.set(key, entry);
+    this.hits++;
+    return entry.value;
+  }
+
+  set(key: K, value: V, ttlMs: number = this.ttlMs): void {
+    this.entries.delete(key);
+    this.entries.set(key, { value, expiresAt: Date.now() + ttlMs });
+    while (this.entries.size > this.maxEntries) {
+      const oldest = this.entries.keys().next().value as K;
+      this.entries.delete(oldest);
+      this.evictions++;
+    }
+  }
+
+  /**
+   * Drop one entry (call after the row it mirrors changes)
+   */
+  delete(key: K): void {
+    if (this.entries.delete(key)) {
+      this.invalidations++;
+    }
+  }
+
+  clear(): void {
+    this.invalidations += this.entries.size;
+    this.entries.clear();
+  }
+
+  getStats(): CacheStats {
+    const lookups = this.hits + this.misses;
+    return {
+      name: this.name,
+      size: this.entries.size,
+      maxEntries: this.maxEntries,
+      ttlMs: this.ttlMs,
+      hits: this.hits,
+      misses: this.misses,
+      hitRate: lookups > 0 ? Math.round((this.hits / lookups) * 10000) / 10000 : 0,
+      evictions: this.evictions,
+      expirations: this.expirations,
+      invalidations: this.invalidations
+    };
+  }
+}
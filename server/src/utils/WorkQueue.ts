@@ -0,0 +1,92 @@
+import { logger } from './logger';
+
+/**
+ * WorkQueue — in-process FIFO of async jobs run with bounded concurrency
+ *
+ * Used for side effects that must not hold up the request or job that produced
+ * them (e.g. notification emails). Jobs are not persisted: anything still queued
+ * when the process exits is lost, so only enqueue work that is safe to drop.
+ * When the queue is full, new jobs are rejected and counted as dropped.
+ */
+
+export interface WorkQueueStats {
+  name: string;
+  pending: number;
+  running: number;
+  concurrency: number;
+  maxPending: number;
+  completed: number;
+  failed: number;
+  dropped: number;
+}
+
+export class WorkQueue {
+  private static registry: WorkQueue[] = [];
+
+  private jobs: Array<() => Promise<void>> = [];
+  private running = 0;
+  private completed = 0;
+  private failed = 0;
+  private dropped = 0;
+
+  constructor(
+    private readonly name: string,
+    private readonly concurrency: number,
+    private readonly maxPending: number
+  ) {
+    WorkQueue.registry.push(this);
+  }
+
+  /**
+   * Stats of every queue created in this process (for admin system health)
+   */
+  static getAllStats(): WorkQueueStats[] {
+    return WorkQueue.registry.map(queue => queue.getStats());
+  }
+
+  /**
+   * Queue a job; returns false (and drops it) if the queue is full
+   */
+  enqueue(job: () => Promise<void>): boolean {
+    if (this.jobs.length >= this.maxPending) {
+      this.dropped++;
+      logger.warn(`⚠️ WorkQueue "${this.name}" full (${this.maxPending} pending) - job dropped`);
+      return false;
+    }
+    this.jobs.push(job);
+    this.drain();
+    return true;
+  }
+
+  private drain(): void {
+    while (this.running < this.concurrency && this.jobs.length > 0) {
+      const job = this.jobs.shift()!;
+      this.running++;
+      job()
+        .then(() => {
+          this.completed++;
+        })
+        .catch(error => {
+          this.failed++;
+          logger.error(`❌ WorkQueue "${this.name}" job failed:`, error);
+        })
+        .finally(() => {
+          this.running--;
+          this.drain();
+        });
+    }
+  }
+
+  getStats(): WorkQueueStats {
+    return {
+      name: this.name,
+      pending: this.jobs.length,
+      running: this.running,
+      concurrency: this.concurrency,
+      maxPending: this.maxPending,
+      completed: this.completed,
+      failed: this.failed,
+      dropped: this.dropped
+    };
+  }
+}
@@ -0,0 +1,122 @@
+import { TtlLruCache } from './TtlLruCache';
+
+/**
+ * Keyset (cursor) pagination helpers shared by the catalog and admin listings
+ *
+ * OFFSET n ROWS makes SQL Server read and discard n rows, so deep pages get
+ * linearly slower. A keyset page instead seeks past the last row of the
+ * previous page: WHERE (sort, Id) < (@cursorValue, @cursorId). The cursor is an
+ * opaque base64url token holding that sort value, the row Id and the sort it
+ * was issued for; a cursor from a different sort is ignored (the listing starts
+ * over), so changing the sort never mixes two orderings.
+ *
+ * Sort values are serialized by SQL Server itself (style 121 for dates keeps
+ * all DATETIME2 digits) and bound back as NVARCHAR, letting the server convert
+ * them to the column type — the JS Date round-trip would drop sub-millisecond
+ * precision and skip rows.
+ *
+ * Totals are a separate COUNT(*) per filter set; they are cached briefly so
+ * paging through a listing does not recount it on every request.
+ */
+
+export type SortDirection = 'ASC' | 'DESC';
+
+export interface KeysetSort {
+  /** ORDER BY expression; must be non-null (wrap nullable columns in ISNULL) */
+  expr: string;
+  type: 'date' | 'value';
+}
+
+export interface DecodedCursor {
+  /** Sort key the cursor was issued for (e.g. 'created:DESC') */
+  s: string;
+  v: string | number;
+  id: string;
+}
+
+export interface KeysetPage<T> {
+  rows: T[];
+  hasNext: boolean;
+  nextCursor: string | null;
+}
+
+const TOTAL_CACHE_TTL_MS = parseInt(process.env.PAGINATION_TOTAL_CACHE_TTL_MS || '30000', 10);
+
+const totalCache = new TtlLruCache<string, number>('paginationTotals', 1000, TOTAL_CACHE_TTL_MS);
+
+export function encodeCursor(sortKey: string, value: string | number, id: string): string {
+  return Buffer.from(JSON.stringify({ s: sortKey, v: value, id: String(id) })).toString('base64url');
+}
+
+/**
+ * Parse a cursor token; returns null if it is missing or malformed
+ */
+export function decodeCursor(token: unknown): DecodedCursor | null {
+  if (typeof token !== 'string' || token.length === 0 || token.length > 512) {
+    return null;
+  }
+  try {
+    const parsed = JSON.parse(Buffer.from(token, 'base64url').toString('utf8'));
+    if (
+      parsed &&
+      typeof parsed.s === 'string' &&
+      (typeof parsed.v === 'string' || typeof parsed.v === 'number') &&
+      typeof parsed.id === 'string'
+    ) {
+      return parsed as DecodedCursor;
+    }
+  } catch {
+    // fall through
+  }
+  return null;
+}
+
+/**
+ * SELECT expression for the sort value to put in the next cursor (aliased cursorKey)
+ */
+export function cursorKeyExpr(sort: KeysetSort): string {
+  return sort.type === 'date' ? `CONVERT(NVARCHAR(40), ${sort.expr}, 121)` : sort.expr;
+}
+
+/**
+ * WHERE fragment for rows after the cursor in ORDER BY expr dir, idExpr dir.
+ * Binds @cursorValue (NVARCHAR) and @cursorId.
+ */
+export function keysetCondition(sort: KeysetSort, idExpr: string, dir: SortDirection): string {
+  const op = dir === 'DESC' ? '<' : '>';
+  return `(${sort.expr} ${op} @cursorValue OR (${sort.expr} = @cursorValue AND ${idExpr} ${op} @cursorId))`;
+}
+
+/**
+ * Trim a result fetched with limit + 1 rows to the page and build the next cursor
+ * from its last row. Removes the cursorKey column from the rows.
+ */
+export function takeKeysetPage<T extends Record<string, any>>(
+  rows: T[],
+  limit: number,
+  sortKey: string,
+  idField: string
+): KeysetPage<T> {
+  const hasNext = rows.length > limit;
+  const pageRows = hasNext ? rows.slice(0, limit) : rows;
+  const last = pageRows[pageRows.length - 1];
+  const nextCursor = hasNext && last ? encodeCursor(sortKey, last.cursorKey, last[idField]) : null;
+  for (const row of pageRows) {
+    delete row.cursorKey;
+  }
+  return { rows: pageRows, hasNext, nextCursor };
+}
+
+/**
+ * Total row count for a filter set, served from a short-TTL cache.
+ * The key must identify the listing and every filter value that shaped the WHERE clause.
+ */
+export async function getCachedTotal(key: string, count: () => Promise<number>): Promise<number> {
+  const cached = totalCache.get(key);
+  if (cached !== undefined) {
+    return cached;
+  }
+  const total = await count();
+  totalCache.set(key, total);
+  return total;
+}
@@ -0,0 +1,27 @@
+/**
+ * SQL Server error classification for batched writers
+ *
+ * A batch that fails because of the values in one of its rows (bad conversion,
+ * overflow, NULL, constraint) fails again every time it is retried, so write-behind
+ * buffers must not put those rows back. Connection and timeout errors are transient
+ * and are worth retrying with the next flush.
+ */
+
+const ROW_DATA_ERROR_NUMBERS = new Set<number>([
+  220, 232,         // Arithmetic overflow for smallint/tinyint/int
+  241, 242,         // Date/time conversion failed or out of range
+  245, 8114, 8169,  // Conversion failed (varchar, numeric, uniqueidentifier)
+  515,              // NULL into a NOT NULL column
+  547,              // CHECK or FOREIGN KEY constraint
+  2628, 8152,       // String or binary data would be truncated
+  8115              // Arithmetic overflow converting to numeric
+]);
+
+/**
+ * Whether an mssql error was caused by the data of a row (retrying the same row cannot succeed)
+ */
+export function isRowDataError(error: unknown): boolean {
+  const err = error as { number?: unknown; originalError?: { info?: { number?: unknown } } } | null;
+  const number = err?.number ?? err?.originalError?.info?.number;
+  return typeof number === 'number' && ROW_DATA_ERROR_NUMBERS.has(number);
+}
@@ -10,11 +10,18 @@ Pytest configuration and shared fixtures for E2E testing
 See TESTING_API_INTEGRATION.md for comprehensive testing guide.
 """
 import pytest
-from playwright.sync_api import Browser, BrowserContext, Page
-from typing import Generator
+from playwright.sync_api import Browser, BrowserContext, Page, Response, WebSocket, expect
+from playwright.sync_api import Error as PlaywrightError
+from typing import Dict, Generator, List, Optional, Tuple
+import base64
+import hashlib
+import json
 import os
 import requests
 import re
+import time
+from requests.adapters import HTTPAdapter
+from urllib.parse import urlsplit
 from dotenv import load_dotenv
 
 # Load test environment variables
@@ -25,6 +32,444 @@ BASE_URL = os.getenv("BASE_URL", "http://localhost:5173")
 API_BASE_URL = os.getenv("API_BASE_URL", "http://localhost:3001")
 HEADLESS = os.getenv("HEADLESS", "true").lower() == "true"
 
+# Refresh pooled tokens this many seconds before their JWT "exp" claim
+AUTH_REFRESH_MARGIN_SECONDS = int(os.getenv("AUTH_REFRESH_MARGIN_SECONDS", "300"))
+# Keep-alive connections kept open per pooled session
+API_POOL_MAXSIZE = int(os.getenv("API_POOL_MAXSIZE", "10"))
+# How browser storage states are produced: "api" (login via REST) or "ui" (login form)
+AUTH_STATE_MODE = os.getenv("AUTH_STATE_MODE", "api").lower()
+# localStorage key used by the client's persisted auth store (client/src/stores/authStore.ts)
+AUTH_STORAGE_KEY = "auth-storage"
+# Versioned API timing baseline used by --benchmark (commit it after --benchmark-save)
+BENCHMARK_BASELINE_PATH = os.getenv("BENCHMARK_BASELINE_PATH", "tests/reports/benchmarks/baseline.json")
+# Allowed slowdown of the median before a benchmark counts as regressed (0.25 = 25%)
+BENCHMARK_TOLERANCE = float(os.getenv("BENCHMARK_TOLERANCE", "0.25"))
+# Timed requests per benchmark, after a few untimed warm-up requests
+BENCHMARK_ROUNDS = int(os.getenv("BENCHMARK_ROUNDS", "20"))
+BENCHMARK_WARMUP = 3
+BENCHMARK_SCHEMA_VERSION = 1
+
+
+# Roles that get their own account per pytest-xdist worker (admin stays shared)
+PER_WORKER_ROLES = ("student", "instructor")
+
+
+def get_worker_id() -> str:
+    """pytest-xdist worker id ("gw0", "gw1", ...) or "master" when not running in parallel"""
+    return os.getenv("PYTEST_XDIST_WORKER", "master")
+
+
+def _worker_email(email: str, worker_id: str) -> str:
+    """Plus-address an email per worker: a+b@x.com -> a+b-gw1@x.com, a@x.com -> a+gw1@x.com"""
+    local, _, domain = email.partition('@')
+    separator = '-' if '+' in local else '+'
+    return f"{local}{separator}{worker_id}@{domain}"
+
+
+def get_role_credentials(role: str, seeded: bool = False) -> dict:
+    """
+    Credentials for a test role ("admin", "student" or "instructor")
+    Values come from tests/.env.test, falling back to the documented defaults
+
+    Under pytest-xdist, student and instructor resolve to a per-worker account
+    ({ROLE}_EMAIL_GW1 if set, otherwise a plus-addressed variant of {ROLE}_EMAIL)
+    so workers never share notifications or preferences. Worker accounts start
+    empty; seeded=True returns the seeded {ROLE}_EMAIL account (enrollments,
+    courses, students) that tests marked seeded run as.
+    """
+    defaults = {
+        "admin": ("admin@example.com", "admin123"),
+        "student": ("student@example.com", "student123"),
+        "instructor": ("instructor@example.com", "instructor123"),
+    }
+    if role not in defaults:
+        raise ValueError(f"Unknown test role: {role}")
+    email, password = defaults[role]
+    prefix = role.upper()
+    credentials = {
+        "email": os.getenv(f"{prefix}_EMAIL", email),
+        "password": os.getenv(f"{prefix}_PASSWORD", password),
+    }
+
+    worker_id = get_worker_id()
+    if worker_id != "master" and role in PER_WORKER_ROLES and not seeded:
+        credentials["email"] = os.getenv(
+            f"{prefix}_EMAIL_{worker_id.upper()}",
+            _worker_email(credentials["email"], worker_id)
+        )
+        credentials["worker_id"] = worker_id
+
+    return credentials
+
+
+def _account_key(role: str, seeded: bool) -> str:
+    """Pool/storage key of a role's account; seeded only differs from the role under xdist"""
+    if seeded and get_worker_id() != "master" and role in PER_WORKER_ROLES:
+        return f"{role} (seeded)"
+    return role
+
+
+def uses_seeded_accounts(request) -> bool:
+    """Whether the requesting test is marked seeded and runs as the seeded accounts"""
+    return request.node.get_closest_marker("seeded") is not None
+
+
+def _decode_token_expiry(token: str) -> Optional[float]:
+    """
+    Read the "exp" claim (epoch seconds) from a JWT without verifying it
+    Returns None if the token cannot be decoded
+    """
+    try:
+        payload = token.split('.')[1]
+        payload += '=' * (-len(payload) % 4)
+        return float(json.loads(base64.urlsafe_b64decode(payload)).get('exp'))
+    except (IndexError, ValueError, TypeError):
+        return None
+
+
+class AuthSessionPool:
+    """
+    Session-scoped pool of pre-authenticated API sessions, keyed by role
+    (and, under xdist, by whether the seeded or the worker account is used)
+
+    Each role logs in through POST /api/auth/login once per test session.
+    Later requests for the same role reuse the same requests.Session (and its
+    keep-alive connections). Tokens are refreshed lazily through
+    POST /api/auth/refresh shortly before the JWT expires, falling back to a
+    full login if the refresh is rejected.
+    """
+
+    def __init__(self, api_base_url: str, refresh_margin: int = AUTH_REFRESH_MARGIN_SECONDS):
+        self.api_base_url = api_base_url
+        self.refresh_margin = refresh_margin
+        self._entries: Dict[str, dict] = {}
+        self.stats: Dict[str, Dict[str, int]] = {}
+
+    def get(self, role: str, seeded: bool = False) -> Tuple[requests.Session, str, str]:
+        """
+        Return (session, auth_token, user_id) for the role, logging in or
+        refreshing only when needed
+        """
+        key = _account_key(role, seeded)
+        stats = self.stats.setdefault(key, {"logins": 0, "refreshes": 0, "reuses": 0})
+        entry = self._entries.get(key)
+
+        if entry is None:
+            entry = self._login(role, seeded)
+            self._entries[key] = entry
+            stats["logins"] += 1
+        elif self._is_expiring(entry):
+            if self._refresh(entry):
+                stats["refreshes"] += 1
+            else:
+                entry["session"].close()
+                entry = self._login(role, seeded)
+                self._entries[key] = entry
+                stats["logins"] += 1
+        else:
+            stats["reuses"] += 1
+
+        return entry["session"], entry["token"], entry["user_id"]
+
+    def user(self, role: str, seeded: bool = False) -> dict:
+        """Return the user object from the role's login response"""
+        self.get(role, seeded)
+        return self._entries[_account_key(role, seeded)]["user"]
+
+    def close(self):
+        """Close all pooled sessions and their connections"""
+        for entry in self._entries.values():
+            entry["session"].close()
+        self._entries.clear()
+
+    def _is_expiring(self, entry: dict) -> bool:
+        expires_at = entry.get("expires_at")
+        return expires_at is not None and expires_at - time.time() <= self.refresh_margin
+
+    def _new_session(self) -> requests.Session:
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=1, pool_maxsize=API_POOL_MAXSIZE)
+        session.mount("http://", adapter)
+        session.mount("https://", adapter)
+        return session
+
+    def _set_token(self, entry: dict, token: str):
+        entry["token"] = token
+        entry["expires_at"] = _decode_token_expiry(token)
+        entry["session"].headers.update({
+            "Authorization": f"Bearer {token}",
+            "Content-Type": "application/json"
+        })
+
+    def _login(self, role: str, seeded: bool = False) -> dict:
+        credentials = get_role_credentials(role, seeded)
+        session = self._new_session()
+
+        login_response = session.post(
+            f"{self.api_base_url}/api/auth/login",
+            json={
+                "email": credentials['email'],
+                "password": credentials['password']
+            }
+        )
+
+        if login_response.status_code == 401 and "worker_id" in credentials:
+            # First run for this worker: create its account, then log in again
+            self._register_worker_account(session, role, credentials)
+            login_response = session.post(
+                f"{self.api_base_url}/api/auth/login",
+                json={
+                    "email": credentials['email'],
+                    "password": credentials['password']
+                }
+            )
+
+        if login_response.status_code != 200:
+            session.close()
+            raise Exception(f"{role.capitalize()} login failed: {login_response.text}")
+
+        response_data = login_response.json()
+        # Login response structure: {success: true, data: {user: {...}, token: "...", expiresIn: "24h"}}
+        data = response_data.get('data', {})
+        auth_token = data.get('token')
+        user_id = data.get('user', {}).get('id')
+
+        if not auth_token:
+            session.close()
+            raise Exception(f"No token in {role} login response: {response_data}")
+
+        entry = {"session": session, "user_id": user_id, "user": data.get('user', {})}
+        self._set_token(entry, auth_token)
+        return entry
+
+    def _register_worker_account(self, session: requests.Session, role: str, credentials: dict):
+        worker_id = credentials["worker_id"]
+        email_hash = hashlib.sha1(credentials['email'].encode()).hexdigest()[:6]
+        response = session.post(
+            f"{self.api_base_url}/api/auth/register",
+            json={
+                "email": credentials['email'],
+                "username": f"e2e_{role}_{worker_id}_{email_hash}",
+                "firstName": "E2E",
+                "lastName": f"{role.capitalize()} {worker_id}",
+                "password": credentials['password'],
+                "role": role
+            }
+        )
+        # 409 USER_EXISTS: registered by an earlier run (login failed for another reason)
+        if response.status_code not in (201, 409):
+            raise Exception(f"Could not register {role} account for worker {worker_id}: {response.text}")
+
+    def _refresh(self, entry: dict) -> bool:
+        try:
+            response = entry["session"].post(
+                f"{self.api_base_url}/api/auth/refresh",
+                json={"token": entry["token"]}
+            )
+        except requests.RequestException:
+            return False
+
+        if response.status_code != 200:
+            return False
+
+        # Refresh response structure: {success: true, data: {token: "..."}}
+        new_token = response.json().get('data', {}).get('token')
+        if not new_token:
+            return False
+
+        self._set_token(entry, new_token)
+        return True
+
+
+
+# Pool of the running session, exposed to the report hooks below
+_auth_pool: Optional[AuthSessionPool] = None
+# Pool stats reported back by pytest-xdist workers (controller process only)
+_worker_pool_stats: Dict[str, Dict[str, int]] = {}
+# Benchmark results of this process (or, on the xdist controller, merged from workers)
+_benchmark_results: Dict[str, dict] = {}
+# Serial-group tests run by this worker; on the controller, the count per worker that ran any
+_serial_tests_run: List[str] = []
+_serial_workers: Dict[str, int] = {}
+
+
+def role_for_email(email: str) -> Optional[Tuple[str, bool]]:
+    """Map an email back to its configured test role and whether it is the seeded account, if any"""
+    for role in ("student", "instructor", "admin"):
+        for seeded in (False, True):
+            if get_role_credentials(role, seeded)["email"].lower() == email.lower():
+                return role, seeded
+    return None
+
+
+def build_storage_state(base_url: str, user: dict, token: str) -> dict:
+    """
+    Playwright storage_state equivalent to a logged-in browser
+    Mirrors what the zustand persist middleware writes after a form login
+    """
+    parts = urlsplit(base_url)
+    return {
+        "cookies": [],
+        "origins": [{
+            "origin": f"{parts.scheme}://{parts.netloc}",
+            "localStorage": [{
+                "name": AUTH_STORAGE_KEY,
+                "value": json.dumps({
+                    "state": {"user": user, "token": token, "isAuthenticated": True},
+                    "version": 0,
+                }),
+            }],
+        }],
+    }
+
+
+NOTIFICATION_BELL_BUTTON = '[data-testid="notification-bell-button"]'
+SETTINGS_SAVE_BUTTON = '[data-testid="notifications-settings-save-button"]'
+
+
+def parse_socketio_event(payload) -> Optional[Tuple[str, object]]:
+    """
+    Parse a Socket.IO EVENT frame (e.g. '42["notification-created",{...}]')
+    Returns (event_name, data) or None for any other frame
+    """
+    if not isinstance(payload, str) or not payload.startswith("42"):
+        return None
+    body = payload[2:]
+    if body.startswith("/"):
+        # Namespaced frame: 42/chat,["event",...]
+        body = body.partition(",")[2]
+    body = body.lstrip("0123456789")  # Optional ack id
+    try:
+        message = json.loads(body)
+    except ValueError:
+        return None
+    if not isinstance(message, list) or not message:
+        return None
+    return message[0], (message[1] if len(message) > 1 else None)
+
+
+class PageWaits:
+    """
+    Condition-based waits for a page, used instead of fixed wait_for_timeout sleeps
+
+    Attached to every page by the page fixture so Socket.IO frames are
+    recorded from the first connection; tests get it through the waits fixture.
+    """
+
+    def __init__(self, page: Page):
+        self.page = page
+        self.socket_events: list = []
+        self._sockets: list = []
+        page.on("websocket", self._on_websocket)
+
+    def _on_websocket(self, ws: WebSocket):
+        if "/socket.io/" not in ws.url:
+            return
+        self._sockets.append(ws)
+        ws.on("framereceived", self._on_frame)
+
+    def _on_frame(self, payload):
+        event = parse_socketio_event(payload)
+        if event:
+            self.socket_events.append(event)
+
+    # ---- Notification settings page ----
+
+    def save_notification_settings(self, timeout_ms: int = 5000) -> Response:
+        """Click Save and wait for the PATCH /api/notifications/preferences response"""
+        def _is_save(response: Response) -> bool:
+            return ("/api/notifications/preferences" in response.url
+                    and response.request.method == "PATCH")
+
+        with self.page.expect_response(_is_save, timeout=timeout_ms) as response_info:
+            self.page.click(SETTINGS_SAVE_BUTTON)
+        response = response_info.value
+        assert response.ok, f"Saving notification settings failed: {response.status} {response.text()}"
+        return response
+
+    def expand_category(self, category: str, timeout_ms: int = 5000):
+        """Expand a notification settings category accordion and wait until it is open"""
+        summary = self.page.locator(
+            f'[data-testid="notifications-settings-category-{category}-accordion-summary"]'
+        )
+        if summary.get_attribute("aria-expanded") != "true":
+            summary.click()
+        expect(summary).to_have_attribute("aria-expanded", "true", timeout=timeout_ms)
+
+    # ---- Notification bell ----
+
+    def expect_bell_count(self, count: int, timeout_ms: int = 5000):
+        """Wait until the bell reports exactly `count` unread notifications"""
+        expect(self.page.locator(NOTIFICATION_BELL_BUTTON)).to_have_attribute(
+            "aria-label", f"show {count} new notifications", timeout=timeout_ms
+        )
+
+    def wait_for_bell_change(self, from_count: int, timeout_ms: int = 5000) -> bool:
+        """Wait until the bell count differs from `from_count`; False on timeout"""
+        try:
+            expect(self.page.locator(NOTIFICATION_BELL_BUTTON)).not_to_have_attribute(
+                "aria-label", f"show {from_count} new notifications", timeout=timeout_ms
+            )
+            return True
+        except AssertionError:
+            return False
+
+    def expect_no_bell_change(self, from_count: int, settle_ms: int = 500):
+        """
+        Assert the bell stays at `from_count` for a short settle window
+        Fails as soon as the count changes instead of sleeping a fixed time first
+        """
+        assert not self.wait_for_bell_change(from_count, timeout_ms=settle_ms), \
+            f"Notification bell changed from {from_count} to {self.page.locator(NOTIFICATION_BELL_BUTTON).get_attribute('aria-label')}"
+
+    # ---- Socket.IO ----
+
+    def socket_mark(self) -> int:
+        """Position in the recorded Socket.IO events; pass as `since` to only see later events"""
+        return len(self.socket_events)
+
+    def wait_for_socket_event(self, event_name: str, since: int = 0, timeout_ms: int = 5000):
+        """
+        Wait for a Socket.IO event frame (e.g. "notification-created") received after `since`
+        Returns the event payload; raises TimeoutError if it does not arrive
+        Note: frames sent before the client upgrades from HTTP long-polling are not visible
+        """
+        deadline = time.monotonic() + timeout_ms / 1000
+        while True:
+            for name, data in self.socket_events[since:]:
+                if name == event_name:
+                    return data
+
+            remaining_ms = (deadline - time.monotonic()) * 1000
+            if remaining_ms <= 0:
+                raise TimeoutError(f"Socket.IO event '{event_name}' not received within {timeout_ms}ms")
+
+            open_sockets = [ws for ws in self._sockets if not ws.is_closed()]
+            try:
+                if open_sockets:
+                    open_sockets[-1].wait_for_event("framereceived", timeout=remaining_ms)
+                else:
+                    self.page.wait_for_event(
+                        "websocket", lambda ws: "/socket.io/" in ws.url, timeout=remaining_ms
+                    )
+            except PlaywrightError:
+                # Timed out or socket closed; re-check recorded events and the deadline
+                continue
+
+
+# PageWaits for each open page, created by the page fixture
+_page_waits: Dict[Page, PageWaits] = {}
+
+
+def ui_login(page: Page, base_url: str, email: str, password: str):
+    """Log in through the /login form and wait for the dashboard redirect"""
+    page.goto(f"{base_url}/login")
+    page.wait_for_load_state("networkidle")
+    page.fill('[data-testid="login-email-input"]', email)
+    page.fill('[data-testid="login-password-input"]', password)
+    page.click('[data-testid="login-submit-button"]')
+    page.wait_for_url(re.compile(r".*/dashboard.*"), timeout=15000)
+
 
 @pytest.fixture(scope="session")
 def browser_context_args(browser_context_args):
@@ -38,9 +483,18 @@ def browser_context_args(browser_context_args):
 
 
 @pytest.fixture(scope="function")
-def context(browser: Browser) -> Generator[BrowserContext, None, None]:
-    """Create a new browser context for each test"""
-    context = browser.new_context()
+def context(browser: Browser, request, auth_storage_state) -> Generator[BrowserContext, None, None]:
+    """
+    Create a new browser context for each test
+    Tests marked @pytest.mark.login_as("<role>") start already logged in as that role
+    """
+    marker = request.node.get_closest_marker("login_as")
+    if marker:
+        context = browser.new_context(
+            storage_state=auth_storage_state(marker.args[0], uses_seeded_accounts(request))
+        )
+    else:
+        context = browser.new_context()
     yield context
     context.close()
 
@@ -49,10 +503,21 @@ def context(browser: Browser) -> Generator[BrowserContext, None, None]:
 def page(context: BrowserContext) -> Generator[Page, None, None]:
     """Create a new page for each test"""
     page = context.new_page()
+    _page_waits[page] = PageWaits(page)
     yield page
+    _page_waits.pop(page, None)
     page.close()
 
 
+@pytest.fixture
+def waits(page: Page) -> PageWaits:
+    """
+    Condition-based waits for the test page (settings save response, bell count,
+    Socket.IO frames, accordion state). Prefer these over page.wait_for_timeout()
+    """
+    return _page_waits[page]
+
+
 @pytest.fixture(scope="session")
 def base_url() -> str:
     """Base URL for the application (frontend)"""
@@ -65,31 +530,42 @@ def api_base_url() -> str:
     return API_BASE_URL
 
 
+@pytest.fixture(scope="session")
+def worker_id() -> str:
+    """pytest-xdist worker id, or "master" for a serial run"""
+    return get_worker_id()
+
+
+@pytest.fixture(scope="session")
+def namespaced(worker_id: str):
+    """
+    Prefix titles of created data (courses, lessons, ...) with the xdist worker id
+    Usage: namespaced("Test Course") -> "[gw1] Test Course" (unchanged in a serial run)
+    """
+    def _namespaced(title: str) -> str:
+        if worker_id == "master":
+            return title
+        return f"[{worker_id}] {title}"
+
+    return _namespaced
+
+
 @pytest.fixture
 def admin_credentials() -> dict:
     """Admin user credentials"""
-    return {
-        "email": os.getenv("ADMIN_EMAIL", "admin@example.com"),
-        "password": os.getenv("ADMIN_PASSWORD", "admin123"),
-    }
+    return get_role_credentials("admin")
 
 
 @pytest.fixture
-def student_credentials() -> dict:
-    """Student user credentials"""
-    return {
-        "email": os.getenv("STUDENT_EMAIL", "student@example.com"),
-        "password": os.getenv("STUDENT_PASSWORD", "student123"),
-    }
+def student_credentials(request) -> dict:
+    """Student user credentials (the seeded student for tests marked seeded)"""
+    return get_role_credentials("student", uses_seeded_accounts(request))
 
 
 @pytest.fixture
-def instructor_credentials() -> dict:
-    """Instructor user credentials"""
-    return {
-        "email": os.getenv("INSTRUCTOR_EMAIL", "instructor@example.com"),
-        "password": os.getenv("INSTRUCTOR_PASSWORD", "instructor123"),
-    }
+def instructor_credentials(request) -> dict:
+    """Instructor user credentials (the seeded instructor for tests marked seeded)"""
+    return get_role_credentials("instructor", uses_seeded_accounts(request))
 
 
 @pytest.fixture
@@ -101,79 +577,192 @@ def api_headers() -> dict:
     }
 
 
+@pytest.fixture(scope="session")
+def auth_pool(api_base_url: str) -> Generator[AuthSessionPool, None, None]:
+    """
+    Session-scoped pool of authenticated API sessions, one per role
+    Use auth_pool.get("student" | "instructor" | "admin")
+    """
+    global _auth_pool
+    pool = AuthSessionPool(api_base_url)
+    _auth_pool = pool
+    yield pool
+    pool.close()
+
+
+@pytest.fixture(scope="session")
+def auth_storage_state(browser: Browser, auth_pool: AuthSessionPool, base_url: str, tmp_path_factory):
+    """
+    Saved Playwright storage_state per role, created once per worker
+    Usage: auth_storage_state("instructor") -> path to the storage state JSON
+           auth_storage_state("instructor", seeded=True) for the seeded account
+
+    AUTH_STATE_MODE=api (default) logs in through the REST API;
+    AUTH_STATE_MODE=ui drives the /login form once per role instead.
+    """
+    state_dir = tmp_path_factory.mktemp("storage_state")
+    paths: Dict[str, str] = {}
+
+    def _get(role: str, seeded: bool = False) -> str:
+        key = _account_key(role, seeded)
+        if key in paths:
+            return paths[key]
+
+        path = str(state_dir / f"{role}{'-seeded' if key != role else ''}.json")
+        if AUTH_STATE_MODE == "ui":
+            credentials = get_role_credentials(role, seeded)
+            context = browser.new_context()
+            page = context.new_page()
+            ui_login(page, base_url, credentials['email'], credentials['password'])
+            context.storage_state(path=path)
+            context.close()
+        else:
+            _, token, _ = auth_pool.get(role, seeded)
+            state = build_storage_state(base_url, auth_pool.user(role, seeded), token)
+            with open(path, "w") as f:
+                json.dump(state, f)
+
+        paths[key] = path
+        return path
+
+    return _get
+
+
 @pytest.fixture
-def api_client(api_base_url: str, student_credentials: dict):
+def api_client(auth_pool: AuthSessionPool, request):
     """
     HTTP client for API calls with authentication
     Returns tuple: (session, auth_token, user_id)
     """
-    session = requests.Session()
-    
-    # Login
-    login_response = session.post(
-        f"{api_base_url}/api/auth/login",
-        json={
-            "email": student_credentials['email'],
-            "password": student_credentials['password']
-        }
-    )
-    
-    if login_response.status_code != 200:
-        raise Exception(f"Login failed: {login_response.text}")
-    
-    response_data = login_response.json()
-    # Login response structure: {success: true, data: {user: {...}, token: "...", expiresIn: "24h"}}
-    data = response_data.get('data', {})
-    auth_token = data.get('token')
-    user_id = data.get('user', {}).get('id')
-    
-    if not auth_token:
-        raise Exception(f"No token in login response: {response_data}")
-    
-    # Set authorization header for all future requests
-    session.headers.update({
-        "Authorization": f"Bearer {auth_token}",
-        "Content-Type": "application/json"
-    })
-    
-    return session, auth_token, user_id
+    return auth_pool.get("student", uses_seeded_accounts(request))
 
 
 @pytest.fixture
-def api_client_instructor(api_base_url: str, instructor_credentials: dict):
+def api_client_instructor(auth_pool: AuthSessionPool, request):
     """
     HTTP client for API calls with instructor authentication
     Returns tuple: (session, auth_token, user_id)
     """
-    session = requests.Session()
-    
-    # Login
-    login_response = session.post(
-        f"{api_base_url}/api/auth/login",
-        json={
-            "email": instructor_credentials['email'],
-            "password": instructor_credentials['password']
+    return auth_pool.get("instructor", uses_seeded_accounts(request))
+
+
+def load_benchmark_baseline(path: str = BENCHMARK_BASELINE_PATH) -> dict:
+    """Baseline JSON as written by --benchmark-save, or an empty baseline"""
+    try:
+        with open(path) as f:
+            baseline = json.load(f)
+    except FileNotFoundError:
+        return {"schema_version": BENCHMARK_SCHEMA_VERSION, "version": 0, "benchmarks": {}}
+    if baseline.get("schema_version") != BENCHMARK_SCHEMA_VERSION:
+        raise Exception(
+            f"Benchmark baseline {path} has schema {baseline.get('schema_version')}, "
+            f"expected {BENCHMARK_SCHEMA_VERSION}; re-record it with --benchmark-save"
+        )
+    return baseline
+
+
+def compare_to_baseline(result: dict, baseline: Optional[dict], tolerance: float) -> dict:
+    """Status (new, ok, improved, regressed) of a result against its baseline entry"""
+    if not baseline:
+        return {"status": "new", "baseline_median_ms": None, "delta_pct": None, "tolerance": tolerance}
+    delta = (result["median_ms"] - baseline["median_ms"]) / baseline["median_ms"]
+    if delta > tolerance:
+        status = "regressed"
+    elif delta < -tolerance:
+        status = "improved"
+    else:
+        status = "ok"
+    return {
+        "status": status,
+        "baseline_median_ms": baseline["median_ms"],
+        "delta_pct": round(delta * 100, 1),
+        "tolerance": tolerance,
+    }
+
+
+def save_benchmark_baseline(results: Dict[str, dict], path: str = BENCHMARK_BASELINE_PATH):
+    """Write results as the next baseline version, keeping entries that were not re-run"""
+    import pathlib
+    import subprocess
+
+    previous = load_benchmark_baseline(path)
+    benchmarks = dict(previous.get("benchmarks", {}))
+    for name, result in results.items():
+        benchmarks[name] = {key: result[key] for key in ("median_ms", "p95_ms", "mean_ms", "rounds")}
+
+    try:
+        commit = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    baseline = {
+        "schema_version": BENCHMARK_SCHEMA_VERSION,
+        "version": previous.get("version", 0) + 1,
+        "recorded_at": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "git_commit": commit,
+        "api_base_url": API_BASE_URL,
+        "benchmarks": dict(sorted(benchmarks.items())),
+    }
+    pathlib.Path(path).parent.mkdir(parents=True, exist_ok=True)
+    with open(path, "w") as f:
+        json.dump(baseline, f, indent=2)
+        f.write("\n")
+    return baseline
+
+
+@pytest.fixture(scope="session")
+def benchmark_baseline() -> dict:
+    return load_benchmark_baseline()
+
+
+@pytest.fixture
+def benchmark(request, benchmark_baseline: dict):
+    """
+    Time an API call against the recorded baseline (tests marked benchmark, run with --benchmark)
+    Usage: benchmark("GET /api/notifications", lambda: session.get(url))
+    The call must return a requests.Response; a regression fails the test, or xfails it
+    with --benchmark-on-regression=xfail
+    """
+    config = request.config
+    marker = request.node.get_closest_marker("benchmark")
+    tolerance = config.getoption("benchmark_tolerance")
+    if marker and "tolerance" in marker.kwargs:
+        tolerance = marker.kwargs["tolerance"]
+
+    def _benchmark(name: str, call, rounds: int = BENCHMARK_ROUNDS, warmup: int = BENCHMARK_WARMUP) -> dict:
+        for _ in range(warmup):
+            call()
+
+        timings = []
+        for _ in range(rounds):
+            start = time.perf_counter()
+            response = call()
+            timings.append((time.perf_counter() - start) * 1000)
+            assert response.ok, f"{name} returned {response.status_code}: {response.text}"
+
+        timings.sort()
+        result = {
+            "median_ms": round(timings[len(timings) // 2], 2),
+            "p95_ms": round(timings[min(len(timings) - 1, int(len(timings) * 0.95))], 2),
+            "mean_ms": round(sum(timings) / len(timings), 2),
+            "rounds": rounds,
         }
-    )
-    
-    if login_response.status_code != 200:
-        raise Exception(f"Instructor login failed: {login_response.text}")
-    
-    response_data = login_response.json()
-    # Login response structure: {success: true, data: {user: {...}, token: "...", expiresIn: "24h"}}
-    data = response_data.get('data', {})
-    auth_token = data.get('token')
-    user_id = data.get('user', {}).get('id')
-    
-    if not auth_token:
-        raise Exception(f"No token in instructor login response: {response_data}")
-    
-    session.headers.update({
-        "Authorization": f"Bearer {auth_token}",
-        "Content-Type": "application/json"
-    })
-    
-    return session, auth_token, user_id
+        result.update(compare_to_baseline(result, benchmark_baseline["benchmarks"].get(name), tolerance))
+        _benchmark_results[name] = result
+
+        if result["status"] == "regressed":
+            message = (
+                f"{name} regressed: median {result['median_ms']}ms vs baseline "
+                f"{result['baseline_median_ms']}ms (+{result['delta_pct']}%, tolerance {tolerance:.0%})"
+            )
+            if config.getoption("benchmark_on_regression") == "xfail":
+                pytest.xfail(message)
+            pytest.fail(message)
+        return result
+
+    return _benchmark
 
 
 @pytest.fixture
@@ -281,23 +870,20 @@ def clear_notifications(api_client, api_base_url: str):
 
 
 @pytest.fixture
-def wait_for_notification(page: Page, get_notification_count):
+def wait_for_notification(page: Page, get_notification_count, waits: PageWaits):
     """
     Helper to wait for notification count to change
     Returns True if count increased, False if timeout
     """
     def _wait(timeout_ms: int = 5000, expected_increase: int = 1) -> bool:
-        import time
         initial_count = get_notification_count()
-        start_time = time.time()
-        
-        while (time.time() - start_time) * 1000 < timeout_ms:
-            current_count = get_notification_count()
-            if current_count >= initial_count + expected_increase:
-                return True
-            page.wait_for_timeout(500)
-        
-        return False
+        target = initial_count + expected_increase
+        try:
+            waits.expect_bell_count(target, timeout_ms=timeout_ms)
+            return True
+        except AssertionError:
+            # The bell may have jumped past the target (e.g. several notifications at once)
+            return get_notification_count() >= target
     
     return _wait
 
@@ -309,9 +895,9 @@ def verify_notification_in_db(api_client, api_base_url: str):
     Returns True if notification found, False otherwise
     """
     def _verify(notification_id: str = None, timeout_ms: int = 5000) -> bool:
-        import time
         session, _, _ = api_client
         start_time = time.time()
+        delay = 0.05
         
         while (time.time() - start_time) * 1000 < timeout_ms:
             response = session.get(f"{api_base_url}/api/notifications")
@@ -330,7 +916,9 @@ def verify_notification_in_db(api_client, api_base_url: str):
                     print(f"✅ Found {len(notifications)} notifications in DB")
                     return True
             
-            time.sleep(0.5)
+            # Back off from 50ms up to 500ms so fast creations are seen right away
+            time.sleep(delay)
+            delay = min(delay * 2, 0.5)
         
         print(f"⚠️ Notification not found in DB after {timeout_ms}ms")
         return False
@@ -433,36 +1021,59 @@ def get_db_notifications(api_client, api_base_url: str):
 
 
 @pytest.fixture
-def switch_user(page: Page, base_url: str):
+def switch_user(page: Page, base_url: str, auth_storage_state):
     """
     Helper to switch between user accounts
     Usage: switch_user(email, password)
+
+    Configured test roles are switched by loading their saved storage state;
+    any other account falls back to the /login form
     """
     def _switch(email: str, password: str):
-        # Logout current user
-        try:
-            page.goto(f"{base_url}/dashboard")
-            page.wait_for_load_state("networkidle")
-            page.click('[data-testid="header-profile-menu-button"]', timeout=3000)
-            page.wait_for_timeout(500)
-            page.click('[data-testid="header-profile-menu-item-logout"]', timeout=3000)
+        account = role_for_email(email)
+        if account is None:
+            page.context.clear_cookies()
+            page.goto(f"{base_url}/login")
+            page.evaluate("() => localStorage.clear()")
+            ui_login(page, base_url, email, password)
             page.wait_for_load_state("networkidle")
-        except:
-            pass  # May already be logged out
-        
-        # Login as new user
+            return True
+
+        with open(auth_storage_state(*account)) as f:
+            state = json.load(f)
+
+        page.context.clear_cookies()
+        if state.get("cookies"):
+            page.context.add_cookies(state["cookies"])
+
+        # Replace localStorage on the app origin, then load the dashboard with it
         page.goto(f"{base_url}/login")
-        page.wait_for_load_state("networkidle")
-        page.fill('[data-testid="login-email-input"]', email)
-        page.fill('[data-testid="login-password-input"]', password)
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"), timeout=15000)
+        page.evaluate(
+            """(items) => {
+                localStorage.clear();
+                for (const item of items) localStorage.setItem(item.name, item.value);
+            }""",
+            [item for origin in state.get("origins", []) for item in origin.get("localStorage", [])]
+        )
+        page.goto(f"{base_url}/dashboard")
         page.wait_for_load_state("networkidle")
         return True
     
     return _switch
 
 
+def pytest_addoption(parser):
+    group = parser.getgroup("benchmark", "API timing baseline")
+    group.addoption("--benchmark", action="store_true",
+                    help="Run tests marked benchmark and compare them with the baseline")
+    group.addoption("--benchmark-save", action="store_true",
+                    help=f"Record this run as the next baseline version in {BENCHMARK_BASELINE_PATH}")
+    group.addoption("--benchmark-tolerance", type=float, default=BENCHMARK_TOLERANCE,
+                    help="Allowed median slowdown before a regression, as a fraction (default: %(default)s)")
+    group.addoption("--benchmark-on-regression", choices=("fail", "xfail"), default="fail",
+                    help="Outcome of a regressed benchmark (default: %(default)s)")
+
+
 def pytest_configure(config):
     """Configure pytest with custom settings"""
     # Create reports directory if it doesn't exist
@@ -485,3 +1096,146 @@ def pytest_runtest_makereport(item, call):
                     print(f"\n📸 Screenshot saved: {screenshot_path}")
                 except Exception as e:
                     print(f"\n❌ Failed to capture screenshot: {e}")
+
+
+def _auth_pool_stats_rows() -> list:
+    """Per-role stats as rows of (role, logins, refreshes, reuses), merged across workers"""
+    merged: Dict[str, Dict[str, int]] = {}
+    sources = [_worker_pool_stats]
+    if _auth_pool is not None:
+        sources.append(_auth_pool.stats)
+    for stats in sources:
+        for role, counts in stats.items():
+            totals = merged.setdefault(role, {"logins": 0, "refreshes": 0, "reuses": 0})
+            for key in totals:
+                totals[key] += counts.get(key, 0)
+    return [
+        (role, s["logins"], s["refreshes"], s["reuses"])
+        for role, s in sorted(merged.items())
+    ]
+
+
+def _auth_pool_stats_html(rows: list) -> str:
+    body = "".join(
+        f"<tr><td>{role}</td><td>{logins}</td><td>{refreshes}</td><td>{reuses}</td></tr>"
+        for role, logins, refreshes, reuses in rows
+    )
+    return (
+        "<h3>API auth session pool</h3>"
+        "<table><tr><th>Role</th><th>Logins</th><th>Refreshes</th><th>Reuses</th></tr>"
+        f"{body}</table>"
+    )
+
+
+def _benchmark_html(results: Dict[str, dict]) -> str:
+    colors = {"regressed": "#fdd", "improved": "#dfd", "new": "#eef"}
+    rows = []
+    for name, r in sorted(results.items()):
+        baseline = "-" if r["baseline_median_ms"] is None else f"{r['baseline_median_ms']}"
+        delta = "-" if r["delta_pct"] is None else f"{r['delta_pct']:+}%"
+        rows.append(
+            f"<tr style=\"background:{colors.get(r['status'], 'inherit')}\"><td>{name}</td><td>{baseline}</td>"
+            f"<td>{r['median_ms']}</td><td>{delta}</td><td>{r['p95_ms']}</td><td>{r['status']}</td></tr>"
+        )
+    return (
+        "<h3>API benchmarks vs baseline</h3>"
+        "<table><tr><th>Benchmark</th><th>Baseline median (ms)</th><th>Median (ms)</th>"
+        "<th>Change</th><th>p95 (ms)</th><th>Status</th></tr>"
+        f"{''.join(rows)}</table>"
+    )
+
+
+@pytest.hookimpl(tryfirst=True)
+def pytest_collection_modifyitems(config, items):
+    """
+    Keep tests marked serial or seeded on a single xdist worker (run with
+    --dist loadgroup) and skip benchmark tests unless --benchmark is given
+
+    Seeded tests share the serial group because both use the shared seeded accounts.
+    Runs first: xdist's loadgroup scheduler reads the xdist_group marker in its own
+    implementation of this hook.
+    """
+    skip_benchmark = pytest.mark.skip(reason="benchmark: run with --benchmark")
+    for item in items:
+        if item.get_closest_marker("serial") or item.get_closest_marker("seeded"):
+            item.add_marker(pytest.mark.xdist_group(name="serial"))
+        if item.get_closest_marker("benchmark") and not config.getoption("benchmark"):
+            item.add_marker(skip_benchmark)
+
+
+def pytest_runtest_setup(item):
+    """Remember serial-group tests so the controller can check they shared one worker"""
+    if item.get_closest_marker("serial") or item.get_closest_marker("seeded"):
+        _serial_tests_run.append(item.nodeid)
+
+
+def pytest_sessionfinish(session):
+    """
+    Hand this worker's auth pool stats, benchmark results and serial tests back to the
+    xdist controller; on the controller (or without xdist) save the benchmark baseline
+    and fail the run if the serial group was split across workers
+    """
+    workeroutput = getattr(session.config, "workeroutput", None)
+    if workeroutput is not None:
+        if _auth_pool is not None:
+            workeroutput["auth_pool_stats"] = _auth_pool.stats
+        workeroutput["benchmark_results"] = _benchmark_results
+        workeroutput["serial_tests_run"] = _serial_tests_run
+        return
+
+    if session.config.getoption("benchmark_save") and _benchmark_results:
+        baseline = save_benchmark_baseline(_benchmark_results)
+        print(f"\n📏 Benchmark baseline v{baseline['version']} saved to {BENCHMARK_BASELINE_PATH}")
+    if len(_serial_workers) > 1:
+        session.exitstatus = pytest.ExitCode.TESTS_FAILED
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_testnodedown(node, error):
+    """Collect auth pool stats and benchmark results from a finished xdist worker"""
+    workeroutput = getattr(node, "workeroutput", {})
+    for role, counts in workeroutput.get("auth_pool_stats", {}).items():
+        totals = _worker_pool_stats.setdefault(role, {"logins": 0, "refreshes": 0, "reuses": 0})
+        for key in totals:
+            totals[key] += counts.get(key, 0)
+    _benchmark_results.update(workeroutput.get("benchmark_results", {}))
+    serial_tests = workeroutput.get("serial_tests_run", [])
+    if serial_tests:
+        _serial_workers[workeroutput.get("workerid", node.gateway.id)] = len(serial_tests)
+
+
+@pytest.hookimpl(optionalhook=True)
+def pytest_html_results_summary(prefix, summary, postfix):
+    """Add per-role auth session reuse stats and the benchmark diff to the pytest-html report"""
+    rows = _auth_pool_stats_rows()
+    if rows:
+        postfix.append(_auth_pool_stats_html(rows))
+    if _benchmark_results:
+        postfix.append(_benchmark_html(_benchmark_results))
+
+
+def pytest_terminal_summary(terminalreporter):
+    """Print per-role auth session reuse stats and benchmark changes at the end of the run"""
+    if len(_serial_workers) > 1:
+        terminalreporter.section("Serial test group", red=True)
+        spread = ", ".join(f"{worker}: {count}" for worker, count in sorted(_serial_workers.items()))
+        terminalreporter.write_line(
+            f"❌ serial/seeded tests ran on {len(_serial_workers)} workers ({spread}); "
+            "they must share one worker (--dist loadgroup)"
+        )
+
+    rows = _auth_pool_stats_rows()
+    if rows:
+        terminalreporter.section("API auth session pool")
+        for role, logins, refreshes, reuses in rows:
+            terminalreporter.write_line(
+                f"{role}: {logins} login(s), {refreshes} refresh(es), {reuses} reuse(s)"
+            )
+
+    if _benchmark_results:
+        terminalreporter.section("API benchmarks vs baseline")
+        for name, r in sorted(_benchmark_results.items()):
+            change = "no baseline" if r["delta_pct"] is None else f"{r['delta_pct']:+}% vs {r['baseline_median_ms']}ms"
+            terminalreporter.write_line(
+                f"{name}: median {r['median_ms']}ms, p95 {r['p95_ms']}ms ({change}) {r['status']}"
+            )
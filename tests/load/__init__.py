@@ -0,0 +1,10 @@
+"""
+Load testing tools for the Mishin Learn API
+
+Not collected by pytest (no test_*.py files). Each module is run directly
+from the repository root so tests/.env.test and the conftest login apply:
+
+    python -m tests.load.api_load --users 50 --duration 60
+
+Reports (JSON + HTML) are written to tests/reports/load/.
+"""
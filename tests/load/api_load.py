@@ -0,0 +1,193 @@
+"""
+REST load generator for the Mishin Learn API
+
+Drives a weighted mix of the traffic a cohort of students produces:
+
+    catalog          GET  /api/courses (paging and search)
+    lesson_complete  POST /api/progress/lessons/:id/complete
+    video_heartbeat  POST /api/video-progress/:id/update
+    notifications    GET  /api/notifications/unread-count + GET /api/notifications
+
+Virtual users share one httpx.AsyncClient and the token obtained through the
+conftest AuthSessionPool, so the same .env.test credentials and API_BASE_URL
+apply. Usage (from the repository root):
+
+    python -m tests.load.api_load --users 50 --duration 60 \
+        --mix catalog=50,video_heartbeat=30,notifications=15,lesson_complete=5
+"""
+import argparse
+import asyncio
+import random
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from tests.conftest import API_BASE_URL, AuthSessionPool
+from tests.load.stats import LatencyStats, print_summary, write_report
+
+DEFAULT_MIX = "catalog=50,video_heartbeat=30,notifications=15,lesson_complete=5"
+
+SEARCH_TERMS = ["python", "javascript", "data", "design", "react", "intro", "advanced", ""]
+
+
+def parse_mix(spec: str) -> Dict[str, int]:
+    """Parse "catalog=50,notifications=10" into {"catalog": 50, "notifications": 10}"""
+    mix = {}
+    for part in spec.split(","):
+        if not part.strip():
+            continue
+        name, _, weight = part.partition("=")
+        name = name.strip()
+        if name not in SCENARIOS:
+            raise ValueError(f"Unknown scenario '{name}'. Known: {', '.join(SCENARIOS)}")
+        mix[name] = int(weight or 1)
+    return mix
+
+
+class Workload:
+    """Lesson and video content ids the mutating scenarios pick from"""
+
+    def __init__(self):
+        self.lesson_ids: List[str] = []
+        self.video_item_ids: List[str] = []
+
+    async def discover(self, client: httpx.AsyncClient, max_courses: int = 5):
+        """Collect lessons and video content items from the user's enrolled courses"""
+        resp = await client.get("/enrollment/my-enrollments", params={"limit": max_courses})
+        resp.raise_for_status()
+        enrollments = resp.json().get("enrollments", [])
+        course_ids = [e.get("courseId") or e.get("CourseId") for e in enrollments]
+
+        for course_id in [c for c in course_ids if c][:max_courses]:
+            resp = await client.get(f"/lessons/{course_id}")
+            if resp.status_code != 200:
+                continue
+            for lesson in resp.json():
+                self.lesson_ids.append(lesson["id"])
+                for item in lesson.get("content") or []:
+                    if item.get("type") == "video" and item.get("id"):
+                        self.video_item_ids.append(item["id"])
+
+
+async def timed(client: httpx.AsyncClient, stats: LatencyStats, label: str,
+                method: str, url: str, **kwargs) -> Optional[httpx.Response]:
+    """Issue one request and record its latency under `label`"""
+    start = time.perf_counter()
+    try:
+        resp = await client.request(method, url, **kwargs)
+    except httpx.HTTPError as e:
+        stats.record_error(label, f"{type(e).__name__}: {e}")
+        return None
+    elapsed_ms = (time.perf_counter() - start) * 1000
+    ok = resp.status_code < 400
+    stats.record(label, elapsed_ms, ok, None if ok else f"{resp.status_code} {resp.text}")
+    return resp
+
+
+async def scenario_catalog(client, stats, workload):
+    params = {"page": random.randint(1, 3), "limit": 12}
+    term = random.choice(SEARCH_TERMS)
+    if term:
+        params["search"] = term
+    await timed(client, stats, "GET /api/courses", "GET", "/courses", params=params)
+
+
+async def scenario_lesson_complete(client, stats, workload):
+    lesson_id = random.choice(workload.lesson_ids)
+    await timed(client, stats, "POST /api/progress/lessons/:id/complete", "POST",
+                f"/progress/lessons/{lesson_id}/complete",
+                json={"timeSpent": random.randint(1, 30)})
+
+
+async def scenario_video_heartbeat(client, stats, workload):
+    item_id = random.choice(workload.video_item_ids)
+    position = random.randint(0, 600)
+    await timed(client, stats, "POST /api/video-progress/:id/update", "POST",
+                f"/video-progress/{item_id}/update",
+                json={"lastPosition": position, "watchedDuration": position, "playbackSpeed": 1})
+
+
+async def scenario_notifications(client, stats, workload):
+    await timed(client, stats, "GET /api/notifications/unread-count", "GET", "/notifications/unread-count")
+    await timed(client, stats, "GET /api/notifications", "GET", "/notifications")
+
+
+SCENARIOS = {
+    "catalog": scenario_catalog,
+    "lesson_complete": scenario_lesson_complete,
+    "video_heartbeat": scenario_video_heartbeat,
+    "notifications": scenario_notifications,
+}
+
+
+async def virtual_user(client, stats, workload, names, weights, deadline, think_ms):
+    while time.monotonic() < deadline:
+        name = random.choices(names, weights)[0]
+        await SCENARIOS[name](client, stats, workload)
+        if think_ms:
+            await asyncio.sleep(random.uniform(0, think_ms) / 1000)
+
+
+async def run(users: int, duration: float, mix: Dict[str, int], role: str = "student",
+              think_ms: int = 0, api_base_url: str = API_BASE_URL) -> dict:
+    """Run the mix and return {"config", "results"} (results as LatencyStats.summary())"""
+    pool = AuthSessionPool(api_base_url)
+    try:
+        _, token, _ = pool.get(role)
+    finally:
+        pool.close()
+
+    limits = httpx.Limits(max_connections=users, max_keepalive_connections=users)
+    async with httpx.AsyncClient(base_url=f"{api_base_url}/api", limits=limits, timeout=30.0,
+                                 headers={"Authorization": f"Bearer {token}"}) as client:
+        workload = Workload()
+        if {"lesson_complete", "video_heartbeat"} & set(mix):
+            await workload.discover(client)
+        if not workload.lesson_ids and mix.pop("lesson_complete", None):
+            print(f"No enrolled lessons for {role}; skipping lesson_complete")
+        if not workload.video_item_ids and mix.pop("video_heartbeat", None):
+            print(f"No video content for {role}; skipping video_heartbeat")
+        if not mix:
+            raise SystemExit("Nothing to run: every scenario in the mix was skipped")
+
+        stats = LatencyStats()
+        names, weights = list(mix), list(mix.values())
+        started = time.monotonic()
+        deadline = started + duration
+        await asyncio.gather(*(
+            virtual_user(client, stats, workload, names, weights, deadline, think_ms)
+            for _ in range(users)
+        ))
+        elapsed = time.monotonic() - started
+
+    config = {
+        "api_base_url": api_base_url,
+        "role": role,
+        "users": users,
+        "duration_s": round(elapsed, 2),
+        "think_ms": think_ms,
+        "mix": mix,
+    }
+    return {"config": config, "results": stats.summary(elapsed)}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="REST load generator for the Mishin Learn API")
+    parser.add_argument("--users", type=int, default=20, help="Concurrent virtual users")
+    parser.add_argument("--duration", type=float, default=30, help="Run time in seconds")
+    parser.add_argument("--mix", default=DEFAULT_MIX, help=f"Scenario weights (default: {DEFAULT_MIX})")
+    parser.add_argument("--role", default="student", help="Account role used for the run")
+    parser.add_argument("--think-ms", type=int, default=0, help="Max random pause between requests")
+    parser.add_argument("--api-base-url", default=API_BASE_URL)
+    args = parser.parse_args(argv)
+
+    outcome = asyncio.run(run(args.users, args.duration, parse_mix(args.mix), args.role,
+                              args.think_ms, args.api_base_url))
+    print_summary("Per-endpoint results", outcome["results"])
+    path = write_report("api-load", outcome["config"], {"Endpoints": outcome["results"]})
+    print(f"\nReport: {path} (+ .html)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,310 @@
+"""
+Socket.IO load generator and latency probe for the Mishin Learn server
+
+Opens authenticated Socket.IO clients in stages (e.g. 100, 500, 1000, 2000)
+and at every stage measures:
+
+    connect storm         handshake latency and wall time to connect the new clients
+    notification latency  POST /api/notifications/test -> "notification-created" on every socket
+    chat fan-out          POST /api/chat/rooms/:id/messages -> "chat:message" on every socket in the room
+
+All sockets authenticate as the --role account (default student), so every socket is
+in that user's `user-<id>` room and notification fan-out equals the connected count.
+For chat, the instructor opens a direct room with that user and every socket joins it,
+so the room size equals the connected count at each stage.
+
+The run stops at the first stage whose connect failure or delivery miss rate exceeds
+--max-error-rate, and reports it as the saturation point. Usage (from the repository root):
+
+    python -m tests.load.socket_load --stages 100,500,1000,2000 --probes 5
+"""
+import argparse
+import asyncio
+import time
+import uuid
+from typing import Dict, List, Optional
+
+import httpx
+import socketio
+
+from tests.conftest import API_BASE_URL, AuthSessionPool
+from tests.load.stats import LatencyStats, print_summary, write_report
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+def raise_open_file_limit():
+    """Thousands of sockets need more descriptors than the default soft limit"""
+    if resource is None:
+        return
+    soft, hard = resource.getrlimit(resource.RLIMIT_NOFILE)
+    if hard == resource.RLIM_INFINITY or soft < hard:
+        resource.setrlimit(resource.RLIMIT_NOFILE, (hard, hard))
+
+
+class Probe:
+    """One marked message and the latency of each socket that received it"""
+
+    def __init__(self, expected: int):
+        self.expected = expected
+        self.sent_at = 0.0
+        self.latencies: List[float] = []
+        self.done = asyncio.Event()
+
+    def hit(self):
+        self.latencies.append((time.perf_counter() - self.sent_at) * 1000)
+        if len(self.latencies) >= self.expected:
+            self.done.set()
+
+
+class SocketLoad:
+    """Connected clients plus the probes currently waiting for deliveries"""
+
+    def __init__(self, api_base_url: str, token: str, connect_timeout: float):
+        self.api_base_url = api_base_url
+        self.token = token
+        self.connect_timeout = connect_timeout
+        self.clients: List[socketio.AsyncClient] = []
+        self.probes: Dict[str, Probe] = {}
+
+    def _new_client(self) -> socketio.AsyncClient:
+        sio = socketio.AsyncClient(reconnection=False)
+
+        # Probes are keyed by a unique title / message content
+        async def on_notification(data):
+            probe = self.probes.get((data or {}).get("title"))
+            if probe:
+                probe.hit()
+
+        async def on_chat_message(data):
+            probe = self.probes.get((data or {}).get("Content"))
+            if probe:
+                probe.hit()
+
+        sio.on("notification-created", on_notification)
+        sio.on("chat:message", on_chat_message)
+        return sio
+
+    async def connect_more(self, count: int, concurrency: int, stats: LatencyStats, label: str) -> dict:
+        """Connect `count` new clients with at most `concurrency` handshakes in flight"""
+        gate = asyncio.Semaphore(concurrency)
+        failures = 0
+
+        async def connect_one():
+            nonlocal failures
+            sio = self._new_client()
+            async with gate:
+                start = time.perf_counter()
+                try:
+                    await sio.connect(self.api_base_url, auth={"token": self.token},
+                                      transports=["websocket"], wait_timeout=self.connect_timeout)
+                except (socketio.exceptions.ConnectionError, asyncio.TimeoutError) as e:
+                    failures += 1
+                    stats.record_error(label, f"{type(e).__name__}: {e}")
+                    return
+                stats.record(label, (time.perf_counter() - start) * 1000)
+            self.clients.append(sio)
+
+        started = time.perf_counter()
+        await asyncio.gather(*(connect_one() for _ in range(count)))
+        storm_s = time.perf_counter() - started
+        return {
+            "attempted": count,
+            "connect_failures": failures,
+            "storm_s": round(storm_s, 3),
+            "connects_per_s": round((count - failures) / storm_s, 1) if storm_s > 0 else 0.0,
+        }
+
+    async def probe(self, send, expected: int, stats: LatencyStats, label: str, timeout: float) -> int:
+        """
+        Run `send(marker)` and wait until `expected` sockets receive the marker
+        Returns the number of sockets that missed it
+        """
+        marker = f"load-{uuid.uuid4().hex[:12]}"
+        probe = Probe(expected)
+        self.probes[marker] = probe
+        probe.sent_at = time.perf_counter()
+        try:
+            if not await send(marker):
+                stats.record_error(label, "send failed")
+                return expected
+            try:
+                await asyncio.wait_for(probe.done.wait(), timeout)
+            except asyncio.TimeoutError:
+                pass
+        finally:
+            del self.probes[marker]
+
+        for latency in probe.latencies:
+            stats.record(label, latency)
+        missed = expected - len(probe.latencies)
+        for _ in range(max(missed, 0)):
+            stats.record_error(label, f"not delivered within {timeout}s")
+        return max(missed, 0)
+
+    async def join_chat_room(self, clients: List[socketio.AsyncClient], room_id: str):
+        await asyncio.gather(*(sio.emit("chat:join-room", {"roomId": room_id}) for sio in clients))
+
+    async def wait_for_room(self, send, expected: int, timeout: float):
+        """
+        Joins are checked against the DB asynchronously, so send unrecorded
+        warm-up messages until one reaches every socket (or `timeout` passes)
+        """
+        deadline = time.monotonic() + timeout
+        while time.monotonic() < deadline:
+            if await self.probe(send, expected, LatencyStats(), "warm-up", 0.5) == 0:
+                return
+
+    async def close(self):
+        await asyncio.gather(*(sio.disconnect() for sio in self.clients), return_exceptions=True)
+        self.clients.clear()
+
+
+async def timed_post(client: httpx.AsyncClient, stats: LatencyStats, label: str, url: str, body: dict):
+    start = time.perf_counter()
+    try:
+        resp = await client.post(url, json=body)
+    except httpx.HTTPError as e:
+        stats.record_error(label, f"{type(e).__name__}: {e}")
+        return None
+    ok = resp.status_code < 400
+    stats.record(label, (time.perf_counter() - start) * 1000, ok, None if ok else f"{resp.status_code} {resp.text}")
+    return resp if ok else None
+
+
+async def open_chat_room(instructor: httpx.AsyncClient, recipient_id: str) -> Optional[str]:
+    """Direct room between the instructor and the load user, or None if DMs are disabled"""
+    resp = await instructor.post("/chat/rooms/direct", json={"recipientId": recipient_id})
+    if resp.status_code >= 400:
+        print(f"Chat fan-out disabled: could not open a direct room ({resp.status_code} {resp.text})")
+        return None
+    return resp.json().get("Id")
+
+
+async def run(stages: List[int], probes: int, role: str = "student", connect_concurrency: int = 200,
+              connect_timeout: float = 10.0, delivery_timeout: float = 10.0, max_error_rate: float = 0.05,
+              chat: bool = True, api_base_url: str = API_BASE_URL) -> dict:
+    raise_open_file_limit()
+
+    pool = AuthSessionPool(api_base_url)
+    try:
+        _, token, user_id = pool.get(role)
+        instructor_token = pool.get("instructor")[1] if chat else None
+    finally:
+        pool.close()
+
+    connect_stats, notification_stats, chat_stats, rest_stats = (LatencyStats() for _ in range(4))
+    load = SocketLoad(api_base_url, token, connect_timeout)
+    stage_results = []
+    saturated_at = None
+    started = time.monotonic()
+
+    async with httpx.AsyncClient(base_url=f"{api_base_url}/api", timeout=30.0,
+                                 headers={"Authorization": f"Bearer {token}"}) as user_api, \
+            httpx.AsyncClient(base_url=f"{api_base_url}/api", timeout=30.0,
+                              headers={"Authorization": f"Bearer {instructor_token}"}) as instructor_api:
+
+        room_id = await open_chat_room(instructor_api, user_id) if chat else None
+
+        async def send_notification(marker):
+            resp = await timed_post(user_api, rest_stats, "POST /api/notifications/test",
+                                    "/notifications/test", {"title": marker, "message": "load probe"})
+            # notificationId is null when the user's preferences block the test notification
+            return bool(resp is not None and resp.json().get("notificationId"))
+
+        async def send_chat(marker):
+            resp = await timed_post(instructor_api, rest_stats, "POST /api/chat/rooms/:id/messages",
+                                    f"/chat/rooms/{room_id}/messages", {"content": marker})
+            return resp is not None
+
+        try:
+            for target in stages:
+                new_count = target - len(load.clients)
+                if new_count <= 0:
+                    continue
+                before = len(load.clients)
+                stage = {"target": target}
+                stage.update(await load.connect_more(new_count, connect_concurrency, connect_stats,
+                                                     f"connect (stage {target})"))
+                connected = len(load.clients)
+                stage["connected"] = connected
+                print(f"Stage {target}: {connected} connected, {stage['connect_failures']} failed "
+                      f"in {stage['storm_s']}s")
+
+                missed = 0
+                for _ in range(probes):
+                    missed += await load.probe(send_notification, connected, notification_stats,
+                                               f"notification @{connected} sockets", delivery_timeout)
+
+                if room_id:
+                    await load.join_chat_room(load.clients[before:], room_id)
+                    await load.wait_for_room(send_chat, connected, delivery_timeout)
+                    for _ in range(probes):
+                        missed += await load.probe(send_chat, connected, chat_stats,
+                                                   f"chat fan-out room={connected}", delivery_timeout)
+
+                deliveries = probes * connected * (2 if room_id else 1)
+                stage["missed_deliveries"] = missed
+                stage["error_rate"] = round(
+                    (stage["connect_failures"] + missed) / (new_count + deliveries), 4)
+                stage_results.append(stage)
+
+                if stage["error_rate"] > max_error_rate:
+                    saturated_at = target
+                    print(f"Error rate {stage['error_rate']:.1%} exceeds {max_error_rate:.1%}; stopping")
+                    break
+        finally:
+            await load.close()
+
+    elapsed = time.monotonic() - started
+    config = {
+        "api_base_url": api_base_url,
+        "role": role,
+        "stages": stages,
+        "probes_per_stage": probes,
+        "connect_concurrency": connect_concurrency,
+        "max_error_rate": max_error_rate,
+        "chat_room_id": room_id,
+        "duration_s": round(elapsed, 2),
+    }
+    sections = {
+        "Connect storm": connect_stats.summary(elapsed),
+        "Notification delivery": notification_stats.summary(elapsed),
+        "Chat fan-out": chat_stats.summary(elapsed),
+        "Probe requests": rest_stats.summary(elapsed),
+    }
+    return {"config": config, "sections": sections,
+            "extra": {"stages": stage_results, "saturated_at": saturated_at}}
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Socket.IO load generator and latency probe")
+    parser.add_argument("--stages", default="100,500,1000", help="Cumulative client counts, comma separated")
+    parser.add_argument("--probes", type=int, default=5, help="Notification and chat probes per stage")
+    parser.add_argument("--role", default="student", help="Account role every socket authenticates as")
+    parser.add_argument("--connect-concurrency", type=int, default=200, help="Handshakes in flight")
+    parser.add_argument("--connect-timeout", type=float, default=10.0)
+    parser.add_argument("--delivery-timeout", type=float, default=10.0)
+    parser.add_argument("--max-error-rate", type=float, default=0.05,
+                        help="Stop at the first stage above this connect/delivery failure rate")
+    parser.add_argument("--no-chat", action="store_true", help="Skip the chat fan-out probe")
+    parser.add_argument("--api-base-url", default=API_BASE_URL)
+    args = parser.parse_args(argv)
+
+    stages = sorted(int(s) for s in args.stages.split(",") if s.strip())
+    outcome = asyncio.run(run(stages, args.probes, args.role, args.connect_concurrency, args.connect_timeout,
+                              args.delivery_timeout, args.max_error_rate, not args.no_chat, args.api_base_url))
+
+    for title, rows in outcome["sections"].items():
+        print_summary(title, rows)
+    saturated_at = outcome["extra"]["saturated_at"]
+    print(f"\nSaturated at: {saturated_at if saturated_at else 'not reached'}")
+    path = write_report("socket-load", outcome["config"], outcome["sections"], outcome["extra"])
+    print(f"Report: {path} (+ .html)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,128 @@
+"""
+Latency statistics and JSON/HTML report output shared by the load tools
+"""
+import html
+import json
+import math
+import pathlib
+import time
+from typing import Dict, List, Optional
+
+REPORTS_DIR = pathlib.Path("tests/reports/load")
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list (0.0 if empty)"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, math.ceil(pct / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+class LatencyStats:
+    """
+    Latency samples and error counts, grouped by a label such as
+    "GET /api/courses" or "notification-created"
+    """
+
+    def __init__(self):
+        self._samples: Dict[str, List[float]] = {}
+        self._errors: Dict[str, int] = {}
+        self._error_examples: Dict[str, str] = {}
+
+    def record(self, label: str, latency_ms: float, ok: bool = True, error: Optional[str] = None):
+        self._samples.setdefault(label, []).append(latency_ms)
+        if not ok:
+            self._errors[label] = self._errors.get(label, 0) + 1
+            if error and label not in self._error_examples:
+                self._error_examples[label] = error[:200]
+
+    def record_error(self, label: str, error: str):
+        """Record a failure that has no meaningful latency (e.g. connection refused)"""
+        self._samples.setdefault(label, [])
+        self._errors[label] = self._errors.get(label, 0) + 1
+        self._error_examples.setdefault(label, error[:200])
+
+    def summary(self, duration_s: float) -> Dict[str, dict]:
+        """Per-label count, error rate, throughput and latency percentiles (ms)"""
+        result = {}
+        for label in sorted(self._samples):
+            values = sorted(self._samples[label])
+            errors = self._errors.get(label, 0)
+            count = len(values) + (errors if not values else 0)
+            result[label] = {
+                "count": count,
+                "errors": errors,
+                "error_rate": round(errors / count, 4) if count else 0.0,
+                "rps": round(len(values) / duration_s, 2) if duration_s > 0 else 0.0,
+                "mean_ms": round(sum(values) / len(values), 2) if values else 0.0,
+                "p50_ms": round(percentile(values, 50), 2),
+                "p95_ms": round(percentile(values, 95), 2),
+                "p99_ms": round(percentile(values, 99), 2),
+                "max_ms": round(values[-1], 2) if values else 0.0,
+            }
+            if label in self._error_examples:
+                result[label]["error_example"] = self._error_examples[label]
+        return result
+
+
+def write_report(name: str, config: dict, sections: Dict[str, Dict[str, dict]],
+                 extra: Optional[dict] = None) -> pathlib.Path:
+    """
+    Write <name>-<timestamp>.json and .html under tests/reports/load/
+    `sections` maps a table title to the output of LatencyStats.summary()
+    Returns the JSON path
+    """
+    REPORTS_DIR.mkdir(parents=True, exist_ok=True)
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    json_path = REPORTS_DIR / f"{name}-{stamp}.json"
+    html_path = REPORTS_DIR / f"{name}-{stamp}.html"
+
+    payload = {"name": name, "generated_at": stamp, "config": config, "results": sections}
+    if extra:
+        payload.update(extra)
+    json_path.write_text(json.dumps(payload, indent=2))
+    html_path.write_text(_render_html(name, config, sections, extra or {}))
+    return json_path
+
+
+def _render_html(name: str, config: dict, sections: Dict[str, Dict[str, dict]], extra: dict) -> str:
+    columns = ["count", "errors", "error_rate", "rps", "mean_ms", "p50_ms", "p95_ms", "p99_ms", "max_ms"]
+    parts = [
+        "<!DOCTYPE html><html><head><meta charset='utf-8'>",
+        f"<title>{html.escape(name)} load report</title>",
+        "<style>body{font-family:sans-serif;margin:2em}table{border-collapse:collapse;margin-bottom:2em}"
+        "th,td{border:1px solid #ccc;padding:4px 8px;text-align:right}th:first-child,td:first-child{text-align:left}"
+        ".bad{background:#fdd}</style></head><body>",
+        f"<h1>{html.escape(name)}</h1>",
+        "<h2>Configuration</h2><table>",
+    ]
+    for key, value in config.items():
+        parts.append(f"<tr><td>{html.escape(str(key))}</td><td>{html.escape(str(value))}</td></tr>")
+    parts.append("</table>")
+
+    for key, value in extra.items():
+        parts.append(f"<h2>{html.escape(str(key))}</h2><pre>{html.escape(json.dumps(value, indent=2))}</pre>")
+
+    for title, rows in sections.items():
+        parts.append(f"<h2>{html.escape(title)}</h2><table><tr><th>Label</th>")
+        parts.extend(f"<th>{col}</th>" for col in columns)
+        parts.append("</tr>")
+        for label, row in rows.items():
+            css = " class='bad'" if row.get("errors") else ""
+            parts.append(f"<tr{css}><td>{html.escape(label)}</td>")
+            parts.extend(f"<td>{row.get(col, '')}</td>" for col in columns)
+            parts.append("</tr>")
+        parts.append("</table>")
+
+    parts.append("</body></html>")
+    return "".join(parts)
+
+
+def print_summary(title: str, rows: Dict[str, dict]):
+    """Print a summary table to stdout"""
+    print(f"\n{title}")
+    print(f"{'label':<50} {'count':>7} {'err%':>6} {'rps':>8} {'p50':>8} {'p95':>8} {'p99':>8}")
+    for label, row in rows.items():
+        print(f"{label:<50} {row['count']:>7} {row['error_rate'] * 100:>5.1f}% {row['rps']:>8} "
+              f"{row['p50_ms']:>8} {row['p95_ms']:>8} {row['p99_ms']:>8}")
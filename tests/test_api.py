@@ -7,3 +7,42 @@ class TestAPI:
     """Test REST API endpoints"""
     
     pass
+
+
+@pytest.mark.api
+@pytest.mark.benchmark
+@pytest.mark.serial  # Timings are only comparable without other tests loading the server
+class TestAPIBenchmarks:
+    """Hot API paths timed against tests/reports/benchmarks/baseline.json (run with --benchmark)"""
+
+    def test_course_search(self, benchmark, api_client, api_base_url):
+        session, _, _ = api_client
+        benchmark(
+            "GET /api/courses?search=",
+            lambda: session.get(f"{api_base_url}/api/courses", params={"search": "python"})
+        )
+
+    def test_course_catalog(self, benchmark, api_client, api_base_url):
+        session, _, _ = api_client
+        benchmark(
+            "GET /api/courses",
+            lambda: session.get(f"{api_base_url}/api/courses", params={"page": 1, "limit": 12})
+        )
+
+    def test_notifications_list(self, benchmark, api_client, api_base_url):
+        session, _, _ = api_client
+        benchmark("GET /api/notifications", lambda: session.get(f"{api_base_url}/api/notifications"))
+
+    def test_notifications_unread_count(self, benchmark, api_client, api_base_url):
+        session, _, _ = api_client
+        benchmark(
+            "GET /api/notifications/unread-count",
+            lambda: session.get(f"{api_base_url}/api/notifications/unread-count")
+        )
+
+    def test_my_enrollments(self, benchmark, api_client, api_base_url):
+        session, _, _ = api_client
+        benchmark(
+            "GET /api/enrollment/my-enrollments",
+            lambda: session.get(f"{api_base_url}/api/enrollment/my-enrollments")
+        )
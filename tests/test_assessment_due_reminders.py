@@ -16,6 +16,7 @@ import time
 
 @pytest.mark.notifications
 @pytest.mark.e2e
+@pytest.mark.serial  # Triggers a scheduler job that fans out to every student
 class TestAssessmentDueReminders:
     """Test Assessment Due Date Reminder notifications"""
 
@@ -27,7 +28,8 @@ class TestAssessmentDueReminders:
         api_client_instructor,
         api_client,
         instructor_credentials: dict,
-        student_credentials: dict
+        student_credentials: dict,
+        namespaced
     ):
         """
         Complete E2E test for Assessment Due Date Reminders
@@ -56,7 +58,7 @@ class TestAssessmentDueReminders:
         # ====== STEP 1: Instructor creates a course ======
         print("📚 STEP 1: Creating course as instructor...")
         course_data = {
-            "title": f"Test Course - Due Reminders {datetime.now().timestamp()}",
+            "title": namespaced(f"Test Course - Due Reminders {datetime.now().timestamp()}"),
             "description": "Course for testing assessment due date reminders",
             "category": "Test",
             "level": "beginner",
@@ -21,26 +21,17 @@ import time
 import json
 
 
+@pytest.mark.login_as("instructor")
 class TestAtRiskStudentAlerts:
     """Test at-risk student alerts notification settings and functionality"""
 
     @pytest.fixture(autouse=True)
-    def setup_instructor(self, page: Page, base_url: str, instructor_credentials: dict):
+    def setup_instructor(self, page: Page, base_url: str, waits):
         """
         Navigate to notification settings before each test as INSTRUCTOR
         At-Risk Alerts are instructor-only notifications
+        (the browser context starts logged in via the login_as marker)
         """
-        # Login as instructor
-        page.goto(f"{base_url}/login")
-        page.wait_for_load_state("networkidle")
-        
-        page.fill('[data-testid="login-email-input"]', instructor_credentials['email'])
-        page.fill('[data-testid="login-password-input"]', instructor_credentials['password'])
-        page.click('[data-testid="login-submit-button"]')
-        
-        # Wait for dashboard
-        page.wait_for_url(re.compile(r".*/dashboard.*"), timeout=15000)
-        
         # Navigate to notification settings
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
@@ -49,9 +40,9 @@ class TestAtRiskStudentAlerts:
         yield
         
         # Cleanup: Reset to default settings after each test
-        self._reset_to_defaults(page)
+        self._reset_to_defaults(page, waits)
 
-    def _reset_to_defaults(self, page: Page):
+    def _reset_to_defaults(self, page: Page, waits):
         """Helper to reset notification settings to defaults"""
         try:
             # Turn on global toggles
@@ -64,10 +55,7 @@ class TestAtRiskStudentAlerts:
                 email_switch.check()
             
             # Expand system alerts accordion
-            system_accordion = page.locator('[data-testid="notifications-settings-category-system-accordion"]')
-            if not system_accordion.locator('[data-expanded="true"]').count() > 0:
-                page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-                page.wait_for_timeout(300)
+            waits.expand_category("system")
             
             # Reset risk alerts to NULL (inherit) by shift-clicking
             risk_alerts_inapp = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -80,8 +68,7 @@ class TestAtRiskStudentAlerts:
             page.keyboard.up('Shift')
             
             # Save
-            page.click('[data-testid="notifications-settings-save-button"]')
-            page.wait_for_timeout(1000)
+            waits.save_notification_settings()
         except:
             pass  # Best effort cleanup
 
@@ -90,11 +77,10 @@ class TestAtRiskStudentAlerts:
     # ================================================================
 
     @pytest.mark.smoke
-    def test_risk_alerts_ui_elements_exist(self, page: Page):
+    def test_risk_alerts_ui_elements_exist(self, page: Page, waits):
         """Test that At-Risk Student Alerts UI elements render with correct test IDs"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Verify risk alerts label exists
         risk_alerts_section = page.locator('text=At-Risk Student Alerts')
@@ -120,11 +106,10 @@ class TestAtRiskStudentAlerts:
         assert email_input.count() == 1, "Email switch input should exist"
 
     @pytest.mark.smoke
-    def test_risk_alerts_positioned_after_security_alerts(self, page: Page):
+    def test_risk_alerts_positioned_after_security_alerts(self, page: Page, waits):
         """Test that At-Risk Student Alerts appear after Security Alerts in System category"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Get all subcategory labels in System Alerts
         system_accordion = page.locator('[data-testid="notifications-settings-category-system-accordion"]')
@@ -143,11 +128,10 @@ class TestAtRiskStudentAlerts:
     # ================================================================
 
     @pytest.mark.smoke
-    def test_risk_alerts_inapp_toggle(self, page: Page):
+    def test_risk_alerts_inapp_toggle(self, page: Page, waits):
         """Test in-app toggle for At-Risk Student Alerts"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         
@@ -166,11 +150,10 @@ class TestAtRiskStudentAlerts:
         assert not inapp_input.is_checked(), "In-app switch should be OFF"
 
     @pytest.mark.smoke
-    def test_risk_alerts_email_toggle(self, page: Page):
+    def test_risk_alerts_email_toggle(self, page: Page, waits):
         """Test email toggle for At-Risk Student Alerts"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         email_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-email-switch"] input')
         
@@ -189,11 +172,10 @@ class TestAtRiskStudentAlerts:
         assert not email_input.is_checked(), "Email switch should be OFF"
 
     @pytest.mark.smoke
-    def test_risk_alerts_both_toggles_independent(self, page: Page):
+    def test_risk_alerts_both_toggles_independent(self, page: Page, waits):
         """Test that in-app and email toggles work independently"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         email_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-email-switch"] input')
@@ -216,11 +198,10 @@ class TestAtRiskStudentAlerts:
     # PERSISTENCE TESTS
     # ================================================================
 
-    def test_risk_alerts_settings_persist_after_save(self, page: Page):
+    def test_risk_alerts_settings_persist_after_save(self, page: Page, waits):
         """Test that At-Risk Student Alerts settings persist after save and reload"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         email_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-email-switch"] input')
@@ -230,7 +211,7 @@ class TestAtRiskStudentAlerts:
         email_input.uncheck()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         
         # Wait for success toast
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
@@ -241,8 +222,7 @@ class TestAtRiskStudentAlerts:
         page.wait_for_selector('[data-testid="notifications-settings-save-button"]', state='visible')
         
         # Expand System Alerts accordion again
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Verify persistence
         inapp_after = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -251,11 +231,10 @@ class TestAtRiskStudentAlerts:
         assert inapp_after.is_checked(), "In-app setting should persist as ON"
         assert not email_after.is_checked(), "Email setting should persist as OFF"
 
-    def test_risk_alerts_both_channels_persist(self, page: Page):
+    def test_risk_alerts_both_channels_persist(self, page: Page, waits):
         """Test that both in-app and email settings persist when both enabled"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         email_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-email-switch"] input')
@@ -265,15 +244,14 @@ class TestAtRiskStudentAlerts:
         email_input.check()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload
         page.reload()
         page.wait_for_load_state("networkidle")
         page.wait_for_selector('[data-testid="notifications-settings-save-button"]', state='visible')
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Verify both persisted
         inapp_after = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -286,11 +264,10 @@ class TestAtRiskStudentAlerts:
     # INHERITANCE TESTS
     # ================================================================
 
-    def test_risk_alerts_inherit_from_system_category(self, page: Page):
+    def test_risk_alerts_inherit_from_system_category(self, page: Page, waits):
         """Test that Risk Alerts inherit from System Alerts category when NULL"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Get System Alerts category switch
         system_switch = page.locator('[data-testid="notifications-settings-category-system-switch"] input')
@@ -304,8 +281,6 @@ class TestAtRiskStudentAlerts:
         inapp_input.click()
         page.keyboard.up('Shift')
         
-        page.wait_for_timeout(500)
-        
         # Verify inherit indicator appears
         inherit_text = page.locator('text=/Inherit:/i')
         expect(inherit_text.first).to_be_visible()
@@ -315,11 +290,10 @@ class TestAtRiskStudentAlerts:
         current_state = inapp_input.is_checked()
         assert current_state == system_enabled, f"Risk alerts should inherit from System category (expected {system_enabled})"
 
-    def test_risk_alerts_explicit_override_vs_inherit(self, page: Page):
+    def test_risk_alerts_explicit_override_vs_inherit(self, page: Page, waits):
         """Test explicit ON/OFF vs inherit mode for Risk Alerts"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         
@@ -333,14 +307,13 @@ class TestAtRiskStudentAlerts:
             inapp_input.uncheck()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload
         page.reload()
         page.wait_for_load_state("networkidle")
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Verify: System ON, Risk Alerts explicitly OFF (should NOT inherit)
         system_after = page.locator('[data-testid="notifications-settings-category-system-switch"] input')
@@ -349,11 +322,10 @@ class TestAtRiskStudentAlerts:
         assert system_after.is_checked(), "System should be ON"
         assert not risk_after.is_checked(), "Risk alerts should be explicitly OFF (not inheriting)"
 
-    def test_risk_alerts_category_off_cascades_to_subcategory(self, page: Page):
+    def test_risk_alerts_category_off_cascades_to_subcategory(self, page: Page, waits):
         """Test that turning OFF System category disables Risk Alerts even if explicitly ON"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Explicitly turn risk alerts ON
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -366,7 +338,7 @@ class TestAtRiskStudentAlerts:
             system_switch.uncheck()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # The UI should show risk alerts as disabled (grayed out) even though explicitly ON
@@ -405,6 +377,8 @@ class TestAtRiskStudentAlerts:
         assert prefs['EmailRiskAlerts'] == False, "EmailRiskAlerts should be False"
 
     @pytest.mark.integration
+    @pytest.mark.serial
+    @pytest.mark.seeded  # Needs the seeded instructor's enrolled students
     def test_risk_alerts_manual_trigger_endpoint(self, api_client_instructor, api_base_url: str):
         """Test the manual at-risk detection trigger endpoint"""
         session, auth_token, user_id = api_client_instructor
@@ -434,15 +408,16 @@ class TestAtRiskStudentAlerts:
                 assert 'courses' in result
 
     @pytest.mark.integration
-    def test_risk_alerts_notification_blocked_when_disabled(self, page: Page, api_client_instructor, api_base_url: str, base_url: str):
+    @pytest.mark.serial
+    @pytest.mark.seeded  # Needs the seeded instructor's enrolled students
+    def test_risk_alerts_notification_blocked_when_disabled(self, page: Page, api_client_instructor, api_base_url: str, base_url: str, waits):
         """Test that Risk Alerts notifications are blocked when settings are disabled"""
         session, auth_token, user_id = api_client_instructor
         
         # Navigate to settings and disable risk alerts
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Disable both in-app and email
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -452,11 +427,9 @@ class TestAtRiskStudentAlerts:
         email_input.uncheck()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
-        page.wait_for_timeout(1000)
-        
         # Get notification count before trigger
         notif_response_before = session.get(f"{api_base_url}/api/notifications")
         assert notif_response_before.status_code == 200
@@ -468,8 +441,6 @@ class TestAtRiskStudentAlerts:
             json={}
         )
         
-        page.wait_for_timeout(2000)
-        
         # Get notification count after trigger
         notif_response_after = session.get(f"{api_base_url}/api/notifications")
         assert notif_response_after.status_code == 200
@@ -495,15 +466,16 @@ class TestAtRiskStudentAlerts:
             "Risk alert notification should be blocked when settings disabled"
 
     @pytest.mark.integration
-    def test_risk_alerts_notification_received_when_enabled(self, page: Page, api_client_instructor, api_base_url: str, base_url: str):
+    @pytest.mark.serial
+    @pytest.mark.seeded  # Needs the seeded instructor's enrolled students
+    def test_risk_alerts_notification_received_when_enabled(self, page: Page, api_client_instructor, api_base_url: str, base_url: str, waits):
         """Test that Risk Alerts notifications are received when settings are enabled"""
         session, auth_token, user_id = api_client_instructor
         
         # Navigate to settings and enable risk alerts
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Enable in-app notifications
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -511,19 +483,15 @@ class TestAtRiskStudentAlerts:
             inapp_input.check()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
-        page.wait_for_timeout(1000)
-        
         # Trigger at-risk detection
         trigger_response = session.post(
             f"{api_base_url}/api/instructor/test-at-risk-detection",
             json={}
         )
         
-        page.wait_for_timeout(2000)
-        
         # Get notifications
         notif_response = session.get(f"{api_base_url}/api/notifications")
         assert notif_response.status_code == 200
@@ -536,7 +504,7 @@ class TestAtRiskStudentAlerts:
     # EDGE CASES
     # ================================================================
 
-    def test_risk_alerts_cannot_enable_if_global_disabled(self, page: Page):
+    def test_risk_alerts_cannot_enable_if_global_disabled(self, page: Page, waits):
         """Test that Risk Alerts are blocked if global in-app notifications are disabled"""
         # Disable global in-app notifications
         global_inapp = page.locator('[data-testid="notifications-settings-enable-in-app-switch"] input')
@@ -544,8 +512,7 @@ class TestAtRiskStudentAlerts:
             global_inapp.uncheck()
         
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Try to enable risk alerts in-app
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
@@ -553,13 +520,13 @@ class TestAtRiskStudentAlerts:
             inapp_input.check()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # The hierarchy logic: Global OFF should override all subcategory settings
         # This is a cascade effect tested at the backend level
 
-    def test_risk_alerts_only_visible_to_instructors(self, page: Page, base_url: str, student_credentials: dict, switch_user):
+    def test_risk_alerts_only_visible_to_instructors(self, page: Page, base_url: str, student_credentials: dict, instructor_credentials: dict, switch_user, waits):
         """Test that At-Risk Student Alerts are visible in settings (even for students, but only relevant for instructors)"""
         # Note: The UI shows all settings to all users, but the notifications are only sent to instructors
         # This test verifies that the setting exists in the UI and description indicates instructor-only
@@ -570,8 +537,7 @@ class TestAtRiskStudentAlerts:
         # Navigate to settings
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         # Verify risk alerts section exists
         risk_alerts_label = page.locator('text=At-Risk Student Alerts')
@@ -582,13 +548,12 @@ class TestAtRiskStudentAlerts:
         expect(description).to_be_visible()
         
         # Switch back to instructor for cleanup (autouse fixture expects instructor context)
-        switch_user("s.mishin.dev+ins1@gmail.com", "Aa123456")
+        switch_user(instructor_credentials['email'], instructor_credentials['password'])
 
-    def test_risk_alerts_multiple_changes_before_save(self, page: Page):
+    def test_risk_alerts_multiple_changes_before_save(self, page: Page, waits):
         """Test that multiple toggle changes work correctly before saving"""
         # Expand System Alerts accordion
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         email_input = page.locator('[data-testid="notifications-settings-system-risk-alerts-email-switch"] input')
@@ -607,14 +572,13 @@ class TestAtRiskStudentAlerts:
         assert not email_input.is_checked()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload and verify final state persisted
         page.reload()
         page.wait_for_load_state("networkidle")
-        page.click('[data-testid="notifications-settings-category-system-accordion-summary"]')
-        page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         inapp_after = page.locator('[data-testid="notifications-settings-system-risk-alerts-inapp-switch"] input')
         email_after = page.locator('[data-testid="notifications-settings-system-risk-alerts-email-switch"] input')
@@ -4,6 +4,7 @@ from playwright.sync_api import Page, expect
 import re
 
 
+@pytest.mark.serial  # Logs in as the shared seeded student by email
 class TestAuthentication:
     """Test user authentication flows"""
     
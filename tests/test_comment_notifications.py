@@ -30,6 +30,7 @@ import re
 import time
 
 
+@pytest.mark.login_as("student")
 class TestCommentNotifications:
     """Test notification system for new comments on courses/lessons"""
 
@@ -52,19 +53,7 @@ class TestCommentNotifications:
         # Clear any existing notifications
         clear_notifications()
         
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.wait_for_load_state("networkidle")
-        
-        page.fill('[data-testid="login-email-input"]', student_credentials['email'])
-        page.fill('[data-testid="login-password-input"]', student_credentials['password'])
-        page.click('[data-testid="login-submit-button"]')
-        
-        # Wait for dashboard
-        page.wait_for_url(re.compile(r".*/dashboard.*"), timeout=15000)
-        page.wait_for_load_state("networkidle")
-        
-        # Navigate to notification settings
+        # Navigate to notification settings (already logged in via login_as marker)
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         page.wait_for_selector('[data-testid="notifications-settings-save-button"]', state='visible')
@@ -211,6 +200,7 @@ class TestCommentNotifications:
     # ================================================================
 
     @pytest.mark.integration
+    @pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
     def test_new_comment_on_lesson_sends_notification(
         self,
         page: Page,
@@ -335,6 +325,7 @@ class TestCommentNotifications:
         expect(notification_menu.locator('text=/comment|posted|new/i').first).to_be_visible(timeout=5000)
 
     @pytest.mark.integration
+    @pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
     def test_comment_author_does_not_receive_own_notification(
         self,
         page: Page,
@@ -342,7 +333,8 @@ class TestCommentNotifications:
         get_enrolled_course,
         get_notification_count,
         clear_notifications,
-        student_credentials: dict
+        student_credentials: dict,
+        waits
     ):
         """
         Test that comment author does NOT receive notification about their own comment
@@ -380,6 +372,7 @@ class TestCommentNotifications:
         
         # Get initial notification count (should be 0)
         initial_count = get_notification_count()
+        mark = waits.socket_mark()
         
         # Post a comment
         comments_section = page.locator('[data-testid="comments-section-lesson"]')
@@ -393,24 +386,25 @@ class TestCommentNotifications:
         page.click('[data-testid="comment-submit-button"]')
         
         # Wait for comment to be posted
-        page.wait_for_timeout(2000)
+        expect(page.locator(f'text="{comment_text}"').first).to_be_visible(timeout=5000)
         
-        # Reload page to refresh notification count
-        page.reload()
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(1000)
+        # Fail fast if a notification reaches the author's bell
+        waits.expect_no_bell_change(initial_count, settle_ms=2000)
         
         # Get final notification count
         final_count = get_notification_count()
         
         # Should NOT increase (author doesn't get notified about own comment)
         assert final_count == initial_count, f"Author should NOT receive notification about own comment. Initial: {initial_count}, Final: {final_count}"
+        pushed = [name for name, _ in waits.socket_events[mark:] if name == "notification-created"]
+        assert not pushed, "Author should NOT be pushed a notification-created event for own comment"
 
     # ================================================================
     # INTEGRATION TESTS - COURSE COMMENTS
     # ================================================================
 
     @pytest.mark.integration
+    @pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
     def test_new_comment_on_course_sends_notification(
         self,
         page: Page,
@@ -497,6 +491,7 @@ class TestCommentNotifications:
     # ================================================================
 
     @pytest.mark.integration
+    @pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
     def test_comment_notification_blocked_when_disabled(
         self,
         page: Page,
@@ -597,6 +592,7 @@ class TestCommentNotifications:
         assert final_count == initial_count, f"Comment notification should be BLOCKED. Initial: {initial_count}, Final: {final_count}"
 
     @pytest.mark.integration
+    @pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
     def test_comment_notification_blocked_when_community_category_disabled(
         self,
         page: Page,
@@ -690,6 +686,7 @@ class TestCommentNotifications:
     # REPLY COMMENT TESTS (EXISTING FEATURE - REGRESSION TEST)
     # ================================================================
 
+    @pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
     def test_reply_to_comment_still_works(
         self,
         page: Page,
@@ -725,6 +722,7 @@ class TestCommentNotifications:
 # ADDITIONAL TEST CLASS FOR API-LEVEL TESTING
 # ================================================================
 
+@pytest.mark.seeded  # Comments on a course the seeded student is enrolled in
 class TestCommentNotificationsAPI:
     """
     API-level tests for comment notification system
@@ -0,0 +1,105 @@
+"""
+Lesson Progress Tests
+
+Course progress is kept incrementally: CourseProgress.ProgressPoints is the sum of the
+student's lesson percentages and OverallProgress = ProgressPoints / LessonCount.
+These tests check that deleting a lesson takes its points out again, so a later
+completion cannot finish the course (and issue a certificate) too early.
+"""
+import pytest
+from datetime import datetime
+
+
+@pytest.mark.courses
+@pytest.mark.integration
+class TestLessonProgress:
+    """Course progress when the instructor changes the lesson list"""
+
+    def _create_course_with_lessons(self, instructor_session, api_base_url: str, namespaced, count: int):
+        course_response = instructor_session.post(
+            f"{api_base_url}/api/instructor/courses",
+            json={
+                "title": namespaced(f"Test Course - Lesson Progress {datetime.now().timestamp()}"),
+                "description": "Course for testing course progress after lesson changes",
+                "category": "Test",
+                "level": "beginner",
+                "price": 0.00,
+                "thumbnail": "https://via.placeholder.com/300"
+            }
+        )
+        assert course_response.status_code == 201, f"Failed to create course: {course_response.text}"
+        course = course_response.json()
+        course_id = course.get('id') or course.get('Id')
+        assert course_id, f"No course ID in response: {course}"
+
+        publish_response = instructor_session.post(f"{api_base_url}/api/instructor/courses/{course_id}/publish")
+        assert publish_response.status_code == 200, f"Failed to publish course: {publish_response.text}"
+
+        lesson_ids = []
+        for i in range(1, count + 1):
+            lesson_response = instructor_session.post(
+                f"{api_base_url}/api/lessons",
+                json={
+                    "courseId": course_id,
+                    "title": f"Lesson {i} - Progress Test",
+                    "description": f"Test lesson {i} description",
+                    "content": [{"type": "text", "data": {"text": f"Lesson {i} content"}}],
+                    "orderIndex": i,
+                    "duration": 10,
+                    "isRequired": True
+                }
+            )
+            assert lesson_response.status_code == 201, f"Failed to create lesson {i}: {lesson_response.text}"
+            lesson = lesson_response.json()
+            lesson_ids.append(lesson.get('id') or lesson.get('Id'))
+
+        return course_id, lesson_ids
+
+    def test_deleted_lesson_does_not_count_toward_completion(
+        self,
+        api_base_url: str,
+        api_client_instructor,
+        api_client,
+        namespaced
+    ):
+        """
+        Flow:
+        1. Instructor creates a course with 3 lessons, student enrolls
+        2. Student completes lesson 1 (33%)
+        3. Instructor deletes lesson 1 (2 lessons left, none completed -> 0%)
+        4. Student completes lesson 2
+        5. Progress is 50% and the enrollment is still active (lesson 3 is not done)
+        """
+        instructor_session, _, _ = api_client_instructor
+        student_session, _, _ = api_client
+
+        course_id, lesson_ids = self._create_course_with_lessons(instructor_session, api_base_url, namespaced, 3)
+
+        enroll_response = student_session.post(f"{api_base_url}/api/enrollment/courses/{course_id}/enroll")
+        assert enroll_response.status_code in [200, 201], f"Failed to enroll student: {enroll_response.text}"
+
+        complete_response = student_session.post(
+            f"{api_base_url}/api/progress/lessons/{lesson_ids[0]}/complete",
+            json={"timeSpent": 5}
+        )
+        assert complete_response.status_code == 200, f"Failed to complete lesson 1: {complete_response.text}"
+
+        delete_response = instructor_session.delete(f"{api_base_url}/api/lessons/{lesson_ids[0]}")
+        assert delete_response.status_code == 200, f"Failed to delete lesson 1: {delete_response.text}"
+
+        progress = student_session.get(f"{api_base_url}/api/progress/courses/{course_id}").json()
+        assert progress['courseProgress']['OverallProgress'] == 0, \
+            f"Deleted lesson should no longer count, got {progress['courseProgress']['OverallProgress']}%"
+
+        complete_response = student_session.post(
+            f"{api_base_url}/api/progress/lessons/{lesson_ids[1]}/complete",
+            json={"timeSpent": 5}
+        )
+        assert complete_response.status_code == 200, f"Failed to complete lesson 2: {complete_response.text}"
+
+        progress = student_session.get(f"{api_base_url}/api/progress/courses/{course_id}").json()
+        assert progress['courseProgress']['OverallProgress'] == 50, \
+            f"Expected 50% with 1 of 2 remaining lessons completed, got {progress['courseProgress']['OverallProgress']}%"
+
+        status = student_session.get(f"{api_base_url}/api/enrollment/courses/{course_id}/enrollment-status").json()
+        assert status.get('status') != 'completed', "Course must not complete while lesson 3 is unfinished"
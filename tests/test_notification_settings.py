@@ -15,23 +15,16 @@ import re
 import time
 
 
+@pytest.mark.login_as("student")
 class TestNotificationSettings:
     """Test notification settings page functionality"""
 
     @pytest.fixture(autouse=True)
-    def setup(self, page: Page, base_url: str, student_credentials: dict):
-        """Navigate to notification settings before each test"""
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.wait_for_load_state("networkidle")
-        
-        page.fill('[data-testid="login-email-input"]', student_credentials['email'])
-        page.fill('[data-testid="login-password-input"]', student_credentials['password'])
-        page.click('[data-testid="login-submit-button"]')
-        
-        # Wait for dashboard
-        page.wait_for_url(re.compile(r".*/dashboard.*"), timeout=15000)
-        
+    def setup(self, page: Page, base_url: str, waits):
+        """
+        Navigate to notification settings before each test
+        (the browser context starts logged in as student via the login_as marker)
+        """
         # Navigate to notification settings
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
@@ -40,9 +33,9 @@ class TestNotificationSettings:
         yield
         
         # Cleanup: Reset to default settings after each test
-        self._reset_to_defaults(page)
+        self._reset_to_defaults(page, waits)
 
-    def _reset_to_defaults(self, page: Page):
+    def _reset_to_defaults(self, page: Page, waits):
         """Helper to reset notification settings to defaults"""
         try:
             # Turn on global toggles
@@ -55,8 +48,7 @@ class TestNotificationSettings:
                 email_switch.check()
             
             # Save
-            page.click('[data-testid="notifications-settings-save-button"]')
-            page.wait_for_timeout(1000)
+            waits.save_notification_settings()
         except:
             pass  # Best effort cleanup
 
@@ -65,7 +57,7 @@ class TestNotificationSettings:
     # ================================================================
 
     @pytest.mark.smoke
-    def test_global_in_app_toggle(self, page: Page):
+    def test_global_in_app_toggle(self, page: Page, waits):
         """Test global in-app notifications toggle"""
         in_app_switch = page.locator('[data-testid="notifications-settings-enable-in-app-switch"] input')
         
@@ -81,7 +73,7 @@ class TestNotificationSettings:
             assert in_app_switch.is_checked()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         
         # Wait for toast message
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
@@ -117,7 +109,7 @@ class TestNotificationSettings:
         # Verify email frequency dropdown appears
         expect(frequency_select).to_be_visible()
 
-    def test_email_frequency_selection(self, page: Page):
+    def test_email_frequency_selection(self, page: Page, waits):
         """Test email digest frequency dropdown"""
         # Ensure email is enabled
         email_switch = page.locator('[data-testid="notifications-settings-enable-email-switch"] input')
@@ -135,7 +127,7 @@ class TestNotificationSettings:
         expect(frequency_select).to_have_text(re.compile('Daily Digest'))
         
         # Save and verify persistence
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         page.reload()
@@ -159,7 +151,7 @@ class TestNotificationSettings:
         
         # Click to expand
         course_summary.click()
-        page.wait_for_timeout(500)  # Animation
+        expect(course_summary).to_have_attribute("aria-expanded", "true")
         
         # Verify subcategories visible
         expect(page.locator('[data-testid="notifications-settings-course-course-enrollment-inapp-switch"] input')).to_be_visible()
@@ -176,9 +168,9 @@ class TestNotificationSettings:
         # Toggle category switch
         progress_switch = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         progress_switch.click()
-        page.wait_for_timeout(300)
         
         # Chip should toggle
+        expect(progress_chip).not_to_have_text(initial_text)
         new_text = progress_chip.inner_text()
         assert new_text != initial_text
         assert new_text in ['Enabled', 'Disabled']
@@ -187,7 +179,7 @@ class TestNotificationSettings:
     # CATEGORY TOGGLE TESTS
     # ================================================================
 
-    def test_progress_category_toggle(self, page: Page):
+    def test_progress_category_toggle(self, page: Page, waits):
         """Test Progress Updates category toggle"""
         progress_switch = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         
@@ -201,7 +193,7 @@ class TestNotificationSettings:
             progress_switch.check()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload and verify
@@ -210,7 +202,7 @@ class TestNotificationSettings:
         progress_switch_after = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         assert progress_switch_after.is_checked() == (not initial_state)
 
-    def test_all_category_switches_persist(self, page: Page):
+    def test_all_category_switches_persist(self, page: Page, waits):
         """Test all 5 category switches can be toggled and persisted"""
         categories = [
             ('progress', 'notifications-settings-category-progress-switch'),
@@ -227,7 +219,7 @@ class TestNotificationSettings:
                 switch.uncheck()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload and verify all OFF
@@ -242,7 +234,7 @@ class TestNotificationSettings:
     # SUBCATEGORY TOGGLE TESTS
     # ================================================================
 
-    def test_lesson_completion_subcategory_toggles(self, page: Page):
+    def test_lesson_completion_subcategory_toggles(self, page: Page, waits):
         """Test Lesson Completion in-app and email toggles"""
         # Progress accordion should be expanded by default
         
@@ -266,7 +258,7 @@ class TestNotificationSettings:
         assert lesson_email.is_checked()  # Email still ON
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload and verify
@@ -279,12 +271,12 @@ class TestNotificationSettings:
         assert not lesson_inapp_after.is_checked()
         assert lesson_email_after.is_checked()
 
-    def test_live_sessions_subcategory_toggles(self, page: Page):
+    def test_live_sessions_subcategory_toggles(self, page: Page, waits):
         """Test Live Sessions in-app and email toggles"""
         # Expand Course accordion
         course_summary = page.locator('[data-testid="notifications-settings-category-course-accordion-summary"]')
         course_summary.click()
-        page.wait_for_timeout(500)
+        expect(course_summary).to_have_attribute("aria-expanded", "true")
         
         # Find live sessions switches
         live_inapp = page.locator('[data-testid="notifications-settings-course-live-sessions-inapp-switch"] input')
@@ -297,7 +289,7 @@ class TestNotificationSettings:
             live_email.uncheck()
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload and verify
@@ -307,7 +299,7 @@ class TestNotificationSettings:
         # Re-expand accordion
         course_summary_after = page.locator('[data-testid="notifications-settings-category-course-accordion-summary"]')
         course_summary_after.click()
-        page.wait_for_timeout(500)
+        expect(course_summary_after).to_have_attribute("aria-expanded", "true")
         
         live_inapp_after = page.locator('[data-testid="notifications-settings-course-live-sessions-inapp-switch"] input')
         live_email_after = page.locator('[data-testid="notifications-settings-course-live-sessions-email-switch"] input')
@@ -331,21 +323,19 @@ class TestNotificationSettings:
         # Turn OFF Progress category
         progress_switch = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         progress_switch.uncheck()
-        page.wait_for_timeout(300)  # Wait for inherited state to update
         
         # Check that lesson completion switches show "Inherit: OFF"
         # Note: The switches themselves will appear unchecked because they inherit the OFF state
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         
         # The switch should appear unchecked (inheriting category OFF state)
-        assert not lesson_inapp.is_checked()
+        expect(lesson_inapp).not_to_be_checked()
         
         # Check for inherit text (appears when subcategory is NULL) - use .first since there are multiple
         expect(page.locator('text=/Inherit: OFF/i').first).to_be_visible()
         
         # Now turn category back ON
         progress_switch.check()
-        page.wait_for_timeout(500)  # Wait for inherited state to update
         
         # Subcategories should now show "Inherit: ON" text (actual checkbox state may vary for NULL inheritance)
         expect(page.locator('text=/Inherit: ON/i').first).to_be_visible()
@@ -392,7 +382,8 @@ class TestNotificationSettings:
         trigger_test_notification,
         get_notification_count,
         clear_notifications,
-        verify_notification_in_db
+        verify_notification_in_db,
+        waits
     ):
         """
         Integration Test: Lesson completion sends notification when enabled
@@ -415,9 +406,8 @@ class TestNotificationSettings:
             lesson_inapp.check()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
-        page.wait_for_timeout(1000)  # Wait for settings to propagate
         
         # Navigate to dashboard
         page.goto(f"{base_url}/dashboard")
@@ -425,6 +415,7 @@ class TestNotificationSettings:
         
         # Get initial notification count
         initial_count = get_notification_count()
+        mark = waits.socket_mark()
         
         # Trigger lesson completion notification via API
         success = trigger_test_notification('progress', 'LessonCompletion')
@@ -434,18 +425,16 @@ class TestNotificationSettings:
         db_verified = verify_notification_in_db(timeout_ms=3000)
         assert db_verified, "Notification was not created in database"
         
-        # Reload page to fetch notifications (WebSocket may not deliver in test environment)
-        page.reload()
-        page.wait_for_load_state("networkidle")
-        page.wait_for_timeout(1000)  # Wait for notification bell to fetch unread count
+        # Wait for the real-time push, then for the bell to apply it
+        waits.wait_for_socket_event("notification-created", since=mark)
+        waits.wait_for_bell_change(initial_count)
         
-        # Get final notification count after reload and verify it increased
+        # Verify the count increased
         final_count = get_notification_count()
         assert final_count >= initial_count + 1, f"Expected at least {initial_count + 1} notifications, got {final_count}"
         
         # Click bell to verify notification content
         page.click('[data-testid="notification-bell-button"]')
-        page.wait_for_timeout(500)
         
         # Verify notification menu opened and contains notification about lesson/progress
         notification_menu = page.locator('[data-testid="notification-bell-menu"]')
@@ -461,7 +450,8 @@ class TestNotificationSettings:
         base_url: str,
         trigger_test_notification,
         get_notification_count,
-        clear_notifications
+        clear_notifications,
+        waits
     ):
         """
         Integration Test: Lesson completion does NOT send notification when disabled
@@ -485,9 +475,8 @@ class TestNotificationSettings:
         lesson_inapp.uncheck()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
-        page.wait_for_timeout(1000)  # Wait for settings to propagate
         
         # Navigate to dashboard
         page.goto(f"{base_url}/dashboard")
@@ -499,8 +488,8 @@ class TestNotificationSettings:
         # Trigger lesson completion notification
         trigger_test_notification('progress', 'LessonCompletion')
         
-        # Wait a bit to ensure notification would have arrived if it was going to
-        page.wait_for_timeout(2000)
+        # Fail fast if a notification shows up in the bell
+        waits.expect_no_bell_change(initial_count)
         
         # Verify count did NOT increase
         final_count = get_notification_count()
@@ -514,7 +503,8 @@ class TestNotificationSettings:
         trigger_test_notification,
         get_notification_count,
         clear_notifications,
-        verify_notification_in_db
+        verify_notification_in_db,
+        waits
     ):
         """
         Integration Test: Live session creation sends notification when enabled
@@ -530,7 +520,7 @@ class TestNotificationSettings:
         # Expand Course accordion
         course_summary = page.locator('[data-testid="notifications-settings-category-course-accordion-summary"]')
         course_summary.click()
-        page.wait_for_timeout(500)
+        expect(course_summary).to_have_attribute("aria-expanded", "true")
         
         # Ensure Course → Live Sessions is ON
         course_switch = page.locator('[data-testid="notifications-settings-category-course-switch"] input')
@@ -542,9 +532,8 @@ class TestNotificationSettings:
             live_inapp.check()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
-        page.wait_for_timeout(1000)
         
         # Navigate to dashboard
         page.goto(f"{base_url}/dashboard")
@@ -552,6 +541,7 @@ class TestNotificationSettings:
         
         # Get initial count
         initial_count = get_notification_count()
+        mark = waits.socket_mark()
         
         # Trigger live session notification
         success = trigger_test_notification('course', 'LiveSessions')
@@ -560,9 +550,9 @@ class TestNotificationSettings:
         # Verify notification exists in database
         assert verify_notification_in_db(), "Notification not found in database"
         
-        # Reload page to fetch updated count (WebSocket doesn't work in tests)
-        page.reload()
-        page.wait_for_load_state("networkidle")
+        # Wait for the real-time push, then for the bell to apply it
+        waits.wait_for_socket_event("notification-created", since=mark)
+        waits.wait_for_bell_change(initial_count)
         
         # Verify count increased
         final_count = get_notification_count()
@@ -575,7 +565,8 @@ class TestNotificationSettings:
         base_url: str,
         trigger_test_notification,
         get_notification_count,
-        clear_notifications
+        clear_notifications,
+        waits
     ):
         """
         Integration Test: Live session does NOT send notification when disabled
@@ -586,16 +577,15 @@ class TestNotificationSettings:
         # Expand Course accordion
         course_summary = page.locator('[data-testid="notifications-settings-category-course-accordion-summary"]')
         course_summary.click()
-        page.wait_for_timeout(500)
+        expect(course_summary).to_have_attribute("aria-expanded", "true")
         
         # Turn OFF Course → Live Sessions
         live_inapp = page.locator('[data-testid="notifications-settings-course-live-sessions-inapp-switch"] input')
         live_inapp.uncheck()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
-        page.wait_for_timeout(1000)
         
         # Navigate to dashboard
         page.goto(f"{base_url}/dashboard")
@@ -607,8 +597,8 @@ class TestNotificationSettings:
         # Trigger live session notification
         trigger_test_notification('course', 'LiveSessions')
         
-        # Wait to ensure notification would have arrived
-        page.wait_for_timeout(2000)
+        # Fail fast if a notification shows up in the bell
+        waits.expect_no_bell_change(initial_count)
         
         # Verify count did NOT increase
         final_count = get_notification_count()
@@ -625,7 +615,8 @@ class TestNotificationSettings:
         base_url: str,
         trigger_test_notification,
         get_notification_count,
-        clear_notifications
+        clear_notifications,
+        waits
     ):
         """
         Critical Test: In-App OFF, Email ON
@@ -650,9 +641,8 @@ class TestNotificationSettings:
         page.click('li[data-value="realtime"]')
         
         # Save
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
-        page.wait_for_timeout(1000)
         
         # Navigate to dashboard
         page.goto(f"{base_url}/dashboard")
@@ -664,8 +654,8 @@ class TestNotificationSettings:
         # Trigger lesson completion
         trigger_test_notification('progress', 'LessonCompletion')
         
-        # Wait to ensure notification would have arrived if in-app was enabled
-        page.wait_for_timeout(2000)
+        # Fail fast if a notification shows up in the bell
+        waits.expect_no_bell_change(initial_count)
         
         # Verify NO in-app notification (count should stay at 0)
         final_count = get_notification_count()
@@ -684,7 +674,7 @@ class TestNotificationSettings:
         # Expand System accordion
         system_summary = page.locator('[data-testid="notifications-settings-category-system-accordion-summary"]')
         system_summary.click()
-        page.wait_for_timeout(500)
+        expect(system_summary).to_have_attribute("aria-expanded", "true")
         
         # Security alerts switches should be disabled
         security_inapp = page.locator('[data-testid="notifications-settings-system-security-alerts-inapp-switch"] input')
@@ -694,7 +684,7 @@ class TestNotificationSettings:
         assert security_inapp.is_disabled()
         assert security_email.is_disabled()
 
-    def test_multiple_changes_before_save(self, page: Page):
+    def test_multiple_changes_before_save(self, page: Page, waits):
         """Test making multiple changes before saving"""
         # Change global settings
         email_switch = page.locator('[data-testid="notifications-settings-enable-email-switch"] input')
@@ -708,13 +698,13 @@ class TestNotificationSettings:
         # Expand Course accordion
         course_summary = page.locator('[data-testid="notifications-settings-category-course-accordion-summary"]')
         course_summary.click()
-        page.wait_for_timeout(500)
+        expect(course_summary).to_have_attribute("aria-expanded", "true")
         
         live_inapp = page.locator('[data-testid="notifications-settings-course-live-sessions-inapp-switch"] input')
         live_inapp.uncheck()
         
         # Save all at once
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         expect(page.locator('text="Notification settings saved!"')).to_be_visible(timeout=5000)
         
         # Reload and verify all changes persisted
@@ -728,6 +718,7 @@ class TestNotificationSettings:
         assert not progress_after.is_checked()
 
 
+@pytest.mark.seeded  # Milestone and live session tests need the seeded enrollments
 class TestNotificationSettingsWithAPI:
     """
     Advanced integration tests that use API calls to trigger notifications
@@ -737,30 +728,21 @@ class TestNotificationSettingsWithAPI:
     # ===== INSTRUCTOR MILESTONE NOTIFICATION TESTS =====
     
     @pytest.mark.integration
+    @pytest.mark.login_as("instructor")
     def test_instructor_milestone_25_percent_notification(
         self, page, base_url, api_client_instructor, get_enrolled_course, 
-        get_course_progress, trigger_test_notification, get_db_notifications
+        get_course_progress, trigger_test_notification, get_db_notifications, waits
     ):
         """
         Test that instructor receives notification when student reaches 25% course completion
         Instructor should receive notification ONLY at milestone, not every lesson
         """
-        # Login as instructor and enable progress notifications
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+ins1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         # Navigate to notification settings
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Ensure Progress category is enabled
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         # Enable student milestone notifications for in-app
         milestone_inapp = page.locator('[data-testid="notifications-settings-progress-student-milestone-inapp-switch"] input')
@@ -768,14 +750,12 @@ class TestNotificationSettingsWithAPI:
             milestone_inapp.check()
         
         # Save settings
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger test notification for 25% milestone
         trigger_test_notification(notification_type='progress', subcategory='StudentMilestone', metadata={'milestone': 25})
         
-        page.wait_for_timeout(2000)
-        
         # Verify notification was created in database
         notifications = get_db_notifications()
         milestone_notifs = [n for n in notifications if 'milestone' in n.get('Message', '').lower() or '25%' in n.get('Message', '')]
@@ -784,39 +764,29 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("instructor")
     def test_instructor_milestone_50_75_100_percent_notifications(
-        self, page, base_url, api_client_instructor, trigger_test_notification, get_db_notifications
+        self, page, base_url, api_client_instructor, trigger_test_notification, get_db_notifications, waits
     ):
         """
         Test that instructor receives notifications at 50%, 75%, and 100% course completion milestones
         """
-        # Login as instructor and enable settings
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+ins1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Enable milestone notifications
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         milestone_inapp = page.locator('[data-testid="notifications-settings-progress-student-milestone-inapp-switch"] input')
         if not milestone_inapp.is_checked():
             milestone_inapp.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Test each milestone
         for milestone in [50, 75, 100]:
             trigger_test_notification(notification_type='progress', subcategory='StudentMilestone', metadata={'milestone': milestone})
-            page.wait_for_timeout(1500)
             
             notifications = get_db_notifications()
             milestone_notifs = [n for n in notifications if f'{milestone}%' in n.get('Message', '') or str(milestone) in n.get('Message', '')]
@@ -825,33 +795,24 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("instructor")
     def test_instructor_milestone_blocked_when_disabled(
-        self, page, base_url, api_client_instructor, trigger_test_notification, get_db_notifications
+        self, page, base_url, api_client_instructor, trigger_test_notification, get_db_notifications, waits
     ):
         """
         Test that instructor does NOT receive milestone notifications when disabled
         """
-        # Login as instructor
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+ins1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Disable milestone notifications
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         milestone_inapp = page.locator('[data-testid="notifications-settings-progress-student-milestone-inapp-switch"] input')
         if milestone_inapp.is_checked():
             milestone_inapp.uncheck()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Get current notification count
@@ -860,7 +821,6 @@ class TestNotificationSettingsWithAPI:
         
         # Trigger milestone notification
         trigger_test_notification(notification_type='progress', subcategory='StudentMilestone', metadata={'milestone': 50})
-        page.wait_for_timeout(2000)
         
         # Verify no new notifications
         final_notifs = get_db_notifications()
@@ -870,27 +830,18 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("instructor")
     def test_instructor_milestone_email_only_mode(
-        self, page, base_url, api_client_instructor, trigger_test_notification
+        self, page, base_url, api_client_instructor, trigger_test_notification, waits
     ):
         """
         Test that instructor receives milestone notifications via email only when email-only is enabled
         """
-        # Login as instructor
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+ins1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Enable email-only for milestone notifications
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         milestone_inapp = page.locator('[data-testid="notifications-settings-progress-student-milestone-inapp-switch"] input')
         milestone_email = page.locator('[data-testid="notifications-settings-progress-student-milestone-email-switch"] input')
@@ -900,12 +851,11 @@ class TestNotificationSettingsWithAPI:
         if not milestone_email.is_checked():
             milestone_email.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger milestone notification
         trigger_test_notification(notification_type='progress', subcategory='StudentMilestone', metadata={'milestone': 75})
-        page.wait_for_timeout(2000)
         
         # Verify no in-app notification in UI (bell badge should not increase)
         badge = page.locator('[data-testid="notifications-bell-icon"]').locator('.MuiBadge-badge')
@@ -918,7 +868,7 @@ class TestNotificationSettingsWithAPI:
     @pytest.mark.integration
     def test_live_session_multiple_enrolled_students(
         self, page, base_url, switch_user, api_client_instructor, create_live_session, 
-        get_enrolled_course, get_db_notifications
+        get_enrolled_course, get_db_notifications, waits, student_credentials, instructor_credentials
     ):
         """
         Test that multiple enrolled students receive live session notifications
@@ -932,34 +882,29 @@ class TestNotificationSettingsWithAPI:
         course_id = enrolled['courseId']
         
         # Setup student1: Enable live session notifications
-        switch_user("s.mishin.dev+student1@gmail.com", "Aa123456")
+        switch_user(student_credentials['email'], student_credentials['password'])
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
-        course_accordion = page.locator('[data-testid="notifications-settings-category-course-accordion"]')
-        if course_accordion.get_attribute("aria-expanded") == "false":
-            course_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("course")
         
         live_session_inapp = page.locator('[data-testid="notifications-settings-course-live-session-scheduled-inapp-switch"] input')
         if not live_session_inapp.is_checked():
             live_session_inapp.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Instructor creates live session
-        switch_user("s.mishin.dev+ins1@gmail.com", "Aa123456")
+        switch_user(instructor_credentials['email'], instructor_credentials['password'])
         session_id = create_live_session(course_id, "Multi-Student Test Session")
         
-        page.wait_for_timeout(3000)
-        
         # Switch back to student1 and verify notification
-        switch_user("s.mishin.dev+student1@gmail.com", "Aa123456")
+        switch_user(student_credentials['email'], student_credentials['password'])
         page.goto(f"{base_url}/dashboard")
         
-        page.wait_for_timeout(1000)
         badge = page.locator('[data-testid="notifications-bell-icon"]').locator('.MuiBadge-badge')
+        expect(badge).to_be_visible()
         
         # Should have at least 1 notification
         assert badge.is_visible() and int(badge.inner_text()) >= 1, \
@@ -968,7 +913,8 @@ class TestNotificationSettingsWithAPI:
     
     @pytest.mark.integration
     def test_live_session_not_enrolled_student_no_notification(
-        self, page, base_url, switch_user, api_client_instructor, create_live_session
+        self, page, base_url, switch_user, api_client_instructor, create_live_session,
+        student_credentials, instructor_credentials
     ):
         """
         Test that student NOT enrolled in course does NOT receive live session notification
@@ -976,14 +922,14 @@ class TestNotificationSettingsWithAPI:
         # Create a live session in a course (using course ID that student might not be in)
         # Note: This test assumes student1 is not enrolled in all courses
         
-        switch_user("s.mishin.dev+ins1@gmail.com", "Aa123456")
+        switch_user(instructor_credentials['email'], instructor_credentials['password'])
         
         # Use a specific course ID or create a new course
         # For testing, we'll use a test course ID
         test_course_id = "test-course-no-enrollment"
         
         # Get initial notification count for a different student
-        switch_user("s.mishin.dev+student1@gmail.com", "Aa123456")
+        switch_user(student_credentials['email'], student_credentials['password'])
         page.goto(f"{base_url}/dashboard")
         page.wait_for_load_state("networkidle")
         
@@ -991,19 +937,17 @@ class TestNotificationSettingsWithAPI:
         initial_count = int(badge.inner_text()) if badge.is_visible() and badge.inner_text() else 0
         
         # Create live session as instructor
-        switch_user("s.mishin.dev+ins1@gmail.com", "Aa123456")
+        switch_user(instructor_credentials['email'], instructor_credentials['password'])
         # Note: This may fail if course doesn't exist, which is expected for this edge case test
         try:
             create_live_session(test_course_id, "Not Enrolled Test Session")
         except:
             pytest.skip("Cannot test unenrolled scenario without proper course setup")
         
-        page.wait_for_timeout(2000)
-        
         # Verify student didn't receive notification
-        switch_user("s.mishin.dev+student1@gmail.com", "Aa123456")
+        switch_user(student_credentials['email'], student_credentials['password'])
         page.goto(f"{base_url}/dashboard")
-        page.wait_for_timeout(1000)
+        page.wait_for_load_state("networkidle")
         
         final_count = int(badge.inner_text()) if badge.is_visible() and badge.inner_text() else 0
         
@@ -1014,27 +958,18 @@ class TestNotificationSettingsWithAPI:
     # ===== EMAIL VS IN-APP SEPARATION TESTS =====
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_lesson_completion_inapp_only(
-        self, page, base_url, trigger_test_notification, get_notification_count, get_db_notifications
+        self, page, base_url, trigger_test_notification, get_notification_count, get_db_notifications, waits
     ):
         """
         Test that lesson completion notification is delivered in-app ONLY when email is disabled
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Enable in-app, disable email for lesson completion
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         lesson_email = page.locator('[data-testid="notifications-settings-progress-lesson-completion-email-switch"] input')
@@ -1044,13 +979,13 @@ class TestNotificationSettingsWithAPI:
         if lesson_email.is_checked():
             lesson_email.uncheck()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.wait_for_bell_change(initial_count)
         
         # Verify in-app notification exists
         final_count = get_notification_count()
@@ -1067,27 +1002,18 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_lesson_completion_email_only(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that lesson completion notification is delivered via EMAIL ONLY when in-app is disabled
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Disable in-app, enable email
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         lesson_email = page.locator('[data-testid="notifications-settings-progress-lesson-completion-email-switch"] input')
@@ -1097,13 +1023,13 @@ class TestNotificationSettingsWithAPI:
         if not lesson_email.is_checked():
             lesson_email.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.expect_no_bell_change(initial_count)
         
         # Verify NO in-app notification
         final_count = get_notification_count()
@@ -1111,27 +1037,18 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_lesson_completion_both_channels(
-        self, page, base_url, trigger_test_notification, get_notification_count, get_db_notifications
+        self, page, base_url, trigger_test_notification, get_notification_count, get_db_notifications, waits
     ):
         """
         Test that lesson completion notification is delivered via BOTH in-app AND email when both enabled
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Enable both in-app and email
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         lesson_email = page.locator('[data-testid="notifications-settings-progress-lesson-completion-email-switch"] input')
@@ -1141,13 +1058,13 @@ class TestNotificationSettingsWithAPI:
         if not lesson_email.is_checked():
             lesson_email.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.wait_for_bell_change(initial_count)
         
         # Verify in-app notification exists
         final_count = get_notification_count()
@@ -1165,27 +1082,18 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_lesson_completion_neither_channel(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that NO notification is delivered when both in-app AND email are disabled
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Disable both in-app and email
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         lesson_email = page.locator('[data-testid="notifications-settings-progress-lesson-completion-email-switch"] input')
@@ -1195,13 +1103,13 @@ class TestNotificationSettingsWithAPI:
         if lesson_email.is_checked():
             lesson_email.uncheck()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.expect_no_bell_change(initial_count)
         
         # Verify NO notification
         final_count = get_notification_count()
@@ -1209,28 +1117,19 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_independent_email_inapp_for_different_subcategories(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that email and in-app settings are independent for different subcategories
         Example: Lesson completion (in-app only), Assessment graded (email only)
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Lesson completion: in-app only
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         lesson_email = page.locator('[data-testid="notifications-settings-progress-lesson-completion-email-switch"] input')
@@ -1240,10 +1139,7 @@ class TestNotificationSettingsWithAPI:
             lesson_email.uncheck()
         
         # Assessment graded: email only
-        assessment_accordion = page.locator('[data-testid="notifications-settings-category-assessment-accordion"]')
-        if assessment_accordion.get_attribute("aria-expanded") == "false":
-            assessment_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("assessment")
         
         graded_inapp = page.locator('[data-testid="notifications-settings-assessment-assessment-graded-inapp-switch"] input')
         graded_email = page.locator('[data-testid="notifications-settings-assessment-assessment-graded-email-switch"] input')
@@ -1252,20 +1148,20 @@ class TestNotificationSettingsWithAPI:
         if not graded_email.is_checked():
             graded_email.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Test lesson completion (should get in-app)
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.wait_for_bell_change(initial_count)
         
         after_lesson = get_notification_count()
         assert after_lesson > initial_count, "Lesson completion should deliver in-app notification"
         
         # Test assessment graded (should NOT get in-app)
         trigger_test_notification(notification_type='assessment', subcategory='AssessmentGraded')
-        page.wait_for_timeout(2000)
+        waits.expect_no_bell_change(after_lesson)
         
         after_assessment = get_notification_count()
         assert after_assessment == after_lesson, "Assessment graded should NOT deliver in-app notification"
@@ -1274,20 +1170,14 @@ class TestNotificationSettingsWithAPI:
     # ===== EDGE CASE TESTS =====
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_global_off_blocks_all_notifications(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that disabling global in-app switch blocks ALL in-app notifications
         Even if category and subcategory are enabled
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
@@ -1297,22 +1187,19 @@ class TestNotificationSettingsWithAPI:
             global_inapp.uncheck()
         
         # Enable progress category and lesson completion
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         lesson_inapp = page.locator('[data-testid="notifications-settings-progress-lesson-completion-inapp-switch"] input')
         if not lesson_inapp.is_checked():
             lesson_inapp.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.expect_no_bell_change(initial_count)
         
         # Verify NO notification due to global OFF
         final_count = get_notification_count()
@@ -1321,28 +1208,19 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_category_off_blocks_subcategory(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that disabling category switch blocks subcategory notifications
         Even if subcategory is explicitly enabled
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Disable Progress category
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         category_switch = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         if category_switch.is_checked():
@@ -1353,13 +1231,13 @@ class TestNotificationSettingsWithAPI:
         if not lesson_inapp.is_checked():
             lesson_inapp.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.expect_no_bell_change(initial_count)
         
         # Verify NO notification due to category OFF
         final_count = get_notification_count()
@@ -1368,28 +1246,19 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_subcategory_explicit_off_overrides_category_on(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that explicitly disabling subcategory blocks notification
         Even when category is enabled (NULL inheritance override)
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Enable Progress category
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         category_switch = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         if not category_switch.is_checked():
@@ -1400,13 +1269,13 @@ class TestNotificationSettingsWithAPI:
         if lesson_inapp.is_checked():
             lesson_inapp.uncheck()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.expect_no_bell_change(initial_count)
         
         # Verify NO notification due to explicit subcategory OFF
         final_count = get_notification_count()
@@ -1415,28 +1284,19 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_null_inheritance_allows_notification(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that NULL subcategory inherits from category ON
         Notification should be delivered when category is ON and subcategory is NULL (inherit)
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
         # Enable Progress category
-        progress_accordion = page.locator('[data-testid="notifications-settings-category-progress-accordion"]')
-        if progress_accordion.get_attribute("aria-expanded") == "false":
-            progress_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("progress")
         
         category_switch = page.locator('[data-testid="notifications-settings-category-progress-switch"] input')
         if not category_switch.is_checked():
@@ -1449,13 +1309,13 @@ class TestNotificationSettingsWithAPI:
         if not lesson_inapp.is_checked():
             lesson_inapp.check()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger notification
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='progress', subcategory='LessonCompletion')
-        page.wait_for_timeout(2000)
+        waits.wait_for_bell_change(initial_count)
         
         # Verify notification is delivered
         final_count = get_notification_count()
@@ -1464,20 +1324,14 @@ class TestNotificationSettingsWithAPI:
     
     
     @pytest.mark.integration
+    @pytest.mark.login_as("student")
     def test_security_alerts_always_delivered(
-        self, page, base_url, trigger_test_notification, get_notification_count
+        self, page, base_url, trigger_test_notification, get_notification_count, waits
     ):
         """
         Test that security alerts are ALWAYS delivered regardless of settings
         Critical security notifications bypass user preferences
         """
-        # Login as student
-        page.goto(f"{base_url}/login")
-        page.fill('[data-testid="login-email-input"]', "s.mishin.dev+student1@gmail.com")
-        page.fill('[data-testid="login-password-input"]', "Aa123456")
-        page.click('[data-testid="login-submit-button"]')
-        page.wait_for_url(re.compile(r".*/dashboard.*"))
-        
         page.goto(f"{base_url}/settings/notifications")
         page.wait_for_load_state("networkidle")
         
@@ -1487,22 +1341,19 @@ class TestNotificationSettingsWithAPI:
             global_inapp.uncheck()
         
         # Disable System category
-        system_accordion = page.locator('[data-testid="notifications-settings-category-system-accordion"]')
-        if system_accordion.get_attribute("aria-expanded") == "false":
-            system_accordion.click()
-            page.wait_for_timeout(300)
+        waits.expand_category("system")
         
         category_switch = page.locator('[data-testid="notifications-settings-category-system-switch"] input')
         if category_switch.is_checked():
             category_switch.uncheck()
         
-        page.click('[data-testid="notifications-settings-save-button"]')
+        waits.save_notification_settings()
         page.wait_for_selector('[data-testid="notifications-settings-success-message"]', timeout=5000)
         
         # Trigger security alert
         initial_count = get_notification_count()
         trigger_test_notification(notification_type='system', subcategory='SecurityAlert')
-        page.wait_for_timeout(2000)
+        waits.wait_for_bell_change(initial_count)
         
         # Verify notification is delivered even with all settings OFF
         final_count = get_notification_count()
@@ -24,6 +24,7 @@ import json
 
 @pytest.mark.notifications
 @pytest.mark.e2e
+@pytest.mark.serial  # Triggers a scheduler job that fans out to every student
 class TestWeeklyProgressSummary:
     """Test Weekly Progress Summary notifications"""
 
@@ -35,7 +36,8 @@ class TestWeeklyProgressSummary:
         api_client_instructor,
         api_client,
         instructor_credentials: dict,
-        student_credentials: dict
+        student_credentials: dict,
+        namespaced
     ):
         """
         Complete E2E test for Weekly Progress Summary
@@ -65,7 +67,7 @@ class TestWeeklyProgressSummary:
         # ====== STEP 1: Instructor creates a course ======
         print("📚 STEP 1: Creating course as instructor...")
         course_data = {
-            "title": f"Test Course - Weekly Summary {datetime.now().timestamp()}",
+            "title": namespaced(f"Test Course - Weekly Summary {datetime.now().timestamp()}"),
             "description": "Course for testing weekly progress summaries",
             "category": "Test",
             "level": "beginner",